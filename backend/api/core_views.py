@@ -6,6 +6,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from django.db.models import Q, Count, Sum, Avg
 from django.utils import timezone
 from datetime import timedelta
@@ -26,6 +27,7 @@ from .core_serializers import (
     ExpenseListSerializer, ExpenseDetailSerializer, ExpenseCreateSerializer,
     OrganizationListSerializer, OrganizationSerializer
 )
+from .services.voter_search import search_voters
 
 
 # ==================== ORGANIZATION VIEWSET ====================
@@ -67,11 +69,40 @@ class OrganizationViewSet(viewsets.ModelViewSet):
 
 # ==================== VOTER VIEWSET ====================
 
+class VoterSearchFilter(filters.BaseFilterBackend):
+    """
+    Indexed voter search on ?search=, best matches first
+
+    Runs after the ordering filter; an explicit ?ordering= still orders
+    the matches.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        matches = search_voters(queryset, query)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return filters.OrderingFilter().filter_queryset(request, matches, view)
+        return matches
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Phone or voter ID prefix, email, or name in Tamil or Latin script',
+            'schema': {'type': 'string'},
+        }]
+
+
 class VoterViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Voters
 
     GET /api/voters/ - List all voters (role-filtered)
+    GET /api/voters/?search=... - Search by phone or voter ID prefix, email or name
     POST /api/voters/ - Create voter
     GET /api/voters/{id}/ - Get voter details
     PUT/PATCH /api/voters/{id}/ - Update voter
@@ -85,8 +116,7 @@ class VoterViewSet(viewsets.ModelViewSet):
     """
     queryset = Voter.objects.select_related('constituency', 'district', 'state', 'created_by').all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['voter_id', 'first_name', 'last_name', 'phone', 'email']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, VoterSearchFilter]
     filterset_fields = ['party_affiliation', 'sentiment', 'influence_level', 'is_active', 'gender', 'ward']
     ordering_fields = ['created_at', 'first_name', 'age', 'last_contacted_at']
     ordering = ['-created_at']
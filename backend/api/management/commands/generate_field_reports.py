@@ -1,22 +1,28 @@
 """
 Django management command to generate 3,000 realistic field reports from volunteers/booth agents.
 Follows TVK party ground-level reporting patterns with realistic Tamil Nadu scenarios.
+
+Reports, then their key issues and voter segments, are sampled with NumPy
+in shards of --shard-size rows and bulk-loaded with COPY on PostgreSQL
+(batched INSERTs on SQLite), like generate_voters. The report templates
+live in api.utils.synthetic_data.
 """
 
-from django.core.management.base import BaseCommand
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.db.models import Count, Max
 from django.utils import timezone
-from faker import Faker
 from api.models import (
     FieldReport, State, District, Constituency, IssueCategory,
-    VoterSegment, PoliticalParty, BoothAgent
+    VoterSegment, PoliticalParty
+)
+from api.utils.synthetic_data import (
+    DEFAULT_SHARD_SIZE, FieldReportGenerator, ManyToManyGenerator, merge_stats, plan_shards,
+    reference_time_for, run_shards,
 )
-import random
-from datetime import datetime, timedelta
-from decimal import Decimal
-
-fake = Faker(['en_IN'])
 
 
 class Command(BaseCommand):
@@ -40,17 +46,56 @@ class Command(BaseCommand):
             default=3000,
             help='Number of field reports to generate (default: 3000)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per COPY/INSERT batch (default: 10000)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed (default: 42)'
+        )
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=0,
+            help='Index of the first report; use the previous total to append more (default: 0)'
+        )
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            default=DEFAULT_SHARD_SIZE,
+            help=f'Rows generated and committed together (default: {DEFAULT_SHARD_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes loading shards in parallel; PostgreSQL only (default: 1)'
+        )
+        parser.add_argument(
+            '--as-of',
+            type=date.fromisoformat,
+            default=None,
+            help='Reference date reports are filed up to, YYYY-MM-DD (default: today)'
+        )
 
     def handle(self, *args, **options):
         count = options['count']
+        if count < 1 or options['shard_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--count, --shard-size and --batch-size must be positive')
 
         self.stdout.write(self.style.SUCCESS(f'Starting generation of {count} field reports...'))
 
         # Load reference data
-        self._load_reference_data()
+        if not self._load_reference_data():
+            return
 
         # Generate reports
-        self._generate_reports(count)
+        self._generate_reports(count, options)
 
         # Print statistics
         self._print_statistics()
@@ -58,379 +103,77 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'Successfully created {self.report_count} field reports!'))
 
     def _load_reference_data(self):
-        """Load all required reference data from database"""
+        """Load the ids reports reference from the database"""
         self.stdout.write('Loading reference data...')
 
         # Get Tamil Nadu state
         self.state = State.objects.filter(code='TN').first()
         if not self.state:
             self.stdout.write(self.style.ERROR('Tamil Nadu state not found. Please run seed data first.'))
-            return
+            return False
 
         # Get all volunteers and booth agents
         self.volunteers = list(User.objects.filter(
             profile__role__in=['volunteer', 'user']
-        ).select_related('profile')[:500])
+        ).order_by('id').values_list('id', flat=True)[:500])
 
         if not self.volunteers:
             self.stdout.write(self.style.ERROR('No volunteers found. Please create users first.'))
-            return
+            return False
 
         # Get constituencies and districts
-        self.constituencies = list(Constituency.objects.filter(state=self.state).select_related('district'))
-        self.districts = list(District.objects.filter(state=self.state))
+        self.constituencies = list(
+            Constituency.objects.filter(state=self.state).order_by('id').values_list('id', 'district_id')
+        )
+        self.districts = list(District.objects.filter(state=self.state).order_by('id').values_list('id', flat=True))
 
         # Get issue categories
-        self.issue_categories = list(IssueCategory.objects.filter(is_active=True))
+        self.issue_categories = list(IssueCategory.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
 
         # Get voter segments
-        self.voter_segments = list(VoterSegment.objects.filter(is_active=True))
+        self.voter_segments = list(VoterSegment.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
 
         # Get political parties
-        self.parties = list(PoliticalParty.objects.all())
+        self.parties = list(PoliticalParty.objects.order_by('id').values_list('id', flat=True))
 
         self.stdout.write(self.style.SUCCESS(
             f'Loaded: {len(self.volunteers)} volunteers, {len(self.constituencies)} constituencies, '
             f'{len(self.issue_categories)} issue categories, {len(self.voter_segments)} voter segments'
         ))
+        return True
 
-    def _generate_reports(self, count):
-        """Generate field reports with realistic distribution"""
-
-        # Report type distribution
-        report_types = [
-            ('daily_summary', 1500),
-            ('event_feedback', 750),
-            ('issue_report', 450),
-            ('competitor_activity', 150),
-            ('booth_report', 150),
-        ]
-
-        # Verification status distribution
-        verification_statuses = [
-            ('verified', 0.70),
-            ('pending', 0.25),
-            ('disputed', 0.05),
-        ]
-
-        reports_to_create = []
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=60)
-
+    def _generate_reports(self, count, options):
+        """Load the reports, then link each to 1-3 issues and 1-2 voter segments"""
         self.stdout.write('Generating field reports...')
 
-        for report_type, type_count in report_types:
-            for i in range(type_count):
-                volunteer = random.choice(self.volunteers)
-                constituency = random.choice(self.constituencies) if self.constituencies else None
-                district = constituency.district if constituency else random.choice(self.districts) if self.districts else None
-
-                # Generate report timestamp (more recent = more reports)
-                # Weight towards recent dates
-                days_ago = int(random.triangular(0, 60, 5))
-                report_time = end_date - timedelta(
-                    days=days_ago,
-                    hours=random.randint(18, 21),  # Peak reporting 6-9 PM
-                    minutes=random.randint(0, 59)
-                )
-
-                # Geographic classification
-                is_urban = random.random() < 0.45
-                is_semi_urban = random.random() < 0.35
-
-                # Generate ward number
-                ward_num = random.randint(1, 60) if constituency else 1
-                ward = f"Ward-{ward_num}"
-
-                # Verification status
-                verification_status = random.choices(
-                    [s[0] for s in verification_statuses],
-                    weights=[s[1] for s in verification_statuses]
-                )[0]
-
-                # Create report based on type
-                report = self._create_report_by_type(
-                    report_type=report_type,
-                    volunteer=volunteer,
-                    constituency=constituency,
-                    district=district,
-                    ward=ward,
-                    report_time=report_time,
-                    verification_status=verification_status,
-                    is_urban=is_urban
-                )
-
-                reports_to_create.append(report)
-
-                # Bulk insert every 500 records
-                if len(reports_to_create) >= 500:
-                    with transaction.atomic():
-                        FieldReport.objects.bulk_create(reports_to_create, ignore_conflicts=True)
-                        self.report_count += len(reports_to_create)
-                        self.stdout.write(f'Created {self.report_count} reports...')
-                        reports_to_create = []
-
-        # Insert remaining reports
-        if reports_to_create:
-            with transaction.atomic():
-                created_reports = FieldReport.objects.bulk_create(reports_to_create, ignore_conflicts=True)
-                self.report_count += len(created_reports)
-
-                # Add many-to-many relationships
-                self._add_many_to_many_relations(created_reports)
-
-    def _create_report_by_type(self, report_type, volunteer, constituency, district, ward,
-                                 report_time, verification_status, is_urban):
-        """Create a field report based on type with realistic content"""
-
-        area = self._get_area_name(is_urban, ward)
-        booth_num = f"{random.randint(1, 150):03d}" if random.random() < 0.3 else ""
-
-        report = FieldReport(
-            volunteer=volunteer,
-            state=self.state,
-            district=district,
-            constituency=constituency,
-            ward=ward,
-            booth_number=booth_num,
-            report_type=report_type,
-            verification_status=verification_status,
-            report_date=report_time.date(),
-            timestamp=report_time,
+        generator = FieldReportGenerator(
+            self.volunteers, self.constituencies, self.districts, self.parties, self.state.id,
+            seed=options['seed'],
+            reference_time=reference_time_for(options['as_of'] or timezone.now().date()),
         )
-
-        if report_type == 'daily_summary':
-            report.title, report.notes = self._generate_daily_summary(ward, area, is_urban)
-            report.positive_reactions = self._get_positive_reactions()
-            report.negative_reactions = self._get_negative_reactions()
-
-        elif report_type == 'event_feedback':
-            report.title, report.notes = self._generate_event_feedback(area, is_urban)
-            report.crowd_size = random.randint(50, 10000)
-            report.positive_reactions = self._get_event_positive_reactions()
-            report.quotes = self._get_event_quotes()
-
-        elif report_type == 'issue_report':
-            report.title, report.notes = self._generate_issue_report(area, ward, is_urban)
-            report.negative_reactions = self._get_issue_negative_reactions()
-
-        elif report_type == 'competitor_activity':
-            report.title, report.notes = self._generate_competitor_activity(area)
-            if self.parties:
-                report.competitor_party = random.choice(self.parties)
-            report.competitor_activity_description = report.notes
-            report.crowd_size = random.randint(50, 500)
-
-        elif report_type == 'booth_report':
-            report.title, report.notes = self._generate_booth_report(ward, booth_num)
-            report.positive_reactions = self._get_positive_reactions()
-
-        # Add verification data
-        if verification_status == 'verified':
-            report.verified_by = random.choice(self.volunteers)
-            report.verified_at = report_time + timedelta(hours=random.randint(2, 48))
-            report.verification_notes = "Field report verified by supervisor. Data cross-checked."
-        elif verification_status == 'disputed':
-            report.verification_notes = "Crowd size seems inflated. Needs re-verification."
-
-        return report
-
-    def _add_many_to_many_relations(self, reports):
-        """Add many-to-many relationships after bulk creation"""
-        for report in reports:
-            # Add 1-3 issue categories
-            if self.issue_categories:
-                issues = random.sample(self.issue_categories, k=min(random.randint(1, 3), len(self.issue_categories)))
-                report.key_issues.set(issues)
-
-            # Add voter segments met
-            if self.voter_segments:
-                segments = random.sample(self.voter_segments, k=min(random.randint(1, 2), len(self.voter_segments)))
-                report.voter_segments_met.set(segments)
-
-    def _get_area_name(self, is_urban, ward):
-        """Generate realistic area names"""
-        if is_urban:
-            urban_areas = [
-                'T Nagar', 'Adyar', 'Anna Nagar', 'Velachery', 'Tambaram',
-                'RS Puram', 'Gandhipuram', 'Saibaba Colony', 'Race Course',
-                'Anna Salai', 'Perambur', 'KK Nagar', 'Kodambakkam', 'Mylapore',
-                'Ashok Nagar', 'Vadapalani', 'Porur', 'Sholinganallur'
-            ]
-            return random.choice(urban_areas)
-        else:
-            return f"{ward} Area"
-
-    # Daily Summary Templates
-    def _generate_daily_summary(self, ward, area, is_urban):
-        templates = [
-            (
-                f"Daily Field Visit - {ward}",
-                f"{ward} field visit completed. Met 45 families, mostly positive response to TVK vision. Water supply remains top concern in {area}. Residents want immediate action on drinking water crisis."
-            ),
-            (
-                f"Door-to-Door Coverage - {area}",
-                f"Booth coverage in {area}: 60% households contacted. Youth showing strong interest in employment programs. Many asked about skill development initiatives and job creation plans."
-            ),
-            (
-                f"Ground Report - {ward}",
-                f"Door-to-door in {area}: Mixed reactions. NEET issue resonates strongly with students, parents very concerned about education costs and accessibility for rural students."
-            ),
-            (
-                f"Field Activity Summary - {area}",
-                f"Covered {random.randint(30, 80)} households in {area} today. Key concerns: water scarcity, unemployment, agriculture input costs. TVK's anti-corruption stand getting good response."
-            ),
-            (
-                f"Community Engagement - {ward}",
-                f"Met with {random.randint(20, 50)} families. Strong support for TVK's stance on social justice. People want change from DMK-AIADMK cycle. Youth very enthusiastic about new political movement."
-            ),
-        ]
-        return random.choice(templates)
-
-    # Event Feedback Templates
-    def _generate_event_feedback(self, area, is_urban):
-        crowd_descriptor = "massive" if random.random() < 0.3 else "good"
-        templates = [
-            (
-                f"TVK Rally Feedback - {area}",
-                f"TVK rally in {area}: Estimated {random.randint(3000, 8000)}+ attendance. Crowd very enthusiastic. Key topics resonated: jobs, water, corruption-free governance. Youth participation exceptional."
-            ),
-            (
-                f"Town Hall Meeting Success - {area}",
-                f"Town hall meeting in {area} was highly successful. 200+ participants asked detailed questions about healthcare access, education reforms. Very positive sentiment, people want actionable solutions."
-            ),
-            (
-                f"Public Meeting Report - {area}",
-                f"Public meeting had {crowd_descriptor} turnout. Vijay's speech on social justice and equality received standing ovation. Many first-time voters expressing strong support. NEET abolition demand got huge applause."
-            ),
-            (
-                f"Community Gathering - {area}",
-                f"Corner meeting in {area} attended by {random.randint(100, 300)} residents. Interactive session on local issues. People appreciate TVK's grassroots approach and listening to ground realities."
-            ),
-        ]
-        return random.choice(templates)
-
-    # Issue Report Templates
-    def _generate_issue_report(self, area, ward, is_urban):
-        templates = [
-            (
-                f"URGENT: Water Crisis - {ward}",
-                f"URGENT: Water crisis worsening in {ward}. Residents without supply for 3 days. Tanker water expensive at Rs.{random.randint(800, 1500)} per load. Immediate attention needed. Women and children traveling 2km to fetch water."
-            ),
-            (
-                f"Employment Crisis - {area}",
-                f"Multiple families in {area} report job loss due to factory closure. Economic distress very high. {random.randint(300, 800)} workers affected. No government response or compensation. Families struggling to make ends meet."
-            ),
-            (
-                f"Fishermen Community Alert - {area}",
-                f"Fishermen community raising SL Navy arrest concerns. {random.randint(10, 25)} families affected this month alone. Boats confiscated, livelihoods destroyed. Community demanding government intervention and protection."
-            ),
-            (
-                f"Agriculture Distress - {ward}",
-                f"Farmers in {ward} facing severe crisis. No Cauvery water for {random.randint(15, 45)} days. Paddy fields drying up. Input costs doubled but MSP unchanged. Debt burden increasing, many considering quitting farming."
-            ),
-            (
-                f"Healthcare Emergency - {area}",
-                f"Primary Health Center in {area} non-functional. No doctors for 2 weeks. Pregnant women forced to travel 30km for basic checkups. Medical emergency cases being turned away. Critical situation needs immediate action."
-            ),
-            (
-                f"Education Infrastructure Crisis - {ward}",
-                f"Government school in {ward} has no proper building. {random.randint(200, 400)} students studying under trees. No toilets, no drinking water. Parents demanding infrastructure improvement or school merger."
-            ),
-        ]
-        return random.choice(templates)
-
-    # Competitor Activity Templates
-    def _generate_competitor_activity(self, area):
-        parties = ['DMK', 'AIADMK', 'BJP', 'Congress']
-        party = random.choice(parties)
-        templates = [
-            (
-                f"{party} Activity Observed - {area}",
-                f"{party} organized small rally in {area}. Approximately {random.randint(150, 400)} attendees. Focus on existing government schemes and freebies. Crowd response lukewarm."
-            ),
-            (
-                f"Opposition Campaign - {area}",
-                f"{party} booth setup observed in {area}. Workers distributing pamphlets about welfare schemes. Minimal public engagement. People asking critical questions about unfulfilled promises."
-            ),
-            (
-                f"Competitor Rally - {area}",
-                f"{party} public meeting in {area}. Estimated {random.randint(300, 800)} participants. Many were brought by organizers. Local issues not addressed, only party rhetoric. TVK gaining ground in comparison."
-            ),
-        ]
-        return random.choice(templates)
-
-    # Booth Report Templates
-    def _generate_booth_report(self, ward, booth_num):
-        templates = [
-            (
-                f"Booth Assessment - {ward}",
-                f"Booth {booth_num} coverage status: {random.randint(50, 85)}% households mapped. Voter database {random.randint(60, 90)}% updated. {random.randint(5, 15)} booth-level volunteers active. Need more volunteers for complete coverage."
-            ),
-            (
-                f"Booth Strength Analysis - {ward}",
-                f"Booth {booth_num} has {random.randint(600, 1200)} registered voters. Our estimated support: {random.randint(25, 45)}%. Swing voters: {random.randint(20, 35)}%. Strong opposition: {random.randint(15, 30)}%. Focus needed on undecided voters."
-            ),
-        ]
-        return random.choice(templates)
-
-    def _get_positive_reactions(self):
-        reactions = [
-            "Strong support for anti-corruption stance",
-            "Youth very enthusiastic about new movement",
-            "Appreciate grassroots approach",
-            "Want alternative to DMK-AIADMK",
-            "NEET abolition demand resonates",
-            "Jobs creation plans appreciated",
-            "Social justice message connects well",
-            "Women voters showing strong interest",
-        ]
-        return random.sample(reactions, k=random.randint(2, 4))
-
-    def _get_negative_reactions(self):
-        reactions = [
-            "Skeptical about new party effectiveness",
-            "Wait and watch approach",
-            "Concerned about political experience",
-            "Want more concrete policy details",
-            "Worried about winnability",
-            "Questions about alliance strategy",
-        ]
-        return random.sample(reactions, k=random.randint(1, 3))
-
-    def _get_event_positive_reactions(self):
-        reactions = [
-            "Massive crowd turnout exceeded expectations",
-            "Standing ovation for key policy points",
-            "Youth participation unprecedented",
-            "First-time voters very engaged",
-            "Social media buzz very positive",
-            "Local media coverage extensive",
-            "Volunteers highly motivated post-event",
-        ]
-        return random.sample(reactions, k=random.randint(3, 5))
-
-    def _get_issue_negative_reactions(self):
-        reactions = [
-            "Community very angry about government inaction",
-            "People losing faith in political system",
-            "Urgent intervention needed",
-            "Families in severe distress",
-            "Children's future at stake",
-            "Economic hardship increasing",
-        ]
-        return random.sample(reactions, k=random.randint(2, 4))
-
-    def _get_event_quotes(self):
-        quotes = [
-            "Finally someone who understands our problems - Auto driver, 42",
-            "My son needs a job, not empty promises - Mother of graduate, 48",
-            "NEET destroyed my daughter's dreams - Father, 51",
-            "We want change, not same old politics - College student, 21",
-            "TVK gives us hope for corruption-free governance - Small business owner, 38",
-            "Youth needs opportunities in Tamil Nadu - Engineering graduate, 24",
+        last_id = FieldReport.objects.aggregate(last=Max('id'))['last'] or 0
+        shards = plan_shards(options['start'], count, options['shard_size'])
+
+        stats = {}
+        started = time.monotonic()
+        for shard_stats in run_shards(generator, shards, options['batch_size'], options['workers']):
+            merge_stats(stats, shard_stats)
+            self.report_count = stats['totals']['total_created']
+            rate = self.report_count / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f'Created {self.report_count} reports... ({rate:,.0f} rows/s)')
+
+        report_ids = list(FieldReport.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True))
+        # Offset seeds so the two link sets are drawn independently
+        links = [
+            ManyToManyGenerator(FieldReport.key_issues.field, report_ids, self.issue_categories, 1, 3,
+                                seed=options['seed'] + 1),
+            ManyToManyGenerator(FieldReport.voter_segments_met.field, report_ids, self.voter_segments, 1, 2,
+                                seed=options['seed'] + 2),
         ]
-        return random.sample(quotes, k=random.randint(2, 4))
+        for link_generator in links:
+            shards = plan_shards(0, len(report_ids), options['shard_size'])
+            for _ in run_shards(link_generator, shards, options['batch_size'], options['workers']):
+                pass
 
     def _print_statistics(self):
         """Print comprehensive statistics"""
@@ -456,7 +199,6 @@ class Command(BaseCommand):
             self.stdout.write(f'\nDate Range: {oldest.timestamp.date()} to {newest.timestamp.date()}')
 
         # Top volunteers
-        from django.db.models import Count
         top_reporters = FieldReport.objects.values('volunteer__username').annotate(
             count=Count('id')
         ).order_by('-count')[:5]
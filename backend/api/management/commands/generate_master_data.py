@@ -12,6 +12,9 @@ Generates:
 - 50+ Voter Segments
 - 10 Political Parties
 - 1 TVK Organization
+
+Polling booths are sampled with NumPy and bulk-loaded like generate_voters
+(COPY on PostgreSQL, batched INSERTs on SQLite); --seed fixes them.
 """
 import random
 import sys
@@ -20,6 +23,7 @@ from decimal import Decimal
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 from django.utils.text import slugify
 from faker import Faker
 
@@ -27,6 +31,7 @@ from api.models import (
     State, District, Constituency, PollingBooth, PoliticalParty,
     IssueCategory, VoterSegment, Organization
 )
+from api.utils.synthetic_data import PollingBoothGenerator, plan_shards, run_shards
 
 fake = Faker('en_IN')
 
@@ -40,6 +45,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before generating new data',
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for polling booths (default: 42)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('=' * 80))
@@ -69,7 +80,7 @@ class Command(BaseCommand):
                 stats['states'] = self.create_states()
                 stats['districts'] = self.create_districts()
                 stats['constituencies'] = self.create_constituencies()
-                stats['polling_booths'] = self.create_polling_booths()
+                stats['polling_booths'] = self.create_polling_booths(options['seed'])
 
                 self.stdout.write(self.style.SUCCESS('\n[PHASE 2] Political Data'))
                 self.stdout.write('-' * 80)
@@ -508,71 +519,21 @@ class Command(BaseCommand):
         self.stdout.write(f'  [Complete] Created {count} constituencies')
         return count
 
-    def create_polling_booths(self):
+    def create_polling_booths(self, seed):
         """Create 10,000+ realistic polling booths"""
         self.stdout.write('Creating Polling Booths...')
 
-        constituencies = Constituency.objects.filter(state__code='TN')
-
-        # Booth names templates
-        booth_templates = [
-            'Government Higher Secondary School',
-            'Corporation Primary School',
-            'Government Elementary School',
-            'Municipal High School',
-            'Government Girls High School',
-            'Panchayat Union Primary School',
-            'Government Boys School',
-            'Corporation Middle School',
-            'Community Hall',
-            'Government Primary School',
-            'Municipal Elementary School',
-            'Village Panchayat Office',
-        ]
+        # Constituencies that already have booths keep them
+        constituencies = list(
+            Constituency.objects.filter(state__code='TN', polling_booths__isnull=True).order_by('id').values_list(
+                'id', 'state_id', 'district_id', 'name', 'center_lat', 'center_lng', 'district__name',
+            )
+        )
+        generator = PollingBoothGenerator(constituencies, seed=seed, reference_time=timezone.now())
 
         count = 0
-        target = 10000
-
-        for constituency in constituencies:
-            # Urban constituencies get more booths
-            if constituency.district and constituency.district.name in ['Chennai', 'Coimbatore', 'Madurai', 'Salem']:
-                num_booths = random.randint(60, 100)
-            else:
-                num_booths = random.randint(30, 50)
-
-            # Calculate booth distribution around constituency center
-            base_lat = float(constituency.center_lat) if constituency.center_lat else 10.0
-            base_lng = float(constituency.center_lng) if constituency.center_lng else 78.0
-
-            for booth_num in range(1, num_booths + 1):
-                # Generate GPS coordinates around constituency center
-                lat_offset = random.uniform(-0.05, 0.05)
-                lng_offset = random.uniform(-0.05, 0.05)
-
-                booth, created = PollingBooth.objects.get_or_create(
-                    constituency=constituency,
-                    booth_number=f'{booth_num:03d}',
-                    defaults={
-                        'state': constituency.state,
-                        'district': constituency.district,
-                        'name': f'{random.choice(booth_templates)} - {constituency.name}',
-                        'building_name': random.choice(booth_templates),
-                        'area': f'{constituency.name} Zone-{random.randint(1, 5)}',
-                        'latitude': Decimal(str(base_lat + lat_offset)),
-                        'longitude': Decimal(str(base_lng + lng_offset)),
-                        'total_voters': random.randint(600, 1200),
-                        'male_voters': random.randint(300, 600),
-                        'female_voters': random.randint(300, 600),
-                        'is_active': True,
-                        'is_accessible': random.choice([True, True, True, False]),  # 75% accessible
-                    }
-                )
-                if created:
-                    count += 1
-
-            # Progress update
-            if count >= target:
-                break
+        for shard_stats in run_shards(generator, plan_shards(0, generator.size)):
+            count += shard_stats['totals']['polling_booths']
 
         self.stdout.write(f'  [Complete] Created {count} polling booths')
         return count
@@ -7,20 +7,27 @@ Usage:
     python manage.py import_electoral_data <data_directory>
     python manage.py import_electoral_data ./output --clear
     python manage.py import_electoral_data ./output --dry-run
+
+Each file is diffed against the database using natural keys (state,
+district and constituency code; constituency + booth number) loaded in
+one query, then only new and changed rows are written with bulk
+statements in one transaction per file. --dry-run prints the diff
+without writing.
 """
 
 import csv
 import json
-import os
+import time
+from collections import Counter
 from decimal import Decimal
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from django.utils import timezone
 
 from api.models import State, District, Constituency, PollingBooth
+from api.utils.bulk_upsert import BulkUpserter
 
 
 class Command(BaseCommand):
@@ -47,18 +54,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip records that already exist (based on code/unique fields)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per bulk INSERT/UPDATE statement (default: 2000)'
+        )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.stats = {
-            'states': {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0},
-            'districts': {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0},
-            'constituencies': {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0},
-            'booths': {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0},
+            category: {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'errors': 0}
+            for category in ['states', 'districts', 'constituencies', 'booths']
         }
-        self.state_cache: Dict[str, State] = {}
-        self.district_cache: Dict[str, District] = {}
-        self.constituency_cache: Dict[str, Constituency] = {}
+        self.changed_fields: Dict[str, Counter] = {}
+        # Natural key -> id; None marks rows that only exist in a dry run
+        self.state_ids: Optional[Dict[str, Optional[int]]] = None
+        self.district_ids: Optional[Dict[str, Optional[int]]] = None
+        self.constituency_ids: Optional[Dict[str, Optional[int]]] = None
 
     def handle(self, *args, **options):
         data_dir = Path(options['data_dir'])
@@ -84,34 +97,30 @@ class Command(BaseCommand):
             self.stdout.write("Available files will be imported.\n")
 
         try:
-            with transaction.atomic():
-                # Clear existing data if requested
-                if options['clear'] and not options['dry_run']:
+            # Clear existing data if requested
+            if options['clear'] and not options['dry_run']:
+                with transaction.atomic():
                     self._clear_data()
 
-                # Import in order (respecting foreign key dependencies)
-                if (data_dir / 'states.csv').exists():
-                    self._import_states(data_dir / 'states.csv', options)
+            # Import in order (respecting foreign key dependencies); each file commits on its own
+            if (data_dir / 'states.csv').exists():
+                self._import_states(data_dir / 'states.csv', options)
 
-                if (data_dir / 'districts.csv').exists():
-                    self._import_districts(data_dir / 'districts.csv', options)
+            if (data_dir / 'districts.csv').exists():
+                self._import_districts(data_dir / 'districts.csv', options)
 
-                if (data_dir / 'constituencies.csv').exists():
-                    self._import_constituencies(data_dir / 'constituencies.csv', options)
+            if (data_dir / 'constituencies.csv').exists():
+                self._import_constituencies(data_dir / 'constituencies.csv', options)
 
-                if (data_dir / 'polling_booths.csv').exists():
-                    self._import_polling_booths(data_dir / 'polling_booths.csv', options)
+            if (data_dir / 'polling_booths.csv').exists():
+                self._import_polling_booths(data_dir / 'polling_booths.csv', options)
 
-                if options['dry_run']:
-                    self.stdout.write(self.style.WARNING("\n🔄 DRY RUN - Rolling back transaction"))
-                    raise Exception("Dry run - rolling back")
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING("\n🔄 DRY RUN - Nothing was written"))
 
         except Exception as e:
-            if options['dry_run']:
-                pass  # Expected for dry run
-            else:
-                self.stdout.write(self.style.ERROR(f"\n❌ Import failed: {e}"))
-                raise
+            self.stdout.write(self.style.ERROR(f"\n❌ Import failed: {e}"))
+            raise
 
         # Print summary
         self._print_summary(options['dry_run'])
@@ -138,251 +147,188 @@ class Command(BaseCommand):
         self.stdout.write(f"   Deleted: {counts['states']} states, {counts['districts']} districts, "
                          f"{counts['constituencies']} constituencies, {counts['booths']} booths")
 
+    def _read_rows(self, file_path: Path):
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+
+    def _row_error(self, category: str, label: str, error):
+        self.stats[category]['errors'] += 1
+        if self.stats[category]['errors'] <= 10:  # Only show first 10 errors
+            self.stdout.write(self.style.ERROR(f"   Error importing {label}: {error}"))
+
+    def _load_file(self, category: str, file_path: Path, upserter: BulkUpserter, parse_row, options: dict):
+        """
+        Diff one file against the database and apply it in one transaction
+
+        parse_row(row) returns the model values for a CSV row and raises
+        on bad data; rows are staged on the upserter and written in bulk.
+        """
+        started = time.monotonic()
+        for row in self._read_rows(file_path):
+            try:
+                upserter.add(parse_row(row))
+            except Exception as e:
+                self._row_error(category, f"{category[:-1]} {row.get('code') or row.get('booth_number')}", e)
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                upserter.apply()
+
+        for outcome in ('created', 'updated', 'unchanged', 'skipped'):
+            self.stats[category][outcome] = upserter.stats[outcome]
+        self.changed_fields[category] = upserter.changed_fields
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"   ✅ Processed {sum(self.stats[category].values()):,} {category} in {elapsed:.1f}s")
+        return upserter.id_map(include_staged=options['dry_run'])
+
     def _import_states(self, file_path: Path, options: dict):
         """Import states from CSV"""
         self.stdout.write(f"\n📍 Importing states from {file_path.name}...")
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    code = row['code'].strip()
-
-                    if options['skip_existing'] and State.objects.filter(code=code).exists():
-                        self.stats['states']['skipped'] += 1
-                        continue
-
-                    if not options['dry_run']:
-                        state, created = State.objects.update_or_create(
-                            code=code,
-                            defaults={
-                                'name': row['name'].strip(),
-                                'capital': row.get('capital', '').strip(),
-                                'region': row.get('region', '').strip(),
-                                'total_districts': int(row.get('total_districts', 0) or 0),
-                                'total_constituencies': int(row.get('total_constituencies', 0) or 0),
-                            }
-                        )
-                        self.state_cache[code] = state
-
-                        if created:
-                            self.stats['states']['created'] += 1
-                        else:
-                            self.stats['states']['updated'] += 1
-                    else:
-                        self.stats['states']['created'] += 1
-
-                except Exception as e:
-                    self.stats['states']['errors'] += 1
-                    self.stdout.write(self.style.ERROR(f"   Error importing state {row.get('code')}: {e}"))
-
-        self.stdout.write(f"   ✅ Processed {sum(self.stats['states'].values())} states")
+        def parse_row(row):
+            return {
+                'code': row['code'].strip(),
+                'name': row['name'].strip(),
+                'capital': (row.get('capital') or '').strip(),
+                'region': (row.get('region') or '').strip(),
+                'total_districts': int(row.get('total_districts', 0) or 0),
+                'total_constituencies': int(row.get('total_constituencies', 0) or 0),
+            }
+
+        upserter = BulkUpserter(
+            State, ['code'], ['name', 'capital', 'region', 'total_districts', 'total_constituencies'],
+            batch_size=options['batch_size'], skip_existing=options['skip_existing'],
+        )
+        self.state_ids = self._load_file('states', file_path, upserter, parse_row, options)
 
     def _import_districts(self, file_path: Path, options: dict):
         """Import districts from CSV"""
         self.stdout.write(f"\n🏙️  Importing districts from {file_path.name}...")
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    code = row['code'].strip()
-                    state_code = row['state_code'].strip()
-
-                    if options['skip_existing'] and District.objects.filter(code=code).exists():
-                        self.stats['districts']['skipped'] += 1
-                        continue
-
-                    # Get or fetch state
-                    if state_code not in self.state_cache:
-                        try:
-                            self.state_cache[state_code] = State.objects.get(code=state_code)
-                        except State.DoesNotExist:
-                            self.stdout.write(self.style.ERROR(f"   State {state_code} not found for district {code}"))
-                            self.stats['districts']['errors'] += 1
-                            continue
-
-                    state = self.state_cache[state_code]
-
-                    if not options['dry_run']:
-                        district, created = District.objects.update_or_create(
-                            code=code,
-                            defaults={
-                                'state': state,
-                                'name': row['name'].strip(),
-                                'headquarters': row.get('headquarters', '').strip(),
-                                'population': int(row.get('population', 0) or 0) if row.get('population') else None,
-                                'area_sq_km': Decimal(row.get('area_sq_km', 0) or 0) if row.get('area_sq_km') else None,
-                                'total_wards': int(row.get('total_wards', 0) or 0),
-                            }
-                        )
-                        self.district_cache[code] = district
-
-                        if created:
-                            self.stats['districts']['created'] += 1
-                        else:
-                            self.stats['districts']['updated'] += 1
-                    else:
-                        self.stats['districts']['created'] += 1
-
-                except Exception as e:
-                    self.stats['districts']['errors'] += 1
-                    self.stdout.write(self.style.ERROR(f"   Error importing district {row.get('code')}: {e}"))
-
-        self.stdout.write(f"   ✅ Processed {sum(self.stats['districts'].values())} districts")
+        state_ids = self._state_ids()
+
+        def parse_row(row):
+            state_code = row['state_code'].strip()
+            if state_code not in state_ids:
+                raise ValueError(f"State {state_code} not found")
+            return {
+                'code': row['code'].strip(),
+                'state_id': state_ids[state_code],
+                'name': row['name'].strip(),
+                'headquarters': (row.get('headquarters') or '').strip(),
+                'population': int(row['population']) if row.get('population') else None,
+                'area_sq_km': Decimal(row['area_sq_km']) if row.get('area_sq_km') else None,
+                'total_wards': int(row.get('total_wards', 0) or 0),
+            }
+
+        upserter = BulkUpserter(
+            District, ['code'], ['state_id', 'name', 'headquarters', 'population', 'area_sq_km', 'total_wards'],
+            batch_size=options['batch_size'], skip_existing=options['skip_existing'],
+        )
+        self.district_ids = self._load_file('districts', file_path, upserter, parse_row, options)
 
     def _import_constituencies(self, file_path: Path, options: dict):
         """Import constituencies from CSV"""
         self.stdout.write(f"\n🗳️  Importing constituencies from {file_path.name}...")
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    code = row['code'].strip()
-                    state_code = row['state_code'].strip()
-                    district_code = row.get('district_code', '').strip()
-
-                    if options['skip_existing'] and Constituency.objects.filter(code=code).exists():
-                        self.stats['constituencies']['skipped'] += 1
-                        continue
-
-                    # Get state
-                    if state_code not in self.state_cache:
-                        try:
-                            self.state_cache[state_code] = State.objects.get(code=state_code)
-                        except State.DoesNotExist:
-                            self.stdout.write(self.style.ERROR(f"   State {state_code} not found"))
-                            self.stats['constituencies']['errors'] += 1
-                            continue
-
-                    state = self.state_cache[state_code]
-
-                    # Get district (optional)
-                    district = None
-                    if district_code:
-                        if district_code not in self.district_cache:
-                            try:
-                                self.district_cache[district_code] = District.objects.get(code=district_code)
-                            except District.DoesNotExist:
-                                self.stdout.write(self.style.WARNING(f"   District {district_code} not found (optional)"))
-
-                        district = self.district_cache.get(district_code)
-
-                    if not options['dry_run']:
-                        constituency, created = Constituency.objects.update_or_create(
-                            code=code,
-                            defaults={
-                                'state': state,
-                                'district': district,
-                                'name': row['name'].strip(),
-                                'constituency_type': row.get('constituency_type', 'assembly'),
-                                'number': int(row.get('number', 0) or 0),
-                                'reserved_for': row.get('reserved_for', 'general'),
-                                'total_voters': int(row.get('total_voters', 0) or 0) if row.get('total_voters') else None,
-                                'total_wards': int(row.get('total_wards', 0) or 0),
-                                'total_booths': int(row.get('total_booths', 0) or 0),
-                                'area_sq_km': Decimal(row.get('area_sq_km', 0) or 0) if row.get('area_sq_km') else None,
-                                'metadata': json.loads(row.get('metadata', '{}')) if row.get('metadata') else {},
-                            }
-                        )
-                        self.constituency_cache[code] = constituency
-
-                        if created:
-                            self.stats['constituencies']['created'] += 1
-                        else:
-                            self.stats['constituencies']['updated'] += 1
-                    else:
-                        self.stats['constituencies']['created'] += 1
-
-                except Exception as e:
-                    self.stats['constituencies']['errors'] += 1
-                    self.stdout.write(self.style.ERROR(f"   Error importing constituency {row.get('code')}: {e}"))
-
-        self.stdout.write(f"   ✅ Processed {sum(self.stats['constituencies'].values())} constituencies")
+        state_ids = self._state_ids()
+        district_ids = self._district_ids()
+
+        def parse_row(row):
+            state_code = row['state_code'].strip()
+            district_code = (row.get('district_code') or '').strip()
+            if state_code not in state_ids:
+                raise ValueError(f"State {state_code} not found")
+            if district_code and district_code not in district_ids:
+                self.stdout.write(self.style.WARNING(f"   District {district_code} not found (optional)"))
+            return {
+                'code': row['code'].strip(),
+                'state_id': state_ids[state_code],
+                'district_id': district_ids.get(district_code),
+                'name': row['name'].strip(),
+                'constituency_type': row.get('constituency_type') or 'assembly',
+                'number': int(row.get('number', 0) or 0),
+                'reserved_for': row.get('reserved_for') or 'general',
+                'total_voters': int(row['total_voters']) if row.get('total_voters') else None,
+                'total_wards': int(row.get('total_wards', 0) or 0),
+                'total_booths': int(row.get('total_booths', 0) or 0),
+                'area_sq_km': Decimal(row['area_sq_km']) if row.get('area_sq_km') else None,
+                'metadata': json.loads(row['metadata']) if row.get('metadata') else {},
+            }
+
+        upserter = BulkUpserter(
+            Constituency, ['code'],
+            ['state_id', 'district_id', 'name', 'constituency_type', 'number', 'reserved_for',
+             'total_voters', 'total_wards', 'total_booths', 'area_sq_km', 'metadata'],
+            batch_size=options['batch_size'], skip_existing=options['skip_existing'],
+        )
+        self.constituency_ids = self._load_file('constituencies', file_path, upserter, parse_row, options)
 
     def _import_polling_booths(self, file_path: Path, options: dict):
         """Import polling booths from CSV"""
         self.stdout.write(f"\n🗳️  Importing polling booths from {file_path.name}...")
+        state_ids = self._state_ids()
+        district_ids = self._district_ids()
+        constituency_ids = self._constituency_ids()
+
+        def parse_row(row):
+            references = {}
+            for field, code, ids in (
+                ('state_id', row['state_code'].strip(), state_ids),
+                ('district_id', row['district_code'].strip(), district_ids),
+                ('constituency_id', row['constituency_code'].strip(), constituency_ids),
+            ):
+                if code not in ids:
+                    raise ValueError(f"{field[:-3].capitalize()} {code} not found")
+                references[field] = ids[code]
+            if references['constituency_id'] is None:
+                # Constituency only exists in this dry run, so every booth in it is new
+                references['constituency_id'] = f"new:{row['constituency_code'].strip()}"
+
+            return {
+                **references,
+                'booth_number': row['booth_number'].strip(),
+                'name': (row.get('name') or '').strip(),
+                'building_name': (row.get('building_name') or '').strip(),
+                'address': (row.get('address') or '').strip(),
+                'area': (row.get('area') or '').strip(),
+                'landmark': (row.get('landmark') or '').strip(),
+                'pincode': (row.get('pincode') or '').strip(),
+                'latitude': Decimal(row['latitude']) if row.get('latitude') else None,
+                'longitude': Decimal(row['longitude']) if row.get('longitude') else None,
+                'total_voters': int(row.get('total_voters', 0) or 0),
+                'male_voters': int(row.get('male_voters', 0) or 0),
+                'female_voters': int(row.get('female_voters', 0) or 0),
+                'other_voters': int(row.get('other_voters', 0) or 0),
+                'is_active': (row.get('is_active') or 'True').lower() in ['true', '1', 'yes'],
+                'is_accessible': (row.get('is_accessible') or 'True').lower() in ['true', '1', 'yes'],
+                'metadata': json.loads(row['metadata']) if row.get('metadata') else {},
+            }
+
+        upserter = BulkUpserter(
+            PollingBooth, ['constituency_id', 'booth_number'],
+            ['state_id', 'district_id', 'name', 'building_name', 'address', 'area', 'landmark', 'pincode',
+             'latitude', 'longitude', 'total_voters', 'male_voters', 'female_voters', 'other_voters',
+             'is_active', 'is_accessible', 'metadata'],
+            batch_size=options['batch_size'], skip_existing=options['skip_existing'],
+        )
+        self._load_file('booths', file_path, upserter, parse_row, options)
+
+    # Natural key maps, loaded from the database when the parent file was not imported in this run
+
+    def _state_ids(self) -> Dict[str, Optional[int]]:
+        if self.state_ids is None:
+            self.state_ids = dict(State.objects.values_list('code', 'id'))
+        return self.state_ids
+
+    def _district_ids(self) -> Dict[str, Optional[int]]:
+        if self.district_ids is None:
+            self.district_ids = dict(District.objects.values_list('code', 'id'))
+        return self.district_ids
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            batch = []
-            batch_size = 500
-
-            for row in reader:
-                try:
-                    state_code = row['state_code'].strip()
-                    district_code = row['district_code'].strip()
-                    constituency_code = row['constituency_code'].strip()
-                    booth_number = row['booth_number'].strip()
-
-                    # Get foreign keys
-                    if state_code not in self.state_cache:
-                        self.state_cache[state_code] = State.objects.get(code=state_code)
-                    if district_code not in self.district_cache:
-                        self.district_cache[district_code] = District.objects.get(code=district_code)
-                    if constituency_code not in self.constituency_cache:
-                        self.constituency_cache[constituency_code] = Constituency.objects.get(code=constituency_code)
-
-                    state = self.state_cache[state_code]
-                    district = self.district_cache[district_code]
-                    constituency = self.constituency_cache[constituency_code]
-
-                    # Check if already exists
-                    if options['skip_existing']:
-                        if PollingBooth.objects.filter(
-                            constituency=constituency,
-                            booth_number=booth_number
-                        ).exists():
-                            self.stats['booths']['skipped'] += 1
-                            continue
-
-                    if not options['dry_run']:
-                        booth, created = PollingBooth.objects.update_or_create(
-                            constituency=constituency,
-                            booth_number=booth_number,
-                            defaults={
-                                'state': state,
-                                'district': district,
-                                'name': row.get('name', '').strip(),
-                                'building_name': row.get('building_name', '').strip(),
-                                'address': row.get('address', '').strip(),
-                                'area': row.get('area', '').strip(),
-                                'landmark': row.get('landmark', '').strip(),
-                                'pincode': row.get('pincode', '').strip(),
-                                'latitude': Decimal(row.get('latitude', 0) or 0) if row.get('latitude') else None,
-                                'longitude': Decimal(row.get('longitude', 0) or 0) if row.get('longitude') else None,
-                                'total_voters': int(row.get('total_voters', 0) or 0),
-                                'male_voters': int(row.get('male_voters', 0) or 0),
-                                'female_voters': int(row.get('female_voters', 0) or 0),
-                                'other_voters': int(row.get('other_voters', 0) or 0),
-                                'is_active': row.get('is_active', 'True').lower() in ['true', '1', 'yes'],
-                                'is_accessible': row.get('is_accessible', 'True').lower() in ['true', '1', 'yes'],
-                                'metadata': json.loads(row.get('metadata', '{}')) if row.get('metadata') else {},
-                            }
-                        )
-
-                        if created:
-                            self.stats['booths']['created'] += 1
-                        else:
-                            self.stats['booths']['updated'] += 1
-                    else:
-                        self.stats['booths']['created'] += 1
-
-                    # Progress indicator
-                    total_processed = sum(self.stats['booths'].values())
-                    if total_processed % 500 == 0:
-                        self.stdout.write(f"   ... processed {total_processed} booths", ending='\r')
-
-                except Exception as e:
-                    self.stats['booths']['errors'] += 1
-                    if self.stats['booths']['errors'] <= 10:  # Only show first 10 errors
-                        self.stdout.write(self.style.ERROR(
-                            f"\n   Error importing booth {row.get('constituency_code')}/{row.get('booth_number')}: {e}"
-                        ))
-
-        self.stdout.write(f"\n   ✅ Processed {sum(self.stats['booths'].values())} polling booths")
+    def _constituency_ids(self) -> Dict[str, Optional[int]]:
+        if self.constituency_ids is None:
+            self.constituency_ids = dict(Constituency.objects.values_list('code', 'id'))
+        return self.constituency_ids
 
     def _print_summary(self, dry_run: bool = False):
         """Print import summary"""
@@ -396,7 +342,12 @@ class Command(BaseCommand):
             self.stdout.write(f"\n{category.capitalize()}:")
             self.stdout.write(f"  Created:  {stats['created']:,}")
             self.stdout.write(f"  Updated:  {stats['updated']:,}")
+            self.stdout.write(f"  Unchanged: {stats['unchanged']:,}")
             self.stdout.write(f"  Skipped:  {stats['skipped']:,}")
+            changed = self.changed_fields.get(category)
+            if dry_run and changed:
+                fields = ', '.join(f"{field} ({count:,})" for field, count in changed.most_common())
+                self.stdout.write(f"  Changed fields: {fields}")
             if stats['errors'] > 0:
                 self.stdout.write(self.style.ERROR(f"  Errors:   {stats['errors']:,}"))
             self.stdout.write(f"  Total:    {total:,}")
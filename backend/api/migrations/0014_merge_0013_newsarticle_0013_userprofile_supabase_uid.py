@@ -0,0 +1,14 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_newsarticle'),
+        ('api', '0013_userprofile_supabase_uid'),
+    ]
+
+    operations = [
+    ]
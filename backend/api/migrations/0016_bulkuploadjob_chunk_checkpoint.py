@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='chunk_size',
+            field=models.IntegerField(default=500),
+        ),
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='committed_chunks',
+            field=models.IntegerField(default=0),
+        ),
+    ]
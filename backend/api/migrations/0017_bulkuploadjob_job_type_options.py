@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_bulkuploadjob_chunk_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='job_type',
+            field=models.CharField(choices=[('users', 'Users'), ('wards', 'Wards'), ('polling_booths', 'Polling Booths')], default='users', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='options',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_bulkuploadjob_job_type_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WhatsAppInboundEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('whatsapp_message_id', models.CharField(max_length=255, unique=True)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('message_type', models.CharField(blank=True, max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('sent_at', models.DateTimeField(help_text='Message timestamp reported by WhatsApp')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'whatsapp_inbound_events',
+                'ordering': ['sent_at', 'id'],
+                'indexes': [
+                    models.Index(fields=['phone_number', 'status', 'sent_at'], name='whatsapp_in_phone_n_5ac7c4_idx'),
+                    models.Index(fields=['status', 'received_at'], name='whatsapp_in_status_63d055_idx'),
+                ],
+            },
+        ),
+    ]
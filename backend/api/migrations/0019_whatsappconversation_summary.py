@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_whatsappinboundevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='whatsappconversation',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+    ]
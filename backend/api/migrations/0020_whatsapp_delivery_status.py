@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+def move_delivery_status(apps, schema_editor):
+    """Copy statuses recorded in WhatsAppMessage.metadata into the new column"""
+    WhatsAppMessage = apps.get_model('api', 'WhatsAppMessage')
+    batch = []
+    for message in WhatsAppMessage.objects.filter(metadata__has_key='delivery_status').only('id', 'metadata').iterator(chunk_size=2000):
+        message.delivery_status = message.metadata.pop('delivery_status')
+        message.metadata.pop('status_timestamp', None)
+        batch.append(message)
+        if len(batch) >= 2000:
+            WhatsAppMessage.objects.bulk_update(batch, ['delivery_status', 'metadata'])
+            batch = []
+    WhatsAppMessage.objects.bulk_update(batch, ['delivery_status', 'metadata'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_whatsappconversation_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WhatsAppStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('whatsapp_message_id', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('delivered', 'Delivered'), ('read', 'Read'), ('failed', 'Failed')], max_length=10)),
+                ('status_at', models.DateTimeField(help_text='Status timestamp reported by WhatsApp')),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'whatsapp_status_events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='delivery_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='delivery_status',
+            field=models.CharField(blank=True, choices=[('sent', 'Sent'), ('delivered', 'Delivered'), ('read', 'Read'), ('failed', 'Failed')], max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='status_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='whatsappmessage',
+            index=models.Index(fields=['delivery_status', 'timestamp'], name='whatsapp_me_deliver_64cef6_idx'),
+        ),
+        migrations.RunPython(move_delivery_status, migrations.RunPython.noop),
+    ]
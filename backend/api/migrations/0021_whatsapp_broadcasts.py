@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:10
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_whatsapp_delivery_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WhatsAppBroadcast',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('template_name', models.CharField(max_length=255)),
+                ('language_code', models.CharField(default='ta', max_length=10)),
+                ('components', models.JSONField(blank=True, default=list)),
+                ('source', models.CharField(choices=[('voter_profile', 'WhatsApp Voter Profiles'), ('voter', 'Voters')], default='voter_profile', max_length=20)),
+                ('segment_filters', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('paused', 'Paused'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('cursor', models.CharField(blank=True, max_length=64)),
+                ('total_recipients', models.IntegerField(default=0)),
+                ('sent_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='whatsapp_broadcasts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'whatsapp_broadcasts',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='whatsapp_br_status_627330_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WhatsAppBroadcastRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=20)),
+                ('whatsapp_message_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('delivery_status', models.CharField(choices=[('sent', 'Sent'), ('delivered', 'Delivered'), ('read', 'Read'), ('failed', 'Failed')], max_length=10)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('status_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('delivery_error', models.CharField(blank=True, max_length=255)),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='api.whatsappbroadcast')),
+            ],
+            options={
+                'db_table': 'whatsapp_broadcast_recipients',
+                'indexes': [
+                    models.Index(fields=['whatsapp_message_id'], name='whatsapp_br_whatsap_fb5085_idx'),
+                    models.Index(fields=['broadcast', 'delivery_status'], name='whatsapp_br_broadca_0e0f08_idx'),
+                ],
+                'unique_together': {('broadcast', 'phone_number')},
+            },
+        ),
+    ]
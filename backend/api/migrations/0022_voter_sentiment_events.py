@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def move_sentiment_history(apps, schema_editor):
+    """Copy VoterProfile.sentiment_history entries into the event table"""
+    VoterProfile = apps.get_model('api', 'VoterProfile')
+    VoterSentimentEvent = apps.get_model('api', 'VoterSentimentEvent')
+    batch = []
+    for profile in VoterProfile.objects.exclude(sentiment_history=[]).only('id', 'sentiment_history').iterator(chunk_size=2000):
+        for entry in profile.sentiment_history or []:
+            recorded_at = parse_datetime(str(entry.get('date') or ''))
+            if recorded_at is None or entry.get('score') is None:
+                continue
+            batch.append(VoterSentimentEvent(voter_profile_id=profile.id, recorded_at=recorded_at, score=float(entry['score'])))
+        if len(batch) >= 5000:
+            VoterSentimentEvent.objects.bulk_create(batch)
+            batch = []
+    VoterSentimentEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_whatsapp_broadcasts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterSentimentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(help_text='Event time, or start of the bucket')),
+                ('score', models.FloatField()),
+                ('count', models.IntegerField(default=1)),
+                ('resolution', models.CharField(choices=[('event', 'Event'), ('day', 'Day'), ('week', 'Week')], default='event', max_length=10)),
+                ('voter_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_events', to='api.voterprofile')),
+            ],
+            options={
+                'db_table': 'voter_sentiment_events',
+                'ordering': ['recorded_at'],
+                'indexes': [
+                    models.Index(fields=['voter_profile', 'recorded_at'], name='voter_senti_voter_p_65bc7d_idx'),
+                    models.Index(fields=['recorded_at', 'voter_profile'], name='voter_senti_recorde_223ea2_idx'),
+                    models.Index(fields=['resolution', 'recorded_at'], name='voter_senti_resolut_266adc_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(move_sentiment_history, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='voterprofile',
+            name='sentiment_history',
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:10
+
+import hashlib
+
+from django.db import migrations, models
+
+from api.utils.url_hash import url_hash
+
+
+def fill_url_hashes(apps, schema_editor):
+    """Hash the URLs of stored articles; later spelling variants of one article are hashed by row id"""
+    NewsArticle = apps.get_model('api', 'NewsArticle')
+    seen = set()
+    batch = []
+    for article in NewsArticle.objects.order_by('scraped_at').only('id', 'url').iterator(chunk_size=2000):
+        digest = url_hash(article.url)
+        if digest in seen:
+            # Keeps the row unique without claiming the article's hash
+            digest = hashlib.sha1(f"article:{article.id}".encode('utf-8')).hexdigest()
+        seen.add(digest)
+        article.url_hash = digest
+        batch.append(article)
+        if len(batch) >= 2000:
+            NewsArticle.objects.bulk_update(batch, ['url_hash'])
+            batch = []
+    NewsArticle.objects.bulk_update(batch, ['url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_voter_sentiment_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, null=True),
+        ),
+        migrations.RunPython(fill_url_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='newsarticle',
+            name='url_hash',
+            field=models.CharField(editable=False, help_text='SHA-1 of the canonical URL; one row per article however it is linked', max_length=40, unique=True),
+        ),
+    ]
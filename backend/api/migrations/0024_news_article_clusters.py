@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_news_article_url_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='cluster_size',
+            field=models.IntegerField(default=1, help_text='Copies of this story, this article included'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='First article of this story; its analysis is shared with this copy', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='api.newsarticle'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='minhash',
+            field=models.BinaryField(help_text='MinHash signature of article_text', null=True),
+        ),
+        migrations.CreateModel(
+            name='NewsArticleBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True, help_text='Hash of the band number and its signature rows')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='api.newsarticle')),
+            ],
+            options={
+                'db_table': 'news_article_bands',
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+from api.services.news_search import DEFAULT_SEARCH_CONFIG, SEARCH_CONFIGS, term_weights
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_articles_search_gin')
+
+
+def create_search_index(apps, schema_editor):
+    """GIN indexes exist on PostgreSQL only; other databases search the term table"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('api', 'NewsArticle'), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('api', 'NewsArticle'), SEARCH_INDEX)
+
+
+def index_stored_articles(apps, schema_editor):
+    """Index the articles stored before search was added"""
+    NewsArticle = apps.get_model('api', 'NewsArticle')
+    NewsSearchTerm = apps.get_model('api', 'NewsSearchTerm')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        def vector(config):
+            return SearchVector('title', weight='A', config=config) + SearchVector('article_text', weight='B', config=config)
+
+        for language, config in SEARCH_CONFIGS.items():
+            NewsArticle.objects.filter(language=language).update(search_vector=vector(config))
+        NewsArticle.objects.exclude(language__in=list(SEARCH_CONFIGS)).update(search_vector=vector(DEFAULT_SEARCH_CONFIG))
+        return
+
+    batch = []
+    for article in NewsArticle.objects.only('id', 'title', 'article_text').iterator(chunk_size=500):
+        batch.extend(
+            NewsSearchTerm(article_id=article.id, term=term, weight=weight)
+            for term, weight in term_weights(article.title, article.article_text).items()
+        )
+        if len(batch) >= 5000:
+            NewsSearchTerm.objects.bulk_create(batch)
+            batch = []
+    NewsSearchTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_news_article_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='NewsSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('weight', models.FloatField(help_text="Grows with the term's occurrences, title occurrences counting more")),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='api.newsarticle')),
+            ],
+            options={
+                'db_table': 'news_search_terms',
+                'indexes': [models.Index(fields=['term', 'article'], name='news_search_term_98fa61_idx')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='newsarticle', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+        migrations.RunPython(index_stored_articles, migrations.RunPython.noop),
+    ]
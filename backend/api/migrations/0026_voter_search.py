@@ -0,0 +1,194 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:30
+
+import re
+import unicodedata
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# The search keys as api.services.voter_search computed them when this
+# migration was written, copied so later changes there cannot change it
+
+TAMIL_VOWELS = {
+    'அ': 'a', 'ஆ': 'a', 'இ': 'i', 'ஈ': 'i', 'உ': 'u', 'ஊ': 'u', 'எ': 'e', 'ஏ': 'e',
+    'ஐ': 'ai', 'ஒ': 'o', 'ஓ': 'o', 'ஔ': 'au', 'ஃ': 'k',
+}
+TAMIL_CONSONANTS = {
+    'க': 'k', 'ங': 'n', 'ச': 's', 'ஞ': 'n', 'ட': 't', 'ண': 'n', 'த': 't', 'ந': 'n',
+    'ப': 'p', 'ம': 'm', 'ய': 'y', 'ர': 'r', 'ல': 'l', 'வ': 'v', 'ழ': 'l', 'ள': 'l',
+    'ற': 'r', 'ன': 'n', 'ஜ': 's', 'ஷ': 's', 'ஸ': 's', 'ஹ': 'h',
+}
+TAMIL_VOWEL_SIGNS = {
+    'ா': 'a', 'ி': 'i', 'ீ': 'i', 'ு': 'u', 'ூ': 'u', 'ெ': 'e', 'ே': 'e',
+    'ை': 'ai', 'ொ': 'o', 'ோ': 'o', 'ௌ': 'au', '்': '', 'ௗ': '',
+}
+LATIN_DIGRAPHS = (
+    ('zh', 'l'), ('sh', 's'), ('ch', 's'), ('jh', 's'), ('th', 't'), ('dh', 't'),
+    ('kh', 'k'), ('gh', 'k'), ('ph', 'p'), ('bh', 'p'), ('ee', 'i'), ('oo', 'u'),
+)
+LATIN_LETTERS = str.maketrans({
+    'g': 'k', 'c': 'k', 'q': 'k', 'd': 't', 'b': 'p', 'f': 'p', 'j': 's', 'z': 's', 'w': 'v', 'x': 'ks',
+})
+
+_INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+_NAME_WORD = re.compile('[a-z\u0B80-\u0BFF]+')
+_INTERVOCALIC_H = re.compile('(?<=[aeiou])h(?=[aeiou])')
+_REPEATS = re.compile(r'(.)\1+')
+
+
+def transliterate(word):
+    letters = []
+    for char in word:
+        if char in TAMIL_CONSONANTS:
+            letters.append(TAMIL_CONSONANTS[char] + 'a')
+        elif char in TAMIL_VOWEL_SIGNS:
+            if letters and letters[-1].endswith('a'):
+                letters[-1] = letters[-1][:-1]
+            letters.append(TAMIL_VOWEL_SIGNS[char])
+        else:
+            letters.append(TAMIL_VOWELS.get(char, char))
+    return ''.join(letters)
+
+
+def name_key(*names):
+    # Of normalize_text only what changes the words found: NFKC, zero-width
+    # characters and case; spacing and punctuation fall between words anyway
+    text = unicodedata.normalize('NFKC', ' '.join(name for name in names if name))
+    words = []
+    for word in _NAME_WORD.findall(_INVISIBLE.sub('', text).casefold()):
+        word = transliterate(word)
+        for digraph, letter in LATIN_DIGRAPHS:
+            word = word.replace(digraph, letter)
+        word = _INTERVOCALIC_H.sub('k', word).translate(LATIN_LETTERS)
+        words.append(_REPEATS.sub(r'\1', word))
+    return ' '.join(words)[:300]
+
+
+def phone_digits(phone):
+    digits = re.sub('[^0-9]', '', phone or '').lstrip('0')
+    if len(digits) > 10 and digits.startswith('91'):
+        digits = digits[2:]
+    return digits
+
+
+def voter_id_key(voter_id):
+    return re.sub('[^0-9A-Z]', '', (voter_id or '').upper())
+
+
+def name_trigrams(key):
+    trigrams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def search_keys(voter):
+    return {
+        'phone_digits': phone_digits(voter.phone),
+        'voter_id_key': voter_id_key(voter.voter_id),
+        'name_key': name_key(voter.first_name, voter.middle_name, voter.last_name),
+    }
+
+
+NAME_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=['name_key'], name='voters_name_key_trgm', opclasses=['gin_trgm_ops'],
+)
+
+
+def create_name_index(apps, schema_editor):
+    """Trigram indexes exist on PostgreSQL only; other databases search the trigram table"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('api', 'Voter'), NAME_INDEX)
+
+
+def drop_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('api', 'Voter'), NAME_INDEX)
+
+
+def fill_search_keys(apps, schema_editor):
+    """Set the search keys of stored voters, and their name trigrams outside PostgreSQL"""
+    Voter = apps.get_model('api', 'Voter')
+    VoterNameTrigram = apps.get_model('api', 'VoterNameTrigram')
+    trigrams = schema_editor.connection.vendor != 'postgresql'
+
+    voters, rows = [], []
+    fields = ['id', 'phone', 'voter_id', 'first_name', 'middle_name', 'last_name']
+    for voter in Voter.objects.only(*fields).iterator(chunk_size=2000):
+        for field, value in search_keys(voter).items():
+            setattr(voter, field, value)
+        voters.append(voter)
+        if trigrams:
+            rows.extend(VoterNameTrigram(voter_id=voter.id, trigram=trigram) for trigram in name_trigrams(voter.name_key))
+        if len(voters) >= 2000:
+            Voter.objects.bulk_update(voters, ['phone_digits', 'voter_id_key', 'name_key'])
+            VoterNameTrigram.objects.bulk_create(rows, batch_size=5000)
+            voters, rows = [], []
+    Voter.objects.bulk_update(voters, ['phone_digits', 'voter_id_key', 'name_key'])
+    VoterNameTrigram.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_news_search'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='voter',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, help_text='Phonetic skeleton of the full name, Tamil or Latin', max_length=300),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='phone_digits',
+            field=models.CharField(blank=True, editable=False, help_text='National phone number, digits only', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='voter_id_key',
+            field=models.CharField(blank=True, editable=False, help_text='Voter ID without case or separators', max_length=50),
+        ),
+        migrations.CreateModel(
+            name='VoterNameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('voter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_trigrams', to='api.voter')),
+            ],
+            options={
+                'db_table': 'voter_name_trigrams',
+            },
+        ),
+        # Keys are filled before the indexes over them are built
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='voternametrigram',
+            index=models.Index(fields=['trigram', 'voter'], name='voter_name__trigram_b75ac0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['email'], name='api_voter_email_9f9a37_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['phone_digits'], name='voters_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['voter_id_key'], name='voters_voter_id_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='voter', index=NAME_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_name_index, drop_name_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_voter_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='whatsappbroadcastrecipient',
+            name='delivery_status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('read', 'Read'), ('failed', 'Failed')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:30
+
+from django.db import migrations
+
+
+def redact_failed_bodies(apps, schema_editor):
+    """Drop the bodies of messages that will never be sent; welcome emails carry temporary passwords"""
+    EmailOutbox = apps.get_model('api', 'EmailOutbox')
+    EmailOutbox.objects.filter(status='failed').exclude(body='').update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_broadcast_recipient_queued'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_failed_bodies, migrations.RunPython.noop),
+    ]
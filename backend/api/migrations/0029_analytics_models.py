@@ -0,0 +1,267 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_redact_failed_outbox_bodies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('report_type', models.CharField(choices=[('executive_summary', 'Executive Summary'), ('campaign_performance', 'Campaign Performance'), ('constituency', 'Constituency Report'), ('daily_activity', 'Daily Activity'), ('weekly_summary', 'Weekly Summary'), ('volunteer_performance', 'Volunteer Performance'), ('custom', 'Custom Report')], max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('metrics', models.JSONField(default=list, help_text='List of metrics to include')),
+                ('filters', models.JSONField(default=dict, help_text='Default filters')),
+                ('visualizations', models.JSONField(default=list, help_text='Chart configurations')),
+                ('is_scheduled', models.BooleanField(default=False)),
+                ('schedule_frequency', models.CharField(blank=True, max_length=20)),
+                ('schedule_time', models.TimeField(blank=True, null=True)),
+                ('schedule_day', models.IntegerField(blank=True, null=True)),
+                ('recipients', models.JSONField(default=list, help_text='Email addresses for scheduled reports')),
+                ('export_format', models.CharField(default='pdf', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_generated', models.DateTimeField(blank=True, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Report Template',
+                'verbose_name_plural': 'Report Templates',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GeneratedReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('report_name', models.CharField(max_length=200)),
+                ('report_type', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('progress', models.IntegerField(default=0)),
+                ('pdf_file_url', models.URLField(blank=True, max_length=500)),
+                ('excel_file_url', models.URLField(blank=True, max_length=500)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('generation_time', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('download_count', models.IntegerField(default=0)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('filters_used', models.JSONField(default=dict)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('generated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_reports', to=settings.AUTH_USER_MODEL)),
+                ('template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_reports', to='api.reporttemplate')),
+            ],
+            options={
+                'verbose_name': 'Generated Report',
+                'verbose_name_plural': 'Generated Reports',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WeeklyCampaignStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('week_end', models.DateField()),
+                ('total_campaigns', models.IntegerField(default=0)),
+                ('active_campaigns', models.IntegerField(default=0)),
+                ('completed_campaigns', models.IntegerField(default=0)),
+                ('total_reach', models.IntegerField(default=0)),
+                ('total_budget', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('total_spent', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('avg_roi', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('total_interactions', models.IntegerField(default=0)),
+                ('total_conversions', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='campaign_stats', to='api.district')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='campaign_stats', to='api.state')),
+            ],
+            options={
+                'verbose_name': 'Weekly Campaign Stats',
+                'verbose_name_plural': 'Weekly Campaign Stats',
+                'ordering': ['-week_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyInteractionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_interactions', models.IntegerField(default=0)),
+                ('phone_calls', models.IntegerField(default=0)),
+                ('door_to_door', models.IntegerField(default=0)),
+                ('events', models.IntegerField(default=0)),
+                ('social_media', models.IntegerField(default=0)),
+                ('conversions', models.IntegerField(default=0)),
+                ('response_rate', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('active_volunteers', models.IntegerField(default=0)),
+                ('top_volunteer_id', models.IntegerField(blank=True, null=True)),
+                ('top_volunteer_count', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('constituency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='interaction_stats', to='api.constituency')),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='interaction_stats', to='api.district')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='interaction_stats', to='api.state')),
+            ],
+            options={
+                'verbose_name': 'Daily Interaction Stats',
+                'verbose_name_plural': 'Daily Interaction Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'state'], name='api_dailyin_date_658a05_idx'), models.Index(fields=['date', 'district'], name='api_dailyin_date_f1db89_idx'), models.Index(fields=['date', 'constituency'], name='api_dailyin_date_2db7d3_idx'), models.Index(fields=['-date'], name='api_dailyin_date_b0c6a3_idx')],
+                'unique_together': {('date', 'state', 'district', 'constituency')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySentimentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('avg_sentiment_score', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('sentiment_velocity', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('positive_count', models.IntegerField(default=0)),
+                ('negative_count', models.IntegerField(default=0)),
+                ('neutral_count', models.IntegerField(default=0)),
+                ('from_feedback', models.IntegerField(default=0)),
+                ('from_field_reports', models.IntegerField(default=0)),
+                ('from_social_media', models.IntegerField(default=0)),
+                ('from_surveys', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('constituency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_stats', to='api.constituency')),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_stats', to='api.district')),
+                ('issue', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_stats', to='api.issuecategory')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_stats', to='api.state')),
+            ],
+            options={
+                'verbose_name': 'Daily Sentiment Stats',
+                'verbose_name_plural': 'Daily Sentiment Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'state'], name='api_dailyse_date_56333c_idx'), models.Index(fields=['date', 'issue'], name='api_dailyse_date_68db7f_idx'), models.Index(fields=['date', 'constituency'], name='api_dailyse_date_9b3ddb_idx'), models.Index(fields=['-date'], name='api_dailyse_date_ad3911_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyVoterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_voters', models.IntegerField(default=0)),
+                ('new_voters', models.IntegerField(default=0)),
+                ('strong_supporters', models.IntegerField(default=0)),
+                ('supporters', models.IntegerField(default=0)),
+                ('neutral', models.IntegerField(default=0)),
+                ('opposition', models.IntegerField(default=0)),
+                ('strong_opposition', models.IntegerField(default=0)),
+                ('male_voters', models.IntegerField(default=0)),
+                ('female_voters', models.IntegerField(default=0)),
+                ('other_voters', models.IntegerField(default=0)),
+                ('age_18_25', models.IntegerField(default=0)),
+                ('age_26_35', models.IntegerField(default=0)),
+                ('age_36_45', models.IntegerField(default=0)),
+                ('age_46_60', models.IntegerField(default=0)),
+                ('age_60_plus', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('constituency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.constituency')),
+                ('district', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.district')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.state')),
+            ],
+            options={
+                'verbose_name': 'Daily Voter Stats',
+                'verbose_name_plural': 'Daily Voter Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'state'], name='api_dailyvo_date_a675c1_idx'), models.Index(fields=['date', 'district'], name='api_dailyvo_date_1b728d_idx'), models.Index(fields=['date', 'constituency'], name='api_dailyvo_date_bdcf43_idx'), models.Index(fields=['-date'], name='api_dailyvo_date_7645b7_idx')],
+                'unique_together': {('date', 'state', 'district', 'constituency')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('resource', models.CharField(max_length=50)),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('excel', 'Excel'), ('json', 'JSON'), ('pdf', 'PDF')], max_length=20)),
+                ('filters', models.JSONField(default=dict)),
+                ('fields', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('progress', models.IntegerField(default=0)),
+                ('file_url', models.URLField(blank=True, max_length=500)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('row_count', models.IntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_by', '-created_at'], name='api_exportj_created_3082b6_idx'), models.Index(fields=['status'], name='api_exportj_status_4807df_idx'), models.Index(fields=['job_id'], name='api_exportj_job_id_3823fb_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reporttemplate',
+            index=models.Index(fields=['created_by', '-created_at'], name='api_reportt_created_f2597c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporttemplate',
+            index=models.Index(fields=['report_type'], name='api_reportt_report__98e8f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporttemplate',
+            index=models.Index(fields=['is_scheduled'], name='api_reportt_is_sche_34b5b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['generated_by', '-created_at'], name='api_generat_generat_9ce563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['status'], name='api_generat_status_92e303_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['expires_at'], name='api_generat_expires_155e45_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['-created_at'], name='api_generat_created_ce7618_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklycampaignstats',
+            index=models.Index(fields=['week_start', 'state'], name='api_weeklyc_week_st_2752da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklycampaignstats',
+            index=models.Index(fields=['week_start', 'district'], name='api_weeklyc_week_st_6e63ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklycampaignstats',
+            index=models.Index(fields=['-week_start'], name='api_weeklyc_week_st_ac5179_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_analytics_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='next_processing_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='whatsappmessage',
+            name='processing_attempts',
+            field=models.IntegerField(default=0),
+        ),
+    ]
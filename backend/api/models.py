@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 import uuid
 
@@ -915,8 +917,16 @@ class BulkUploadJob(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    JOB_TYPE_CHOICES = [
+        ('users', 'Users'),
+        ('wards', 'Wards'),
+        ('polling_booths', 'Polling Booths'),
+    ]
+
     job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bulk_upload_jobs')
+    job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, default='users')
+    options = models.JSONField(default=dict, blank=True)  # import settings, e.g. organization_id, update_existing
     file_name = models.CharField(max_length=255)
     file_path = models.CharField(max_length=500)
 
@@ -928,6 +938,11 @@ class BulkUploadJob(models.Model):
 
     validation_errors = models.JSONField(default=list)
 
+    # Checkpoint: rows are processed in chunks of chunk_size and a job
+    # resumes after its last committed chunk
+    chunk_size = models.IntegerField(default=500)
+    committed_chunks = models.IntegerField(default=0)
+
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -974,6 +989,42 @@ class BulkUploadError(models.Model):
         return f"Row {self.row_number} - {self.error_field}: {self.error_message[:50]}"
 
 
+class EmailOutbox(models.Model):
+    """Outbound email queued for delivery by the outbox worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    category = models.CharField(max_length=50, blank=True)  # e.g. welcome, bulk_import_summary
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = "Email Outbox Message"
+        verbose_name_plural = "Email Outbox"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject[:50]} ({self.status})"
+
+
 # =====================================================
 # TWO-FACTOR AUTHENTICATION MODELS
 # =====================================================
@@ -1085,6 +1136,11 @@ class Voter(models.Model):
     negative_interactions = models.IntegerField(default=0)
     preferred_communication = models.CharField(max_length=20, choices=COMMUNICATION_CHOICES, default='phone')
 
+    # Search keys, set on save (see api/services/voter_search.py)
+    phone_digits = models.CharField(max_length=20, blank=True, editable=False, help_text="National phone number, digits only")
+    voter_id_key = models.CharField(max_length=50, blank=True, editable=False, help_text="Voter ID without case or separators")
+    name_key = models.CharField(max_length=300, blank=True, editable=False, help_text="Phonetic skeleton of the full name, Tamil or Latin")
+
     # Metadata
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_voters')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1106,11 +1162,46 @@ class Voter(models.Model):
             models.Index(fields=['phone']),
             models.Index(fields=['is_active']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['email']),
+            # Prefix search: LIKE 'digits%' uses these under any collation
+            models.Index(fields=['phone_digits'], name='voters_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['voter_id_key'], name='voters_voter_id_key_idx', opclasses=['varchar_pattern_ops']),
+            # Only created on PostgreSQL; see migration 0026
+            GinIndex(fields=['name_key'], name='voters_name_key_trgm', opclasses=['gin_trgm_ops']),
         ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.voter_id})"
 
+    def save(self, *args, **kwargs):
+        from api.services.voter_search import index_voter_names, search_keys
+        keys = search_keys(self)
+        for field, value in keys.items():
+            setattr(self, field, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *keys}
+        super().save(*args, **kwargs)
+
+        if update_fields is None or {'first_name', 'middle_name', 'last_name'} & set(update_fields):
+            index_voter_names([self.pk])
+
+
+class VoterNameTrigram(models.Model):
+    """Trigram of a voter's name key, for name search on databases without pg_trgm"""
+
+    voter = models.ForeignKey(Voter, on_delete=models.CASCADE, related_name='name_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'voter_name_trigrams'
+        indexes = [
+            models.Index(fields=['trigram', 'voter']),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} ({self.voter_id})"
+
 
 class VoterInteraction(models.Model):
     """
@@ -1525,6 +1616,7 @@ class WhatsAppConversation(models.Model):
     satisfaction_score = models.IntegerField(default=0)
     resolved = models.BooleanField(default=False)
     human_handoff = models.BooleanField(default=False)
+    summary = models.TextField(blank=True)  # Running summary of turns older than the context window
 
     # Tracking
     session_id = models.UUIDField(default=uuid.uuid4)
@@ -1575,6 +1667,13 @@ class WhatsAppMessage(models.Model):
         ('location', 'Location'),
     ]
 
+    DELIVERY_STATUS_CHOICES = [
+        ('sent', 'Sent'),
+        ('delivered', 'Delivered'),
+        ('read', 'Read'),
+        ('failed', 'Failed'),
+    ]
+
     # Primary fields
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     conversation = models.ForeignKey(
@@ -1603,12 +1702,21 @@ class WhatsAppMessage(models.Model):
     # Processing status
     processed = models.BooleanField(default=False)
     processing_error = models.TextField(blank=True, null=True)
+    processing_attempts = models.IntegerField(default=0)
+    next_processing_at = models.DateTimeField(blank=True, null=True)
 
     # Response metadata
     prompt_tokens = models.IntegerField(default=0)
     completion_tokens = models.IntegerField(default=0)
     model_used = models.CharField(max_length=50, blank=True, null=True)
 
+    # Delivery status of outgoing messages, from WhatsApp status webhooks
+    delivery_status = models.CharField(max_length=10, choices=DELIVERY_STATUS_CHOICES, blank=True, null=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+    status_updated_at = models.DateTimeField(blank=True, null=True)
+    delivery_error = models.CharField(max_length=255, blank=True)
+
     # Metadata
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1620,12 +1728,170 @@ class WhatsAppMessage(models.Model):
             models.Index(fields=['conversation', 'timestamp']),
             models.Index(fields=['whatsapp_message_id']),
             models.Index(fields=['processed']),
+            models.Index(fields=['delivery_status', 'timestamp']),
         ]
 
     def __str__(self):
         return f"{self.sender}: {self.content[:50]}"
 
 
+class WhatsAppInboundEvent(models.Model):
+    """
+    Raw incoming WhatsApp message, stored by the webhook before processing
+
+    The webhook only records events (idempotently, by WhatsApp message id)
+    and acknowledges; workers process each phone number's events in order.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
+    whatsapp_message_id = models.CharField(max_length=255, unique=True)
+    phone_number = models.CharField(max_length=20)
+    message_type = models.CharField(max_length=20, blank=True)
+    payload = models.JSONField(default=dict)  # message object as sent by Meta
+    sent_at = models.DateTimeField(help_text="Message timestamp reported by WhatsApp")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'whatsapp_inbound_events'
+        ordering = ['sent_at', 'id']
+        indexes = [
+            models.Index(fields=['phone_number', 'status', 'sent_at']),
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.phone_number} - {self.whatsapp_message_id} ({self.status})"
+
+
+class WhatsAppStatusEvent(models.Model):
+    """
+    Delivery status reported by WhatsApp for an outgoing message
+
+    Webhooks append statuses here in one insert per request; a worker
+    collapses them to the latest state per message and applies them to
+    WhatsAppMessage in bulk, then deletes them.
+    """
+
+    whatsapp_message_id = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=WhatsAppMessage.DELIVERY_STATUS_CHOICES)
+    status_at = models.DateTimeField(help_text="Status timestamp reported by WhatsApp")
+    error = models.CharField(max_length=255, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'whatsapp_status_events'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.whatsapp_message_id} - {self.status}"
+
+
+class WhatsAppBroadcast(models.Model):
+    """
+    Template message sent to every voter in a segment
+
+    The segment is stored as a source model and lookup filters so an
+    interrupted broadcast can re-run the same query; recipients are read in
+    primary key order and `cursor` holds the last key whose outcome has been
+    recorded.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('paused', 'Paused'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    SOURCE_CHOICES = [
+        ('voter_profile', 'WhatsApp Voter Profiles'),
+        ('voter', 'Voters'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+
+    # Template
+    template_name = models.CharField(max_length=255)
+    language_code = models.CharField(max_length=10, default='ta')
+    components = models.JSONField(default=list, blank=True)
+
+    # Segment: filter(**segment_filters) on the source model
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='voter_profile')
+    segment_filters = models.JSONField(default=dict, blank=True)
+
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    cursor = models.CharField(max_length=64, blank=True)
+    total_recipients = models.IntegerField(default=0)
+    sent_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='whatsapp_broadcasts')
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'whatsapp_broadcasts'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.template_name} ({self.status})"
+
+
+class WhatsAppBroadcastRecipient(models.Model):
+    """Outcome of a broadcast for one phone number, updated by status webhooks"""
+
+    # Recipients are recorded as queued before their send, so a run that dies
+    # mid-chunk leaves the numbers it may have reached behind
+    DELIVERY_STATUS_CHOICES = [('queued', 'Queued')] + WhatsAppMessage.DELIVERY_STATUS_CHOICES
+
+    broadcast = models.ForeignKey(WhatsAppBroadcast, on_delete=models.CASCADE, related_name='recipients')
+    phone_number = models.CharField(max_length=20)
+    whatsapp_message_id = models.CharField(max_length=255, blank=True, null=True)
+
+    # Same fields as WhatsAppMessage so statuses apply to both alike
+    delivery_status = models.CharField(max_length=10, choices=DELIVERY_STATUS_CHOICES)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+    status_updated_at = models.DateTimeField(blank=True, null=True)
+    delivery_error = models.CharField(max_length=255, blank=True)
+
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'whatsapp_broadcast_recipients'
+        unique_together = ['broadcast', 'phone_number']
+        indexes = [
+            models.Index(fields=['whatsapp_message_id']),
+            models.Index(fields=['broadcast', 'delivery_status']),
+        ]
+
+    def __str__(self):
+        return f"{self.phone_number} - {self.delivery_status}"
+
+
 class VoterProfile(models.Model):
     """Aggregated voter profile from WhatsApp interactions"""
 
@@ -1654,9 +1920,6 @@ class VoterProfile(models.Model):
     topic_interests = models.JSONField(default=dict, blank=True)
     issues_raised = models.JSONField(default=list, blank=True)
 
-    # Sentiment history
-    sentiment_history = models.JSONField(default=list, blank=True)
-
     # Referral tracking
     referral_code = models.CharField(max_length=50, unique=True, blank=True, null=True)
     referrals_made = models.IntegerField(default=0)
@@ -1695,6 +1958,41 @@ class VoterProfile(models.Model):
         return self.referral_code
 
 
+class VoterSentimentEvent(models.Model):
+    """
+    Sentiment of a voter at a point in time, append-only
+
+    Each ended conversation adds an 'event' row. Older rows are downsampled
+    in place into 'day' and then 'week' buckets holding the mean score and
+    the number of events folded in, so a voter's history stays small and
+    range queries over recorded_at stay on the index.
+    """
+
+    RESOLUTION_CHOICES = [
+        ('event', 'Event'),
+        ('day', 'Day'),
+        ('week', 'Week'),
+    ]
+
+    voter_profile = models.ForeignKey(VoterProfile, on_delete=models.CASCADE, related_name='sentiment_events')
+    recorded_at = models.DateTimeField(help_text="Event time, or start of the bucket")
+    score = models.FloatField()  # -1 to 1; mean score for buckets
+    count = models.IntegerField(default=1)
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES, default='event')
+
+    class Meta:
+        db_table = 'voter_sentiment_events'
+        ordering = ['recorded_at']
+        indexes = [
+            models.Index(fields=['voter_profile', 'recorded_at']),
+            models.Index(fields=['recorded_at', 'voter_profile']),
+            models.Index(fields=['resolution', 'recorded_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.voter_profile_id} - {self.score:+.2f} ({self.resolution})"
+
+
 class BotConfiguration(models.Model):
     """Bot personality and behavior configuration"""
 
@@ -1743,3 +2041,154 @@ class BotConfiguration(models.Model):
 
     def __str__(self):
         return self.name
+
+
+# =====================================================
+# NEWS MONITORING MODELS
+# =====================================================
+
+class NewsArticle(models.Model):
+    """Tamil Nadu political news article with TVK/Vijay sentiment analysis"""
+
+    LANGUAGE_CHOICES = [
+        ('ta', 'Tamil'),
+        ('en', 'English'),
+        ('hi', 'Hindi'),
+    ]
+
+    SENTIMENT_CHOICES = [
+        ('positive', 'Positive'),
+        ('negative', 'Negative'),
+        ('neutral', 'Neutral'),
+    ]
+
+    CATEGORY_CHOICES = [
+        ('politics', 'Politics'),
+        ('election', 'Election'),
+        ('policy', 'Policy'),
+        ('governance', 'Governance'),
+        ('social_issue', 'Social Issue'),
+        ('economy', 'Economy'),
+        ('other', 'Other'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Source
+    title = models.CharField(max_length=500)
+    url = models.URLField(max_length=1000, unique=True, db_index=True)
+    url_hash = models.CharField(max_length=40, unique=True, editable=False,
+                                help_text="SHA-1 of the canonical URL; one row per article however it is linked")
+    source = models.CharField(max_length=200)
+    author = models.CharField(max_length=200, blank=True, null=True)
+    published_at = models.DateTimeField(db_index=True)
+    scraped_at = models.DateTimeField(auto_now_add=True)
+
+    # Content
+    article_text = models.TextField()
+    excerpt = models.TextField(max_length=500, blank=True, null=True)
+    language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, default='en')
+    word_count = models.IntegerField(default=0)
+
+    # Sentiment analysis
+    tvk_sentiment = models.CharField(max_length=20, choices=SENTIMENT_CHOICES, default='neutral', db_index=True)
+    tvk_sentiment_score = models.DecimalField(
+        max_digits=3, decimal_places=2, default=0.5,
+        help_text="0.00 (very negative) to 1.00 (very positive)"
+    )
+    vijay_mentions = models.IntegerField(default=0)
+    tvk_mentions = models.IntegerField(default=0)
+    dmk_mentions = models.IntegerField(default=0)
+    opposition_mentions = models.IntegerField(default=0)
+
+    # AI analysis
+    ai_summary = models.TextField(blank=True, null=True)
+    key_topics = models.JSONField(default=list, blank=True, help_text="['jobs', 'neet', 'water_crisis']")
+    sentiment_reasoning = models.TextField(blank=True, null=True, help_text="LLM explanation for sentiment classification")
+    entities_mentioned = models.JSONField(default=list, blank=True, help_text="['Vijay', 'Stalin', 'BJP', 'Chennai']")
+    is_relevant = models.BooleanField(default=True, help_text="Is this article relevant to TN politics/TVK?")
+    category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='politics')
+
+    # Processing status
+    ai_processed = models.BooleanField(default=False)
+    processing_error = models.TextField(blank=True, null=True)
+    processing_attempts = models.IntegerField(default=0)
+
+    # Near-duplicate clustering (see api/services/news_dedup.py)
+    minhash = models.BinaryField(null=True, help_text="MinHash signature of article_text")
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates',
+        help_text="First article of this story; its analysis is shared with this copy",
+    )
+    cluster_size = models.IntegerField(default=1, help_text="Copies of this story, this article included")
+
+    # Full-text search on PostgreSQL (see api/services/news_search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'news_articles'
+        ordering = ['-published_at']
+        verbose_name = "News Article"
+        verbose_name_plural = "News Articles"
+        indexes = [
+            models.Index(fields=['-published_at']),
+            models.Index(fields=['source', '-published_at']),
+            models.Index(fields=['tvk_sentiment', '-published_at']),
+            models.Index(fields=['language', '-published_at']),
+            # Only created on PostgreSQL; see migration 0025
+            GinIndex(fields=['search_vector'], name='news_articles_search_gin'),
+        ]
+
+    def __str__(self):
+        return f"{self.source}: {self.title[:60]}"
+
+    def save(self, *args, **kwargs):
+        from api.utils.url_hash import url_hash
+        self.url_hash = url_hash(self.url)
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'article_text', 'language'} & set(update_fields):
+            from api.services.news_search import index_articles
+            index_articles([self.pk])
+
+
+class NewsSearchTerm(models.Model):
+    """Inverted index entry of a news article, for full-text search on databases without one"""
+
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=100)
+    weight = models.FloatField(help_text="Grows with the term's occurrences, title occurrences counting more")
+
+    class Meta:
+        db_table = 'news_search_terms'
+        indexes = [
+            models.Index(fields=['term', 'article']),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.article_id})"
+
+
+class NewsArticleBand(models.Model):
+    """One LSH band of a news article's MinHash signature; shared keys mark near-duplicate candidates"""
+
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='lsh_bands')
+    key = models.BigIntegerField(db_index=True, help_text="Hash of the band number and its signature rows")
+
+    class Meta:
+        db_table = 'news_article_bands'
+
+    def __str__(self):
+        return f"{self.article_id}: {self.key}"
+
+
+# The analytics and reporting models live in their own module; importing them
+# here registers them with the api app, and so with its migrations
+from api.models_analytics import (  # noqa: E402,F401
+    DailyInteractionStats, DailySentimentStats, DailyVoterStats, ExportJob, GeneratedReport,
+    ReportTemplate, WeeklyCampaignStats,
+)
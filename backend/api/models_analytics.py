@@ -281,6 +281,7 @@ class GeneratedReport(models.Model):
     # Generation
     generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='generated_reports')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.IntegerField(default=0)  # 0-100
 
     # Files
     pdf_file_url = models.URLField(max_length=500, blank=True)
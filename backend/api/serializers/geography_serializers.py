@@ -205,10 +205,9 @@ class WardBulkImportSerializer(serializers.Serializer):
     def validate_file(self, value):
         """Validate uploaded file"""
         # Check file extension
-        allowed_extensions = ['.csv', '.xlsx', '.xls']
-        file_ext = value.name.lower()[value.name.lower().rfind('.'):]
+        allowed_extensions = ['.csv', '.csv.gz', '.xlsx', '.xls']
 
-        if file_ext not in allowed_extensions:
+        if not value.name.lower().endswith(tuple(allowed_extensions)):
             raise serializers.ValidationError(
                 f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
             )
@@ -232,10 +231,9 @@ class PollingBoothBulkImportSerializer(serializers.Serializer):
     def validate_file(self, value):
         """Validate uploaded file"""
         # Check file extension
-        allowed_extensions = ['.csv', '.xlsx', '.xls']
-        file_ext = value.name.lower()[value.name.lower().rfind('.'):]
+        allowed_extensions = ['.csv', '.csv.gz', '.xlsx', '.xls']
 
-        if file_ext not in allowed_extensions:
+        if not value.name.lower().endswith(tuple(allowed_extensions)):
             raise serializers.ValidationError(
                 f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
             )
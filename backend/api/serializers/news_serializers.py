@@ -5,6 +5,7 @@ Handles serialization for Tamil Nadu political news articles with sentiment anal
 
 from rest_framework import serializers
 from api.models import NewsArticle
+from api.services.news_search import highlight
 
 
 class NewsArticleListSerializer(serializers.ModelSerializer):
@@ -12,6 +13,7 @@ class NewsArticleListSerializer(serializers.ModelSerializer):
     Lightweight serializer for news article lists
     """
     excerpt_preview = serializers.SerializerMethodField()
+    highlights = serializers.SerializerMethodField()
 
     class Meta:
         model = NewsArticle
@@ -26,6 +28,7 @@ class NewsArticleListSerializer(serializers.ModelSerializer):
             'language',
             'word_count',
             'excerpt_preview',
+            'highlights',
 
             # Sentiment fields
             'tvk_sentiment',
@@ -38,6 +41,8 @@ class NewsArticleListSerializer(serializers.ModelSerializer):
             'is_relevant',
             'category',
             'ai_processed',
+            'duplicate_of',
+            'cluster_size',
         ]
         read_only_fields = fields
 
@@ -47,6 +52,16 @@ class NewsArticleListSerializer(serializers.ModelSerializer):
             return obj.excerpt[:150] + '...' if len(obj.excerpt) > 150 else obj.excerpt
         return obj.article_text[:150] + '...' if len(obj.article_text) > 150 else obj.article_text
 
+    def get_highlights(self, obj):
+        """Snippets of title and text around the search terms, when searching"""
+        terms = self.context.get('search_terms')
+        if not terms:
+            return None
+        return {
+            'title': (highlight(obj.title, terms, fragments=1, width=2 * len(obj.title)) or [None])[0],
+            'text': highlight(obj.article_text, terms),
+        }
+
 
 class NewsArticleDetailSerializer(serializers.ModelSerializer):
     """
@@ -90,6 +105,8 @@ class NewsArticleDetailSerializer(serializers.ModelSerializer):
             'ai_processed',
             'processing_attempts',
             'processing_error',
+            'duplicate_of',
+            'cluster_size',
         ]
         read_only_fields = fields
 
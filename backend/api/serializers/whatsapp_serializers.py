@@ -108,6 +108,8 @@ class WhatsAppConversationDetailSerializer(serializers.ModelSerializer):
 class VoterProfileSerializer(serializers.ModelSerializer):
     """Serializer for voter profiles"""
 
+    sentiment_history = serializers.SerializerMethodField()
+
     class Meta:
         model = VoterProfile
         fields = [
@@ -130,6 +132,13 @@ class VoterProfileSerializer(serializers.ModelSerializer):
             'referrals_made',
         ]
 
+    def get_sentiment_history(self, obj):
+        """Sentiment readings (downsampled with age), oldest first; prefetch sentiment_events for lists"""
+        return [
+            {'date': event.recorded_at.isoformat(), 'score': event.score}
+            for event in obj.sentiment_events.all()
+        ]
+
 
 class BotConfigurationSerializer(serializers.ModelSerializer):
     """Serializer for bot configurations"""
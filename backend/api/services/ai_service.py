@@ -10,10 +10,76 @@ from typing import Optional, Dict, Any, List
 from openai import OpenAI
 from langdetect import detect, LangDetectException
 import re
+import time
+from api.services.local_classifier import TierStats, get_local_classifier
+from api.utils.result_cache import ai_result_cache, prompt_version
 
 logger = logging.getLogger(__name__)
 
 
+# Prompt templates are module-level so their text versions the result cache:
+# editing one changes the cache keys of its operation
+LANGUAGE_MAP = {
+    'ta': 'ta',  # Tamil
+    'en': 'en',  # English
+    'hi': 'hi',  # Hindi
+    'te': 'te',  # Telugu
+}
+
+INTENT_PROMPT = """Classify the intent of this message into ONE of these categories:
+
+1. feedback_positive - User sharing positive feedback
+2. feedback_negative - User sharing negative feedback/complaint
+3. report_issue - User reporting a specific problem
+4. ask_question - User asking a question
+5. make_suggestion - User providing suggestions
+6. political_opinion - User sharing political views
+7. general_inquiry - General conversation
+8. off_topic - Not relevant to governance
+
+Message: "{text}"
+
+Respond in JSON format:
+{{"intent": "category_name", "confidence": 0.0-1.0, "category": "feedback|complaint|suggestion|inquiry|political"}}"""
+
+SENTIMENT_PROMPT = """Analyze the sentiment of this message:
+
+Message: "{text}"
+
+Respond in JSON format:
+{{"sentiment": "positive|negative|neutral", "score": -1.0 to 1.0, "confidence": 0.0-1.0}}
+
+Where score: -1.0 (very negative) to 1.0 (very positive), 0.0 (neutral)"""
+
+TOPICS_PROMPT = """Extract structured information from this message:
+
+Message: "{text}"
+
+Identify:
+1. Topics: Main subjects (Healthcare, Education, Jobs, Infrastructure, Transport, etc.)
+2. Keywords: Important words (hospital, school, road, bus, etc.)
+3. Issues: Specific problems mentioned
+
+Respond in JSON format:
+{{
+    "topics": ["topic1", "topic2"],
+    "keywords": ["keyword1", "keyword2"],
+    "issues": ["issue1", "issue2"]
+}}"""
+
+ENRICHMENT_PROMPT = """For each numbered message below:
+
+1. Classify the intent into ONE of: feedback_positive, feedback_negative, report_issue, ask_question, make_suggestion, political_opinion, general_inquiry, off_topic
+2. Analyze the sentiment: positive, negative or neutral, with a score from -1.0 (very negative) to 1.0 (very positive)
+3. Extract topics (Healthcare, Education, Jobs, Infrastructure, Transport, etc.), keywords (hospital, school, road, bus, etc.) and specific issues mentioned
+
+Messages:
+{numbered}
+
+Respond with a JSON array containing one object per message, in order:
+[{{"id": 1, "intent": "category_name", "confidence": 0.0-1.0, "category": "feedback|complaint|suggestion|inquiry|political", "sentiment": "positive|negative|neutral", "score": -1.0 to 1.0, "topics": ["topic1"], "keywords": ["keyword1"], "issues": ["issue1"]}}]"""
+
+
 class AIService:
     """
     Service class for AI-powered conversation handling
@@ -34,6 +100,40 @@ class AIService:
                 logger.error(f"Failed to initialize OpenAI client: {str(e)}")
                 self.client = None
 
+        self.result_cache = ai_result_cache
+        self.local_classifier = get_local_classifier()
+        self.tier_stats = TierStats()
+
+    def _cached_completion(self, operation: str, template: str, text: str, **params) -> Dict[str, Any]:
+        """
+        JSON result of a single-message prompt, from the result cache when the
+        same normalized text was seen with the same prompt and parameters
+        """
+        started = time.perf_counter()
+        key = self.result_cache.key(operation, prompt_version(template, params), text)
+        result = self.result_cache.get(key)
+        if result is not None:
+            self.tier_stats.record('cache', time.perf_counter() - started)
+            return result
+
+        response = self.client.chat.completions.create(
+            messages=[{"role": "user", "content": template.format(text=text)}],
+            **params
+        )
+
+        result = json.loads(response.choices[0].message.content)
+        self.result_cache.set(key, result)
+        self.tier_stats.record('llm', time.perf_counter() - started)
+        return result
+
+    def _local(self, tier: str, classify, text: str) -> Optional[Any]:
+        """Answer from a local tier, recording its use; None to escalate"""
+        started = time.perf_counter()
+        result = classify(text)
+        if result is not None:
+            self.tier_stats.record(tier, time.perf_counter() - started)
+        return result
+
     def detect_language(self, text: str) -> str:
         """
         Detect language of text
@@ -44,18 +144,23 @@ class AIService:
         Returns:
             Language code (ta, en, hi, te)
         """
+        # Tamil, Hindi and Telugu each have their own script
+        language = self._local('script', self.local_classifier.language, text)
+        if language is not None:
+            return language
+
+        key = self.result_cache.key('detect_language', prompt_version('langdetect', LANGUAGE_MAP), text)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             lang = detect(text)
 
             # Map to our supported languages
-            lang_map = {
-                'ta': 'ta',  # Tamil
-                'en': 'en',  # English
-                'hi': 'hi',  # Hindi
-                'te': 'te',  # Telugu
-            }
-
-            return lang_map.get(lang, 'en')
+            language = LANGUAGE_MAP.get(lang, 'en')
+            self.result_cache.set(key, language)
+            return language
         except LangDetectException:
             # Default to English if detection fails
             return 'en'
@@ -189,6 +294,10 @@ Respond in {lang_name} unless the user switches languages."""
         Returns:
             Dictionary with intent and confidence
         """
+        local = self._local('local', self.local_classifier.intent, text)
+        if local is not None:
+            return local
+
         if not self.client:
             return {
                 "intent": "general_inquiry",
@@ -197,32 +306,13 @@ Respond in {lang_name} unless the user switches languages."""
             }
 
         try:
-            prompt = f"""Classify the intent of this message into ONE of these categories:
-
-1. feedback_positive - User sharing positive feedback
-2. feedback_negative - User sharing negative feedback/complaint
-3. report_issue - User reporting a specific problem
-4. ask_question - User asking a question
-5. make_suggestion - User providing suggestions
-6. political_opinion - User sharing political views
-7. general_inquiry - General conversation
-8. off_topic - Not relevant to governance
-
-Message: "{text}"
-
-Respond in JSON format:
-{{"intent": "category_name", "confidence": 0.0-1.0, "category": "feedback|complaint|suggestion|inquiry|political"}}"""
-
-            response = self.client.chat.completions.create(
+            return self._cached_completion(
+                'classify_intent', INTENT_PROMPT, text,
                 model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=100
             )
 
-            result = response.choices[0].message.content
-            return json.loads(result)
-
         except Exception as e:
             logger.error(f"Intent classification failed: {str(e)}")
             return {
@@ -241,6 +331,10 @@ Respond in JSON format:
         Returns:
             Dictionary with sentiment and score
         """
+        local = self._local('local', self.local_classifier.sentiment, text)
+        if local is not None:
+            return local
+
         if not self.client:
             return {
                 "sentiment": "neutral",
@@ -249,25 +343,13 @@ Respond in JSON format:
             }
 
         try:
-            prompt = f"""Analyze the sentiment of this message:
-
-Message: "{text}"
-
-Respond in JSON format:
-{{"sentiment": "positive|negative|neutral", "score": -1.0 to 1.0, "confidence": 0.0-1.0}}
-
-Where score: -1.0 (very negative) to 1.0 (very positive), 0.0 (neutral)"""
-
-            response = self.client.chat.completions.create(
+            return self._cached_completion(
+                'analyze_sentiment', SENTIMENT_PROMPT, text,
                 model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
                 max_tokens=100
             )
 
-            result = response.choices[0].message.content
-            return json.loads(result)
-
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {str(e)}")
             return {
@@ -294,32 +376,13 @@ Where score: -1.0 (very negative) to 1.0 (very positive), 0.0 (neutral)"""
             }
 
         try:
-            prompt = f"""Extract structured information from this message:
-
-Message: "{text}"
-
-Identify:
-1. Topics: Main subjects (Healthcare, Education, Jobs, Infrastructure, Transport, etc.)
-2. Keywords: Important words (hospital, school, road, bus, etc.)
-3. Issues: Specific problems mentioned
-
-Respond in JSON format:
-{{
-    "topics": ["topic1", "topic2"],
-    "keywords": ["keyword1", "keyword2"],
-    "issues": ["issue1", "issue2"]
-}}"""
-
-            response = self.client.chat.completions.create(
+            return self._cached_completion(
+                'extract_topics_and_keywords', TOPICS_PROMPT, text,
                 model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=200
             )
 
-            result = response.choices[0].message.content
-            return json.loads(result)
-
         except Exception as e:
             logger.error(f"Topic extraction failed: {str(e)}")
             return {
@@ -328,6 +391,106 @@ Respond in JSON format:
                 "issues": []
             }
 
+    ENRICHMENT_DEFAULTS = {
+        "intent": "general_inquiry",
+        "confidence": 0.5,
+        "category": "inquiry",
+        "sentiment": "neutral",
+        "score": 0.0,
+        "topics": [],
+        "keywords": [],
+        "issues": []
+    }
+
+    def enrich_messages(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Classify intent, analyze sentiment and extract topics for several
+        messages in one request
+
+        Replaces a classify_intent, analyze_sentiment and
+        extract_topics_and_keywords call per message.
+
+        Args:
+            texts: Message texts
+
+        Returns:
+            One dictionary per text, in order, with the keys of
+            ENRICHMENT_DEFAULTS and the tier ("local" or "llm") that
+            answered; None for any message the model did not return, so
+            a failed request is never mistaken for a real label
+        """
+        if not texts:
+            return []
+
+        # Each distinct normalized text is sent at most once, and only if
+        # the local tier cannot answer it and it is not already cached
+        version = prompt_version(ENRICHMENT_PROMPT, "gpt-4", 0.2)
+        keys = [self.result_cache.key('enrich_message', version, text) for text in texts]
+        results = {}
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            local = self._local('local', self.local_classifier.enrich, text)
+            if local is not None:
+                results[key] = {**local, "tier": "local"}
+                continue
+            started = time.perf_counter()
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+                self.tier_stats.record('cache', time.perf_counter() - started)
+            else:
+                pending[key] = text
+
+        if pending and self.client:
+            try:
+                started = time.perf_counter()
+                numbered = "\n".join(
+                    f"{index}. {json.dumps(text, ensure_ascii=False)}"
+                    for index, text in enumerate(pending.values(), start=1)
+                )
+
+                response = self.client.chat.completions.create(
+                    model="gpt-4",
+                    messages=[{"role": "user", "content": ENRICHMENT_PROMPT.format(numbered=numbered)}],
+                    temperature=0.2,
+                    max_tokens=150 * len(pending)
+                )
+
+                items = self._parse_enrichment_items(response.choices[0].message.content, len(pending))
+                for key, item in zip(pending, items):
+                    if item is not None:
+                        results[key] = {**self._enrichment_defaults(), **item, "tier": "llm"}
+                        self.result_cache.set(key, results[key])
+                self.tier_stats.record('llm', time.perf_counter() - started, len(pending))
+
+            except Exception as e:
+                logger.error(f"Message enrichment failed for {len(pending)} messages: {str(e)}")
+
+        return [dict(results[key]) if key in results else None for key in keys]
+
+    def _enrichment_defaults(self) -> Dict[str, Any]:
+        return {key: list(value) if isinstance(value, list) else value
+                for key, value in self.ENRICHMENT_DEFAULTS.items()}
+
+    def _parse_enrichment_items(self, content: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        """The fields the model returned for each message, None where it returned nothing"""
+        match = re.search(r'\[.*\]', content or '', re.DOTALL)
+        items = json.loads(match.group(0)) if match else []
+
+        results = [None] * count
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get('id', position + 1)) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < count:
+                results[index] = {key: item[key] for key in self.ENRICHMENT_DEFAULTS if key in item}
+        return results
+
     def extract_demographics(self, conversation_history: List[Dict[str, str]]) -> Dict[str, Any]:
         """
         Infer user demographics from conversation
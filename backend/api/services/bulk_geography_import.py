@@ -1,167 +1,264 @@
 """
 Bulk Import Service for Wards and Polling Booths
-Handles CSV/Excel parsing, validation, and batch insertion to Supabase
+Handles CSV/Excel streaming, validation, and batch insertion to Supabase
 """
 
-import csv
-import io
-import uuid
-from typing import Dict, List, Tuple, Any, Optional
-from datetime import datetime
-from decimal import Decimal
-import openpyxl
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 from supabase import create_client, Client
 
-from api.models import BulkUploadJob, BulkUploadError, User, Constituency
+from api.models import BulkUploadJob, BulkUploadError, User
+from api.services.bulk_upload_jobs import store_upload
+from api.utils.row_sources import XlsxRowSource, open_row_source
 from api.utils.validators import WardValidator, PollingBoothValidator, DuplicateDetector
 
+logger = logging.getLogger(__name__)
+
+
+class SupabaseWriteError(Exception):
+    """A PostgREST write that was rejected or never reached the server"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        self.status_code = status_code
+        super().__init__(message)
+
+    @property
+    def retryable(self) -> bool:
+        """Connection errors, rate limits and server errors are worth retrying; 4xx data errors are not"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class AdaptiveBatchWriter:
+    """
+    Send rows in concurrent batches
+
+    Batch size grows while batches finish well under TARGET_SECONDS and
+    shrinks when they run long or hit retryable errors. A batch rejected
+    for its data is bisected until the offending rows are isolated, so
+    one bad row no longer fails its whole batch.
+    """
+
+    MAX_WORKERS = 8
+    MIN_BATCH_SIZE = 25
+    MAX_BATCH_SIZE = 2000
+    TARGET_SECONDS = 2.0
+    MAX_RETRIES = 3
+    RETRY_BACKOFF_SECONDS = 0.5
+
+    def __init__(self, send: Callable[[List[Dict[str, Any]]], None], batch_size: int = 500,
+                 max_workers: Optional[int] = None, sleep: Callable[[float], None] = time.sleep):
+        self.send = send
+        self.batch_size = max(self.MIN_BATCH_SIZE, min(batch_size, self.MAX_BATCH_SIZE))
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.sleep = sleep
+        self.requests = 0
+
+    def _timed_send(self, rows: List[Dict[str, Any]]) -> float:
+        started = time.monotonic()
+        self.send(rows)
+        return time.monotonic() - started
+
+    def _adapt(self, size: int, elapsed: float):
+        if elapsed > self.TARGET_SECONDS:
+            self.batch_size = max(self.MIN_BATCH_SIZE, min(self.batch_size, size) // 2)
+        elif elapsed < self.TARGET_SECONDS / 2 and size >= self.batch_size:
+            self.batch_size = min(self.MAX_BATCH_SIZE, self.batch_size * 2)
+
+    def write(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Write all rows
+
+        Returns:
+            {'written': int, 'failed': [{'index': int, 'error': str}]}
+            where index is the row's position in rows
+        """
+        written = 0
+        failed = []
+        retry_queue = deque()  # (start, end, attempt) ranges split off failed batches
+        cursor = 0
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while cursor < len(rows) or retry_queue or in_flight:
+                while len(in_flight) < self.max_workers and (retry_queue or cursor < len(rows)):
+                    if retry_queue:
+                        start, end, attempt = retry_queue.popleft()
+                    else:
+                        start, end, attempt = cursor, min(cursor + self.batch_size, len(rows)), 0
+                        cursor = end
+                    self.requests += 1
+                    in_flight[pool.submit(self._timed_send, rows[start:end])] = (start, end, attempt)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, end, attempt = in_flight.pop(future)
+                    size = end - start
+                    try:
+                        self._adapt(size, future.result())
+                        written += size
+                        continue
+                    except SupabaseWriteError as e:
+                        error = e
+                    except Exception as e:
+                        error = SupabaseWriteError(str(e))
+
+                    middle = start + size // 2
+                    if error.retryable and attempt < self.MAX_RETRIES:
+                        # Smaller batches are less likely to time out again
+                        self.batch_size = max(self.MIN_BATCH_SIZE, self.batch_size // 2)
+                        self.sleep(self.RETRY_BACKOFF_SECONDS * (2 ** attempt))
+                        if size > 1:
+                            retry_queue.extend([(start, middle, attempt + 1), (middle, end, attempt + 1)])
+                        else:
+                            retry_queue.append((start, end, attempt + 1))
+                    elif not error.retryable and size > 1:
+                        retry_queue.extend([(start, middle, 0), (middle, end, 0)])
+                    else:
+                        failed.extend({'index': index, 'error': str(error)} for index in range(start, end))
+
+        failed.sort(key=lambda failure: failure['index'])
+        return {'written': written, 'failed': failed}
+
 
 class SupabaseService:
     """Wrapper for Supabase client operations"""
 
-    def __init__(self):
-        self.client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
-        )
+    PAGE_SIZE = 1000
+    REQUEST_TIMEOUT = (5, 60)  # connect, read
+
+    def __init__(self, max_connections: int = AdaptiveBatchWriter.MAX_WORKERS):
+        self.url = settings.SUPABASE_URL.rstrip('/')
+        self.key = settings.SUPABASE_SERVICE_KEY
+        self._client: Optional[Client] = None
+
+        # One pooled session shared by all batch threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'apikey': self.key,
+            'Authorization': f'Bearer {self.key}',
+            'Content-Type': 'application/json',
+        })
+
+    @property
+    def client(self) -> Client:
+        """supabase-py client, created on first use"""
+        if self._client is None:
+            self._client = create_client(self.url, self.key)
+        return self._client
+
+    def _table_url(self, table: str) -> str:
+        return f"{self.url}/rest/v1/{table}"
+
+    def select_all(self, table: str, columns: str, **filters) -> List[Dict[str, Any]]:
+        """Read every matching row, paging past the PostgREST row limit"""
+        params = {'select': columns, 'order': 'id'}
+        params.update({field: f'eq.{value}' for field, value in filters.items()})
+
+        rows = []
+        offset = 0
+        while True:
+            response = self.session.get(
+                self._table_url(table),
+                params={**params, 'limit': self.PAGE_SIZE, 'offset': offset},
+                timeout=self.REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+            page = response.json()
+            rows.extend(page)
+            if len(page) < self.PAGE_SIZE:
+                return rows
+            offset += self.PAGE_SIZE
 
     def get_constituencies(self, organization_id: str) -> Dict[str, str]:
         """Get constituency code -> id mapping"""
-        response = self.client.table('constituencies').select('id, code').eq(
-            'organization_id', organization_id
-        ).execute()
-
-        return {row['code']: row['id'] for row in response.data}
+        rows = self.select_all('constituencies', 'id,code', organization_id=organization_id)
+        return {row['code']: row['id'] for row in rows}
 
     def get_wards(self, organization_id: str) -> Dict[str, str]:
         """Get ward code -> id mapping"""
-        response = self.client.table('wards').select('id, code').eq(
-            'organization_id', organization_id
-        ).execute()
+        rows = self.select_all('wards', 'id,code', organization_id=organization_id)
+        return {row['code']: row['id'] for row in rows}
 
-        return {row['code']: row['id'] for row in response.data}
-
-    def bulk_insert_wards(self, wards: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
+    def write_rows(self, table: str, rows: List[Dict[str, Any]], on_conflict: str, update_existing: bool):
         """
-        Bulk insert wards in batches
-
-        Args:
-            wards: List of ward dictionaries
-            batch_size: Number of records per batch
+        Upsert one batch
 
-        Returns:
-            Dict with insert statistics
+        Existing rows (by on_conflict) are updated when update_existing is
+        set and skipped otherwise, so re-sending a batch is always safe.
+        Rows may leave out optional fields; the batch names the union of
+        their keys in columns, which PostgREST requires when keys differ.
         """
-        total_inserted = 0
-        total_failed = 0
-        errors = []
+        resolution = 'merge-duplicates' if update_existing else 'ignore-duplicates'
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        try:
+            response = self.session.post(
+                self._table_url(table),
+                params={'on_conflict': on_conflict, 'columns': ','.join(columns)},
+                json=rows,
+                headers={'Prefer': f'resolution={resolution},return=minimal'},
+                timeout=self.REQUEST_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            raise SupabaseWriteError(str(e))
 
-        # Insert in batches
-        for i in range(0, len(wards), batch_size):
-            batch = wards[i:i + batch_size]
+        if response.status_code >= 400:
             try:
-                response = self.client.table('wards').insert(batch).execute()
-                total_inserted += len(response.data)
-            except Exception as e:
-                total_failed += len(batch)
-                errors.append({
-                    'batch_start': i,
-                    'batch_end': min(i + batch_size, len(wards)),
-                    'error': str(e)
-                })
+                message = response.json().get('message') or response.text
+            except ValueError:
+                message = response.text
+            raise SupabaseWriteError(message, status_code=response.status_code)
+
+    def bulk_write(self, table: str, rows: List[Dict[str, Any]], on_conflict: str,
+                   update_existing: bool, batch_size: int = 500) -> Dict[str, Any]:
+        """Write rows in concurrent adaptive batches; see AdaptiveBatchWriter.write"""
+        writer = AdaptiveBatchWriter(
+            lambda batch: self.write_rows(table, batch, on_conflict, update_existing),
+            batch_size=batch_size,
+        )
+        return writer.write(rows)
 
+    @staticmethod
+    def _legacy_result(result: Dict[str, Any], key: str) -> Dict[str, Any]:
         return {
-            'total_inserted': total_inserted,
-            'total_failed': total_failed,
-            'errors': errors
+            key: result['written'],
+            'total_failed': len(result['failed']),
+            'errors': result['failed'],
         }
 
-    def bulk_upsert_wards(self, wards: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
+    def bulk_insert_wards(self, wards: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
+        """Insert wards, skipping codes that already exist"""
+        result = self.bulk_write('wards', wards, 'organization_id,code', False, batch_size)
+        return self._legacy_result(result, 'total_inserted')
+
+    def bulk_upsert_wards(self, wards: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
         """
         Bulk upsert wards (insert or update if exists)
 
         Uses ON CONFLICT (organization_id, code) DO UPDATE
         """
-        total_upserted = 0
-        total_failed = 0
-        errors = []
+        result = self.bulk_write('wards', wards, 'organization_id,code', True, batch_size)
+        return self._legacy_result(result, 'total_upserted')
 
-        for i in range(0, len(wards), batch_size):
-            batch = wards[i:i + batch_size]
-            try:
-                response = self.client.table('wards').upsert(
-                    batch,
-                    on_conflict='organization_id,code'
-                ).execute()
-                total_upserted += len(response.data)
-            except Exception as e:
-                total_failed += len(batch)
-                errors.append({
-                    'batch_start': i,
-                    'batch_end': min(i + batch_size, len(wards)),
-                    'error': str(e)
-                })
-
-        return {
-            'total_upserted': total_upserted,
-            'total_failed': total_failed,
-            'errors': errors
-        }
-
-    def bulk_insert_booths(self, booths: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
-        """Bulk insert polling booths in batches"""
-        total_inserted = 0
-        total_failed = 0
-        errors = []
-
-        for i in range(0, len(booths), batch_size):
-            batch = booths[i:i + batch_size]
-            try:
-                response = self.client.table('polling_booths').insert(batch).execute()
-                total_inserted += len(response.data)
-            except Exception as e:
-                total_failed += len(batch)
-                errors.append({
-                    'batch_start': i,
-                    'batch_end': min(i + batch_size, len(booths)),
-                    'error': str(e)
-                })
-
-        return {
-            'total_inserted': total_inserted,
-            'total_failed': total_failed,
-            'errors': errors
-        }
+    def bulk_insert_booths(self, booths: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
+        """Insert polling booths, skipping booths that already exist"""
+        result = self.bulk_write('polling_booths', booths, 'organization_id,constituency_id,booth_number', False, batch_size)
+        return self._legacy_result(result, 'total_inserted')
 
-    def bulk_upsert_booths(self, booths: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
+    def bulk_upsert_booths(self, booths: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
         """Bulk upsert polling booths"""
-        total_upserted = 0
-        total_failed = 0
-        errors = []
-
-        for i in range(0, len(booths), batch_size):
-            batch = booths[i:i + batch_size]
-            try:
-                response = self.client.table('polling_booths').upsert(
-                    batch,
-                    on_conflict='organization_id,constituency_id,booth_number'
-                ).execute()
-                total_upserted += len(response.data)
-            except Exception as e:
-                total_failed += len(batch)
-                errors.append({
-                    'batch_start': i,
-                    'batch_end': min(i + batch_size, len(booths)),
-                    'error': str(e)
-                })
-
-        return {
-            'total_upserted': total_upserted,
-            'total_failed': total_failed,
-            'errors': errors
-        }
+        result = self.bulk_write('polling_booths', booths, 'organization_id,constituency_id,booth_number', True, batch_size)
+        return self._legacy_result(result, 'total_upserted')
 
 
 class FileParser:
@@ -169,354 +266,306 @@ class FileParser:
 
     @staticmethod
     def parse_csv(file: UploadedFile) -> List[Dict[str, Any]]:
-        """Parse CSV file into list of dictionaries"""
-        # Read file content
-        content = file.read()
-        if isinstance(content, bytes):
-            content = content.decode('utf-8-sig')  # Handle BOM
-
-        # Parse CSV
-        reader = csv.DictReader(io.StringIO(content))
-        rows = [dict(row) for row in reader]
-
-        return rows
+        """Parse CSV (or gzip'd CSV) file into list of dictionaries"""
+        with open_row_source(file, getattr(file, 'name', None) or 'upload.csv') as source:
+            return [row['data'] for row in source]
 
     @staticmethod
     def parse_excel(file: UploadedFile) -> List[Dict[str, Any]]:
         """Parse Excel file into list of dictionaries"""
-        workbook = openpyxl.load_workbook(file, read_only=True)
-        sheet = workbook.active
+        with XlsxRowSource(file) as source:
+            return [row['data'] for row in source]
 
-        # Get headers from first row
-        headers = [cell.value for cell in sheet[1]]
 
-        # Parse data rows
-        rows = []
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            row_dict = {headers[i]: row[i] for i in range(len(headers)) if i < len(row)}
-            rows.append(row_dict)
+class GeographyBulkImportService(ABC):
+    """
+    Background import of geography rows into Supabase
 
-        workbook.close()
-        return rows
+    process_file stores the upload and queues it; a Celery worker then
+    runs the job through ChunkedImportRunner using the handler methods
+    below. Each chunk is written with concurrent adaptive batches and
+    rows Supabase rejects are recorded as BulkUploadErrors.
+    """
 
+    JOB_TYPE = ''
+    TABLE = ''
+    ON_CONFLICT = ''
+    CHUNK_SIZE = 5000  # rows per checkpoint
+    BATCH_SIZE = 500   # initial rows per request; adapted while writing
 
-class WardBulkImportService:
-    """Service for bulk importing wards"""
-
-    def __init__(self, user: User, organization_id: str):
+    def __init__(self, user: User, organization_id: str, update_existing: bool = False,
+                 job: Optional[BulkUploadJob] = None):
         self.user = user
         self.organization_id = organization_id
+        self.update_existing = update_existing
+        self.job = job
         self.supabase = SupabaseService()
+        self._constituency_map: Optional[Dict[str, str]] = None
+        self._seen_keys: Dict[Any, int] = {}
+
+    @classmethod
+    def for_job(cls, job: BulkUploadJob):
+        """Rebuild the service for a queued job on the worker"""
+        return cls(
+            job.created_by,
+            job.options.get('organization_id'),
+            update_existing=job.options.get('update_existing', False),
+            job=job,
+        )
+
+    @property
+    def constituency_map(self) -> Dict[str, str]:
+        if self._constituency_map is None:
+            self._constituency_map = self.supabase.get_constituencies(self.organization_id)
+            self._constituency_codes = set(self._constituency_map)
+        return self._constituency_map
+
+    @property
+    def constituency_codes(self) -> set:
+        self.constituency_map
+        return self._constituency_codes
 
-    def process_file(self, file: UploadedFile, update_existing: bool = False) -> BulkUploadJob:
+    def process_file(self, file: UploadedFile, update_existing: Optional[bool] = None) -> BulkUploadJob:
         """
-        Process uploaded file and import wards
+        Store the uploaded file and queue the import
 
         Args:
             file: Uploaded CSV or Excel file
-            update_existing: If True, update existing wards. If False, skip duplicates.
+            update_existing: If True, update existing rows. If False, skip duplicates.
 
         Returns:
-            BulkUploadJob instance with import results
+            Pending BulkUploadJob; poll the import status endpoint for progress
         """
-        # Create job record
-        job = BulkUploadJob.objects.create(
+        from api.tasks import process_bulk_upload
+
+        if update_existing is not None:
+            self.update_existing = update_existing
+
+        self.job = BulkUploadJob.objects.create(
             created_by=self.user,
             file_name=file.name,
-            file_path=f"uploads/{uuid.uuid4()}_{file.name}",
-            status='validating'
+            job_type=self.JOB_TYPE,
+            options={'organization_id': self.organization_id, 'update_existing': self.update_existing},
+            chunk_size=self.CHUNK_SIZE,
+            status='pending'
+        )
+        store_upload(self.job, file)
+        process_bulk_upload.delay(str(self.job.job_id))
+        return self.job
+
+    def _error(self, row: Dict[str, Any], message: str, field: str = 'validation') -> BulkUploadError:
+        return BulkUploadError(
+            job=self.job,
+            row_number=row['row_number'],
+            row_data={key: str(value) if value is not None else None for key, value in row['data'].items()},
+            error_message=message,
+            error_field=field
         )
 
-        try:
-            # Parse file
-            if file.name.lower().endswith('.csv'):
-                rows = FileParser.parse_csv(file)
-            else:
-                rows = FileParser.parse_excel(file)
-
-            job.total_rows = len(rows)
-            job.save()
-
-            # Get constituency mapping
-            constituency_map = self.supabase.get_constituencies(self.organization_id)
-            constituency_codes = set(constituency_map.keys())
-
-            # Validate data
-            job.status = 'validating'
-            job.save()
-
-            validation_result = WardValidator.validate_batch(rows, constituency_codes)
-
-            if not validation_result['is_valid']:
-                # Store validation errors
-                for error in validation_result['errors']:
-                    BulkUploadError.objects.create(
-                        job=job,
-                        row_number=error['row_number'],
-                        row_data=error['row_data'],
-                        error_message='; '.join(error['errors']),
-                        error_field='validation'
-                    )
-
-                job.status = 'failed'
-                job.failed_count = validation_result['invalid_rows']
-                job.validation_errors = validation_result['errors']
-                job.save()
-                return job
-
-            # Check for duplicates in the file
-            duplicates = DuplicateDetector.find_duplicate_ward_codes(rows)
-            if duplicates:
-                job.status = 'failed'
-                job.validation_errors = {
-                    'duplicates': duplicates,
-                    'message': f"Found {len(duplicates)} duplicate ward codes in file"
-                }
-                job.save()
-                return job
-
-            # Transform data for Supabase
-            job.status = 'processing'
-            job.started_at = datetime.now()
-            job.save()
-
-            wards_data = self._transform_rows(
-                validation_result['valid_data'],
-                constituency_map
+    # Handler interface for ChunkedImportRunner
+
+    def check_structure(self, headers: List[str]) -> List[str]:
+        self._seen_keys = {}
+        return [] if headers else ["File is empty or has no headers"]
+
+    def validate(self, rows: List[Dict[str, Any]]) -> List[BulkUploadError]:
+        data = [row['data'] for row in rows]
+        errors = []
+        for row in rows:
+            messages = self.validate_row(row['data'], row['row_number'])
+            if messages:
+                errors.append(self._error(row, '; '.join(messages)))
+
+        # Keep the first occurrence of a duplicated key, reject the rest;
+        # the seen keys carry over between chunks of the same file
+        repeats = DuplicateDetector.scan(
+            map(self.duplicate_key, data), self._seen_keys, labels=(row['row_number'] for row in rows)
+        )
+        for index, _ in repeats:
+            errors.append(self._error(rows[index], self.duplicate_message(data[index]), 'duplicate'))
+        return errors
+
+    def process_chunk(self, rows: List[Dict[str, Any]]) -> List[BulkUploadError]:
+        records = []
+        sources = []
+        errors = []
+        for row in rows:
+            try:
+                records.append(self.transform_row(row['data']))
+                sources.append(row)
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                errors.append(self._error(row, f"Could not convert row: {str(e)}", 'transform'))
+
+        if records:
+            result = self.supabase.bulk_write(
+                self.TABLE, records, self.ON_CONFLICT, self.update_existing, batch_size=self.BATCH_SIZE
             )
+            for failure in result['failed']:
+                errors.append(self._error(sources[failure['index']], failure['error'], 'supabase'))
+        return errors
 
-            # Insert or upsert to Supabase
-            if update_existing:
-                result = self.supabase.bulk_upsert_wards(wards_data, batch_size=100)
-                job.success_count = result['total_upserted']
-            else:
-                result = self.supabase.bulk_insert_wards(wards_data, batch_size=100)
-                job.success_count = result['total_inserted']
+    def finish(self):
+        logger.info(f"{self.JOB_TYPE} import {self.job.job_id} finished: {self.job.status}")
 
-            job.failed_count = result['total_failed']
-            job.processed_rows = job.total_rows
+    # Implemented per geography type
 
-            if result['errors']:
-                job.validation_errors = {'insert_errors': result['errors']}
+    @abstractmethod
+    def validate_row(self, row: Dict[str, Any], row_number: int) -> List[str]:
+        """Error messages for one row; empty when it is valid"""
 
-            # Update job status
-            job.status = 'completed' if job.failed_count == 0 else 'failed'
-            job.completed_at = datetime.now()
-            job.save()
+    @abstractmethod
+    def duplicate_key(self, row: Dict[str, Any]) -> Optional[Any]:
+        """Key two rows of the file collide on, or None to skip the check"""
 
-            return job
+    @abstractmethod
+    def duplicate_message(self, row: Dict[str, Any]) -> str:
+        """Error recorded against a row whose key came up earlier"""
 
-        except Exception as e:
-            job.status = 'failed'
-            job.validation_errors = {'error': str(e)}
-            job.save()
-            raise
+    @abstractmethod
+    def transform_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Supabase payload for a valid row"""
 
-    def _transform_rows(self, rows: List[Dict[str, Any]], constituency_map: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Transform validated rows into Supabase format"""
-        wards = []
 
-        for row in rows:
-            ward = {
-                'organization_id': self.organization_id,
-                'constituency_id': constituency_map[row['constituency_code']],
-                'name': row['name'],
-                'code': row['code'],
-            }
+class WardBulkImportService(GeographyBulkImportService):
+    """Service for bulk importing wards"""
 
-            # Optional fields
-            if row.get('ward_number'):
-                ward['ward_number'] = int(row['ward_number'])
+    JOB_TYPE = 'wards'
+    TABLE = 'wards'
+    ON_CONFLICT = 'organization_id,code'
 
-            if row.get('population'):
-                ward['population'] = int(row['population'])
+    duplicate_key = staticmethod(DuplicateDetector.ward_key)
 
-            if row.get('voter_count'):
-                ward['voter_count'] = int(row['voter_count'])
+    def validate_row(self, row: Dict[str, Any], row_number: int) -> List[str]:
+        return WardValidator.validate_row(row, row_number, self.constituency_codes)[1]
 
-            if row.get('total_booths'):
-                ward['total_booths'] = int(row['total_booths'])
+    def duplicate_message(self, row: Dict[str, Any]) -> str:
+        return f"Duplicate ward code in file: {row['code']}"
 
-            if row.get('urbanization'):
-                ward['urbanization'] = row['urbanization'].lower()
+    def transform_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform a validated row into Supabase format"""
+        ward = {
+            'organization_id': self.organization_id,
+            'constituency_id': self.constituency_map[row['constituency_code']],
+            'name': row['name'],
+            'code': row['code'],
+        }
 
-            if row.get('income_level'):
-                ward['income_level'] = row['income_level'].lower()
+        # Optional fields
+        if row.get('ward_number'):
+            ward['ward_number'] = int(row['ward_number'])
 
-            if row.get('literacy_rate'):
-                ward['literacy_rate'] = float(row['literacy_rate'])
+        if row.get('population'):
+            ward['population'] = int(row['population'])
 
-            wards.append(ward)
+        if row.get('voter_count'):
+            ward['voter_count'] = int(row['voter_count'])
 
-        return wards
+        if row.get('total_booths'):
+            ward['total_booths'] = int(row['total_booths'])
 
+        if row.get('urbanization'):
+            ward['urbanization'] = row['urbanization'].lower()
 
-class PollingBoothBulkImportService:
-    """Service for bulk importing polling booths"""
+        if row.get('income_level'):
+            ward['income_level'] = row['income_level'].lower()
 
-    def __init__(self, user: User, organization_id: str):
-        self.user = user
-        self.organization_id = organization_id
-        self.supabase = SupabaseService()
+        if row.get('literacy_rate'):
+            ward['literacy_rate'] = float(row['literacy_rate'])
 
-    def process_file(self, file: UploadedFile, update_existing: bool = False) -> BulkUploadJob:
-        """Process uploaded file and import polling booths"""
+        return ward
 
-        # Create job record
-        job = BulkUploadJob.objects.create(
-            created_by=self.user,
-            file_name=file.name,
-            file_path=f"uploads/{uuid.uuid4()}_{file.name}",
-            status='validating'
-        )
 
-        try:
-            # Parse file
-            if file.name.lower().endswith('.csv'):
-                rows = FileParser.parse_csv(file)
-            else:
-                rows = FileParser.parse_excel(file)
 
-            job.total_rows = len(rows)
-            job.save()
+class PollingBoothBulkImportService(GeographyBulkImportService):
+    """Service for bulk importing polling booths"""
 
-            # Get constituency and ward mappings
-            constituency_map = self.supabase.get_constituencies(self.organization_id)
-            constituency_codes = set(constituency_map.keys())
+    JOB_TYPE = 'polling_booths'
+    TABLE = 'polling_booths'
+    ON_CONFLICT = 'organization_id,constituency_id,booth_number'
 
-            ward_map = self.supabase.get_wards(self.organization_id)
-            ward_codes = set(ward_map.keys())
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ward_map: Optional[Dict[str, str]] = None
 
-            # Validate data
-            job.status = 'validating'
-            job.save()
+    @property
+    def ward_map(self) -> Dict[str, str]:
+        if self._ward_map is None:
+            self._ward_map = self.supabase.get_wards(self.organization_id)
+            self._ward_codes = set(self._ward_map)
+        return self._ward_map
 
-            validation_result = PollingBoothValidator.validate_batch(
-                rows, constituency_codes, ward_codes
-            )
+    @property
+    def ward_codes(self) -> set:
+        self.ward_map
+        return self._ward_codes
 
-            if not validation_result['is_valid']:
-                for error in validation_result['errors']:
-                    BulkUploadError.objects.create(
-                        job=job,
-                        row_number=error['row_number'],
-                        row_data=error['row_data'],
-                        error_message='; '.join(error['errors']),
-                        error_field='validation'
-                    )
-
-                job.status = 'failed'
-                job.failed_count = validation_result['invalid_rows']
-                job.validation_errors = validation_result['errors']
-                job.save()
-                return job
-
-            # Check for duplicates
-            duplicates = DuplicateDetector.find_duplicate_booth_numbers(rows)
-            if duplicates:
-                job.status = 'failed'
-                job.validation_errors = {
-                    'duplicates': duplicates,
-                    'message': f"Found {len(duplicates)} duplicate booth numbers in file"
-                }
-                job.save()
-                return job
-
-            # Transform and insert
-            job.status = 'processing'
-            job.started_at = datetime.now()
-            job.save()
-
-            booths_data = self._transform_rows(rows, constituency_map, ward_map)
-
-            if update_existing:
-                result = self.supabase.bulk_upsert_booths(booths_data, batch_size=100)
-                job.success_count = result['total_upserted']
-            else:
-                result = self.supabase.bulk_insert_booths(booths_data, batch_size=100)
-                job.success_count = result['total_inserted']
-
-            job.failed_count = result['total_failed']
-            job.processed_rows = job.total_rows
-
-            if result['errors']:
-                job.validation_errors = {'insert_errors': result['errors']}
-
-            job.status = 'completed' if job.failed_count == 0 else 'failed'
-            job.completed_at = datetime.now()
-            job.save()
-
-            return job
-
-        except Exception as e:
-            job.status = 'failed'
-            job.validation_errors = {'error': str(e)}
-            job.save()
-            raise
-
-    def _transform_rows(self, rows: List[Dict[str, Any]],
-                       constituency_map: Dict[str, str],
-                       ward_map: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Transform validated rows into Supabase format"""
-        booths = []
+    duplicate_key = staticmethod(DuplicateDetector.booth_key)
 
-        for row in rows:
-            booth = {
-                'organization_id': self.organization_id,
-                'constituency_id': constituency_map[row['constituency_code']],
-                'booth_number': str(row['booth_number']).strip(),
-                'name': row['name'],
-            }
+    def validate_row(self, row: Dict[str, Any], row_number: int) -> List[str]:
+        return PollingBoothValidator.validate_row(row, row_number, self.constituency_codes, self.ward_codes)[1]
 
-            # Optional fields
-            if row.get('ward_code') and row['ward_code'] in ward_map:
-                booth['ward_id'] = ward_map[row['ward_code']]
+    def duplicate_message(self, row: Dict[str, Any]) -> str:
+        return (
+            f"Duplicate booth number in file: {row['booth_number']} "
+            f"in {row['constituency_code']}"
+        )
+
+    def transform_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform a validated row into Supabase format"""
+        booth = {
+            'organization_id': self.organization_id,
+            'constituency_id': self.constituency_map[row['constituency_code']],
+            'booth_number': str(row['booth_number']).strip(),
+            'name': row['name'],
+        }
 
-            if row.get('address'):
-                booth['address'] = row['address']
+        # Optional fields
+        if row.get('ward_code') and row['ward_code'] in self.ward_map:
+            booth['ward_id'] = self.ward_map[row['ward_code']]
 
-            if row.get('latitude'):
-                booth['latitude'] = float(row['latitude'])
+        if row.get('address'):
+            booth['address'] = row['address']
 
-            if row.get('longitude'):
-                booth['longitude'] = float(row['longitude'])
+        if row.get('latitude'):
+            booth['latitude'] = float(row['latitude'])
 
-            if row.get('landmark'):
-                booth['landmark'] = row['landmark']
+        if row.get('longitude'):
+            booth['longitude'] = float(row['longitude'])
 
-            if row.get('total_voters'):
-                booth['total_voters'] = int(row['total_voters'])
+        if row.get('landmark'):
+            booth['landmark'] = row['landmark']
 
-            if row.get('male_voters'):
-                booth['male_voters'] = int(row['male_voters'])
+        if row.get('total_voters'):
+            booth['total_voters'] = int(row['total_voters'])
 
-            if row.get('female_voters'):
-                booth['female_voters'] = int(row['female_voters'])
+        if row.get('male_voters'):
+            booth['male_voters'] = int(row['male_voters'])
 
-            if row.get('transgender_voters'):
-                booth['transgender_voters'] = int(row['transgender_voters'])
+        if row.get('female_voters'):
+            booth['female_voters'] = int(row['female_voters'])
 
-            if row.get('booth_type'):
-                booth['booth_type'] = row['booth_type'].lower()
+        if row.get('transgender_voters'):
+            booth['transgender_voters'] = int(row['transgender_voters'])
 
-            if row.get('is_accessible') is not None:
-                booth['is_accessible'] = self._parse_boolean(row['is_accessible'])
+        if row.get('booth_type'):
+            booth['booth_type'] = row['booth_type'].lower()
 
-            if row.get('is_active') is not None:
-                booth['is_active'] = self._parse_boolean(row['is_active'])
+        if row.get('is_accessible') is not None:
+            booth['is_accessible'] = self._parse_boolean(row['is_accessible'])
 
-            if row.get('building_name'):
-                booth['building_name'] = row['building_name']
+        if row.get('is_active') is not None:
+            booth['is_active'] = self._parse_boolean(row['is_active'])
 
-            if row.get('building_type'):
-                booth['building_type'] = row['building_type']
+        if row.get('building_name'):
+            booth['building_name'] = row['building_name']
 
-            if row.get('priority_level'):
-                booth['priority_level'] = int(row['priority_level'])
+        if row.get('building_type'):
+            booth['building_type'] = row['building_type']
 
-            booths.append(booth)
+        if row.get('priority_level'):
+            booth['priority_level'] = int(row['priority_level'])
 
-        return booths
+        return booth
 
     @staticmethod
     def _parse_boolean(value: Any) -> bool:
@@ -0,0 +1,302 @@
+"""
+Bulk Upload Job Engine
+Runs BulkUploadJob imports on Celery workers in checkpointed chunks
+
+The uploaded file is kept in default storage so any worker can pick the
+job up. The file is streamed through a row source (CSV, gzip'd CSV or
+XLSX) in fixed-size chunks, so memory does not grow with the file; each
+chunk's writes and the job checkpoint (committed_chunks) commit in one
+transaction, so a crashed or recycled worker resumes from the last
+committed chunk without duplicating rows. Progress counters are written
+at most once per PROGRESS_INTERVAL and can always be rebuilt from the
+checkpoint and the job's BulkUploadError rows.
+
+Handlers supply the import-specific steps:
+    check_structure(headers) -> List[str]    called first on every run
+    validate(rows) -> List[BulkUploadError]  called per chunk, in file order
+    prepare_chunk(rows) -> rows              optional; slow per-row work
+                                             done before the chunk's
+                                             transaction opens
+    process_chunk(rows) -> List[BulkUploadError]
+    finish()
+Rows are dicts with 'row_number' and 'data'.
+"""
+
+import io
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import BulkUploadJob, BulkUploadError
+from api.utils.row_sources import RowSource, RowSourceError, open_row_source
+
+logger = logging.getLogger(__name__)
+
+
+UPLOAD_STORAGE_DIR = 'bulk_uploads'
+
+ACTIVE_STATUSES = ['pending', 'validating', 'processing']
+TERMINAL_STATUSES = ['completed', 'failed', 'cancelled']
+
+
+def store_upload(job: BulkUploadJob, content) -> str:
+    """
+    Save the uploaded file where every worker can read it
+
+    Args:
+        content: File content as str/bytes, or a file object (e.g. an
+            UploadedFile) which is copied in chunks
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    content = ContentFile(content) if isinstance(content, bytes) else File(content)
+    name = (job.file_name or '').lower()
+    extension = '.csv.gz' if name.endswith('.csv.gz') else os.path.splitext(name)[1] or '.csv'
+    path = default_storage.save(f"{UPLOAD_STORAGE_DIR}/{job.job_id}{extension}", content)
+    BulkUploadJob.objects.filter(pk=job.pk).update(file_path=path)
+    job.file_path = path
+    return path
+
+
+def open_upload(job: BulkUploadJob, content: Optional[bytes] = None) -> RowSource:
+    """Open a row source over the stored upload, or over content when given"""
+    if content is None:
+        handle = default_storage.open(job.file_path, 'rb')
+        fileobj = getattr(handle, 'file', handle)
+    else:
+        fileobj = io.BytesIO(content.encode('utf-8') if isinstance(content, str) else content)
+    return open_row_source(fileobj, job.file_name)
+
+
+def delete_upload(job: BulkUploadJob):
+    try:
+        if job.file_path and default_storage.exists(job.file_path):
+            default_storage.delete(job.file_path)
+    except Exception as e:
+        logger.warning(f"Could not delete upload {job.file_path}: {e}")
+
+
+class _CheckpointLost(Exception):
+    """The job was cancelled or claimed by another runner mid-chunk"""
+
+
+class ChunkedImportRunner:
+    """Drives a BulkUploadJob through validation and checkpointed chunks"""
+
+    PROGRESS_INTERVAL = 5  # seconds between progress writes
+    LOCK_TIMEOUT = 600     # a job silent for this long is considered stalled
+
+    def __init__(self, job: BulkUploadJob, handler, progress_interval: Optional[float] = None):
+        self.job = job
+        self.handler = handler
+        self.progress_interval = self.PROGRESS_INTERVAL if progress_interval is None else progress_interval
+        self.content: Optional[bytes] = None
+        self._last_progress = time.monotonic()
+        self.progress_writes = 0
+        # Position of the last committed chunk, for rebuilding counters
+        self._processed = 0
+        self._last_row_number = 0
+
+    @property
+    def lock_key(self) -> str:
+        return f"bulk-upload-lock:{self.job.job_id}"
+
+    def _update(self, **fields) -> bool:
+        """Write job fields unless the job was cancelled; returns False if it was"""
+        fields.setdefault('updated_at', timezone.now())
+        updated = BulkUploadJob.objects.filter(pk=self.job.pk, status__in=ACTIVE_STATUSES).update(**fields)
+        if updated:
+            for name, value in fields.items():
+                setattr(self.job, name, value)
+        return bool(updated)
+
+    def _fail(self, errors: List[str]):
+        self._update(status='failed', validation_errors=errors, completed_at=timezone.now())
+
+    def _open(self) -> RowSource:
+        return open_upload(self.job, self.content)
+
+    def _chunks(self, source: RowSource):
+        return source.batches(max(self.job.chunk_size, 1))
+
+    def _progress_fields(self) -> dict:
+        """Rebuild counters from the checkpoint position and recorded errors"""
+        failed = 0
+        if self._processed:
+            failed = (
+                BulkUploadError.objects.filter(job=self.job, row_number__lte=self._last_row_number)
+                .values('row_number').distinct().count()
+            )
+        return {
+            'processed_rows': self._processed,
+            'failed_count': failed,
+            'success_count': self._processed - failed,
+        }
+
+    def report_progress(self, force: bool = False) -> bool:
+        """
+        Write progress counters if the interval has elapsed
+
+        Also acts as the heartbeat and cancellation check; returns False
+        once the job has been cancelled.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_interval:
+            return True
+        self._last_progress = now
+        self.progress_writes += 1
+        return self._update(**self._progress_fields())
+
+    def check_structure(self) -> bool:
+        with self._open() as source:
+            errors = self.handler.check_structure(source.headers)
+        if errors:
+            self._fail(errors)
+            return False
+        return True
+
+    def validate(self) -> bool:
+        """Record validation errors once; skipped when resuming a processing job"""
+        if not self._update(
+            status='validating',
+            started_at=self.job.started_at or timezone.now(),
+            committed_chunks=0,
+        ):
+            return False
+
+        # Idempotent if a previous attempt died during validation
+        BulkUploadError.objects.filter(job=self.job).delete()
+
+        total_rows = 0
+        invalid_count = 0
+        with self._open() as source:
+            for chunk in self._chunks(source):
+                validation_errors = self.handler.validate(chunk)
+                BulkUploadError.objects.bulk_create(validation_errors)
+                # Errors always belong to rows of the chunk being validated
+                invalid_count += len({error.row_number for error in validation_errors})
+                total_rows += len(chunk)
+                cache.touch(self.lock_key, self.LOCK_TIMEOUT)
+
+        if not total_rows:
+            self._fail(["File contains no data rows"])
+            return False
+
+        if invalid_count == total_rows:
+            self._update(total_rows=total_rows)
+            self._fail(["No valid rows to process"])
+            return False
+
+        return self._update(
+            status='processing',
+            total_rows=total_rows,
+            validation_errors=[f"{invalid_count} rows have validation errors"] if invalid_count else [],
+        )
+
+    def process_chunks(self) -> bool:
+        """Process every uncommitted chunk; returns False if cancelled"""
+        with self._open() as source:
+            for index, chunk in enumerate(self._chunks(source)):
+                # Chunks committed by an earlier run are read past, not redone
+                pending = index >= self.job.committed_chunks
+                if pending and not self._process_chunk(index, chunk):
+                    return False
+                self._processed += len(chunk)
+                self._last_row_number = chunk[-1]['row_number']
+                if pending and not self.report_progress():
+                    return False
+        return True
+
+    def _process_chunk(self, index: int, chunk: List[dict]) -> bool:
+        invalid_rows = set(
+            BulkUploadError.objects.filter(
+                job=self.job,
+                row_number__gte=chunk[0]['row_number'],
+                row_number__lte=chunk[-1]['row_number'],
+            ).values_list('row_number', flat=True)
+        )
+        valid_rows = [row for row in chunk if row['row_number'] not in invalid_rows]
+        prepare_chunk = getattr(self.handler, 'prepare_chunk', None)
+        if valid_rows and prepare_chunk:
+            valid_rows = prepare_chunk(valid_rows)
+        try:
+            with transaction.atomic():
+                failures = self.handler.process_chunk(valid_rows) if valid_rows else []
+                BulkUploadError.objects.bulk_create(failures)
+                # Checkpoint commits with the chunk; guarded so a cancelled job
+                # or a second runner on the same chunk rolls back instead
+                claimed = BulkUploadJob.objects.filter(
+                    pk=self.job.pk, status='processing', committed_chunks=index
+                ).update(committed_chunks=index + 1)
+                if not claimed:
+                    raise _CheckpointLost()
+        except _CheckpointLost:
+            logger.info(f"Bulk upload {self.job.job_id} stopped at chunk {index}")
+            return False
+
+        self.job.committed_chunks = index + 1
+        cache.touch(self.lock_key, self.LOCK_TIMEOUT)
+        return True
+
+    def run(self, content=None) -> BulkUploadJob:
+        """
+        Run or resume the job
+
+        Args:
+            content: File content; streamed from storage when omitted
+        """
+        self.content = content
+        self.job.refresh_from_db()
+        if self.job.status in TERMINAL_STATUSES:
+            delete_upload(self.job)
+            return self.job
+
+        if not cache.add(self.lock_key, True, self.LOCK_TIMEOUT):
+            logger.info(f"Bulk upload {self.job.job_id} is already running")
+            return self.job
+
+        try:
+            self._run()
+        except RowSourceError as e:
+            self._fail([f"Failed to parse file: {str(e)}"])
+        except Exception as e:
+            logger.exception(f"Bulk upload {self.job.job_id} failed")
+            self._fail([f"Unexpected error: {str(e)}"])
+        finally:
+            cache.delete(self.lock_key)
+
+        self.job.refresh_from_db()
+        if self.job.status in TERMINAL_STATUSES:
+            delete_upload(self.job)
+            if self.job.status != 'cancelled':
+                self.handler.finish()
+        return self.job
+
+    def _run(self):
+        if not self.check_structure():
+            return
+
+        if self.job.status in ('pending', 'validating') and not self.validate():
+            return
+
+        if not self.process_chunks():
+            return
+
+        self._update(status='completed', completed_at=timezone.now(), **self._progress_fields())
+
+
+def find_stalled_jobs(timeout: Optional[int] = None):
+    """Active jobs that have not written progress within the lock timeout"""
+    timeout = timeout or ChunkedImportRunner.LOCK_TIMEOUT
+    return BulkUploadJob.objects.filter(
+        status__in=['validating', 'processing'],
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
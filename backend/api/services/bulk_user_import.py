@@ -3,21 +3,44 @@ Bulk User Import Service
 Handles CSV validation, processing, and user creation in background
 """
 
-import csv
 import io
 import os
 import uuid
 import string
 import secrets
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
 from django.conf import settings
-from django.db import transaction
-from django.utils import timezone
-from api.models import UserProfile, BulkUploadJob, BulkUploadError, State, District
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from api.models import UserProfile, BulkUploadJob, BulkUploadError, State, District, AuditLog
+from api.services.bulk_upload_jobs import ChunkedImportRunner, store_upload
+from api.services.email_outbox import queue_email, queue_emails
+from api.utils.row_sources import RowSourceError, open_row_source
+
+
+# Below this many passwords the thread pool costs more than it saves
+PARALLEL_HASH_THRESHOLD = 32
+
+
+def hash_passwords(passwords: List[str], workers: Optional[int] = None) -> List[str]:
+    """
+    Hash passwords with the configured hasher, spread over a thread pool
+
+    PBKDF2 (hashlib.pbkdf2_hmac) releases the GIL while it runs, so threads
+    scale with the number of cores. Threads rather than processes because
+    imports run on Celery prefork workers, which are daemonic and may not
+    start child processes. Small batches are hashed serially.
+    """
+    workers = workers or getattr(settings, 'BULK_IMPORT_HASH_WORKERS', None) or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords))
 
 
 class BulkUserImportService:
@@ -42,6 +65,7 @@ class BulkUserImportService:
         self.requesting_user = requesting_user
         self.requesting_role = getattr(requesting_user.profile, 'role', 'user')
         self.allowed_roles = self.ROLE_HIERARCHY.get(self.requesting_role, [])
+        self._first_seen: Dict[str, int] = {}
 
     def generate_password(self, length: int = 12) -> str:
         """Generate a random secure password"""
@@ -55,76 +79,118 @@ class BulkUserImportService:
                     and any(c in string.punctuation for c in password)):
                 return password
 
-    def validate_csv_structure(self, file_content: str) -> Tuple[bool, List[str], List[Dict]]:
+    def check_structure(self, headers: List[str]) -> List[str]:
+        """Check the header row and start a fresh pass; returns structure errors"""
+        self._first_seen = {}
+        if not headers:
+            return ["CSV file is empty or has no headers"]
+        missing_columns = set(self.REQUIRED_COLUMNS) - set(headers)
+        if missing_columns:
+            return [f"Missing required columns: {', '.join(sorted(missing_columns))}"]
+        return []
+
+    def validate_csv_structure(self, file_content) -> Tuple[bool, List[str], List[Dict]]:
         """
         Validate CSV structure and return parsed rows
 
+        Materializes the file; imports stream it through ChunkedImportRunner
+        instead.
+
         Returns:
             (is_valid, errors, rows)
         """
-        errors = []
-        rows = []
-
+        if isinstance(file_content, str):
+            file_content = file_content.encode('utf-8')
+        try:
+            with open_row_source(io.BytesIO(file_content), self.job.file_name or 'upload.csv') as source:
+                errors = self.check_structure(source.headers)
+                if errors:
+                    return False, errors, []
+                rows = list(source)
+        except RowSourceError as e:
+            return False, [f"Failed to parse CSV: {str(e)}"], []
+
+        if not rows:
+            return False, ["CSV file contains no data rows"], []
+        return True, [], rows
+
+    # Keeps IN (...) lists under database parameter limits
+    LOOKUP_CHUNK_SIZE = 1000
+
+    @staticmethod
+    def _parse_id(value) -> Optional[int]:
         try:
-            # Parse CSV
-            csv_file = io.StringIO(file_content)
-            reader = csv.DictReader(csv_file)
-
-            # Check if file has headers
-            if not reader.fieldnames:
-                errors.append("CSV file is empty or has no headers")
-                return False, errors, []
-
-            # Validate required columns
-            missing_columns = set(self.REQUIRED_COLUMNS) - set(reader.fieldnames)
-            if missing_columns:
-                errors.append(f"Missing required columns: {', '.join(missing_columns)}")
-                return False, errors, []
-
-            # Read all rows
-            for idx, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-                rows.append({
-                    'row_number': idx,
-                    'data': row
-                })
-
-            if not rows:
-                errors.append("CSV file contains no data rows")
-                return False, errors, []
-
-            if len(rows) > 10000:
-                errors.append("CSV file exceeds maximum of 10,000 users")
-                return False, errors, []
-
-            return True, errors, rows
+            return int(str(value).strip())
+        except (TypeError, ValueError):
+            return None
 
-        except Exception as e:
-            errors.append(f"Failed to parse CSV: {str(e)}")
-            return False, errors, []
+    @classmethod
+    def _chunks(cls, values: List) -> List[List]:
+        return [values[i:i + cls.LOOKUP_CHUNK_SIZE] for i in range(0, len(values), cls.LOOKUP_CHUNK_SIZE)]
+
+    def load_lookups(self, rows: List[Dict]) -> Dict[str, set]:
+        """
+        Resolve every email, state and district referenced by the file
+        in a handful of IN (...) queries
+
+        Returns:
+            {'existing_emails': set, 'state_ids': set, 'district_ids': set}
+        """
+        emails, state_ids, district_ids = set(), set(), set()
+        for row_info in rows:
+            row = row_info['data']
+            email = (row.get('email') or '').strip().lower()
+            if email:
+                emails.add(email)
+            state_id = self._parse_id(row.get('state_id'))
+            if state_id is not None:
+                state_ids.add(state_id)
+            district_id = self._parse_id(row.get('district_id'))
+            if district_id is not None:
+                district_ids.add(district_id)
+
+        lookups = {'existing_emails': set(), 'state_ids': set(), 'district_ids': set()}
+        for chunk in self._chunks(sorted(emails)):
+            lookups['existing_emails'].update(
+                User.objects.annotate(email_lower=Lower('email'))
+                .filter(email_lower__in=chunk)
+                .values_list('email_lower', flat=True)
+            )
+        for chunk in self._chunks(sorted(state_ids)):
+            lookups['state_ids'].update(State.objects.filter(id__in=chunk).values_list('id', flat=True))
+        for chunk in self._chunks(sorted(district_ids)):
+            lookups['district_ids'].update(District.objects.filter(id__in=chunk).values_list('id', flat=True))
+        return lookups
 
-    def validate_row(self, row: Dict, row_number: int) -> Tuple[bool, List[str]]:
+    def validate_row(self, row: Dict, row_number: int, lookups: Optional[Dict[str, set]] = None) -> Tuple[bool, List[str]]:
         """
-        Validate a single row
+        Validate a single row against preloaded lookups
+
+        Lookups are loaded for just this row when not supplied; use
+        validate_all_rows for whole files.
 
         Returns:
             (is_valid, error_messages)
         """
+        if lookups is None:
+            lookups = self.load_lookups([{'row_number': row_number, 'data': row}])
+
         errors = []
 
         # Check required fields
-        if not row.get('name', '').strip():
+        if not (row.get('name') or '').strip():
             errors.append('Name is required')
 
-        email = row.get('email', '').strip()
+        email = (row.get('email') or '').strip()
         if not email:
             errors.append('Email is required')
         elif '@' not in email:
             errors.append('Email is invalid')
-        elif User.objects.filter(email=email).exists():
+        elif email.lower() in lookups['existing_emails']:
             errors.append(f'Email {email} already exists')
 
         # Validate role
-        role = row.get('role', '').strip().lower()
+        role = (row.get('role') or '').strip().lower()
         if not role:
             errors.append('Role is required')
         elif role not in self.VALID_ROLES:
@@ -133,51 +199,69 @@ class BulkUserImportService:
             errors.append(f'You do not have permission to create users with role: {role}')
 
         # Validate optional state_id
-        state_id = row.get('state_id', '').strip()
+        state_id = (row.get('state_id') or '').strip()
         if state_id:
-            try:
-                state_id = int(state_id)
-                if not State.objects.filter(id=state_id).exists():
-                    errors.append(f'State ID {state_id} does not exist')
-            except ValueError:
+            parsed = self._parse_id(state_id)
+            if parsed is None:
                 errors.append(f'State ID must be a number, got: {state_id}')
+            elif parsed not in lookups['state_ids']:
+                errors.append(f'State ID {parsed} does not exist')
 
         # Validate optional district_id
-        district_id = row.get('district_id', '').strip()
+        district_id = (row.get('district_id') or '').strip()
         if district_id:
-            try:
-                district_id = int(district_id)
-                if not District.objects.filter(id=district_id).exists():
-                    errors.append(f'District ID {district_id} does not exist')
-            except ValueError:
+            parsed = self._parse_id(district_id)
+            if parsed is None:
                 errors.append(f'District ID must be a number, got: {district_id}')
+            elif parsed not in lookups['district_ids']:
+                errors.append(f'District ID {parsed} does not exist')
 
         return len(errors) == 0, errors
 
-    def validate_all_rows(self, rows: List[Dict]) -> List[BulkUploadError]:
+    def validate_all_rows(self, rows: List[Dict], first_seen: Optional[Dict[str, int]] = None) -> List[BulkUploadError]:
         """
         Validate all rows and collect errors
 
+        References are resolved up front with load_lookups, so the
+        number of queries does not grow with the number of rows.
+        Repeated emails within the file are flagged after their first row.
+
+        Args:
+            rows: Rows to validate
+            first_seen: Email -> first row number, shared across batches
+                when a file is validated in chunks
+
         Returns:
             List of BulkUploadError objects (not yet saved)
         """
+        lookups = self.load_lookups(rows)
+        if first_seen is None:
+            first_seen = {}
         error_objects = []
 
         for row_info in rows:
             row_number = row_info['row_number']
             row_data = row_info['data']
 
-            is_valid, error_messages = self.validate_row(row_data, row_number)
+            is_valid, error_messages = self.validate_row(row_data, row_number, lookups)
 
-            if not is_valid:
-                for error_msg in error_messages:
-                    error_objects.append(BulkUploadError(
-                        job=self.job,
-                        row_number=row_number,
-                        row_data=row_data,
-                        error_message=error_msg,
-                        error_field=self._extract_field_from_error(error_msg)
-                    ))
+            email = (row_data.get('email') or '').strip().lower()
+            if email:
+                if email in first_seen:
+                    error_messages.append(
+                        f'Email {email} is duplicated in file (first seen on row {first_seen[email]})'
+                    )
+                else:
+                    first_seen[email] = row_number
+
+            for error_msg in error_messages:
+                error_objects.append(BulkUploadError(
+                    job=self.job,
+                    row_number=row_number,
+                    row_data=row_data,
+                    error_message=error_msg,
+                    error_field=self._extract_field_from_error(error_msg)
+                ))
 
         return error_objects
 
@@ -266,11 +350,116 @@ class BulkUserImportService:
         except Exception as e:
             return None, None, str(e)
 
-    def send_welcome_email(self, user: User, password: str):
-        """Send welcome email with credentials"""
+    def allocate_usernames(self, emails: List[str]) -> List[str]:
+        """
+        Derive a unique username from each email
+
+        Mirrors create_user_from_row (local part, then a numeric suffix)
+        but checks existing usernames with a few queries instead of one
+        per attempt.
+        """
+        bases = [email.split('@')[0] for email in emails]
+        unique_bases = sorted(set(bases))
+
+        taken = set()
+        for chunk in self._chunks(unique_bases):
+            taken.update(User.objects.filter(username__in=chunk).values_list('username', flat=True))
+        # Only colliding bases can have suffixed variants worth loading
+        for base in unique_bases:
+            if base in taken:
+                taken.update(User.objects.filter(username__startswith=base).values_list('username', flat=True))
+
+        usernames = []
+        for base in bases:
+            username = base
+            counter = 1
+            while username in taken:
+                username = f"{base}{counter}"
+                counter += 1
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
+    def create_users_batch(self, rows: List[Dict]) -> List[Tuple[Dict, Optional[User], Optional[str], Optional[str]]]:
+        """
+        Create users for a batch of validated rows
+
+        Passwords come from prepare_chunk (hashed in a thread pool) and
+        User/UserProfile rows are inserted with bulk_create. bulk_create skips post_save signals,
+        so the audit entries they would have written are created here.
+        If the batch insert fails (e.g. a username taken concurrently)
+        the batch falls back to create_user_from_row so failures are
+        reported per row.
+
+        Returns:
+            List of (row_info, user, password, error_message)
+        """
+        if not rows:
+            return []
+
+        if 'password_hash' not in rows[0]:
+            rows = self.prepare_chunk(rows)
+        datas = [row_info['data'] for row_info in rows]
+        emails = [(data.get('email') or '').strip() for data in datas]
+        usernames = self.allocate_usernames(emails)
+        passwords = [row_info['password'] for row_info in rows]
+        hashes = [row_info['password_hash'] for row_info in rows]
+
+        users = []
+        for data, email, username, password_hash in zip(datas, emails, usernames, hashes):
+            name = (data.get('name') or '').strip()
+            users.append(User(
+                username=username,
+                email=User.objects.normalize_email(email),
+                password=password_hash,
+                first_name=name.split()[0] if name else '',
+                last_name=' '.join(name.split()[1:]) if len(name.split()) > 1 else ''
+            ))
+
         try:
-            subject = 'Welcome to Pulse of People - Your Account Details'
-            message = f"""
+            with transaction.atomic():
+                users = User.objects.bulk_create(users)
+                profiles = UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user=user,
+                        role=(data.get('role') or '').strip().lower(),
+                        must_change_password=True,
+                        phone=(data.get('phone') or '').strip() or None,
+                        assigned_state_id=self._parse_id(data.get('state_id')),
+                        assigned_district_id=self._parse_id(data.get('district_id')),
+                    )
+                    for user, data in zip(users, datas)
+                ])
+                audit_logs = []
+                for user, profile in zip(users, profiles):
+                    audit_logs.append(AuditLog(
+                        user=user,
+                        action='create',
+                        target_model='User',
+                        target_id=str(user.id),
+                        changes={'email': user.email, 'username': user.username, 'created': True},
+                    ))
+                    audit_logs.append(AuditLog(
+                        user=user,
+                        action='create',
+                        target_model='UserProfile',
+                        target_id=str(profile.id),
+                        changes={'role': profile.role, 'organization': None},
+                    ))
+                AuditLog.objects.bulk_create(audit_logs)
+        except IntegrityError as e:
+            print(f"Bulk user insert failed, creating batch row by row: {e}")
+            return [(row_info, *self.create_user_from_row(row_info['data'])) for row_info in rows]
+
+        return [
+            (row_info, user, password, None)
+            for row_info, user, password in zip(rows, users, passwords)
+        ]
+
+    def build_welcome_email(self, user: User, password: str) -> Dict:
+        """Build the welcome email with credentials for the outbox"""
+        subject = 'Welcome to Pulse of People - Your Account Details'
+        message = f"""
 Hello {user.first_name or user.username},
 
 Your account has been created successfully!
@@ -286,20 +475,19 @@ Login URL: {settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://loc
 
 Best regards,
 Pulse of People Team
-            """.strip()
+        """.strip()
 
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@pulseofpeople.com',
-                [user.email],
-                fail_silently=True,
-            )
+        return {'to_email': user.email, 'subject': subject, 'body': message}
+
+    def send_welcome_email(self, user: User, password: str):
+        """Queue welcome email with credentials"""
+        try:
+            queue_emails([self.build_welcome_email(user, password)], category='welcome')
         except Exception as e:
-            print(f"Failed to send email to {user.email}: {e}")
+            print(f"Failed to queue email to {user.email}: {e}")
 
     def send_completion_email(self):
-        """Send completion email to admin"""
+        """Queue completion email to admin"""
         try:
             subject = f'Bulk User Import Completed - Job {self.job.job_id}'
             message = f"""
@@ -319,140 +507,66 @@ Best regards,
 Pulse of People Team
             """.strip()
 
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@pulseofpeople.com',
-                [self.requesting_user.email],
-                fail_silently=True,
-            )
+            queue_email(self.requesting_user.email, subject, message, category='bulk_import_summary')
         except Exception as e:
-            print(f"Failed to send completion email: {e}")
-
-    def process_csv(self, file_content: str):
+            print(f"Failed to queue completion email: {e}")
+
+    # Handler interface for ChunkedImportRunner
+
+    def validate(self, rows: List[Dict]) -> List[BulkUploadError]:
+        return self.validate_all_rows(rows, self._first_seen)
+
+    def prepare_chunk(self, rows: List[Dict]) -> List[Dict]:
+        """Generate and hash the chunk's passwords, before its transaction opens"""
+        passwords = [self.generate_password() for _ in rows]
+        return [
+            {**row_info, 'password': password, 'password_hash': password_hash}
+            for row_info, password, password_hash in zip(rows, passwords, hash_passwords(passwords))
+        ]
+
+    def process_chunk(self, rows: List[Dict]) -> List[BulkUploadError]:
+        """Create users for one chunk and queue their welcome emails"""
+        failed_rows = []
+        welcome_emails = []
+
+        for row_info, user, password, error in self.create_users_batch(rows):
+            if user and password:
+                welcome_emails.append(self.build_welcome_email(user, password))
+            else:
+                failed_rows.append(BulkUploadError(
+                    job=self.job,
+                    row_number=row_info['row_number'],
+                    row_data=row_info['data'],
+                    error_message=error or 'Unknown error',
+                    error_field=''
+                ))
+
+        # Welcome emails go through the outbox so the import never waits on SMTP
+        queue_emails(welcome_emails, category='welcome')
+        return failed_rows
+
+    def finish(self):
+        self.send_completion_email()
+
+    def process_csv(self, file_content: Optional[str] = None):
         """
         Main processing function - validates and creates users
-        This runs in the background
-        """
-        try:
-            # Update status to validating
-            self.job.status = 'validating'
-            self.job.started_at = timezone.now()
-            self.job.save()
-
-            # Validate CSV structure
-            is_valid, structure_errors, rows = self.validate_csv_structure(file_content)
-            if not is_valid:
-                self.job.status = 'failed'
-                self.job.validation_errors = structure_errors
-                self.job.completed_at = timezone.now()
-                self.job.save()
-                return
-
-            self.job.total_rows = len(rows)
-            self.job.save()
-
-            # Validate all rows
-            validation_errors = self.validate_all_rows(rows)
-
-            if validation_errors:
-                # Save validation errors
-                BulkUploadError.objects.bulk_create(validation_errors)
-                self.job.failed_count = len(validation_errors)
-                self.job.validation_errors = [f"{len(validation_errors)} rows have validation errors"]
-                self.job.save()
-
-            # Filter out rows with errors
-            error_row_numbers = {err.row_number for err in validation_errors}
-            valid_rows = [r for r in rows if r['row_number'] not in error_row_numbers]
-
-            if not valid_rows:
-                self.job.status = 'failed'
-                self.job.validation_errors = ["No valid rows to process"]
-                self.job.completed_at = timezone.now()
-                self.job.save()
-                self.send_completion_email()
-                return
-
-            # Update status to processing
-            self.job.status = 'processing'
-            self.job.save()
-
-            # Process valid rows
-            for row_info in valid_rows:
-                row_number = row_info['row_number']
-                row_data = row_info['data']
-
-                user, password, error = self.create_user_from_row(row_data)
-
-                if user and password:
-                    # Success
-                    self.job.success_count += 1
-                    # Send welcome email
-                    self.send_welcome_email(user, password)
-                else:
-                    # Failed to create user
-                    self.job.failed_count += 1
-                    BulkUploadError.objects.create(
-                        job=self.job,
-                        row_number=row_number,
-                        row_data=row_data,
-                        error_message=error or 'Unknown error',
-                        error_field=''
-                    )
-
-                # Update progress
-                self.job.processed_rows += 1
-                self.job.save()
-
-            # Mark as completed
-            self.job.status = 'completed'
-            self.job.completed_at = timezone.now()
-            self.job.save()
-
-            # Send completion email
-            self.send_completion_email()
-
-        except Exception as e:
-            # Handle unexpected errors
-            self.job.status = 'failed'
-            self.job.validation_errors = [f"Unexpected error: {str(e)}"]
-            self.job.completed_at = timezone.now()
-            self.job.save()
-
 
-def process_bulk_upload_async(job_id: str, file_content: str, requesting_user_id: int):
-    """
-    Process bulk upload in background thread
-
-    Args:
-        job_id: UUID of the BulkUploadJob
-        file_content: CSV file content as string
-        requesting_user_id: ID of user who initiated the upload
-    """
-    try:
-        job = BulkUploadJob.objects.get(job_id=job_id)
-        requesting_user = User.objects.get(id=requesting_user_id)
-
-        service = BulkUserImportService(job, requesting_user)
-        service.process_csv(file_content)
-
-    except Exception as e:
-        print(f"Background processing failed for job {job_id}: {e}")
+        Runs (or resumes) the job in checkpointed chunks; the file is read
+        from storage when no content is given.
+        """
+        return ChunkedImportRunner(self.job, self).run(file_content)
 
 
-def start_bulk_upload_processing(job: BulkUploadJob, file_content: str, requesting_user: User):
+def start_bulk_upload_processing(job: BulkUploadJob, file_content):
     """
-    Start background processing of bulk upload
+    Store the upload and queue it for a Celery worker
 
     Args:
         job: BulkUploadJob instance
-        file_content: CSV file content as string
-        requesting_user: User who initiated the upload
+        file_content: Uploaded file, or CSV content as str/bytes
     """
-    thread = threading.Thread(
-        target=process_bulk_upload_async,
-        args=(str(job.job_id), file_content, requesting_user.id)
-    )
-    thread.daemon = True
-    thread.start()
+    from api.tasks import process_bulk_upload
+
+    store_upload(job, file_content)
+    process_bulk_upload.delay(str(job.job_id))
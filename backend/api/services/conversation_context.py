@@ -0,0 +1,178 @@
+"""
+Conversation Context Store
+Recent turns and a running summary of each active WhatsApp conversation,
+kept in the cache so building a reply prompt needs no queries.
+
+The context of a conversation holds:
+- turns: the last TURNS messages, oldest first, each cut to MAX_TURN_CHARS
+- summary: a model-written summary of the turns before those
+- overflow: turns pushed out of the window but not yet summarized
+
+Messages are written to the database as they arrive, so the cached turns
+can always be rebuilt from WhatsAppMessage. Once SUMMARIZE_EVERY turns have
+overflowed, a worker folds them into the summary and writes it through to
+WhatsAppConversation.summary. A prompt is therefore bounded by TURNS turns
+plus one short summary however long the conversation runs.
+
+The summary is drafted without holding the conversation's processing lock,
+so replies are not held up by the model call; it is then applied under the
+lock only if the context still starts from the turns it summarized.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models import WhatsAppConversation, WhatsAppMessage
+
+logger = logging.getLogger(__name__)
+
+
+CONTEXT_DEFAULTS = {
+    'TURNS': 20,                # recent messages sent with every prompt
+    'SUMMARIZE_EVERY': 10,      # overflowed turns that trigger a summary
+    'MAX_TURN_CHARS': 1000,
+    'TIMEOUT': 24 * 3600,       # conversations go inactive after a day
+}
+
+
+def get_context_setting(name: str):
+    return getattr(settings, 'WHATSAPP_CONTEXT', {}).get(name, CONTEXT_DEFAULTS[name])
+
+
+def context_key(conversation_id) -> str:
+    return f"whatsapp-context:{conversation_id}"
+
+
+def _turn(sender: str, content: str) -> Dict[str, str]:
+    return {
+        'role': 'user' if sender == 'user' else 'assistant',
+        'content': (content or '')[:get_context_setting('MAX_TURN_CHARS')],
+    }
+
+
+class ConversationContextStore:
+    """Reads and appends to cached conversation contexts"""
+
+    def load(self, conversation: WhatsAppConversation) -> Dict[str, Any]:
+        """The cached context, rebuilt from the database on a miss"""
+        context = cache.get(context_key(conversation.id))
+        if context is None:
+            context = self.rebuild(conversation)
+        return context
+
+    def rebuild(self, conversation: WhatsAppConversation) -> Dict[str, Any]:
+        turns = get_context_setting('TURNS')
+        recent = (
+            WhatsAppMessage.objects
+            .filter(conversation=conversation)
+            .order_by('-timestamp')
+            .values_list('sender', 'content')[:turns]
+        )
+        context = {
+            'turns': [_turn(sender, content) for sender, content in reversed(list(recent))],
+            'summary': conversation.summary,
+            'overflow': [],
+        }
+        self._save(conversation.id, context)
+        return context
+
+    def append(self, conversation: WhatsAppConversation, context: Dict[str, Any], sender: str, content: str):
+        """Add a stored message to the context, queueing a summary when enough has overflowed"""
+        context['turns'].append(_turn(sender, content))
+        overflowed = context['turns'][:-get_context_setting('TURNS')]
+        if overflowed:
+            context['turns'] = context['turns'][len(overflowed):]
+            # Bounded even if summaries stop being written
+            context['overflow'] = (context['overflow'] + overflowed)[-4 * get_context_setting('SUMMARIZE_EVERY'):]
+        self._save(conversation.id, context)
+
+        if overflowed and len(context['overflow']) >= get_context_setting('SUMMARIZE_EVERY'):
+            schedule_summary(conversation.id, conversation.phone_number)
+
+    def history(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Messages for the model: the summary, if any, then the recent turns"""
+        history = []
+        if context.get('summary'):
+            history.append({
+                'role': 'system',
+                'content': f"Summary of the earlier conversation: {context['summary']}",
+            })
+        return history + context['turns']
+
+    def summarize(self, conversation_id, ai_service=None) -> Optional[str]:
+        """
+        Fold overflowed turns into the running summary and write it through
+
+        The caller must hold the conversation's processing lock so no turn
+        is appended meanwhile; see draft_summary to call the model without it.
+        """
+        draft = self.draft_summary(conversation_id, ai_service)
+        if draft is None or not self.apply_summary(conversation_id, draft):
+            return None
+        return draft['summary']
+
+    def draft_summary(self, conversation_id, ai_service=None) -> Optional[Dict[str, Any]]:
+        """A new summary of the overflowed turns, with the context it was drafted from; None if none is due"""
+        context = cache.get(context_key(conversation_id))
+        if not context or not context['overflow']:
+            return None
+
+        if ai_service is None:
+            from api.services.ai_service import get_ai_service
+            ai_service = get_ai_service()
+
+        turns = list(context['overflow'])
+        if context['summary']:
+            turns.insert(0, {'role': 'system', 'content': f"Earlier summary: {context['summary']}"})
+        summary = ai_service.summarize_conversation(turns)
+        if not summary:
+            return None
+        return {'summary': summary, 'previous': context['summary'], 'overflow': context['overflow']}
+
+    def apply_summary(self, conversation_id, draft: Dict[str, Any]) -> bool:
+        """
+        Replace the summary and the turns it covers, unless the context moved on
+
+        Turns overflowed since the draft are kept for the next summary. The
+        caller must hold the conversation's processing lock.
+        """
+        context = cache.get(context_key(conversation_id))
+        covered = len(draft['overflow'])
+        if (not context or context['summary'] != draft['previous']
+                or context['overflow'][:covered] != draft['overflow']):
+            return False
+
+        WhatsAppConversation.objects.filter(id=conversation_id).update(summary=draft['summary'])
+        context['summary'] = draft['summary']
+        context['overflow'] = context['overflow'][covered:]
+        self._save(conversation_id, context)
+        return True
+
+    def discard(self, conversation_id):
+        cache.delete(context_key(conversation_id))
+
+    def _save(self, conversation_id, context: Dict[str, Any]):
+        cache.set(context_key(conversation_id), context, get_context_setting('TIMEOUT'))
+
+
+def schedule_summary(conversation_id, phone_number: str):
+    from api.tasks import summarize_whatsapp_conversation
+
+    try:
+        summarize_whatsapp_conversation.delay(str(conversation_id), phone_number)
+    except Exception as e:
+        # Retried when the next turn overflows
+        logger.warning(f"Could not queue summary for conversation {conversation_id}: {e}")
+
+
+_context_store = None
+
+def get_context_store() -> ConversationContextStore:
+    """Get or create the conversation context store"""
+    global _context_store
+    if _context_store is None:
+        _context_store = ConversationContextStore()
+    return _context_store
@@ -0,0 +1,205 @@
+"""
+Email Outbox
+Queues outbound email in the EmailOutbox table and delivers it in batches
+
+Callers queue messages instead of sending inline; a worker drains the
+outbox over a single reused connection, rate-limited to the provider and
+retrying failed messages with exponential backoff.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+OUTBOX_DEFAULTS = {
+    'BATCH_SIZE': 100,           # messages claimed per batch
+    'RATE_PER_SECOND': 10,       # provider send rate; 0 disables throttling
+    'MAX_ATTEMPTS': 5,           # after this many failures a message is marked failed
+    'RETRY_BASE_SECONDS': 60,    # backoff: base * 2 ** (attempts - 1)
+    'RETRY_MAX_SECONDS': 3600,
+}
+
+
+def get_outbox_setting(name: str):
+    return getattr(settings, 'EMAIL_OUTBOX', {}).get(name, OUTBOX_DEFAULTS[name])
+
+
+def _default_from_email() -> str:
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', None) or 'noreply@pulseofpeople.com'
+
+
+def queue_emails(messages: List[Dict], category: str = '') -> List[EmailOutbox]:
+    """
+    Queue several emails with one insert
+
+    Each message is a dict with to_email, subject, body and optionally
+    from_email.
+    """
+    rows = [
+        EmailOutbox(
+            category=category,
+            to_email=message['to_email'],
+            from_email=message.get('from_email') or _default_from_email(),
+            subject=message['subject'],
+            body=message['body'],
+        )
+        for message in messages
+        if message.get('to_email')
+    ]
+    return EmailOutbox.objects.bulk_create(rows) if rows else []
+
+
+def queue_email(to_email: str, subject: str, body: str, from_email: Optional[str] = None,
+                category: str = '') -> Optional[EmailOutbox]:
+    """Queue a single email"""
+    rows = queue_emails([{
+        'to_email': to_email, 'subject': subject, 'body': body, 'from_email': from_email,
+    }], category=category)
+    return rows[0] if rows else None
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of failed attempts"""
+    seconds = get_outbox_setting('RETRY_BASE_SECONDS') * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, get_outbox_setting('RETRY_MAX_SECONDS')))
+
+
+class OutboxDispatcher:
+    """Drains the email outbox in batches over one connection"""
+
+    def __init__(self, batch_size: Optional[int] = None, rate_per_second: Optional[float] = None,
+                 max_attempts: Optional[int] = None, sleep=time.sleep):
+        self.batch_size = batch_size or get_outbox_setting('BATCH_SIZE')
+        self.rate_per_second = get_outbox_setting('RATE_PER_SECOND') if rate_per_second is None else rate_per_second
+        self.max_attempts = max_attempts or get_outbox_setting('MAX_ATTEMPTS')
+        self.sleep = sleep
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._last_send = 0.0
+
+    def claim_batch(self) -> List[EmailOutbox]:
+        """
+        Mark the next due batch as sending and return it
+
+        Rows are locked with SKIP LOCKED where the database supports it,
+        so several workers can drain the outbox without double sending.
+        """
+        with transaction.atomic():
+            due = EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            batch = list(due.order_by('next_attempt_at', 'id')[:self.batch_size])
+            if batch:
+                EmailOutbox.objects.filter(id__in=[row.id for row in batch]).update(
+                    status='sending', updated_at=timezone.now()
+                )
+        return batch
+
+    def _throttle(self):
+        if not self.rate_per_second:
+            return
+        wait = (1.0 / self.rate_per_second) - (time.monotonic() - self._last_send)
+        if wait > 0:
+            self.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _record_failure(self, row: EmailOutbox, error: str):
+        row.attempts += 1
+        row.last_error = error[:2000]
+        if row.attempts >= self.max_attempts:
+            row.status = 'failed'
+            # Never retried, so its body (possibly a temporary password) is not kept either
+            row.body = ''
+            self.failed += 1
+        else:
+            row.status = 'pending'
+            row.next_attempt_at = timezone.now() + retry_delay(row.attempts)
+            self.retried += 1
+
+    def send_batch(self, batch: List[EmailOutbox]):
+        """Send a claimed batch over one connection and record the outcome"""
+        email_connection = get_connection(fail_silently=False)
+        try:
+            email_connection.open()
+        except Exception as e:
+            logger.warning(f"Email connection failed, retrying {len(batch)} messages later: {e}")
+            for row in batch:
+                self._record_failure(row, f"Connection failed: {e}")
+            self._save(batch)
+            return
+
+        try:
+            for row in batch:
+                self._throttle()
+                message = EmailMessage(
+                    subject=row.subject,
+                    body=row.body,
+                    from_email=row.from_email or _default_from_email(),
+                    to=[row.to_email],
+                    connection=email_connection,
+                )
+                try:
+                    email_connection.send_messages([message])
+                except Exception as e:
+                    logger.warning(f"Email to {row.to_email} failed (attempt {row.attempts + 1}): {e}")
+                    self._record_failure(row, str(e))
+                else:
+                    row.status = 'sent'
+                    row.sent_at = timezone.now()
+                    row.attempts += 1
+                    row.last_error = ''
+                    # Welcome emails carry temporary passwords; don't keep them once delivered
+                    row.body = ''
+                    self.sent += 1
+        finally:
+            email_connection.close()
+
+        self._save(batch)
+
+    def _save(self, batch: List[EmailOutbox]):
+        now = timezone.now()
+        for row in batch:
+            row.updated_at = now
+        EmailOutbox.objects.bulk_update(
+            batch,
+            ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body', 'updated_at'],
+        )
+
+    def drain(self, max_batches: Optional[int] = None, time_budget: Optional[float] = None) -> Dict[str, int]:
+        """
+        Send due messages until the outbox is empty or a limit is hit
+
+        Returns:
+            {'sent': int, 'retried': int, 'failed': int}
+        """
+        started = time.monotonic()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if time_budget is not None and time.monotonic() - started >= time_budget:
+                break
+            batch = self.claim_batch()
+            if not batch:
+                break
+            self.send_batch(batch)
+            batches += 1
+
+        return {'sent': self.sent, 'retried': self.retried, 'failed': self.failed}
+
+
+def release_stale_claims(older_than: timedelta = timedelta(minutes=30)) -> int:
+    """Return messages stuck in 'sending' (e.g. a worker died) to the queue"""
+    return EmailOutbox.objects.filter(
+        status='sending', updated_at__lt=timezone.now() - older_than
+    ).update(status='pending', updated_at=timezone.now())
@@ -0,0 +1,362 @@
+"""
+Local Classifier
+Fast in-process tier that answers language, intent and sentiment without a
+model call when it can do so confidently.
+
+Tiers, cheapest first:
+1. Script - language from the Unicode block of the letters (Tamil, Devanagari,
+   Telugu, Latin)
+2. Rules - exact normalized greetings, thanks and quick replies
+3. Naive Bayes - multinomial models for intent and sentiment trained from
+   the WhatsAppMessage rows the LLM has already labeled
+
+Anything the local tiers are not confident about escalates to the LLM.
+A naive Bayes model is only used when its accuracy on held-out labels, at
+the confidence threshold, reaches MIN_ACCURACY.
+
+The trained model is a plain dict of counts, kept in the shared Django
+cache so every worker picks up a retrained model within RELOAD_SECONDS.
+"""
+
+import logging
+import math
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from api.utils.result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+LOCAL_CLASSIFIER_DEFAULTS = {
+    'MIN_CONFIDENCE': 0.9,      # posterior needed to answer without the LLM
+    'MIN_ACCURACY': 0.9,        # held-out accuracy needed to enable a model
+    'MIN_EXAMPLES': 200,        # labeled messages needed to train
+    'TRAINING_LIMIT': 50000,    # most recent labeled messages used
+    'MAX_VOCABULARY': 20000,
+    'RELOAD_SECONDS': 600,
+}
+
+MODEL_CACHE_KEY = 'ai-local-classifier-model'
+
+# Letters of each script; Tamil, Devanagari and Telugu ranges include
+# their vowel signs
+SCRIPTS = {
+    'ta': re.compile('[\u0B80-\u0BFF]'),
+    'hi': re.compile('[\u0900-\u097F]'),
+    'te': re.compile('[\u0C00-\u0C7F]'),
+    'en': re.compile('[a-zA-Z]'),
+}
+
+_TOKEN = re.compile('[\\w\u0900-\u097F\u0B80-\u0BFF\u0C00-\u0C7F]+')
+
+INTENT_CATEGORIES = {
+    'feedback_positive': 'feedback',
+    'feedback_negative': 'complaint',
+    'report_issue': 'complaint',
+    'ask_question': 'inquiry',
+    'make_suggestion': 'suggestion',
+    'political_opinion': 'political',
+    'general_inquiry': 'inquiry',
+    'off_topic': 'inquiry',
+}
+
+SENTIMENT_SCORES = {'positive': 1.0, 'neutral': 0.0, 'negative': -1.0}
+
+# Intents whose enrichment needs the issues the LLM extracts
+ESCALATE_INTENTS = {'report_issue', 'make_suggestion'}
+
+# Whole messages with a known meaning: greetings, thanks and quick-reply buttons
+QUICK_REPLIES = {
+    **{text: ('general_inquiry', 'neutral') for text in (
+        'hi', 'hii', 'hello', 'hey', 'hai', 'vanakkam', 'vanakam', 'வணக்கம்', 'namaste', 'नमस्ते',
+        'నమస్తే', 'good morning', 'good evening', 'good night', 'start', 'menu', 'help', 'ok', 'okay',
+        'yes', 'no', 'sari', 'சரி',
+    )},
+    **{text: ('feedback_positive', 'positive') for text in (
+        'thanks', 'thank you', 'thankyou', 'thx', 'nandri', 'நன்றி', 'romba nandri', 'மிக்க நன்றி',
+        'dhanyavad', 'धन्यवाद', 'ధన్యవాదాలు', 'super', 'great', 'good',
+    )},
+    'stop': ('off_topic', 'neutral'),
+    'unsubscribe': ('off_topic', 'neutral'),
+}
+
+
+def get_local_classifier_setting(name: str):
+    return getattr(settings, 'AI_LOCAL_CLASSIFIER', {}).get(name, LOCAL_CLASSIFIER_DEFAULTS[name])
+
+
+def get_quick_reply(text: str) -> Optional[Tuple[str, str]]:
+    """(intent, sentiment) of a stock greeting or thanks, however it is punctuated"""
+    return QUICK_REPLIES.get(normalize_text(text).rstrip('?!'))
+
+
+def tokenize(text: str) -> List[str]:
+    """Word tokens of normalized text, keeping Indic vowel signs attached"""
+    return _TOKEN.findall(normalize_text(text))
+
+
+def detect_script(text: str) -> Tuple[Optional[str], float]:
+    """Language from the script most letters are written in, and its share"""
+    counts = {language: len(pattern.findall(text or '')) for language, pattern in SCRIPTS.items()}
+    total = sum(counts.values())
+    if not total:
+        return None, 0.0
+    language = max(counts, key=counts.get)
+    return language, counts[language] / total
+
+
+# Naive Bayes
+
+def train_naive_bayes(documents: Iterable[Tuple[List[str], str]], max_vocabulary: int) -> Dict[str, Any]:
+    """Multinomial naive Bayes counts for tokenized documents and their labels"""
+    documents = list(documents)
+    frequency = Counter(token for tokens, _ in documents for token in set(tokens))
+    vocabulary = {token for token, _ in frequency.most_common(max_vocabulary)}
+
+    class_counts = Counter()
+    token_counts = defaultdict(Counter)
+    for tokens, label in documents:
+        class_counts[label] += 1
+        token_counts[label].update(token for token in tokens if token in vocabulary)
+
+    return {
+        'class_counts': dict(class_counts),
+        'token_counts': {label: dict(counts) for label, counts in token_counts.items()},
+        'token_totals': {label: sum(counts.values()) for label, counts in token_counts.items()},
+        'vocabulary_size': len(vocabulary),
+        'documents': len(documents),
+    }
+
+
+def predict_naive_bayes(model: Dict[str, Any], tokens: List[str]) -> Tuple[Optional[str], float]:
+    """Most likely label and its posterior; (None, 0.0) if no token is known"""
+    token_counts = model['token_counts']
+    known = [token for token in tokens if any(token in counts for counts in token_counts.values())]
+    if not known:
+        return None, 0.0
+
+    vocabulary_size = model['vocabulary_size']
+    scores = {}
+    for label, documents in model['class_counts'].items():
+        counts = token_counts.get(label, {})
+        denominator = model['token_totals'].get(label, 0) + vocabulary_size
+        score = math.log(documents / model['documents'])
+        for token in known:
+            score += math.log((counts.get(token, 0) + 1) / denominator)
+        scores[label] = score
+
+    best = max(scores, key=scores.get)
+    total = sum(math.exp(score - scores[best]) for score in scores.values())
+    return best, 1.0 / total
+
+
+def held_out_accuracy(model: Dict[str, Any], documents: List[Tuple[List[str], str]],
+                      min_confidence: float) -> Tuple[float, float]:
+    """Accuracy of confident predictions and the share of documents answered"""
+    answered = correct = 0
+    for tokens, label in documents:
+        predicted, confidence = predict_naive_bayes(model, tokens)
+        if predicted is not None and confidence >= min_confidence:
+            answered += 1
+            correct += predicted == label
+    if not answered:
+        return 0.0, 0.0
+    return correct / answered, answered / len(documents)
+
+
+# Training
+
+def labeled_messages(limit: int):
+    """(content, intent, sentiment, keywords, topics) of LLM-labeled user messages"""
+    from api.models import WhatsAppMessage
+
+    rows = (
+        WhatsAppMessage.objects
+        .filter(sender='user', processed=True, intent__isnull=False, sentiment__isnull=False)
+        .filter(Q(metadata__classified_by__isnull=True) | ~Q(metadata__classified_by='local'))
+        .order_by('-timestamp')
+        .values_list('content', 'intent', 'sentiment', 'entities')[:limit]
+    )
+    for content, intent, sentiment, entities in rows.iterator(chunk_size=2000):
+        entities = entities or {}
+        yield content, intent, sentiment, entities.get('keywords') or [], entities.get('topics') or []
+
+
+def train_local_model(rows: Optional[Iterable] = None, seed: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Train the intent and sentiment models and the keyword-topic lexicon
+
+    Returns None when there are fewer than MIN_EXAMPLES labeled messages.
+    """
+    rows = list(rows if rows is not None else labeled_messages(get_local_classifier_setting('TRAINING_LIMIT')))
+    if len(rows) < get_local_classifier_setting('MIN_EXAMPLES'):
+        return None
+
+    random.Random(seed).shuffle(rows)
+    split = max(1, len(rows) // 10)
+    held_out, training = rows[:split], rows[split:]
+    tokenized = [tokenize(row[0]) for row in rows]
+    held_out_tokens, training_tokens = tokenized[:split], tokenized[split:]
+
+    min_confidence = get_local_classifier_setting('MIN_CONFIDENCE')
+    max_vocabulary = get_local_classifier_setting('MAX_VOCABULARY')
+    model = {'trained_at': time.time(), 'examples': len(rows), 'min_confidence': min_confidence}
+
+    for name, column in (('intent', 1), ('sentiment', 2)):
+        evaluation = train_naive_bayes(zip(training_tokens, (row[column] for row in training)), max_vocabulary)
+        accuracy, coverage = held_out_accuracy(
+            evaluation, list(zip(held_out_tokens, (row[column] for row in held_out))), min_confidence
+        )
+        enabled = accuracy >= get_local_classifier_setting('MIN_ACCURACY')
+        model[name] = {
+            # Deployed models use every example once the held-out check passes
+            'naive_bayes': train_naive_bayes(zip(tokenized, (row[column] for row in rows)), max_vocabulary)
+            if enabled else None,
+            'accuracy': round(accuracy, 4),
+            'coverage': round(coverage, 4),
+        }
+
+    # Keywords the LLM extracted, and the topics they appeared with
+    keyword_topics = defaultdict(Counter)
+    for _, _, _, keywords, topics in rows:
+        for keyword in keywords:
+            normalized = normalize_text(str(keyword))
+            if normalized:
+                keyword_topics[normalized].update(topics)
+    model['keywords'] = {
+        keyword: [topic for topic, _ in topics.most_common(2)]
+        for keyword, topics in keyword_topics.items()
+    }
+    return model
+
+
+def save_local_model(model: Dict[str, Any]):
+    cache.set(MODEL_CACHE_KEY, model, None)
+
+
+# Classification
+
+class TierStats:
+    """Answers and time spent per tier"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.counts = Counter()
+        self.seconds = Counter()
+
+    def record(self, tier: str, seconds: float, count: int = 1):
+        with self._lock:
+            self.counts[tier] += count
+            self.seconds[tier] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        total = sum(self.counts.values())
+        return {
+            tier: {
+                'count': count,
+                'share': round(count / total, 4),
+                'avg_ms': round(self.seconds[tier] / count * 1000, 3),
+            }
+            for tier, count in self.counts.items()
+        }
+
+
+class LocalClassifier:
+    """Answers from the local tiers, or None to escalate"""
+
+    def __init__(self, model: Optional[Dict[str, Any]] = None):
+        self._model = model
+        self._loaded_at = time.monotonic() if model is not None else None
+
+    @property
+    def model(self) -> Optional[Dict[str, Any]]:
+        reload_after = get_local_classifier_setting('RELOAD_SECONDS')
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > reload_after:
+            try:
+                self._model = cache.get(MODEL_CACHE_KEY) or self._model
+            except Exception as e:
+                logger.warning(f"Could not load local classifier model: {e}")
+            self._loaded_at = time.monotonic()
+        return self._model
+
+    def language(self, text: str) -> Optional[str]:
+        language, share = detect_script(text)
+        return language if share >= 0.5 else None
+
+    def _predict(self, name: str, tokens: List[str]) -> Tuple[Optional[str], float]:
+        model = self.model
+        naive_bayes = model and model.get(name, {}).get('naive_bayes')
+        if not naive_bayes:
+            return None, 0.0
+        label, confidence = predict_naive_bayes(naive_bayes, tokens)
+        if confidence < model.get('min_confidence', get_local_classifier_setting('MIN_CONFIDENCE')):
+            return None, 0.0
+        return label, confidence
+
+    def intent(self, text: str) -> Optional[Dict[str, Any]]:
+        quick_reply = get_quick_reply(text)
+        if quick_reply:
+            intent, confidence = quick_reply[0], 1.0
+        else:
+            intent, confidence = self._predict('intent', tokenize(text))
+            if intent is None:
+                return None
+        return {
+            "intent": intent,
+            "confidence": round(confidence, 4),
+            "category": INTENT_CATEGORIES.get(intent, 'inquiry'),
+        }
+
+    def sentiment(self, text: str) -> Optional[Dict[str, Any]]:
+        quick_reply = get_quick_reply(text)
+        if quick_reply:
+            sentiment, confidence = quick_reply[1], 1.0
+        else:
+            sentiment, confidence = self._predict('sentiment', tokenize(text))
+            if sentiment is None:
+                return None
+        return {
+            "sentiment": sentiment,
+            "score": round(SENTIMENT_SCORES.get(sentiment, 0.0) * confidence, 4),
+            "confidence": round(confidence, 4),
+        }
+
+    def enrich(self, text: str) -> Optional[Dict[str, Any]]:
+        """Full enrichment when intent and sentiment are both confident"""
+        intent = self.intent(text)
+        if intent is None or intent['intent'] in ESCALATE_INTENTS:
+            return None
+        sentiment = self.sentiment(text)
+        if sentiment is None:
+            return None
+
+        lexicon = (self.model or {}).get('keywords', {})
+        keywords = [token for token in dict.fromkeys(tokenize(text)) if token in lexicon]
+        topics = list(dict.fromkeys(topic for keyword in keywords for topic in lexicon[keyword]))
+        return {
+            **intent,
+            "sentiment": sentiment['sentiment'],
+            "score": sentiment['score'],
+            "topics": topics,
+            "keywords": keywords,
+            "issues": [],
+        }
+
+
+_local_classifier = None
+
+def get_local_classifier() -> LocalClassifier:
+    """Get or create the per-process local classifier"""
+    global _local_classifier
+    if _local_classifier is None:
+        _local_classifier = LocalClassifier()
+    return _local_classifier
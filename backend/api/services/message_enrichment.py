@@ -0,0 +1,217 @@
+"""
+Message Enrichment
+Micro-batched AI enrichment (intent, sentiment, topics) of WhatsApp messages
+
+Incoming user messages are stored unprocessed and enriched later by a
+worker. The first message in a batching window schedules one task for the
+end of the window; that task takes every pending message, across all
+conversations, and sends them to the model in batches of BATCH_SIZE with
+one combined enrichment call per batch. Message fields and conversation
+aggregates are then written with bulk updates.
+
+Messages the model gave no answer for, or whose request failed, are never
+given default labels, so they stay out of the aggregates and the local
+classifier's training data. They count an attempt and are retried with
+exponential backoff by later runs; only after MAX_ATTEMPTS are they left
+with their processing_error for good. Without a configured model client
+nothing is attempted and unanswered messages simply stay pending.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import WhatsAppConversation, WhatsAppMessage
+from api.utils.task_window import schedule_once_per_window
+
+logger = logging.getLogger(__name__)
+
+
+ENRICHMENT_DEFAULTS = {
+    'BATCH_SIZE': 20,          # messages per model request
+    'CONCURRENCY': 4,          # model requests in flight at once
+    'WINDOW_SECONDS': 2,       # how long messages are collected before a batch runs
+    'MAX_ATTEMPTS': 5,         # after this many failed attempts a message is given up on
+    'RETRY_BASE_SECONDS': 30,  # backoff: base * 2 ** (attempts - 1)
+}
+
+NO_ANSWER_ERROR = 'No enrichment returned by the model'
+SCHEDULED_KEY = 'whatsapp-enrichment-scheduled'
+LOCK_KEY = 'whatsapp-enrichment-lock'
+LOCK_TIMEOUT = 300
+
+
+def get_enrichment_setting(name: str):
+    return getattr(settings, 'WHATSAPP_ENRICHMENT', {}).get(name, ENRICHMENT_DEFAULTS[name])
+
+
+def schedule_enrichment():
+    """Schedule a batch for the end of the current window, once per window"""
+    from api.tasks import enrich_whatsapp_messages
+
+    schedule_once_per_window(enrich_whatsapp_messages, SCHEDULED_KEY, get_enrichment_setting('WINDOW_SECONDS'))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of failed attempts"""
+    return timedelta(seconds=get_enrichment_setting('RETRY_BASE_SECONDS') * (2 ** max(attempts - 1, 0)))
+
+
+def pending_messages():
+    return (
+        WhatsAppMessage.objects
+        .filter(sender='user', processed=False, processing_attempts__lt=get_enrichment_setting('MAX_ATTEMPTS'))
+        .filter(Q(next_processing_at__isnull=True) | Q(next_processing_at__lte=timezone.now()))
+        .select_related('conversation')
+        .order_by('timestamp')
+    )
+
+
+class MessageEnricher:
+    """Enriches pending messages in batches and writes the results in bulk"""
+
+    def __init__(self, ai_service=None, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        if ai_service is None:
+            from api.services.ai_service import get_ai_service
+            ai_service = get_ai_service()
+        self.ai_service = ai_service
+        self.batch_size = batch_size or get_enrichment_setting('BATCH_SIZE')
+        self.concurrency = concurrency or get_enrichment_setting('CONCURRENCY')
+        self.max_attempts = get_enrichment_setting('MAX_ATTEMPTS')
+        self.enriched = 0
+        self.retried = 0
+        self.failed = 0
+        self.requests = 0
+        self.local = 0
+
+    def enrich(self, messages: List[WhatsAppMessage]):
+        """Enrich messages with one model request per batch"""
+        batches = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(batches)))) as executor:
+            results = list(executor.map(
+                lambda batch: self.ai_service.enrich_messages([message.content for message in batch]),
+                batches,
+            ))
+        self.requests += len(batches)
+
+        enriched, unanswered = [], []
+        for batch, batch_results in zip(batches, results):
+            for message, result in zip(batch, batch_results):
+                if result is None:
+                    unanswered.append(message)
+                    continue
+                self._apply(message, result)
+                enriched.append(message)
+                self.local += result.get('tier') == 'local'
+
+        # Without a model client nothing was asked, so nothing failed
+        if self.ai_service.client is not None:
+            for message in unanswered:
+                self._record_failure(message, NO_ANSWER_ERROR)
+
+        WhatsAppMessage.objects.bulk_update(enriched + unanswered, [
+            'intent', 'confidence', 'sentiment', 'entities', 'metadata', 'processed',
+            'processing_error', 'processing_attempts', 'next_processing_at',
+        ])
+        self._update_conversations(enriched)
+        self.enriched += len(enriched)
+
+    def _record_failure(self, message: WhatsAppMessage, error: str):
+        message.processing_attempts += 1
+        message.processing_error = error
+        if message.processing_attempts >= self.max_attempts:
+            message.next_processing_at = None
+            self.failed += 1
+        else:
+            message.next_processing_at = timezone.now() + retry_delay(message.processing_attempts)
+            self.retried += 1
+
+    def _apply(self, message: WhatsAppMessage, result: Dict[str, Any]):
+        message.intent = result.get('intent')
+        message.confidence = (result.get('confidence') or 0) * 100
+        message.sentiment = result.get('sentiment')
+        message.entities = {
+            'topics': result.get('topics', []),
+            'keywords': result.get('keywords', []),
+            'issues': result.get('issues', []),
+        }
+        if result.get('tier'):
+            # Local answers are kept out of the local classifier's training data
+            message.metadata = {**(message.metadata or {}), 'classified_by': result['tier']}
+        message.processed = True
+        message.processing_error = None
+        message.next_processing_at = None
+        message.enrichment = result
+
+    def _update_conversations(self, messages: List[WhatsAppMessage]):
+        """Fold each conversation's newly enriched messages into its aggregates"""
+        by_conversation: Dict[Any, List[WhatsAppMessage]] = {}
+        for message in messages:
+            by_conversation.setdefault(message.conversation_id, []).append(message)
+
+        conversations = WhatsAppConversation.objects.in_bulk(list(by_conversation))
+        for conversation_id, conversation_messages in by_conversation.items():
+            conversation = conversations.get(conversation_id)
+            if conversation is None:
+                continue
+
+            # Sentiment and category follow the latest message
+            latest = max(conversation_messages, key=lambda message: message.timestamp).enrichment
+            conversation.sentiment = latest.get('sentiment', 'neutral')
+            conversation.sentiment_score = latest.get('score', 0.0)
+            conversation.category = latest.get('category', 'inquiry')
+
+            for field in ('topics', 'keywords', 'issues'):
+                values = set(getattr(conversation, field))
+                for message in conversation_messages:
+                    values.update(message.entities[field])
+                setattr(conversation, field, list(values))
+
+        WhatsAppConversation.objects.bulk_update(
+            list(conversations.values()),
+            ['sentiment', 'sentiment_score', 'category', 'topics', 'keywords', 'issues'],
+        )
+
+    def drain(self, time_budget: Optional[float] = None) -> Dict[str, int]:
+        """
+        Enrich pending messages until none are left
+
+        Only one drain runs at a time; concurrency comes from the parallel
+        model requests within it. Messages left pending in this run (no
+        model client) are not taken again until the next one.
+        """
+        if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+            return {'enriched': 0, 'retried': 0, 'failed': 0, 'requests': 0, 'local': 0}
+
+        started = time.monotonic()
+        seen = set()
+        try:
+            while time_budget is None or time.monotonic() - started < time_budget:
+                messages = list(pending_messages().exclude(id__in=seen)[:self.batch_size * self.concurrency])
+                if not messages:
+                    break
+                seen.update(message.id for message in messages)
+                try:
+                    self.enrich(messages)
+                except Exception as e:
+                    logger.error(f"Failed to enrich {len(messages)} messages: {e}", exc_info=True)
+                    for message in messages:
+                        self._record_failure(message, str(e))
+                    WhatsAppMessage.objects.bulk_update(
+                        messages, ['processing_error', 'processing_attempts', 'next_processing_at']
+                    )
+                cache.touch(LOCK_KEY, LOCK_TIMEOUT)
+        finally:
+            cache.delete(LOCK_KEY)
+
+        return {
+            'enriched': self.enriched, 'retried': self.retried, 'failed': self.failed,
+            'requests': self.requests, 'local': self.local,
+        }
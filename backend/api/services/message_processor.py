@@ -7,7 +7,10 @@ Orchestrates the complete message handling pipeline:
 4. Send response
 """
 import logging
+from datetime import datetime
 from typing import Dict, Any, Optional
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from django.core.cache import cache
 from api.models import (
@@ -17,6 +20,9 @@ from api.models import (
 )
 from .whatsapp_service import get_whatsapp_service
 from .ai_service import get_ai_service
+from .conversation_context import get_context_store
+from .message_enrichment import schedule_enrichment
+from .voter_sentiment import count_topics, record_sentiment
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +35,7 @@ class MessageProcessor:
     def __init__(self):
         self.whatsapp_service = get_whatsapp_service()
         self.ai_service = get_ai_service()
+        self.context_store = get_context_store()
 
     def process_incoming_message(
         self,
@@ -37,7 +44,8 @@ class MessageProcessor:
         message_type: str = 'text',
         whatsapp_message_id: Optional[str] = None,
         media_url: Optional[str] = None,
-        source_campaign: Optional[str] = None
+        source_campaign: Optional[str] = None,
+        timestamp: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Main entry point for processing incoming messages
@@ -49,11 +57,18 @@ class MessageProcessor:
             whatsapp_message_id: WhatsApp's message ID
             media_url: URL for media messages
             source_campaign: Campaign tracking parameter
+            timestamp: When the user sent the message; defaults to now
 
         Returns:
             Dictionary with processing results
         """
         try:
+            # Redelivered messages are skipped once answered; one stored but
+            # left unanswered by a failed attempt is processed again
+            if whatsapp_message_id and self._resume_or_skip(whatsapp_message_id):
+                logger.info(f"Skipping already answered message {whatsapp_message_id}")
+                return {"status": "duplicate"}
+
             # 1. Get or create voter profile
             voter_profile = self._get_or_create_voter_profile(phone_number)
 
@@ -65,8 +80,12 @@ class MessageProcessor:
 
             # 3. Detect language
             language = self.ai_service.detect_language(message_text)
-            conversation.language = language
-            conversation.save(update_fields=['language'])
+            if conversation.language != language:
+                conversation.language = language
+                conversation.save(update_fields=['language'])
+
+            # Recent turns and summary, loaded before this message is stored
+            context = self.context_store.load(conversation)
 
             # 4. Store incoming message
             user_message = self._store_message(
@@ -76,14 +95,16 @@ class MessageProcessor:
                 message_type=message_type,
                 whatsapp_message_id=whatsapp_message_id,
                 media_url=media_url,
-                language=language
+                language=language,
+                timestamp=timestamp
             )
 
-            # 5. Process message with AI (async)
+            # 5. Queue message for batched AI enrichment
             self._process_message_with_ai(user_message)
 
             # 6. Get conversation history
-            conversation_history = self._get_conversation_history(conversation)
+            conversation_history = self.context_store.history(context)
+            self.context_store.append(conversation, context, 'user', message_text)
 
             # 7. Generate AI response
             bot_personality = self._get_bot_personality(conversation)
@@ -94,40 +115,42 @@ class MessageProcessor:
                 bot_personality=bot_personality
             )
 
-            # 8. Store bot response
-            bot_message = self._store_message(
-                conversation=conversation,
-                sender='bot',
-                content=ai_response['response'],
-                message_type='text',
-                model_used=ai_response['model'],
-                prompt_tokens=ai_response['tokens']['prompt'],
-                completion_tokens=ai_response['tokens']['completion']
-            )
-
-            # 9. Send response via WhatsApp
+            # 8. Send response via WhatsApp; a failed send is retried with the event
             sent_result = self.whatsapp_service.send_text_message(
                 to=phone_number,
                 message=ai_response['response']
             )
+            if not sent_result:
+                raise RuntimeError(f"Reply to {phone_number} could not be sent")
+
+            with transaction.atomic():
+                # 9. Store bot response, marking the user message answered
+                bot_message = self._store_message(
+                    conversation=conversation,
+                    sender='bot',
+                    content=ai_response['response'],
+                    message_type='text',
+                    whatsapp_message_id=sent_result.get('message_id'),
+                    model_used=ai_response['model'],
+                    prompt_tokens=ai_response['tokens']['prompt'],
+                    completion_tokens=ai_response['tokens']['completion'],
+                    metadata={'reply_to': whatsapp_message_id} if whatsapp_message_id else {}
+                )
 
-            if sent_result:
-                bot_message.whatsapp_message_id = sent_result.get('message_id')
-                bot_message.save(update_fields=['whatsapp_message_id'])
+                # 10. Update conversation metrics (the user message and the reply)
+                WhatsAppConversation.objects.filter(pk=conversation.pk).update(
+                    message_count=F('message_count') + 2
+                )
+                conversation.message_count += 2
 
-            # 10. Update conversation metrics
-            conversation.message_count = conversation.messages.count()
-            conversation.save(update_fields=['message_count'])
+                # 11. Update voter profile
+                VoterProfile.objects.filter(pk=voter_profile.pk).update(
+                    interaction_count=F('interaction_count') + 1,
+                    total_messages_sent=F('total_messages_sent') + 1,
+                    last_contacted=timezone.now()
+                )
 
-            # 11. Update voter profile
-            voter_profile.interaction_count += 1
-            voter_profile.total_messages_sent += 1
-            voter_profile.last_contacted = timezone.now()
-            voter_profile.save(update_fields=[
-                'interaction_count',
-                'total_messages_sent',
-                'last_contacted'
-            ])
+            self.context_store.append(conversation, context, 'bot', ai_response['response'])
 
             # 12. Check if should send referral prompt
             if self._should_prompt_referral(voter_profile, conversation):
@@ -149,6 +172,26 @@ class MessageProcessor:
                 "error": str(e)
             }
 
+    def _resume_or_skip(self, whatsapp_message_id: str) -> bool:
+        """
+        True if a redelivered message was already answered
+
+        A message stored by an attempt that failed before its reply was
+        sent is removed, with the cached context that may hold it, so it
+        is processed again from the start.
+        """
+        stored = WhatsAppMessage.objects.filter(whatsapp_message_id=whatsapp_message_id, sender='user').first()
+        if stored is None:
+            return False
+        if WhatsAppMessage.objects.filter(
+            conversation_id=stored.conversation_id, sender='bot', metadata__reply_to=whatsapp_message_id
+        ).exists():
+            return True
+
+        self.context_store.discard(stored.conversation_id)
+        stored.delete()
+        return False
+
     def _get_or_create_voter_profile(self, phone_number: str) -> VoterProfile:
         """Get or create voter profile"""
         profile, created = VoterProfile.objects.get_or_create(
@@ -214,12 +257,12 @@ class MessageProcessor:
         **kwargs
     ) -> WhatsAppMessage:
         """Store message in database"""
+        kwargs['timestamp'] = kwargs.get('timestamp') or timezone.now()
         message = WhatsAppMessage.objects.create(
             conversation=conversation,
             sender=sender,
             content=content,
             message_type=message_type,
-            timestamp=timezone.now(),
             **kwargs
         )
         return message
@@ -229,8 +272,8 @@ class MessageProcessor:
         conversation: WhatsAppConversation,
         limit: int = 20
     ) -> list:
-        """Get conversation history formatted for AI"""
-        messages = conversation.messages.order_by('timestamp')[:limit]
+        """Get the latest messages, oldest first, formatted for AI"""
+        messages = reversed(list(conversation.messages.order_by('-timestamp')[:limit]))
 
         history = []
         for msg in messages:
@@ -249,62 +292,12 @@ class MessageProcessor:
 
     def _process_message_with_ai(self, message: WhatsAppMessage):
         """
-        Process message with AI for classification, sentiment, etc.
-        This runs async after response is sent
-        """
-        try:
-            # Classify intent
-            intent_result = self.ai_service.classify_intent(message.content)
-            message.intent = intent_result.get('intent')
-            message.confidence = intent_result.get('confidence', 0) * 100
-
-            # Analyze sentiment
-            sentiment_result = self.ai_service.analyze_sentiment(message.content)
-            message.sentiment = sentiment_result.get('sentiment')
-
-            # Extract topics and keywords
-            extraction = self.ai_service.extract_topics_and_keywords(message.content)
-            message.entities = {
-                'topics': extraction.get('topics', []),
-                'keywords': extraction.get('keywords', []),
-                'issues': extraction.get('issues', [])
-            }
+        Queue message for AI classification, sentiment and topic extraction
 
-            message.processed = True
-            message.save()
-
-            # Update conversation with extracted data
-            conversation = message.conversation
-            conversation.sentiment = sentiment_result.get('sentiment', 'neutral')
-            conversation.sentiment_score = sentiment_result.get('score', 0.0)
-            conversation.category = intent_result.get('category', 'inquiry')
-
-            # Merge topics and keywords
-            conversation.topics = list(set(
-                conversation.topics + extraction.get('topics', [])
-            ))
-            conversation.keywords = list(set(
-                conversation.keywords + extraction.get('keywords', [])
-            ))
-            conversation.issues = list(set(
-                conversation.issues + extraction.get('issues', [])
-            ))
-
-            conversation.save(update_fields=[
-                'sentiment',
-                'sentiment_score',
-                'category',
-                'topics',
-                'keywords',
-                'issues'
-            ])
-
-            logger.info(f"Processed message {message.id} with AI")
-
-        except Exception as e:
-            logger.error(f"Failed to process message with AI: {str(e)}")
-            message.processing_error = str(e)
-            message.save(update_fields=['processing_error'])
+        Enrichment is micro-batched across conversations by a worker (see
+        api.services.message_enrichment), so it adds no model calls here.
+        """
+        schedule_enrichment()
 
     def _should_prompt_referral(
         self,
@@ -373,6 +366,8 @@ Current referrals: {voter_profile.referrals_made}/5"""
                 # Generate conversation summary
                 history = self._get_conversation_history(conversation, limit=100)
                 summary = self.ai_service.summarize_conversation(history)
+                if summary:
+                    conversation.summary = summary
 
                 # Extract demographics
                 demographics = self.ai_service.extract_demographics(history)
@@ -389,27 +384,23 @@ Current referrals: {voter_profile.referrals_made}/5"""
 
                 conversation.resolved = True
                 conversation.save()
+                self.context_store.discard(conversation.id)
 
                 # Update voter profile
                 voter_profile = VoterProfile.objects.get(
                     phone_number=conversation.phone_number
                 )
 
-                # Update sentiment history
-                voter_profile.sentiment_history.append({
-                    'date': conversation.started_at.isoformat(),
-                    'score': conversation.sentiment_score
-                })
+                # Append to the sentiment time series (one insert)
+                record_sentiment(voter_profile, conversation.sentiment_score, conversation.started_at)
 
                 # Update topic interests
-                for topic in conversation.topics:
-                    voter_profile.topic_interests[topic] = \
-                        voter_profile.topic_interests.get(topic, 0) + 1
+                voter_profile.topic_interests = count_topics(voter_profile.topic_interests, conversation.topics)
 
                 # Update demographics
                 voter_profile.demographics.update(conversation.demographics)
 
-                voter_profile.save()
+                voter_profile.save(update_fields=['topic_interests', 'demographics', 'updated_at'])
 
                 logger.info(f"Ended conversation {conversation_id}")
 
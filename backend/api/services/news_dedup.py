@@ -0,0 +1,197 @@
+"""
+News Near-Duplicate Detection
+Clusters syndicated and near-identical copies of a story so it is analyzed once
+
+Each article's text is reduced to word 3-gram shingles (Tamil words kept
+whole) and a NUM_PERM MinHash signature, whose positions agree with
+probability equal to the Jaccard similarity of the shingle sets. The
+signature is cut into BANDS bands; each band's hash is stored as a
+NewsArticleBand row, so candidates sharing any band are found with one
+indexed lookup instead of comparing against every stored article.
+Candidates are confirmed when their signatures agree on at least
+THRESHOLD of the positions.
+
+A confirmed copy points at the first article of its story (duplicate_of)
+and inherits its analysis, now or as soon as the original is analyzed.
+The original's cluster_size counts the copies, which the trending
+statistics use to weigh a story by how widely it was carried.
+"""
+
+import hashlib
+import logging
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from api.models import NewsArticle, NewsArticleBand
+from api.services.local_classifier import tokenize
+from api.services.tvk_sentiment_analyzer import ANALYSIS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+
+DEDUP_DEFAULTS = {
+    'NUM_PERM': 128,
+    'BANDS': 16,            # 16 bands of 8 rows: pairs above ~0.7 similarity become candidates
+    'SHINGLE_SIZE': 3,      # words per shingle
+    'THRESHOLD': 0.8,       # estimated Jaccard similarity of a near-duplicate
+}
+
+# Universal hashing modulo the largest 32-bit prime; a * h + b stays within 64 bits
+_PRIME = np.uint64(4294967291)
+
+
+def get_dedup_setting(name: str):
+    return getattr(settings, 'NEWS_DEDUP', {}).get(name, DEDUP_DEFAULTS[name])
+
+
+def _permutations(num_perm: int):
+    generator = np.random.RandomState(1)
+    a = generator.randint(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+    b = generator.randint(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text: str, size: Optional[int] = None) -> set:
+    """Hashes of the word n-grams of the text"""
+    size = size or get_dedup_setting('SHINGLE_SIZE')
+    words = tokenize(text)
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the text, or None for text without words"""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    a, b = _permutations(get_dedup_setting('NUM_PERM'))
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    return ((np.outer(values, a) + b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.mean(signature == other))
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit key per band, distinct across band positions"""
+    rows = len(signature) // get_dedup_setting('BANDS')
+    keys = []
+    for band, start in enumerate(range(0, rows * get_dedup_setting('BANDS'), rows)):
+        digest = hashlib.blake2b(bytes([band]) + signature[start:start + rows].tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def _load_signature(value) -> Optional[np.ndarray]:
+    return np.frombuffer(bytes(value), dtype=np.uint32) if value else None
+
+
+def _inherit(copy: NewsArticle, original: NewsArticle):
+    for field in ANALYSIS_FIELDS:
+        setattr(copy, field, getattr(original, field))
+    copy.ai_processed = True
+
+
+def cluster_articles(article_ids: Iterable) -> List:
+    """
+    Sign new articles and attach near-duplicates to the story they copy
+
+    Articles are taken oldest first, so the earliest copy of a story in a
+    batch becomes its original.
+
+    Returns:
+        list: ids of the unanalyzed articles that need an analysis of their own
+    """
+    articles = list(
+        NewsArticle.objects.filter(id__in=list(article_ids), minhash__isnull=True).order_by('published_at', 'scraped_at')
+    )
+    signatures = {article.id: minhash(article.article_text) for article in articles}
+    keys = {article_id: band_keys(signature) for article_id, signature in signatures.items() if signature is not None}
+
+    # Stored articles sharing a band with any of the batch, with the originals they point at
+    matches = defaultdict(set)
+    for key, article_id in NewsArticleBand.objects.filter(
+        key__in={key for article_keys in keys.values() for key in article_keys},
+    ).values_list('key', 'article_id'):
+        matches[key].add(article_id)
+    candidates = {
+        candidate.id: candidate
+        for candidate in NewsArticle.objects.filter(id__in={i for ids in matches.values() for i in ids})
+    } if matches else {}
+    missing = {c.duplicate_of_id for c in candidates.values() if c.duplicate_of_id and c.duplicate_of_id not in candidates}
+    candidates.update({original.id: original for original in NewsArticle.objects.filter(id__in=missing)} if missing else {})
+
+    threshold = get_dedup_setting('THRESHOLD')
+    needs_analysis, bands = [], []
+    growth = Counter()
+    for article in articles:
+        signature = signatures[article.id]
+        if signature is None:
+            if not article.ai_processed:
+                needs_analysis.append(article.id)
+            continue
+        article.minhash = signature.tobytes()
+        bands.extend(NewsArticleBand(article=article, key=key) for key in keys[article.id])
+
+        best, best_similarity = None, threshold
+        for candidate_id in {i for key in keys[article.id] for i in matches.get(key, ())}:
+            candidate = candidates[candidate_id]
+            score = similarity(signature, _load_signature(candidate.minhash))
+            if score >= best_similarity:
+                best, best_similarity = candidate, score
+
+        # Later articles of the batch can match this one
+        for key in keys[article.id]:
+            matches[key].add(article.id)
+        candidates[article.id] = article
+
+        if best is None:
+            if not article.ai_processed:
+                needs_analysis.append(article.id)
+            continue
+        original = candidates[best.duplicate_of_id] if best.duplicate_of_id else best
+        article.duplicate_of = original
+        growth[original.id] += 1
+        if original.ai_processed:
+            _inherit(article, original)
+        # else the analysis is shared once the original has it
+
+    sizes = defaultdict(list)
+    for original_id, count in growth.items():
+        sizes[count].append(original_id)
+
+    inherited = [article for article in articles if article.duplicate_of_id and article.ai_processed]
+    signed = [article for article in articles if article.minhash and not (article.duplicate_of_id and article.ai_processed)]
+    with transaction.atomic():
+        NewsArticle.objects.bulk_update(signed, ['minhash', 'duplicate_of'], batch_size=500)
+        NewsArticle.objects.bulk_update(
+            inherited, ['minhash', 'duplicate_of', 'ai_processed'] + ANALYSIS_FIELDS, batch_size=500,
+        )
+        NewsArticleBand.objects.bulk_create(bands, batch_size=2000)
+        for count, original_ids in sizes.items():
+            NewsArticle.objects.filter(id__in=original_ids).update(cluster_size=F('cluster_size') + count)
+
+    if growth:
+        logger.info(f"Clustered {sum(growth.values())} near-duplicate articles into {len(growth)} stories")
+    return needs_analysis
+
+
+def share_analysis(originals: List[NewsArticle]) -> int:
+    """Copy fresh analyses to the near-duplicates waiting on them; returns the copies updated"""
+    by_id: Dict = {original.id: original for original in originals}
+    if not by_id:
+        return 0
+    copies = list(NewsArticle.objects.filter(duplicate_of__in=list(by_id), ai_processed=False))
+    for copy in copies:
+        _inherit(copy, by_id[copy.duplicate_of_id])
+    NewsArticle.objects.bulk_update(copies, ['ai_processed'] + ANALYSIS_FIELDS, batch_size=500)
+    return len(copies)
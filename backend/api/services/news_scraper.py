@@ -5,31 +5,124 @@ Scrapes Tamil and English news articles every 6 hours for TVK/Vijay political co
 Supported Sources:
 - Tamil: Dinamalar, Dinakaran, Maalaimalar, Polimer News
 - English: The Hindu (TN), Times of India (Chennai), Indian Express (TN)
+
+A scrape cycle fetches every source's listing concurrently, then every new
+article page concurrently, over one pooled session with at most PER_HOST
+requests in flight to any one site. Listings are requested with the ETag
+and Last-Modified of the previous cycle, so an unchanged source costs one
+304. Links are checked against an in-memory set of the canonical URL
+hashes of stored articles before anything is downloaded, so only articles
+never seen before are fetched.
 """
 
+import calendar
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import feedparser
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-from urllib.parse import urljoin, urlparse
-import feedparser
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
 from api.models import NewsArticle
+from api.services.news_search import index_articles
+from api.utils.url_hash import url_hash
 
 logger = logging.getLogger(__name__)
 
 
+SCRAPER_DEFAULTS = {
+    'CONCURRENCY': 16,              # pages in flight across all sites
+    'PER_HOST': 4,                  # pages in flight to any one site
+    'REQUEST_TIMEOUT': 15,
+    'MAX_ARTICLES_PER_SOURCE': 20,
+    'KNOWN_URL_DAYS': 30,           # stored links older than this are off the listings
+    'VALIDATOR_TTL': 7 * 24 * 60 * 60,
+    'BATCH_SIZE': 500,              # articles per INSERT
+}
+
+
+def get_scraper_setting(name: str):
+    return getattr(settings, 'NEWS_SCRAPER', {}).get(name, SCRAPER_DEFAULTS[name])
+
+
+class NewsSource(NamedTuple):
+    """A listing page and how to read its article links"""
+    name: str       # for logs
+    source: str     # stored on the articles
+    url: str
+    language: str
+    parser: str     # TamilNaduNewsScraper method returning the listing's links
+
+
+class HostLimiter:
+    """Caps the requests in flight to each host"""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._hosts.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            yield
+
+
 class TamilNaduNewsScraper:
     """
     Main scraper class for Tamil Nadu political news
     """
 
-    def __init__(self):
+    TAMIL_SOURCES = [
+        NewsSource('Dinamalar', 'Dinamalar', "https://www.dinamalar.com/chennai_news.asp", 'ta', '_parse_dinamalar'),
+        NewsSource('Dinakaran', 'Dinakaran', "https://www.dinakaran.com/tamilnadu", 'ta', '_parse_dinakaran'),
+    ]
+
+    ENGLISH_SOURCES = [
+        NewsSource('The Hindu TN', 'The Hindu',
+                   "https://www.thehindu.com/news/national/tamil-nadu/feeder/default.rss", 'en', '_parse_rss'),
+        NewsSource('Times of India Chennai', 'Times of India',
+                   "https://timesofindia.indiatimes.com/city/chennai", 'en', '_parse_times_of_india'),
+        NewsSource('Indian Express TN', 'Indian Express',
+                   "https://indianexpress.com/section/cities/chennai/", 'en', '_parse_indian_express'),
+    ]
+
+    def __init__(self, concurrency: Optional[int] = None, per_host: Optional[int] = None,
+                 timeout: Optional[float] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.timeout = 15
-        self.max_articles_per_source = 20
+        self.timeout = timeout or get_scraper_setting('REQUEST_TIMEOUT')
+        self.max_articles_per_source = get_scraper_setting('MAX_ARTICLES_PER_SOURCE')
+        self.concurrency = concurrency or get_scraper_setting('CONCURRENCY')
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.hosts = HostLimiter(per_host or get_scraper_setting('PER_HOST'))
+
+        self.known_hashes: Optional[Set[str]] = None
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
 
     # =====================================================
     # TAMIL NEWS SOURCES
@@ -39,97 +132,35 @@ class TamilNaduNewsScraper:
         """
         Scrape Dinamalar Tamil News (Chennai/TN Politics)
         """
-        articles = []
-        try:
-            # Dinamalar Chennai/TN News URL
-            url = "https://www.dinamalar.com/chennai_news.asp"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find news articles (adjust selectors based on actual site structure)
-            news_items = soup.find_all('div', class_='NewsList', limit=self.max_articles_per_source)
-
-            for item in news_items:
-                try:
-                    title_tag = item.find('a')
-                    if not title_tag:
-                        continue
-
-                    title = title_tag.get_text(strip=True)
-                    relative_url = title_tag.get('href', '')
-                    article_url = urljoin(url, relative_url)
-
-                    # Filter for political keywords
-                    if not self._is_political_article(title):
-                        continue
-
-                    # Fetch full article
-                    article_data = self._extract_article_from_url(
-                        article_url,
-                        source='Dinamalar',
-                        language='ta'
-                    )
-
-                    if article_data:
-                        articles.append(article_data)
-
-                except Exception as e:
-                    logger.error(f"Error parsing Dinamalar article: {str(e)}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Error scraping Dinamalar: {str(e)}")
-
-        return articles
+        return self.scrape_sources(self.TAMIL_SOURCES[:1])
 
     def scrape_dinakaran(self):
         """
         Scrape Dinakaran Tamil News (Tamil Nadu section)
         """
-        articles = []
-        try:
-            url = "https://www.dinakaran.com/tamilnadu"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find news articles
-            news_items = soup.find_all('div', class_='news-item', limit=self.max_articles_per_source)
-
-            for item in news_items:
-                try:
-                    title_tag = item.find('h2') or item.find('h3')
-                    link_tag = item.find('a')
-
-                    if not title_tag or not link_tag:
-                        continue
-
-                    title = title_tag.get_text(strip=True)
-                    article_url = urljoin(url, link_tag.get('href', ''))
-
-                    if not self._is_political_article(title):
-                        continue
-
-                    article_data = self._extract_article_from_url(
-                        article_url,
-                        source='Dinakaran',
-                        language='ta'
-                    )
-
-                    if article_data:
-                        articles.append(article_data)
-
-                except Exception as e:
-                    logger.error(f"Error parsing Dinakaran article: {str(e)}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Error scraping Dinakaran: {str(e)}")
-
-        return articles
+        return self.scrape_sources(self.TAMIL_SOURCES[1:2])
+
+    def _parse_dinamalar(self, content, url):
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # Find news articles (adjust selectors based on actual site structure)
+        links = []
+        for item in soup.find_all('div', class_='NewsList', limit=self.max_articles_per_source):
+            title_tag = item.find('a')
+            if title_tag:
+                links.append({'title': title_tag.get_text(strip=True), 'url': urljoin(url, title_tag.get('href', ''))})
+        return links
+
+    def _parse_dinakaran(self, content, url):
+        soup = BeautifulSoup(content, 'html.parser')
+
+        links = []
+        for item in soup.find_all('div', class_='news-item', limit=self.max_articles_per_source):
+            title_tag = item.find('h2') or item.find('h3')
+            link_tag = item.find('a')
+            if title_tag and link_tag:
+                links.append({'title': title_tag.get_text(strip=True), 'url': urljoin(url, link_tag.get('href', ''))})
+        return links
 
     # =====================================================
     # ENGLISH NEWS SOURCES
@@ -139,186 +170,185 @@ class TamilNaduNewsScraper:
         """
         Scrape The Hindu Tamil Nadu Section
         """
-        articles = []
-        try:
-            # The Hindu TN News RSS feed
-            rss_url = "https://www.thehindu.com/news/national/tamil-nadu/feeder/default.rss"
-            feed = feedparser.parse(rss_url)
-
-            for entry in feed.entries[:self.max_articles_per_source]:
-                try:
-                    title = entry.title
-                    article_url = entry.link
-                    published = entry.get('published_parsed', None)
-
-                    if not self._is_political_article(title):
-                        continue
-
-                    article_data = self._extract_article_from_url(
-                        article_url,
-                        source='The Hindu',
-                        language='en',
-                        published_date=published
-                    )
-
-                    if article_data:
-                        articles.append(article_data)
-
-                except Exception as e:
-                    logger.error(f"Error parsing The Hindu article: {str(e)}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Error scraping The Hindu: {str(e)}")
-
-        return articles
+        return self.scrape_sources(self.ENGLISH_SOURCES[:1])
 
     def scrape_times_of_india_chennai(self):
         """
         Scrape Times of India Chennai Section
         """
-        articles = []
-        try:
-            url = "https://timesofindia.indiatimes.com/city/chennai"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+        return self.scrape_sources(self.ENGLISH_SOURCES[1:2])
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+    def scrape_indian_express_tn(self):
+        """
+        Scrape Indian Express Tamil Nadu Section
+        """
+        return self.scrape_sources(self.ENGLISH_SOURCES[2:3])
 
-            # Find news articles
-            news_items = soup.find_all('div', class_='uwU81', limit=self.max_articles_per_source)
+    def _parse_rss(self, content, url):
+        feed = feedparser.parse(content)
+        return [
+            {'title': entry.title, 'url': entry.link, 'published': entry.get('published_parsed', None)}
+            for entry in feed.entries[:self.max_articles_per_source]
+        ]
 
-            for item in news_items:
-                try:
-                    link_tag = item.find('a')
-                    if not link_tag:
-                        continue
+    def _parse_times_of_india(self, content, url):
+        soup = BeautifulSoup(content, 'html.parser')
 
-                    title = link_tag.get_text(strip=True)
-                    article_url = urljoin(url, link_tag.get('href', ''))
+        links = []
+        for item in soup.find_all('div', class_='uwU81', limit=self.max_articles_per_source):
+            link_tag = item.find('a')
+            if link_tag:
+                links.append({'title': link_tag.get_text(strip=True), 'url': urljoin(url, link_tag.get('href', ''))})
+        return links
 
-                    if not self._is_political_article(title):
-                        continue
+    def _parse_indian_express(self, content, url):
+        soup = BeautifulSoup(content, 'html.parser')
 
-                    article_data = self._extract_article_from_url(
-                        article_url,
-                        source='Times of India',
-                        language='en'
-                    )
+        links = []
+        for item in soup.find_all('div', class_='articles', limit=self.max_articles_per_source):
+            link_tag = item.find('h2').find('a') if item.find('h2') else None
+            if link_tag:
+                links.append({'title': link_tag.get_text(strip=True), 'url': link_tag.get('href', '')})
+        return links
 
-                    if article_data:
-                        articles.append(article_data)
+    # =====================================================
+    # HELPER METHODS
+    # =====================================================
 
-                except Exception as e:
-                    logger.error(f"Error parsing TOI article: {str(e)}")
-                    continue
+    def load_known_hashes(self) -> Set[str]:
+        """URL hashes of articles stored recently enough to still be listed"""
+        since = timezone.now() - timedelta(days=get_scraper_setting('KNOWN_URL_DAYS'))
+        hashes = NewsArticle.objects.filter(scraped_at__gte=since).values_list('url_hash', flat=True)
+        return set(hashes.iterator(chunk_size=2000))
 
-        except Exception as e:
-            logger.error(f"Error scraping Times of India: {str(e)}")
+    def fetch(self, url, validators: Optional[Dict] = None) -> Optional[requests.Response]:
+        """
+        GET a page within the per-host limit; raises for HTTP errors
 
-        return articles
+        With the validators of an earlier response, returns None when the
+        page has not changed since.
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        with self.hosts.limit(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response
 
-    def scrape_indian_express_tn(self):
+    def _scrape_listing(self, source: NewsSource) -> Tuple[List[Dict], Optional[Tuple[str, Dict]]]:
         """
-        Scrape Indian Express Tamil Nadu Section
+        Political article links on a source's listing page
+
+        Returns:
+            (links, (cache key, validators) to keep once its articles are in)
         """
-        articles = []
+        key = f"news_scraper:validators:{url_hash(source.url)}"
         try:
-            url = "https://indianexpress.com/section/cities/chennai/"
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find news articles
-            news_items = soup.find_all('div', class_='articles', limit=self.max_articles_per_source)
-
-            for item in news_items:
-                try:
-                    link_tag = item.find('h2').find('a') if item.find('h2') else None
-                    if not link_tag:
-                        continue
-
-                    title = link_tag.get_text(strip=True)
-                    article_url = link_tag.get('href', '')
-
-                    if not self._is_political_article(title):
-                        continue
+            response = self.fetch(source.url, cache.get(key))
+            if response is None:
+                self._count('not_modified')
+                logger.info(f"{source.name}: not modified")
+                return [], None
+            links = getattr(self, source.parser)(response.content, source.url)
+        except Exception as e:
+            self._count('errors')
+            logger.error(f"Error scraping {source.name}: {str(e)}")
+            return [], None
 
-                    article_data = self._extract_article_from_url(
-                        article_url,
-                        source='Indian Express',
-                        language='en'
-                    )
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        links = [
+            dict(link, source=source.source, language=source.language)
+            for link in links if link['url'] and self._is_political_article(link['title'])
+        ]
+        return links, ((key, validators) if any(validators.values()) else None)
 
-                    if article_data:
-                        articles.append(article_data)
+    def _scrape_article(self, link: Dict) -> Tuple[Optional[Dict], bool]:
+        """
+        Download and extract one article
 
-                except Exception as e:
-                    logger.error(f"Error parsing Indian Express article: {str(e)}")
-                    continue
+        Returns:
+            (article data or None, whether the download failed)
+        """
+        try:
+            response = self.fetch(link['url'])
+        except requests.RequestException as e:
+            self._count('errors')
+            logger.error(f"Error extracting article from {link['url']}: {str(e)}")
+            return None, True
+        self._count('fetched')
 
+        try:
+            return self._parse_article(
+                response.content, link['url'], link['source'], link['language'], link.get('published'),
+            ), False
         except Exception as e:
-            logger.error(f"Error scraping Indian Express: {str(e)}")
-
-        return articles
-
-    # =====================================================
-    # HELPER METHODS
-    # =====================================================
+            logger.error(f"Error extracting article from {link['url']}: {str(e)}")
+            return None, False
 
     def _extract_article_from_url(self, url, source, language, published_date=None):
         """
         Extract full article content from URL
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract title
-            title_tag = soup.find('h1')
-            title = title_tag.get_text(strip=True) if title_tag else "No Title"
-
-            # Extract article text (combine all paragraph tags)
-            paragraphs = soup.find_all('p')
-            article_text = ' '.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-
-            # Extract author (common patterns)
-            author = None
-            author_tag = soup.find('span', class_='author') or soup.find('div', class_='author')
-            if author_tag:
-                author = author_tag.get_text(strip=True)
-
-            # Published date
-            if not published_date:
-                published_date = timezone.now()
-            elif isinstance(published_date, tuple):
-                # Convert time.struct_time to datetime
-                import time
-                published_date = datetime.fromtimestamp(time.mktime(published_date))
-                published_date = timezone.make_aware(published_date)
-
-            # Validate article length
-            if len(article_text) < 100:
-                logger.warning(f"Article too short, skipping: {url}")
-                return None
-
-            return {
-                'title': title,
-                'url': url,
-                'source': source,
-                'author': author,
-                'article_text': article_text,
-                'language': language,
-                'published_at': published_date,
-            }
+            response = self.fetch(url)
+            return self._parse_article(response.content, url, source, language, published_date)
 
         except Exception as e:
             logger.error(f"Error extracting article from {url}: {str(e)}")
             return None
 
+    def _parse_article(self, content, url, source, language, published_date=None):
+        """
+        Article data from a downloaded article page; None if it is too short
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # Extract title
+        title_tag = soup.find('h1')
+        title = title_tag.get_text(strip=True) if title_tag else "No Title"
+
+        # Extract article text (combine all paragraph tags)
+        paragraphs = soup.find_all('p')
+        article_text = ' '.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+
+        # Extract author (common patterns)
+        author = None
+        author_tag = soup.find('span', class_='author') or soup.find('div', class_='author')
+        if author_tag:
+            author = author_tag.get_text(strip=True)
+
+        # Published date
+        if not published_date:
+            published_date = timezone.now()
+        elif isinstance(published_date, tuple):
+            # feedparser's time.struct_time is in UTC
+            published_date = datetime.fromtimestamp(calendar.timegm(published_date), tz=dt_timezone.utc)
+
+        # Validate article length
+        if len(article_text) < 100:
+            logger.warning(f"Article too short, skipping: {url}")
+            return None
+
+        return {
+            'title': title,
+            'url': url,
+            'source': source,
+            'author': author,
+            'article_text': article_text,
+            'language': language,
+            'published_at': published_date,
+        }
+
     def _is_political_article(self, title):
         """
         Check if article title contains political keywords
@@ -351,52 +381,55 @@ class TamilNaduNewsScraper:
     # MAIN SCRAPING METHODS
     # =====================================================
 
+    def scrape_sources(self, sources: List[NewsSource]) -> List[Dict]:
+        """
+        Scrape the sources' listings, then the articles not seen before, concurrently
+        """
+        if self.known_hashes is None:
+            self.known_hashes = self.load_known_hashes()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            listings = list(pool.map(self._scrape_listing, sources))
+
+            links = []
+            for source_links, _ in listings:
+                for link in source_links:
+                    digest = url_hash(link['url'])
+                    if digest in self.known_hashes:
+                        self._count('known')
+                        continue
+                    self.known_hashes.add(digest)
+                    links.append(link)
+
+            results = list(pool.map(self._scrape_article, links))
+
+        # A listing is only taken as seen once all of its new articles were downloaded
+        incomplete = {link['source'] for link, (_, failed) in zip(links, results) if failed}
+        for source, (_, validators) in zip(sources, listings):
+            if validators and source.source not in incomplete:
+                cache.set(*validators, get_scraper_setting('VALIDATOR_TTL'))
+
+        articles = [article for article, _ in results if article]
+        logger.info(
+            f"Scraped {len(sources)} sources: {self.stats['not_modified']} not modified, "
+            f"{self.stats['known']} known links skipped, {self.stats['fetched']} articles fetched, "
+            f"{self.stats['errors']} errors"
+        )
+        return articles
+
     def scrape_all_tamil_sources(self):
         """
         Scrape all Tamil news sources
         """
         logger.info("Starting Tamil news scraping...")
-        all_articles = []
-
-        sources = [
-            ('Dinamalar', self.scrape_dinamalar),
-            ('Dinakaran', self.scrape_dinakaran),
-        ]
-
-        for source_name, scraper_func in sources:
-            try:
-                logger.info(f"Scraping {source_name}...")
-                articles = scraper_func()
-                all_articles.extend(articles)
-                logger.info(f"✅ {source_name}: {len(articles)} articles")
-            except Exception as e:
-                logger.error(f"❌ {source_name} failed: {str(e)}")
-
-        return all_articles
+        return self.scrape_sources(self.TAMIL_SOURCES)
 
     def scrape_all_english_sources(self):
         """
         Scrape all English news sources
         """
         logger.info("Starting English news scraping...")
-        all_articles = []
-
-        sources = [
-            ('The Hindu TN', self.scrape_the_hindu_tn),
-            ('Times of India Chennai', self.scrape_times_of_india_chennai),
-            ('Indian Express TN', self.scrape_indian_express_tn),
-        ]
-
-        for source_name, scraper_func in sources:
-            try:
-                logger.info(f"Scraping {source_name}...")
-                articles = scraper_func()
-                all_articles.extend(articles)
-                logger.info(f"✅ {source_name}: {len(articles)} articles")
-            except Exception as e:
-                logger.error(f"❌ {source_name} failed: {str(e)}")
-
-        return all_articles
+        return self.scrape_sources(self.ENGLISH_SOURCES)
 
     def scrape_all_sources(self):
         """
@@ -404,14 +437,12 @@ class TamilNaduNewsScraper:
         """
         logger.info("🚀 Starting full news scraping cycle...")
 
-        tamil_articles = self.scrape_all_tamil_sources()
-        english_articles = self.scrape_all_english_sources()
-
-        all_articles = tamil_articles + english_articles
+        all_articles = self.scrape_sources(self.TAMIL_SOURCES + self.ENGLISH_SOURCES)
+        tamil_count = sum(1 for article in all_articles if article['language'] == 'ta')
 
         logger.info(f"📊 Total articles scraped: {len(all_articles)}")
-        logger.info(f"   Tamil: {len(tamil_articles)}")
-        logger.info(f"   English: {len(english_articles)}")
+        logger.info(f"   Tamil: {tamil_count}")
+        logger.info(f"   English: {len(all_articles) - tamil_count}")
 
         return all_articles
 
@@ -432,41 +463,53 @@ def scrape_tamil_nadu_news():
 def save_articles_to_database(articles):
     """
     Save scraped articles to database
-    """
-    saved_count = 0
-    duplicate_count = 0
-    error_count = 0
 
-    for article_data in articles:
-        try:
-            # Check if article already exists
-            existing = NewsArticle.objects.filter(url=article_data['url']).first()
-            if existing:
-                duplicate_count += 1
-                continue
-
-            # Create new article (without AI processing yet)
-            article = NewsArticle.objects.create(
-                title=article_data['title'],
-                url=article_data['url'],
-                source=article_data['source'],
-                author=article_data.get('author'),
-                article_text=article_data['article_text'],
-                language=article_data['language'],
-                published_at=article_data['published_at'],
-                ai_processed=False,  # Will be processed by sentiment analyzer
-            )
-
-            saved_count += 1
-            logger.info(f"✅ Saved: {article.title[:50]}...")
+    Articles are keyed on their canonical URL hash: the ones already stored
+    cost a single lookup, the rest go in with one INSERT per BATCH_SIZE
+    that ignores conflicts, so a concurrent cycle saving the same article
+    cannot fail the batch.
 
-        except Exception as e:
-            error_count += 1
-            logger.error(f"❌ Error saving article: {str(e)}")
+    Returns:
+        list: ids of the newly stored articles, for sentiment analysis
+    """
+    # Each article once, even if listed by several sources
+    by_hash = {}
+    for article_data in articles:
+        by_hash.setdefault(url_hash(article_data['url']), article_data)
+    if not by_hash:
+        return []
+
+    existing = set(NewsArticle.objects.filter(url_hash__in=by_hash).values_list('url_hash', flat=True))
+    new_articles = [
+        NewsArticle(
+            title=article_data['title'][:500],
+            url=article_data['url'],
+            url_hash=digest,
+            source=article_data['source'],
+            author=(article_data.get('author') or '')[:200] or None,
+            article_text=article_data['article_text'],
+            language=article_data['language'],
+            published_at=article_data['published_at'],
+            ai_processed=False,  # Will be processed by sentiment analyzer
+        )
+        for digest, article_data in by_hash.items()
+        if digest not in existing and len(article_data['url']) <= 1000
+    ]
+
+    saved_ids = []
+    if new_articles:
+        NewsArticle.objects.bulk_create(
+            new_articles, batch_size=get_scraper_setting('BATCH_SIZE'), ignore_conflicts=True,
+        )
+        # Ids are generated here, so the rows that exist are the ones this insert stored
+        saved_ids = list(
+            NewsArticle.objects.filter(id__in=[article.id for article in new_articles]).values_list('id', flat=True)
+        )
+        # bulk_create skips NewsArticle.save(), which indexes an article for search
+        index_articles(saved_ids)
 
     logger.info(f"📊 Save Summary:")
-    logger.info(f"   Saved: {saved_count}")
-    logger.info(f"   Duplicates: {duplicate_count}")
-    logger.info(f"   Errors: {error_count}")
+    logger.info(f"   Saved: {len(saved_ids)}")
+    logger.info(f"   Duplicates: {len(articles) - len(saved_ids)}")
 
-    return saved_count
+    return saved_ids
@@ -0,0 +1,205 @@
+"""
+News Search
+Ranked full-text search over news articles in Tamil and English
+
+On PostgreSQL every article carries a search_vector behind a GIN index,
+with the title weighted above the text. English articles are indexed with
+the 'english' configuration (stemming, stop words), everything else with
+'simple', as PostgreSQL has no Tamil dictionary. A query is parsed with
+websearch syntax under both configurations and ranked with ts_rank.
+
+Other databases (SQLite in development and tests) use an inverted index
+of NewsSearchTerm rows, one per distinct term of an article and weighted
+by how often and where it occurs. A query matches the articles holding
+every one of its terms, ranked by the summed weights times each term's
+inverse document frequency.
+
+Terms are NFKC-normalized, case-folded words with Tamil vowel signs kept
+attached, as the local classifier tokenizes messages. Highlights are cut
+only from the page of results being returned.
+"""
+
+import html
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+
+from api.models import NewsArticle, NewsSearchTerm
+from api.services.local_classifier import tokenize
+from api.utils.result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_DEFAULTS = {
+    'TITLE_WEIGHT': 3,          # a title occurrence counts as this many in the text
+    'MAX_TERMS': 10,            # query terms used; the rest are ignored
+    'HIGHLIGHTS': 3,            # snippets per article
+    'HIGHLIGHT_WIDTH': 120,     # characters of context around a match
+    'SOURCES_CACHE_SECONDS': 3600,
+}
+
+# Search configuration per article language on PostgreSQL
+SEARCH_CONFIGS = {'en': 'english'}
+DEFAULT_SEARCH_CONFIG = 'simple'
+
+SOURCES_CACHE_KEY = 'news-search-sources'
+
+# Words as local_classifier.tokenize finds them, matched in the original text
+_WORD = re.compile('[\\w\u0900-\u097F\u0B80-\u0BFF\u0C00-\u0C7F]+')
+
+
+def get_search_setting(name: str):
+    return getattr(settings, 'NEWS_SEARCH', {}).get(name, SEARCH_DEFAULTS[name])
+
+
+def uses_postgres() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def search_terms(query: str) -> List[str]:
+    """Distinct terms of a search query, in order"""
+    terms = [term[:100] for term in dict.fromkeys(tokenize(query or ''))]
+    return terms[:get_search_setting('MAX_TERMS')]
+
+
+def term_weights(title: str, text: str) -> Dict[str, float]:
+    """Index weight of every term of an article: 1 + log of its title-weighted count"""
+    counts = Counter(term[:100] for term in tokenize(text or ''))
+    for term in tokenize(title or ''):
+        counts[term[:100]] += get_search_setting('TITLE_WEIGHT')
+    return {term: 1 + math.log(count) for term, count in counts.items()}
+
+
+def _search_vector(config: str):
+    return SearchVector('title', weight='A', config=config) + SearchVector('article_text', weight='B', config=config)
+
+
+def index_articles(article_ids: Iterable):
+    """(Re)index articles for search after their title or text was written"""
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+    articles = NewsArticle.objects.filter(id__in=article_ids)
+
+    if uses_postgres():
+        for language, config in SEARCH_CONFIGS.items():
+            articles.filter(language=language).update(search_vector=_search_vector(config))
+        articles.exclude(language__in=list(SEARCH_CONFIGS)).update(
+            search_vector=_search_vector(DEFAULT_SEARCH_CONFIG),
+        )
+        return
+
+    rows = [
+        NewsSearchTerm(article_id=article_id, term=term, weight=weight)
+        for article_id, title, text in articles.values_list('id', 'title', 'article_text')
+        for term, weight in term_weights(title, text).items()
+    ]
+    with transaction.atomic():
+        NewsSearchTerm.objects.filter(article_id__in=article_ids).delete()
+        NewsSearchTerm.objects.bulk_create(rows, batch_size=2000)
+
+
+def search_articles(queryset, query: str):
+    """
+    Articles of the queryset matching the query, best first
+
+    Adds a search_rank annotation. A query without any word matches nothing.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if uses_postgres():
+        search_query = (
+            SearchQuery(query, config=SEARCH_CONFIGS['en'], search_type='websearch')
+            | SearchQuery(query, config=DEFAULT_SEARCH_CONFIG, search_type='websearch')
+        )
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(search_rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-search_rank', '-published_at')
+        )
+
+    document_frequency = dict(
+        NewsSearchTerm.objects.filter(term__in=terms).values('term').annotate(articles=Count('article_id'))
+        .values_list('term', 'articles')
+    )
+    if len(document_frequency) < len(terms):
+        return queryset.none()
+
+    total = NewsArticle.objects.count()
+    idf = {term: math.log(1 + total / articles) for term, articles in document_frequency.items()}
+    matching = (
+        NewsSearchTerm.objects.filter(term__in=terms).values('article_id')
+        .annotate(matched=Count('term')).filter(matched=len(terms)).values('article_id')
+    )
+    rank = (
+        NewsSearchTerm.objects.filter(article=OuterRef('pk'), term__in=terms).values('article_id')
+        .annotate(rank=Sum(
+            Case(*[When(term=term, then=F('weight') * Value(idf[term])) for term in terms], output_field=FloatField())
+        ))
+        .values('rank')
+    )
+    return (
+        queryset.filter(id__in=matching)
+        .annotate(search_rank=Subquery(rank, output_field=FloatField()))
+        .order_by('-search_rank', '-published_at')
+    )
+
+
+def highlight(text: str, terms: Iterable[str], fragments: Optional[int] = None,
+              width: Optional[int] = None) -> List[str]:
+    """
+    Snippets of text around the search terms, HTML-escaped, terms in <mark>
+
+    Returns at most `fragments` non-overlapping snippets, in text order.
+    """
+    terms = set(terms)
+    fragments = fragments or get_search_setting('HIGHLIGHTS')
+    width = width or get_search_setting('HIGHLIGHT_WIDTH')
+    text = text or ''
+    spans = [match.span() for match in _WORD.finditer(text) if normalize_text(match.group()) in terms]
+
+    snippets = []
+    covered = 0
+    for start, end in spans:
+        if start < covered:
+            continue
+        # Widen to whole words
+        low = max(0, start - width // 2)
+        low = text.rfind(' ', 0, low) + 1 if low else 0
+        high = min(len(text), end + width // 2)
+        high = (text.find(' ', high) if text.find(' ', high) != -1 else len(text)) if high < len(text) else high
+
+        parts, cursor = [], low
+        for span_start, span_end in spans:
+            if span_start >= low and span_end <= high and span_start >= cursor:
+                parts.append(html.escape(text[cursor:span_start]))
+                parts.append(f"<mark>{html.escape(text[span_start:span_end])}</mark>")
+                cursor = span_end
+        parts.append(html.escape(text[cursor:high]))
+        snippets.append(('…' if low else '') + ''.join(parts).strip() + ('…' if high < len(text) else ''))
+
+        covered = high
+        if len(snippets) == fragments:
+            break
+    return snippets
+
+
+def sources_matching(fragment: str) -> List[str]:
+    """Stored source names containing the fragment, ignoring case"""
+    sources = cache.get(SOURCES_CACHE_KEY)
+    if sources is None:
+        sources = list(NewsArticle.objects.order_by().values_list('source', flat=True).distinct())
+        cache.set(SOURCES_CACHE_KEY, sources, get_search_setting('SOURCES_CACHE_SECONDS'))
+    fragment = fragment.casefold()
+    return [source for source in sources if fragment in source.casefold()]
@@ -0,0 +1,882 @@
+"""
+Report Engine
+Builds dataset snapshots once per (scope, period) and renders GeneratedReport
+files (PDF/Excel) from them inside Celery workers.
+
+A snapshot holds every aggregate the report templates need for one geographic
+scope and date range. All report types and export formats requested for that
+scope are rendered from the same snapshot, so a burst of scheduled reports
+only hits the database once per scope.
+"""
+
+import logging
+import time
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api.models import (
+    Campaign, Constituency, DirectFeedback, District, Event, FieldReport,
+    PollingBooth, SentimentData, State, Voter, VoterInteraction,
+)
+from api.models_analytics import GeneratedReport
+from api.utils.artifact_cache import artifact_cache, content_hash
+from api.utils.excel_exporter import ExcelExporter
+from api.utils.pdf_generator import ReportPDF, chart_artifact_paths
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_CACHE_PREFIX = 'report_snapshot'
+SNAPSHOT_TTL = getattr(settings, 'CACHE_TTL', {}).get('report_snapshot', 900)
+SNAPSHOT_LOCK_TIMEOUT = 120  # seconds another worker waits for a snapshot being built
+DEFAULT_PERIOD_DAYS = 30
+EXPORT_EXTENSIONS = {'pdf': 'pdf', 'excel': 'xlsx'}
+
+SCOPE_FIELDS = ('state_id', 'district_id', 'constituency_id')
+
+REPORT_TITLES = {
+    'executive_summary': 'Executive Summary Report',
+    'campaign_performance': 'Campaign Performance Report',
+    'constituency': 'Constituency Report',
+    'daily_activity': 'Daily Activity Report',
+    'weekly_summary': 'Weekly Summary Report',
+    'volunteer_performance': 'Volunteer Performance Report',
+    'custom': 'Custom Report',
+}
+
+
+# =====================================================
+# SCOPE AND PERIOD RESOLUTION
+# =====================================================
+
+
+def _to_date(value):
+    """Parse a date from a request/filter value ('None' and '' mean unset)"""
+    if not value or value == 'None':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if hasattr(value, 'isoformat') and not isinstance(value, str):
+        return value
+    try:
+        return parse_date(str(value))
+    except ValueError:
+        return None
+
+
+def _to_id(value):
+    """Parse an optional integer id"""
+    if value in (None, '', 'None'):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_report_scope(report: GeneratedReport) -> Tuple[Dict, object, object]:
+    """
+    Work out the geographic scope and date range a report covers
+
+    Returns:
+        (scope, date_from, date_to) where scope maps SCOPE_FIELDS to ids
+    """
+    filters = report.filters_used or {}
+
+    scope = {}
+    for field in SCOPE_FIELDS:
+        scope[field] = _to_id(filters.get(field, filters.get(field[:-3])))
+
+    today = timezone.now().date()
+
+    if report.report_type == 'daily_activity':
+        date_to = _to_date(filters.get('date')) or today
+        date_from = date_to
+    elif report.report_type == 'weekly_summary':
+        date_from = _to_date(filters.get('week_start'))
+        date_to = _to_date(filters.get('week_end'))
+        if not date_from:
+            reference = date_to or today
+            date_from = reference - timedelta(days=reference.weekday())
+        if not date_to:
+            date_to = date_from + timedelta(days=6)
+    else:
+        date_to = _to_date(filters.get('date_to')) or today
+        date_from = _to_date(filters.get('date_from')) or date_to - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+
+    return scope, date_from, date_to
+
+
+def snapshot_cache_key(scope: Dict, date_from, date_to) -> str:
+    """Cache key shared by every report over the same scope and period"""
+    scope_part = ':'.join(str(scope.get(field) or '-') for field in SCOPE_FIELDS)
+    return f"{SNAPSHOT_CACHE_PREFIX}:{scope_part}:{date_from}:{date_to}"
+
+
+# =====================================================
+# DATASET SNAPSHOT
+# =====================================================
+
+
+def _scope_filter(scope: Dict, prefix: str = '') -> Q:
+    """Build a Q object restricting a queryset to the snapshot scope"""
+    conditions = {
+        f'{prefix}{field}': value
+        for field, value in scope.items()
+        if value
+    }
+    return Q(**conditions)
+
+
+def _number(value):
+    """Make aggregate values cache/JSON friendly"""
+    if value is None:
+        return 0
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _counts(queryset, field) -> Dict:
+    """{value: count} for a single field"""
+    return {
+        (row[field] or 'unknown'): row['count']
+        for row in queryset.values(field).annotate(count=Count('id')).order_by(field)
+    }
+
+
+def _period_bounds(date_from, date_to):
+    """Aware datetimes covering [date_from, date_to] for index-friendly range filters"""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(date_from, dt_time.min), tz)
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), dt_time.min), tz)
+    return start, end
+
+
+def _scope_labels(scope: Dict) -> Dict:
+    """Human-readable names for the snapshot scope"""
+    labels = {'state': None, 'district': None, 'constituency': None}
+    if scope.get('state_id'):
+        labels['state'] = State.objects.filter(id=scope['state_id']).values_list('name', flat=True).first()
+    if scope.get('district_id'):
+        labels['district'] = District.objects.filter(id=scope['district_id']).values_list('name', flat=True).first()
+    if scope.get('constituency_id'):
+        labels['constituency'] = Constituency.objects.filter(
+            id=scope['constituency_id']
+        ).values_list('name', flat=True).first()
+    return labels
+
+
+def build_dataset_snapshot(scope: Dict, date_from, date_to) -> Dict:
+    """
+    Compute every aggregate used by the report templates for one scope/period
+
+    The result only contains plain Python types so it can be stored in the
+    shared cache and reused by other workers.
+    """
+    start, end = _period_bounds(date_from, date_to)
+    geo = _scope_filter(scope)
+
+    # Direct feedback
+    feedback = DirectFeedback.objects.filter(geo, submitted_at__gte=start, submitted_at__lt=end)
+    feedback_by_issue = [
+        {'issue': row['issue_category__name'] or 'Uncategorized', 'count': row['count']}
+        for row in feedback.values('issue_category__name').annotate(count=Count('id')).order_by('-count')[:10]
+    ]
+    feedback_daily = [
+        {'date': str(row['submitted_at__date']), 'count': row['count']}
+        for row in feedback.values('submitted_at__date').annotate(count=Count('id')).order_by('submitted_at__date')
+    ]
+
+    # Field reports
+    field_reports = FieldReport.objects.filter(geo, report_date__gte=date_from, report_date__lte=date_to)
+    field_report_totals = field_reports.aggregate(total=Count('id'), crowd=Sum('crowd_size'))
+    field_reports_daily = [
+        {'date': str(row['report_date']), 'count': row['count']}
+        for row in field_reports.values('report_date').annotate(count=Count('id')).order_by('report_date')
+    ]
+
+    # Voter interactions
+    interactions = VoterInteraction.objects.filter(
+        _scope_filter(scope, 'voter__'),
+        interaction_date__gte=start,
+        interaction_date__lt=end,
+    )
+
+    # Volunteer performance (field reports + interactions per user)
+    volunteers = {}
+    for row in field_reports.values(
+        'volunteer_id', 'volunteer__first_name', 'volunteer__last_name', 'volunteer__username'
+    ).annotate(
+        reports=Count('id'),
+        verified=Count('id', filter=Q(verification_status='verified')),
+        crowd=Sum('crowd_size'),
+    ):
+        name = f"{row['volunteer__first_name']} {row['volunteer__last_name']}".strip() or row['volunteer__username']
+        volunteers[row['volunteer_id']] = {
+            'volunteer_id': row['volunteer_id'],
+            'name': name,
+            'field_reports': row['reports'],
+            'verified_reports': row['verified'],
+            'crowd_reached': _number(row['crowd']),
+            'interactions': 0,
+        }
+    for row in interactions.exclude(contacted_by=None).values(
+        'contacted_by_id', 'contacted_by__first_name', 'contacted_by__last_name', 'contacted_by__username'
+    ).annotate(count=Count('id')):
+        entry = volunteers.get(row['contacted_by_id'])
+        if entry is None:
+            name = (
+                f"{row['contacted_by__first_name']} {row['contacted_by__last_name']}".strip()
+                or row['contacted_by__username']
+            )
+            entry = volunteers[row['contacted_by_id']] = {
+                'volunteer_id': row['contacted_by_id'],
+                'name': name,
+                'field_reports': 0,
+                'verified_reports': 0,
+                'crowd_reached': 0,
+                'interactions': 0,
+            }
+        entry['interactions'] = row['count']
+
+    # Sentiment
+    sentiment = SentimentData.objects.filter(geo, timestamp__gte=start, timestamp__lt=end)
+    sentiment_totals = sentiment.aggregate(records=Count('id'), avg_score=Avg('sentiment_score'))
+    sentiment_by_issue = [
+        {'issue': row['issue__name'], 'avg_score': round(_number(row['avg_score']), 2), 'count': row['count']}
+        for row in sentiment.values('issue__name').annotate(
+            avg_score=Avg('sentiment_score'), count=Count('id')
+        ).order_by('-count')[:10]
+    ]
+
+    # Voters
+    voters = Voter.objects.filter(geo, is_active=True)
+
+    # Campaigns overlapping the period
+    campaign_scope = Q()
+    if scope.get('constituency_id'):
+        campaign_scope &= Q(target_constituency_id=scope['constituency_id'])
+    if scope.get('district_id'):
+        campaign_scope &= Q(target_constituency__district_id=scope['district_id'])
+    if scope.get('state_id'):
+        campaign_scope &= Q(target_constituency__state_id=scope['state_id'])
+    campaigns = Campaign.objects.filter(
+        campaign_scope,
+        start_date__lte=date_to,
+        end_date__gte=date_from,
+    )
+    event_stats = {
+        row['campaign_id']: row
+        for row in Event.objects.filter(
+            campaign__in=campaigns, start_datetime__gte=start, start_datetime__lt=end
+        ).values('campaign_id').annotate(events=Count('id'), attendance=Sum('actual_attendance'))
+    }
+    campaign_rows = []
+    for campaign in campaigns.values(
+        'id', 'campaign_name', 'campaign_type', 'status', 'start_date', 'end_date',
+        'budget', 'spent_amount', 'metrics',
+    ):
+        events = event_stats.get(campaign['id'], {})
+        metrics = campaign['metrics'] or {}
+        campaign_rows.append({
+            'id': campaign['id'],
+            'name': campaign['campaign_name'],
+            'type': campaign['campaign_type'],
+            'status': campaign['status'],
+            'start_date': str(campaign['start_date']),
+            'end_date': str(campaign['end_date']),
+            'budget': _number(campaign['budget']),
+            'spent': _number(campaign['spent_amount']),
+            'reach': _number(metrics.get('reach')),
+            'events': events.get('events', 0),
+            'attendance': _number(events.get('attendance')),
+        })
+
+    booths = PollingBooth.objects.filter(geo, is_active=True).aggregate(
+        total=Count('id'), total_voters=Sum('total_voters')
+    )
+
+    return {
+        'scope': scope,
+        'scope_labels': _scope_labels(scope),
+        'date_from': str(date_from),
+        'date_to': str(date_to),
+        'built_at': timezone.now().isoformat(),
+        'feedback': {
+            'total': feedback.count(),
+            'by_status': _counts(feedback, 'status'),
+            'by_polarity': _counts(feedback, 'ai_sentiment_polarity'),
+            'by_urgency': _counts(feedback, 'ai_urgency'),
+            'by_issue': feedback_by_issue,
+            'daily': feedback_daily,
+        },
+        'field_reports': {
+            'total': field_report_totals['total'],
+            'crowd_reached': _number(field_report_totals['crowd']),
+            'by_type': _counts(field_reports, 'report_type'),
+            'by_verification': _counts(field_reports, 'verification_status'),
+            'daily': field_reports_daily,
+        },
+        'interactions': {
+            'total': interactions.count(),
+            'by_type': _counts(interactions, 'interaction_type'),
+            'by_sentiment': _counts(interactions, 'sentiment'),
+        },
+        'volunteers': sorted(
+            volunteers.values(),
+            key=lambda v: (v['field_reports'] + v['interactions']),
+            reverse=True,
+        ),
+        'sentiment': {
+            'records': sentiment_totals['records'],
+            'avg_score': round(_number(sentiment_totals['avg_score']), 2),
+            'by_polarity': _counts(sentiment, 'polarity'),
+            'by_issue': sentiment_by_issue,
+        },
+        'voters': {
+            'total': voters.count(),
+            'new': voters.filter(created_at__gte=start, created_at__lt=end).count(),
+            'by_sentiment': _counts(voters, 'sentiment'),
+            'by_party': _counts(voters, 'party_affiliation'),
+        },
+        'campaigns': campaign_rows,
+        'booths': {
+            'total': booths['total'],
+            'total_voters': _number(booths['total_voters']),
+        },
+    }
+
+
+# =====================================================
+# REPORT DATA BUILDERS (snapshot -> ReportPDF/ExcelExporter input)
+# =====================================================
+
+
+def _label(value) -> str:
+    return str(value).replace('_', ' ').title()
+
+
+def _count_table(title, counts: Dict, header='Category'):
+    rows = [[header, 'Count']]
+    rows.extend([_label(key), value] for key, value in counts.items())
+    return {'title': title, 'data': rows}
+
+
+def _pie_chart(title, counts: Dict):
+    return {
+        'title': title,
+        'type': 'pie',
+        'data': {'labels': [_label(k) for k in counts], 'values': list(counts.values())},
+    }
+
+
+def _trend_chart(title, daily: List[Dict], y_label='Count'):
+    return {
+        'title': title,
+        'type': 'line',
+        'data': {
+            'x': [row['date'] for row in daily],
+            'y': [row['count'] for row in daily],
+            'x_label': 'Date',
+            'y_label': y_label,
+        },
+    }
+
+
+def _base_report_data(report: GeneratedReport, snapshot: Dict) -> Dict:
+    generated_by = 'System'
+    if report.generated_by_id:
+        user = report.generated_by
+        generated_by = user.get_full_name() or user.username
+    return {
+        'report_name': report.report_name,
+        'date_from': snapshot['date_from'],
+        'date_to': snapshot['date_to'],
+        'generated_by': generated_by,
+        'summary': {},
+        'insights': [],
+        'charts': [],
+        'tables': [],
+    }
+
+
+def _activity_sections(data: Dict, snapshot: Dict):
+    """Feedback/field report sections shared by the activity style reports"""
+    feedback = snapshot['feedback']
+    field_reports = snapshot['field_reports']
+
+    data['summary'].update({
+        'feedback_submitted': feedback['total'],
+        'field_reports_submitted': field_reports['total'],
+        'voter_interactions': snapshot['interactions']['total'],
+        'new_voters_added': snapshot['voters']['new'],
+        'issues_raised': sum(row['count'] for row in feedback['by_issue']),
+    })
+    data['insights'].extend([
+        f"{feedback['total']} feedback submissions received",
+        f"{field_reports['total']} field reports submitted by volunteers",
+    ])
+    if feedback['by_issue']:
+        top_issue = feedback['by_issue'][0]
+        data['insights'].append(f"Top issue raised: {top_issue['issue']} ({top_issue['count']} submissions)")
+
+    if feedback['daily']:
+        data['charts'].append(_trend_chart('Feedback Trend', feedback['daily']))
+    if feedback['by_issue']:
+        data['tables'].append({
+            'title': 'Top Issues',
+            'data': [['Issue', 'Submissions']] + [[row['issue'], row['count']] for row in feedback['by_issue']],
+        })
+    if field_reports['by_type']:
+        data['tables'].append(_count_table('Field Reports by Type', field_reports['by_type'], 'Report Type'))
+
+
+def _sentiment_sections(data: Dict, snapshot: Dict):
+    sentiment = snapshot['sentiment']
+    data['summary']['average_sentiment_score'] = sentiment['avg_score']
+    if sentiment['records']:
+        data['insights'].append(
+            f"Average sentiment score {sentiment['avg_score']} across {sentiment['records']} data points"
+        )
+    if sentiment['by_polarity']:
+        data['charts'].append(_pie_chart('Sentiment Distribution', sentiment['by_polarity']))
+    if sentiment['by_issue']:
+        data['tables'].append({
+            'title': 'Sentiment by Issue',
+            'data': [['Issue', 'Average Score', 'Data Points']] + [
+                [row['issue'], row['avg_score'], row['count']] for row in sentiment['by_issue']
+            ],
+        })
+
+
+def _voter_sections(data: Dict, snapshot: Dict):
+    voters = snapshot['voters']
+    data['summary']['total_voters'] = voters['total']
+    if voters['by_sentiment']:
+        data['charts'].append({
+            'title': 'Voter Sentiment',
+            'type': 'bar',
+            'data': {
+                'labels': [_label(k) for k in voters['by_sentiment']],
+                'values': list(voters['by_sentiment'].values()),
+            },
+        })
+        data['tables'].append(_count_table('Voters by Sentiment', voters['by_sentiment'], 'Sentiment'))
+
+
+def _campaign_sections(data: Dict, snapshot: Dict, campaign_ids=None):
+    campaigns = snapshot['campaigns']
+    if campaign_ids:
+        wanted = {_to_id(cid) for cid in campaign_ids}
+        campaigns = [c for c in campaigns if c['id'] in wanted]
+
+    total_budget = sum(c['budget'] for c in campaigns)
+    total_spent = sum(c['spent'] for c in campaigns)
+    data['summary'].update({
+        'campaigns': len(campaigns),
+        'active_campaigns': sum(1 for c in campaigns if c['status'] == 'active'),
+        'total_budget': round(total_budget, 2),
+        'total_spent': round(total_spent, 2),
+        'total_reach': sum(c['reach'] for c in campaigns),
+        'events_held': sum(c['events'] for c in campaigns),
+    })
+    if total_budget:
+        data['insights'].append(f"{round(total_spent / total_budget * 100, 1)}% of campaign budget utilised")
+    if campaigns:
+        data['tables'].append({
+            'title': 'Campaigns',
+            'data': [['Campaign', 'Type', 'Status', 'Budget', 'Spent', 'Reach', 'Events', 'Attendance']] + [
+                [c['name'], _label(c['type']), _label(c['status']), c['budget'], c['spent'],
+                 c['reach'], c['events'], c['attendance']]
+                for c in campaigns
+            ],
+        })
+        data['charts'].append({
+            'title': 'Budget vs Spent',
+            'type': 'bar',
+            'data': {'labels': [c['name'] for c in campaigns], 'values': [c['spent'] for c in campaigns]},
+        })
+
+
+def _volunteer_sections(data: Dict, snapshot: Dict, volunteer_ids=None):
+    volunteers = snapshot['volunteers']
+    if volunteer_ids:
+        wanted = {_to_id(vid) for vid in volunteer_ids}
+        volunteers = [v for v in volunteers if v['volunteer_id'] in wanted]
+
+    data['summary'].update({
+        'active_volunteers': len(volunteers),
+        'field_reports': sum(v['field_reports'] for v in volunteers),
+        'verified_reports': sum(v['verified_reports'] for v in volunteers),
+        'voter_interactions': sum(v['interactions'] for v in volunteers),
+    })
+    if volunteers:
+        top = volunteers[0]
+        data['insights'].append(
+            f"Top volunteer: {top['name']} ({top['field_reports']} reports, {top['interactions']} interactions)"
+        )
+        data['tables'].append({
+            'title': 'Volunteer Leaderboard',
+            'data': [['Volunteer', 'Field Reports', 'Verified', 'Interactions', 'Crowd Reached']] + [
+                [v['name'], v['field_reports'], v['verified_reports'], v['interactions'], v['crowd_reached']]
+                for v in volunteers
+            ],
+        })
+        top_ten = volunteers[:10]
+        data['charts'].append({
+            'title': 'Top Volunteers',
+            'type': 'bar',
+            'data': {
+                'labels': [v['name'] for v in top_ten],
+                'values': [v['field_reports'] + v['interactions'] for v in top_ten],
+            },
+        })
+
+
+def build_executive_summary(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    _activity_sections(data, snapshot)
+    _sentiment_sections(data, snapshot)
+    _voter_sections(data, snapshot)
+    return data
+
+
+def build_campaign_performance(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    _campaign_sections(data, snapshot, (report.filters_used or {}).get('campaign_ids'))
+    return data
+
+
+def build_constituency(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    labels = snapshot['scope_labels']
+    if labels.get('constituency'):
+        data['insights'].append(f"Constituency: {labels['constituency']}")
+    data['summary'].update({
+        'polling_booths': snapshot['booths']['total'],
+        'registered_voters': snapshot['booths']['total_voters'],
+    })
+    _activity_sections(data, snapshot)
+    _sentiment_sections(data, snapshot)
+    _voter_sections(data, snapshot)
+    return data
+
+
+def build_daily_activity(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    _activity_sections(data, snapshot)
+    if snapshot['interactions']['by_type']:
+        data['tables'].append(
+            _count_table('Interactions by Type', snapshot['interactions']['by_type'], 'Interaction Type')
+        )
+    return data
+
+
+def build_weekly_summary(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    _activity_sections(data, snapshot)
+    _sentiment_sections(data, snapshot)
+    if snapshot['field_reports']['daily']:
+        data['charts'].append(_trend_chart('Field Reports Trend', snapshot['field_reports']['daily']))
+    return data
+
+
+def build_volunteer_performance(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    _volunteer_sections(data, snapshot, (report.filters_used or {}).get('volunteer_ids'))
+    return data
+
+
+CUSTOM_METRIC_SECTIONS = {
+    'feedback': _activity_sections,
+    'field_reports': _activity_sections,
+    'sentiment': _sentiment_sections,
+    'voters': _voter_sections,
+    'campaigns': _campaign_sections,
+    'volunteers': _volunteer_sections,
+}
+
+
+def build_custom(report, snapshot):
+    data = _base_report_data(report, snapshot)
+    metrics = (report.metadata or {}).get('metrics') or list(CUSTOM_METRIC_SECTIONS)
+    applied = set()
+    for metric in metrics:
+        section = CUSTOM_METRIC_SECTIONS.get(metric)
+        if section and section not in applied:
+            section(data, snapshot)
+            applied.add(section)
+    return data
+
+
+REPORT_BUILDERS = {
+    'executive_summary': build_executive_summary,
+    'campaign_performance': build_campaign_performance,
+    'constituency': build_constituency,
+    'daily_activity': build_daily_activity,
+    'weekly_summary': build_weekly_summary,
+    'volunteer_performance': build_volunteer_performance,
+    'custom': build_custom,
+}
+
+
+def build_report_data(report: GeneratedReport, snapshot: Dict) -> Dict:
+    """Turn a shared snapshot into the data dict for one report type"""
+    builder = REPORT_BUILDERS.get(report.report_type, build_executive_summary)
+    return builder(report, snapshot)
+
+
+def get_export_formats(report: GeneratedReport) -> List[str]:
+    """Formats to render: 'pdf', 'excel' or 'both' (from the request or template)"""
+    export_format = (report.metadata or {}).get('export_format')
+    if not export_format and report.template_id:
+        export_format = report.template.export_format
+    export_format = (export_format or 'pdf').lower()
+    if export_format == 'both':
+        return ['pdf', 'excel']
+    if export_format in ('excel', 'xlsx'):
+        return ['excel']
+    return ['pdf']
+
+
+# =====================================================
+# ENGINE
+# =====================================================
+
+
+class ReportEngine:
+    """
+    Renders GeneratedReport rows in a worker
+
+    Snapshots are memoised for the lifetime of the engine and shared between
+    workers through the Django cache, so rendering a batch of reports only
+    computes each (scope, period) dataset once.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self.snapshots_built = 0
+        self.artifacts_reused = 0
+
+    def get_snapshot(self, scope: Dict, date_from, date_to) -> Tuple[str, Dict]:
+        """Return (cache_key, snapshot), building it at most once across workers"""
+        key = snapshot_cache_key(scope, date_from, date_to)
+        if key in self._snapshots:
+            return key, self._snapshots[key]
+
+        snapshot = cache.get(key)
+        if snapshot is None:
+            lock_key = f"{key}:lock"
+            if cache.add(lock_key, True, SNAPSHOT_LOCK_TIMEOUT):
+                try:
+                    snapshot = self._build(scope, date_from, date_to)
+                    cache.set(key, snapshot, SNAPSHOT_TTL)
+                finally:
+                    cache.delete(lock_key)
+            else:
+                # Another worker is building this snapshot - wait for it
+                deadline = time.monotonic() + SNAPSHOT_LOCK_TIMEOUT
+                while snapshot is None and time.monotonic() < deadline:
+                    time.sleep(0.5)
+                    snapshot = cache.get(key)
+                if snapshot is None:
+                    snapshot = self._build(scope, date_from, date_to)
+
+        self._snapshots[key] = snapshot
+        return key, snapshot
+
+    def _build(self, scope, date_from, date_to):
+        self.snapshots_built += 1
+        return build_dataset_snapshot(scope, date_from, date_to)
+
+    def _set_progress(self, report: GeneratedReport, progress: int, status: Optional[str] = None):
+        """Persist progress without touching the rest of the row"""
+        report.progress = progress
+        updates = {'progress': progress, 'updated_at': timezone.now()}
+        if status:
+            report.status = status
+            updates['status'] = status
+        GeneratedReport.objects.filter(pk=report.pk).update(**updates)
+
+    def _artifact(self, report: GeneratedReport, export_format: str, data: Dict,
+                  branding: Optional[Dict]) -> Tuple[str, str]:
+        """
+        Return (digest, storage path) of the rendered file, rendering it only
+        when no artifact exists for the same data, template and branding
+        """
+        extension = EXPORT_EXTENSIONS[export_format]
+        digest = content_hash('report', report.report_type, export_format, data, branding)
+
+        path = artifact_cache.exists('reports', digest, extension)
+        if path:
+            self.artifacts_reused += 1
+            return digest, path
+
+        if export_format == 'pdf':
+            buffer = self.render_pdf(report, data, branding)
+        else:
+            buffer = self.render_excel(report, data)
+        return digest, artifact_cache.put('reports', digest, extension, buffer.getvalue())
+
+    def render_pdf(self, report: GeneratedReport, data: Dict, branding: Optional[Dict] = None):
+        title = REPORT_TITLES.get(report.report_type, 'Report')
+        return ReportPDF(title, data, branding).generate()
+
+    def render_excel(self, report: GeneratedReport, data: Dict):
+        return ExcelExporter(report.report_name, data).generate()
+
+    def render(self, report: GeneratedReport) -> GeneratedReport:
+        """Generate all requested files for a report and record the outcome"""
+        started = time.monotonic()
+        self._set_progress(report, 5, status='generating')
+
+        try:
+            scope, date_from, date_to = resolve_report_scope(report)
+            key, snapshot = self.get_snapshot(scope, date_from, date_to)
+            self._set_progress(report, 40)
+
+            data = build_report_data(report, snapshot)
+            branding = report.template.metadata.get('branding') if report.template_id else None
+            formats = get_export_formats(report)
+
+            files = {}
+            artifacts = {}
+            total_size = 0
+            step = 50 // len(formats)
+            progress = 40
+            for export_format in formats:
+                digest, path = self._artifact(report, export_format, data, branding)
+                url = artifact_cache.url(path)
+                if export_format == 'pdf':
+                    report.pdf_file_url = url
+                else:
+                    report.excel_file_url = url
+                files[export_format] = path
+                artifacts[export_format] = digest
+                total_size += artifact_cache.size(path)
+                progress += step
+                self._set_progress(report, progress)
+
+            metadata = dict(report.metadata or {})
+            metadata.update({
+                'files': files,
+                'artifacts': artifacts,
+                'chart_artifacts': chart_artifact_paths(data) if 'pdf' in formats else [],
+                'snapshot_key': key,
+            })
+            report.metadata = metadata
+            report.file_size = total_size
+            report.status = 'completed'
+            report.progress = 100
+            report.error_message = ''
+        except Exception as e:
+            logger.exception(f"Report generation failed for {report.report_id}")
+            report.status = 'failed'
+            report.error_message = str(e)
+
+        report.generation_time = Decimal(str(round(time.monotonic() - started, 2)))
+        report.save()
+        return report
+
+    def render_batch(self, reports: List[GeneratedReport]) -> List[GeneratedReport]:
+        """Render several reports, grouping them so each snapshot is built once"""
+        def group_key(report):
+            scope, date_from, date_to = resolve_report_scope(report)
+            return snapshot_cache_key(scope, date_from, date_to)
+
+        return [self.render(report) for report in sorted(reports, key=group_key)]
+
+
+def render_reports(report_ids: List[str]) -> List[GeneratedReport]:
+    """Load and render reports by report_id (entry point for the Celery tasks)"""
+    reports = list(
+        GeneratedReport.objects.select_related('template', 'generated_by').filter(report_id__in=report_ids)
+    )
+    return ReportEngine().render_batch(reports)
+
+
+# =====================================================
+# REUSE AND EVICTION
+# =====================================================
+
+
+def report_request_key(report: GeneratedReport) -> str:
+    """Hash of everything a report request depends on besides the data itself"""
+    metadata = {k: v for k, v in (report.metadata or {}).items() if k in ('metrics', 'visualizations', 'export_format')}
+    return content_hash(
+        'request', report.report_type, report.report_name, report.filters_used,
+        metadata, report.generated_by_id, report.template_id,
+    )
+
+
+def reuse_completed_report(report: GeneratedReport) -> bool:
+    """
+    Complete a new report instantly from an identical request rendered within
+    the snapshot TTL (the same window in which its data is considered fresh)
+
+    Returns True when the report was completed from an existing one.
+    """
+    now = timezone.now()
+    key = report_request_key(report)
+    metadata = dict(report.metadata or {})
+    metadata['request_key'] = key
+
+    source = GeneratedReport.objects.filter(
+        metadata__request_key=key,
+        status='completed',
+        created_at__gte=now - timedelta(seconds=SNAPSHOT_TTL),
+        expires_at__gt=now,
+    ).exclude(pk=report.pk).order_by('-created_at').first()
+
+    if source:
+        for field in ('files', 'artifacts', 'chart_artifacts', 'snapshot_key'):
+            if field in source.metadata:
+                metadata[field] = source.metadata[field]
+        metadata['reused_from'] = str(source.report_id)
+        report.pdf_file_url = source.pdf_file_url
+        report.excel_file_url = source.excel_file_url
+        report.file_size = source.file_size
+        report.generation_time = Decimal('0')
+        report.status = 'completed'
+        report.progress = 100
+
+    report.metadata = metadata
+    report.save()
+    return source is not None
+
+
+def _artifact_paths(metadata) -> set:
+    metadata = metadata or {}
+    return set(metadata.get('files', {}).values()) | set(metadata.get('chart_artifacts', []))
+
+
+def evict_report_artifacts(expired_reports) -> int:
+    """
+    Delete the artifacts of expired reports that no live report still uses
+
+    Artifacts are shared between reports with identical inputs, so a file is
+    only removed once every report referencing it has expired.
+    """
+    expired_ids = list(expired_reports.values_list('pk', flat=True))
+    candidates = set()
+    for metadata in expired_reports.values_list('metadata', flat=True):
+        candidates |= _artifact_paths(metadata)
+    if not candidates:
+        return 0
+
+    keep = set()
+    for metadata in GeneratedReport.objects.exclude(pk__in=expired_ids).values_list('metadata', flat=True):
+        keep |= _artifact_paths(metadata)
+
+    return artifact_cache.evict(candidates, keep=keep)
@@ -9,17 +9,72 @@ Analyzes:
 - Opposition (DMK/BJP/etc.) mentions
 - Key topics extraction
 - Sentiment reasoning
+
+Backlogs are analyzed by AnalysisPipeline: up to CONCURRENCY requests in
+flight, held within the account's requests-per-minute and tokens-per-minute
+budgets by two token buckets. Rate limits and server errors are retried
+with backoff; each request counts towards the article's
+processing_attempts, and an article that runs out of attempts gets the
+keyword analysis. Results are written with bulk_update and shared with
+the article's near-duplicates (see news_dedup), which are never sent.
+Only one pipeline drains at a time, so two workers never pay for the same
+article and their rate budgets never add up.
 """
 
 import logging
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import openai
 from openai import OpenAI
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 from api.models import NewsArticle
+from api.utils.rate_limit import TokenBucket
 
 logger = logging.getLogger(__name__)
 
 
+ANALYSIS_DEFAULTS = {
+    'REQUESTS_PER_MINUTE': 500,
+    'TOKENS_PER_MINUTE': 300000,
+    'CONCURRENCY': 8,
+    'MAX_ATTEMPTS': 3,              # processing_attempts before falling back to keywords
+    'RETRY_BASE_SECONDS': 2,        # backoff: base * 2 ** attempt
+    'MAX_COMPLETION_TOKENS': 800,
+    'BATCH_SIZE': 100,
+}
+
+LOCK_KEY = 'news-analysis-lock'
+LOCK_TIMEOUT = 900
+
+ANALYSIS_FIELDS = [
+    'tvk_sentiment', 'tvk_sentiment_score', 'sentiment_reasoning',
+    'vijay_mentions', 'tvk_mentions', 'dmk_mentions', 'opposition_mentions',
+    'key_topics', 'entities_mentioned', 'is_relevant', 'category', 'ai_summary',
+]
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError,
+)
+
+SYSTEM_PROMPT = "You are a political sentiment analyzer specializing in Tamil Nadu politics. Analyze news articles for sentiment toward Vijay (Thalapathy) and his TVK (Thamizhaga Vettri Kazhagam) party."
+
+
+def get_analysis_setting(name: str):
+    return getattr(settings, 'NEWS_ANALYSIS', {}).get(name, ANALYSIS_DEFAULTS[name])
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size: about four UTF-8 bytes per token, so Tamil counts heavier"""
+    return len(text.encode('utf-8')) // 4 + 1
+
+
 class TVKSentimentAnalyzer:
     """
     Analyzes news articles for TVK/Vijay political sentiment using LLM
@@ -32,7 +87,18 @@ class TVKSentimentAnalyzer:
             logger.warning("OPENAI_API_KEY not set, using fallback analysis")
             self.client = None
         else:
-            self.client = OpenAI(api_key=api_key)
+            # Retries are made by AnalysisPipeline, within the rate budgets; the
+            # connection pool is sized for its concurrent requests
+            concurrency = get_analysis_setting('CONCURRENCY')
+            self.client = OpenAI(
+                api_key=api_key,
+                base_url=getattr(settings, 'OPENAI_BASE_URL', None),
+                max_retries=0,
+                http_client=httpx.Client(
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                ),
+            )
 
         self.model = "gpt-4"  # or "gpt-3.5-turbo" for faster/cheaper
 
@@ -52,37 +118,38 @@ class TVKSentimentAnalyzer:
             return self._fallback_analysis(article_text)
 
         try:
-            # Construct analysis prompt
-            prompt = self._build_analysis_prompt(article_text, title, language)
-
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a political sentiment analyzer specializing in Tamil Nadu politics. Analyze news articles for sentiment toward Vijay (Thalapathy) and his TVK (Thamizhaga Vettri Kazhagam) party."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,  # Lower temperature for consistent analysis
-                response_format={"type": "json_object"}
-            )
-
-            # Parse response
-            result_text = response.choices[0].message.content
-            analysis = json.loads(result_text)
-
-            # Validate and normalize response
-            return self._normalize_analysis(analysis)
+            analysis, _ = self.request_analysis(self.build_messages(article_text, title, language))
+            return analysis
 
         except Exception as e:
             logger.error(f"LLM analysis failed: {str(e)}")
             return self._fallback_analysis(article_text)
 
+    def build_messages(self, article_text, title="", language="en"):
+        """Chat messages asking for the analysis of one article"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": self._build_analysis_prompt(article_text, title, language)},
+        ]
+
+    def request_analysis(self, messages) -> Tuple[Dict, int]:
+        """
+        One analysis request; raises on any failure
+
+        Returns:
+            (normalized analysis, total tokens used)
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,  # Lower temperature for consistent analysis
+            max_tokens=get_analysis_setting('MAX_COMPLETION_TOKENS'),
+            response_format={"type": "json_object"}
+        )
+        analysis = json.loads(response.choices[0].message.content)
+        used = response.usage.total_tokens if response.usage else 0
+        return self._normalize_analysis(analysis), used
+
     def _build_analysis_prompt(self, article_text, title, language):
         """
         Build the LLM analysis prompt
@@ -231,101 +298,192 @@ Focus on:
             'ai_summary': article_text[:200] + '...',
         }
 
-    def process_article(self, article_id):
+    def process_article(self, article):
         """
         Process a NewsArticle from database
 
         Args:
-            article_id: UUID of NewsArticle
+            article: NewsArticle, or its UUID
 
         Returns:
             bool: Success status
         """
-        try:
-            article = NewsArticle.objects.get(id=article_id)
-
-            # Skip if already processed
-            if article.ai_processed:
-                logger.info(f"Article {article_id} already processed")
-                return True
-
-            # Analyze
-            logger.info(f"Analyzing article: {article.title[:50]}...")
-            analysis = self.analyze_article(
-                article_text=article.article_text,
-                title=article.title,
-                language=article.language
-            )
+        if not isinstance(article, NewsArticle):
+            article = NewsArticle.objects.filter(id=article).first()
+            if article is None:
+                logger.error("Article not found")
+                return False
+
+        # Skip if already processed
+        if article.ai_processed:
+            logger.info(f"Article {article.id} already processed")
+            return True
 
-            # Update article with analysis results
-            article.tvk_sentiment = analysis['tvk_sentiment']
-            article.tvk_sentiment_score = analysis['tvk_sentiment_score']
-            article.sentiment_reasoning = analysis['sentiment_reasoning']
+        success_count, _ = AnalysisPipeline(self, concurrency=1).run([article])
+        return bool(success_count)
 
-            article.vijay_mentions = analysis['vijay_mentions']
-            article.tvk_mentions = analysis['tvk_mentions']
-            article.dmk_mentions = analysis['dmk_mentions']
-            article.opposition_mentions = analysis['opposition_mentions']
+    def process_unprocessed_articles(self, batch_size=10):
+        """
+        Process a batch of unprocessed articles concurrently
 
-            article.key_topics = analysis['key_topics']
-            article.entities_mentioned = analysis['entities_mentioned']
+        Args:
+            batch_size (int): Number of articles to process
 
-            article.is_relevant = analysis['is_relevant']
-            article.category = analysis['category']
+        Returns:
+            tuple: (success_count, error_count)
+        """
+        articles = list(pending_articles()[:batch_size])
+        success_count, error_count = AnalysisPipeline(self).run(articles)
 
-            article.ai_summary = analysis['ai_summary']
-            article.ai_processed = True
-            article.processing_attempts += 1
+        logger.info(f"📊 Batch processing complete: {success_count} success, {error_count} errors")
+        return success_count, error_count
 
-            article.save()
 
-            logger.info(f"✅ Analysis complete: {analysis['tvk_sentiment']} ({analysis['tvk_sentiment_score']})")
-            return True
+def pending_articles():
+    """
+    Unanalyzed articles with attempts left, newest first, loaded with just what analysis reads
 
-        except NewsArticle.DoesNotExist:
-            logger.error(f"Article {article_id} not found")
-            return False
-        except Exception as e:
-            logger.error(f"Error processing article {article_id}: {str(e)}")
+    Near-duplicates are left out: they get the analysis of their original.
+    """
+    return (
+        NewsArticle.objects
+        .filter(ai_processed=False, processing_attempts__lt=get_analysis_setting('MAX_ATTEMPTS'),
+                duplicate_of__isnull=True)
+        .only('id', 'title', 'article_text', 'language', 'processing_attempts', 'ai_processed')
+        .order_by('-scraped_at')
+    )
+
+
+class AnalysisPipeline:
+    """Analyzes articles concurrently within requests- and tokens-per-minute budgets"""
+
+    def __init__(self, analyzer: Optional[TVKSentimentAnalyzer] = None, concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 sleep=time.sleep):
+        self.analyzer = analyzer or TVKSentimentAnalyzer()
+        self.concurrency = concurrency or get_analysis_setting('CONCURRENCY')
+        self.max_attempts = get_analysis_setting('MAX_ATTEMPTS')
+        self.sleep = sleep
+        requests_per_minute = requests_per_minute or get_analysis_setting('REQUESTS_PER_MINUTE')
+        tokens_per_minute = tokens_per_minute or get_analysis_setting('TOKENS_PER_MINUTE')
+        # Bursts of up to ten seconds' budget, then the per-minute rate
+        self.requests = TokenBucket(requests_per_minute / 60, capacity=max(requests_per_minute / 6, 1), sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute / 6, sleep=sleep)
+        self.tokens_used = 0
+        self._lock = threading.Lock()
+
+    def analyze(self, article: NewsArticle) -> Tuple[Optional[Dict], str, int]:
+        """
+        Analyze one article, retrying rate limits and server errors
 
-            # Update error status
+        Returns:
+            (analysis or None, last error, requests made)
+        """
+        if not self.analyzer.client:
+            return self.analyzer._fallback_analysis(article.article_text), '', 1
+
+        messages = self.analyzer.build_messages(article.article_text, article.title, article.language)
+        estimate = estimate_tokens(messages[0]['content'] + messages[1]['content']) + \
+            get_analysis_setting('MAX_COMPLETION_TOKENS')
+        remaining = max(self.max_attempts - article.processing_attempts, 1)
+        error = ''
+
+        for attempt in range(remaining):
+            self.requests.acquire()
+            self.tokens.acquire(estimate)
             try:
-                article = NewsArticle.objects.get(id=article_id)
-                article.processing_error = str(e)
-                article.processing_attempts += 1
-                article.save()
-            except:
-                pass
+                analysis, used = self.analyzer.request_analysis(messages)
+            except RETRYABLE_ERRORS as e:
+                error = str(e)
+                delay = get_analysis_setting('RETRY_BASE_SECONDS') * (2 ** attempt)
+                if isinstance(e, openai.RateLimitError):
+                    # The account is over budget: hold every worker back
+                    self.requests.pause(delay)
+                if attempt + 1 < remaining:
+                    self.sleep(delay)
+            except Exception as e:
+                # Malformed response or rejected request; retrying the same prompt won't help
+                logger.error(f"Error analyzing article {article.id}: {str(e)}")
+                return None, str(e), attempt + 1
+            else:
+                self.tokens.adjust(estimate - used)
+                with self._lock:
+                    self.tokens_used += used
+                return analysis, '', attempt + 1
 
-            return False
+        logger.warning(f"Analysis of article {article.id} failed after {remaining} attempts: {error}")
+        return None, error, remaining
 
-    def process_unprocessed_articles(self, batch_size=10):
+    def run(self, articles: List[NewsArticle]) -> Tuple[int, int]:
         """
-        Process all unprocessed articles in batches
-
-        Args:
-            batch_size (int): Number of articles to process
+        Analyze articles and write the results in bulk
 
         Returns:
-            tuple: (success_count, error_count)
+            tuple: (analyzed_count, error_count)
         """
-        # Get unprocessed articles
-        unprocessed = NewsArticle.objects.filter(
-            ai_processed=False,
-            processing_attempts__lt=3  # Max 3 attempts
-        ).order_by('-scraped_at')[:batch_size]
-
-        success_count = 0
-        error_count = 0
-
-        for article in unprocessed:
-            if self.process_article(article.id):
-                success_count += 1
-            else:
-                error_count += 1
+        if not articles:
+            return 0, 0
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(articles))) as pool:
+            outcomes = list(pool.map(self.analyze, articles))
+
+        now = timezone.now()
+        analyzed, failed = [], []
+        for article, (analysis, error, attempts) in zip(articles, outcomes):
+            article.processing_attempts += attempts
+            article.processing_error = error or None
+            article.updated_at = now
+            if analysis is None and article.processing_attempts >= self.max_attempts:
+                analysis = self.analyzer._fallback_analysis(article.article_text)
+            if analysis is None:
+                failed.append(article)
+                continue
+            for field in ANALYSIS_FIELDS:
+                setattr(article, field, analysis[field])
+            article.ai_processed = True
+            analyzed.append(article)
 
-        logger.info(f"📊 Batch processing complete: {success_count} success, {error_count} errors")
-        return success_count, error_count
+        status_fields = ['ai_processed', 'processing_error', 'processing_attempts', 'updated_at']
+        NewsArticle.objects.bulk_update(analyzed, ANALYSIS_FIELDS + status_fields, batch_size=500)
+        NewsArticle.objects.bulk_update(failed, status_fields, batch_size=500)
+
+        from api.services.news_dedup import share_analysis
+        share_analysis(analyzed)
+        return len(analyzed), len(failed)
+
+    def drain(self, batch_size: Optional[int] = None, time_budget: Optional[float] = None,
+              article_ids: Optional[List] = None) -> Dict[str, int]:
+        """
+        Analyze the backlog (or just article_ids) batch by batch until it is
+        empty or the time budget is spent
+
+        Only one drain runs at a time; a drain that finds another one running
+        returns at once and leaves the articles to it or the next backlog run.
+        Articles that failed in this run are not retried until the next one.
+        """
+        if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+            return {'analyzed': 0, 'failed': 0, 'tokens': 0}
+
+        batch_size = batch_size or get_analysis_setting('BATCH_SIZE')
+        pending = pending_articles()
+        if article_ids is not None:
+            pending = pending.filter(id__in=article_ids)
+        started = time.monotonic()
+        seen = set()
+        analyzed = failed = 0
+        try:
+            while time_budget is None or time.monotonic() - started < time_budget:
+                articles = list(pending.exclude(id__in=seen)[:batch_size])
+                if not articles:
+                    break
+                seen.update(article.id for article in articles)
+                batch_analyzed, batch_failed = self.run(articles)
+                analyzed += batch_analyzed
+                failed += batch_failed
+                cache.touch(LOCK_KEY, LOCK_TIMEOUT)
+        finally:
+            cache.delete(LOCK_KEY)
+        return {'analyzed': analyzed, 'failed': failed, 'tokens': self.tokens_used}
 
 
 # =====================================================
@@ -344,5 +502,5 @@ def analyze_all_unprocessed_articles():
     """
     Analyze all unprocessed articles
     """
-    analyzer = TVKSentimentAnalyzer()
-    return analyzer.process_unprocessed_articles(batch_size=50)
+    result = AnalysisPipeline().drain()
+    return result['analyzed'], result['failed']
@@ -0,0 +1,231 @@
+"""
+Voter Search
+Indexed search-as-you-type over voters by phone, voter ID, name or email
+
+Every voter stores normalized search keys, set on save:
+
+- phone_digits: the national number, digits only, so "+91 98765-43210",
+  "098765 43210" and "9876543210" are one key
+- voter_id_key: the voter ID in upper case without separators
+- name_key: a phonetic skeleton of the full name in Latin letters. Tamil
+  script is transliterated and spelling variants that Tamil does not
+  distinguish (g/k, d/t, b/p, j/ch/s, th/t, zh/l, doubled letters, long
+  vowels) are folded, so "Geetha", "Geeta" and "கீதா" share the key "kita".
+
+Phone and voter ID queries are prefix matches on btree indexes built with
+varchar_pattern_ops on PostgreSQL, so LIKE 'prefix%' is an index range
+scan under any collation. Name queries are ranked by pg_trgm word
+similarity behind a GIN trigram index on PostgreSQL; other databases
+(SQLite in development and tests) keep the trigrams of each name key as
+VoterNameTrigram rows and rank by the share of the query's trigrams found.
+Searches only narrow the queryset they are given, so role scoping applied
+before them holds.
+"""
+
+import logging
+import math
+import re
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import Count, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast
+
+from api.models import Voter, VoterNameTrigram
+from api.utils.result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+VOTER_SEARCH_DEFAULTS = {
+    'MIN_QUERY_LENGTH': 3,      # characters of a normalized key before a search matches anything
+    'NAME_SIMILARITY': 0.6,     # share of query trigrams a name needs; pg_trgm's own default on PostgreSQL
+}
+
+TAMIL_VOWELS = {
+    'அ': 'a', 'ஆ': 'a', 'இ': 'i', 'ஈ': 'i', 'உ': 'u', 'ஊ': 'u', 'எ': 'e', 'ஏ': 'e',
+    'ஐ': 'ai', 'ஒ': 'o', 'ஓ': 'o', 'ஔ': 'au', 'ஃ': 'k',
+}
+
+TAMIL_CONSONANTS = {
+    'க': 'k', 'ங': 'n', 'ச': 's', 'ஞ': 'n', 'ட': 't', 'ண': 'n', 'த': 't', 'ந': 'n',
+    'ப': 'p', 'ம': 'm', 'ய': 'y', 'ர': 'r', 'ல': 'l', 'வ': 'v', 'ழ': 'l', 'ள': 'l',
+    'ற': 'r', 'ன': 'n', 'ஜ': 's', 'ஷ': 's', 'ஸ': 's', 'ஹ': 'h',
+}
+
+# Vowel signs replace a consonant's inherent 'a'; the pulli (virama) removes it
+TAMIL_VOWEL_SIGNS = {
+    'ா': 'a', 'ி': 'i', 'ீ': 'i', 'ு': 'u', 'ூ': 'u', 'ெ': 'e', 'ே': 'e',
+    'ை': 'ai', 'ொ': 'o', 'ோ': 'o', 'ௌ': 'au', '்': '', 'ௗ': '',
+}
+
+# Latin spellings folded to the sounds Tamil script writes with one letter
+LATIN_DIGRAPHS = (
+    ('zh', 'l'), ('sh', 's'), ('ch', 's'), ('jh', 's'), ('th', 't'), ('dh', 't'),
+    ('kh', 'k'), ('gh', 'k'), ('ph', 'p'), ('bh', 'p'), ('ee', 'i'), ('oo', 'u'),
+)
+LATIN_LETTERS = str.maketrans({
+    'g': 'k', 'c': 'k', 'q': 'k', 'd': 't', 'b': 'p', 'f': 'p', 'j': 's', 'z': 's', 'w': 'v', 'x': 'ks',
+})
+
+_NAME_WORD = re.compile('[a-z\u0B80-\u0BFF]+')
+_INTERVOCALIC_H = re.compile('(?<=[aeiou])h(?=[aeiou])')
+_REPEATS = re.compile(r'(.)\1+')
+_PHONE_QUERY = re.compile(r'\+?[\d\s().-]+')
+
+
+def get_voter_search_setting(name: str):
+    return getattr(settings, 'VOTER_SEARCH', {}).get(name, VOTER_SEARCH_DEFAULTS[name])
+
+
+def uses_postgres() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def transliterate(word: str) -> str:
+    """Latin letters for a word in Tamil script; other characters pass through"""
+    letters = []
+    for char in word:
+        if char in TAMIL_CONSONANTS:
+            letters.append(TAMIL_CONSONANTS[char] + 'a')
+        elif char in TAMIL_VOWEL_SIGNS:
+            if letters and letters[-1].endswith('a'):
+                letters[-1] = letters[-1][:-1]
+            letters.append(TAMIL_VOWEL_SIGNS[char])
+        else:
+            letters.append(TAMIL_VOWELS.get(char, char))
+    return ''.join(letters)
+
+
+def name_key(*names: str) -> str:
+    """Phonetic skeleton of a name, one key per word, the same for its Tamil and Latin spellings"""
+    words = []
+    for word in _NAME_WORD.findall(normalize_text(' '.join(name for name in names if name))):
+        word = transliterate(word)
+        for digraph, letter in LATIN_DIGRAPHS:
+            word = word.replace(digraph, letter)
+        word = _INTERVOCALIC_H.sub('k', word).translate(LATIN_LETTERS)
+        words.append(_REPEATS.sub(r'\1', word))
+    return ' '.join(words)[:300]
+
+
+def phone_digits(phone: str) -> str:
+    """National number of a phone, digits only, without trunk or Indian country prefix"""
+    digits = re.sub('[^0-9]', '', phone or '').lstrip('0')
+    if len(digits) > 10 and digits.startswith('91'):
+        digits = digits[2:]
+    return digits
+
+
+def voter_id_key(voter_id: str) -> str:
+    """Voter ID in upper case, letters and digits only"""
+    return re.sub('[^0-9A-Z]', '', (voter_id or '').upper())
+
+
+def name_trigrams(key: str) -> set:
+    """Trigrams of a name key as pg_trgm forms them, each word padded with two spaces before and one after"""
+    trigrams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def search_keys(voter) -> dict:
+    """Search key field values of a voter, from its phone, voter ID and names"""
+    return {
+        'phone_digits': phone_digits(voter.phone),
+        'voter_id_key': voter_id_key(voter.voter_id),
+        'name_key': name_key(voter.first_name, voter.middle_name, voter.last_name),
+    }
+
+
+def index_voter_names(voter_ids: Iterable):
+    """(Re)build the name trigrams of voters; PostgreSQL indexes name_key itself"""
+    voter_ids = list(voter_ids)
+    if not voter_ids or uses_postgres():
+        return
+    rows = [
+        VoterNameTrigram(voter_id=voter_id, trigram=trigram)
+        for voter_id, key in Voter.objects.filter(id__in=voter_ids).values_list('id', 'name_key')
+        for trigram in name_trigrams(key)
+    ]
+    with transaction.atomic():
+        VoterNameTrigram.objects.filter(voter_id__in=voter_ids).delete()
+        VoterNameTrigram.objects.bulk_create(rows, batch_size=2000)
+
+
+def index_unindexed_names(chunk_size: int = 5000) -> int:
+    """Build the name trigrams of voters written without save(), such as synthetic loads; returns their number"""
+    if uses_postgres():
+        return 0
+    voter_ids = list(
+        Voter.objects.filter(name_trigrams__isnull=True).exclude(name_key='').values_list('id', flat=True)
+    )
+    for start in range(0, len(voter_ids), chunk_size):
+        index_voter_names(voter_ids[start:start + chunk_size])
+    return len(voter_ids)
+
+
+def _search_names(queryset, key: str):
+    if uses_postgres():
+        return (
+            queryset.filter(name_key__trigram_word_similar=key)
+            .annotate(search_rank=TrigramWordSimilarity(key, 'name_key'))
+            .order_by('-search_rank', 'name_key')
+        )
+
+    trigrams = name_trigrams(key)
+    shared = (
+        VoterNameTrigram.objects.filter(trigram__in=trigrams).values('voter_id')
+        .annotate(shared=Count('trigram'))
+    )
+    needed = math.ceil(get_voter_search_setting('NAME_SIMILARITY') * len(trigrams))
+    rank = (
+        shared.filter(voter_id=OuterRef('pk'))
+        .annotate(rank=Cast('shared', FloatField()) / Value(float(len(trigrams))))
+        .values('rank')
+    )
+    return (
+        queryset.filter(id__in=shared.filter(shared__gte=needed).values('voter_id'))
+        .annotate(search_rank=Subquery(rank, output_field=FloatField()))
+        .order_by('-search_rank', 'name_key')
+    )
+
+
+def search_voters(queryset, query: str):
+    """
+    Voters of the queryset matching a search box query, best first
+
+    The query is read as an email when it has an '@', as a phone number
+    when it is digits and phone punctuation, as a voter ID when it has
+    letters and digits, and as a name otherwise. Queries shorter than
+    MIN_QUERY_LENGTH once normalized match nothing.
+    """
+    query = (query or '').strip()
+    min_length = get_voter_search_setting('MIN_QUERY_LENGTH')
+
+    if '@' in query:
+        return queryset.filter(email__in={query, query.lower()})
+
+    if _PHONE_QUERY.fullmatch(query):
+        digits = re.sub('[^0-9]', '', query).lstrip('0')
+        if query.startswith('+') or len(digits) > 10:
+            digits = digits[2:] if digits.startswith('91') else digits
+        if len(digits) < min_length:
+            return queryset.none()
+        return queryset.filter(phone_digits__startswith=digits).order_by('phone_digits')
+
+    if any(char.isdigit() for char in query):
+        key = voter_id_key(query)
+        if len(key) < min_length:
+            return queryset.none()
+        return queryset.filter(voter_id_key__startswith=key).order_by('voter_id_key')
+
+    key = name_key(query)
+    if len(key.replace(' ', '')) < min_length:
+        return queryset.none()
+    return _search_names(queryset, key)
+
@@ -0,0 +1,182 @@
+"""
+Voter Sentiment Time Series
+Per-voter sentiment stored as VoterSentimentEvent rows instead of a JSON
+list rewritten on every conversation.
+
+Recording a sentiment is one insert. A daily job downsamples events older
+than RAW_DAYS into per-day buckets and day buckets older than DAILY_DAYS
+into per-week buckets, each holding the mean score and event count, so
+the rows per voter stay bounded by roughly RAW_DAYS events, DAILY_DAYS
+days and one row per week beyond.
+
+Questions over many voters ("whose sentiment dropped in the last 30
+days?") are a single aggregate over a recorded_at range scan.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Max, Q, Sum
+from django.db.models.functions import Cast, TruncDay, TruncWeek
+from django.utils import timezone
+
+from api.models import VoterProfile, VoterSentimentEvent
+
+logger = logging.getLogger(__name__)
+
+
+SENTIMENT_DEFAULTS = {
+    'RAW_DAYS': 7,          # individual events kept this long
+    'DAILY_DAYS': 90,       # then one row per day, then one per week
+    'MAX_TOPICS': 50,       # topic_interests keeps the most frequent topics
+    'BATCH_SIZE': 2000,
+}
+
+# Each level is compacted from the levels before it
+COMPACTIONS = [
+    ('day', ['event'], TruncDay, 'RAW_DAYS'),
+    ('week', ['event', 'day'], TruncWeek, 'DAILY_DAYS'),
+]
+
+
+def get_sentiment_setting(name: str):
+    return getattr(settings, 'VOTER_SENTIMENT', {}).get(name, SENTIMENT_DEFAULTS[name])
+
+
+def _weighted(condition: Optional[Q] = None):
+    return Sum(F('score') * F('count'), filter=condition, output_field=FloatField())
+
+
+def _mean(condition: Optional[Q] = None):
+    """Event-weighted mean score of the aggregated rows"""
+    return _weighted(condition) / Cast(Sum('count', filter=condition), FloatField())
+
+
+def record_sentiment(voter_profile: VoterProfile, score: float,
+                     recorded_at: Optional[datetime] = None) -> VoterSentimentEvent:
+    """Append one sentiment reading to a voter's history"""
+    return VoterSentimentEvent.objects.create(
+        voter_profile=voter_profile,
+        score=max(-1.0, min(1.0, float(score))),
+        recorded_at=recorded_at or timezone.now(),
+    )
+
+
+def count_topics(topic_interests: Dict[str, int], topics: List[str]) -> Dict[str, int]:
+    """Topic counters with new mentions added, keeping only the most frequent topics"""
+    counts = dict(topic_interests or {})
+    for topic in topics:
+        counts[topic] = counts.get(topic, 0) + 1
+    top = sorted(counts.items(), key=lambda item: -item[1])[:get_sentiment_setting('MAX_TOPICS')]
+    return dict(top)
+
+
+def sentiment_series(voter_profile, since: Optional[datetime] = None) -> List[Dict]:
+    """A voter's history, oldest first, at whatever resolution each period is stored"""
+    events = VoterSentimentEvent.objects.filter(voter_profile=voter_profile)
+    if since is not None:
+        events = events.filter(recorded_at__gte=since)
+    return [
+        {'date': recorded_at.isoformat(), 'score': round(score, 4), 'count': count, 'resolution': resolution}
+        for recorded_at, score, count, resolution in
+        events.order_by('recorded_at').values_list('recorded_at', 'score', 'count', 'resolution')
+    ]
+
+
+def sentiment_changes(days: int = 30, baseline_days: int = 60, now: Optional[datetime] = None):
+    """
+    Mean sentiment per voter over the last `days` and the `baseline_days` before
+
+    Returns a values queryset of voter_profile_id, recent, baseline and
+    change (recent - baseline) for voters with readings in both periods.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(days=days)
+    recent = Q(recorded_at__gte=since)
+    baseline = Q(recorded_at__lt=since)
+    return (
+        VoterSentimentEvent.objects
+        .filter(recorded_at__gte=since - timedelta(days=baseline_days), recorded_at__lte=now)
+        .values('voter_profile_id')
+        .annotate(recent=_mean(recent), baseline=_mean(baseline))
+        .filter(recent__isnull=False, baseline__isnull=False)
+        .annotate(change=F('recent') - F('baseline'))
+        .order_by('change')
+    )
+
+
+def sentiment_dropped(days: int = 30, min_drop: float = 0.2, baseline_days: int = 60,
+                      now: Optional[datetime] = None):
+    """Voter profiles whose mean sentiment fell by at least `min_drop` in the last `days`"""
+    changes = sentiment_changes(days, baseline_days, now).filter(change__lte=-min_drop)
+    return VoterProfile.objects.filter(id__in=changes.values('voter_profile_id'))
+
+
+def _compact(resolution: str, sources: List[str], trunc, cutoff: datetime) -> int:
+    """Fold source rows older than cutoff into buckets; returns the rows removed"""
+    rows = VoterSentimentEvent.objects.filter(resolution__in=sources, recorded_at__lt=cutoff)
+    # Rows arriving during the compaction wait for the next run
+    last_id = rows.aggregate(last=Max('id'))['last']
+    if last_id is None:
+        return 0
+    rows = rows.filter(id__lte=last_id)
+
+    buckets = list(
+        rows.annotate(bucket=trunc('recorded_at'))
+        .values('voter_profile_id', 'bucket')
+        .annotate(weighted=_weighted(), total=Sum('count'))
+        .order_by()
+    )
+
+    batch_size = get_sentiment_setting('BATCH_SIZE')
+    with transaction.atomic():
+        for start in range(0, len(buckets), batch_size):
+            batch = buckets[start:start + batch_size]
+            # A bucket can exist already when late events arrive for a compacted period
+            existing = {
+                (event.voter_profile_id, event.recorded_at): event
+                for event in VoterSentimentEvent.objects.filter(
+                    resolution=resolution,
+                    voter_profile_id__in={row['voter_profile_id'] for row in batch},
+                    recorded_at__in={row['bucket'] for row in batch},
+                )
+            }
+            created, updated = [], []
+            for row in batch:
+                event = existing.get((row['voter_profile_id'], row['bucket']))
+                if event is None:
+                    created.append(VoterSentimentEvent(
+                        voter_profile_id=row['voter_profile_id'], recorded_at=row['bucket'],
+                        score=row['weighted'] / row['total'], count=row['total'], resolution=resolution,
+                    ))
+                else:
+                    total = event.count + row['total']
+                    event.score = (event.score * event.count + row['weighted']) / total
+                    event.count = total
+                    updated.append(event)
+            VoterSentimentEvent.objects.bulk_create(created, batch_size=1000)
+            VoterSentimentEvent.objects.bulk_update(updated, ['score', 'count'], batch_size=1000)
+        removed, _ = rows.delete()
+    return removed
+
+
+def _bucket_start(resolution: str, moment: datetime) -> datetime:
+    """Start of the day or week containing moment, as TruncDay/TruncWeek compute it"""
+    start = timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def compact_sentiment_events(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Downsample aged events into day and week buckets; returns rows folded per level"""
+    now = now or timezone.now()
+    result = {}
+    for resolution, sources, trunc, age_setting in COMPACTIONS:
+        # Only whole buckets, so a bucket straddling the cutoff waits for the next run
+        cutoff = _bucket_start(resolution, now - timedelta(days=get_sentiment_setting(age_setting)))
+        result[resolution] = _compact(resolution, sources, trunc, cutoff)
+    return result
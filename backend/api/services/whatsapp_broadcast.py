@@ -0,0 +1,394 @@
+"""
+WhatsApp Broadcasts
+Sends a template message to every voter in a segment, throttled to the
+WhatsApp Cloud API throughput of the sending number.
+
+A broadcast streams its segment in primary key order with a server-side
+cursor, CHUNK_SIZE recipients at a time. Each chunk is sent by a pool of
+CONCURRENCY workers over one pooled HTTP session, all drawing from a token
+bucket refilled at MESSAGES_PER_SECOND (the number's messaging tier).
+The chunk's numbers are recorded as queued recipients before any is sent;
+their outcomes are written with one bulk upsert afterwards, and the
+broadcast's counters and cursor move past the chunk in the same
+transaction.
+
+A run that stops (worker lost, time budget spent, broadcast paused)
+resumes after the cursor. Numbers already recorded for the broadcast are
+never sent again: a run that dies mid-chunk leaves its numbers queued,
+and the resumed run marks them failed as unconfirmed instead of sending
+them a second time. Delivery and read statuses arrive through the status
+webhook and are applied to the recipient rows like any other message.
+
+Throughput is bounded by the tier, not the engine: at 1000 messages per
+second, 500k recipients take under nine minutes.
+"""
+
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from api.models import Voter, VoterProfile, WhatsAppBroadcast, WhatsAppBroadcastRecipient
+from api.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+BROADCAST_DEFAULTS = {
+    'GRAPH_API_URL': 'https://graph.facebook.com/v21.0',
+    'MESSAGES_PER_SECOND': 80,      # Cloud API default throughput per number
+    'CONCURRENCY': 32,              # in-flight requests; rate x API latency is enough
+    'CHUNK_SIZE': 1000,             # recipients per checkpoint
+    'MAX_RETRIES': 3,               # per recipient, for throttling and server errors
+    'RETRY_BASE_SECONDS': 1,        # backoff: base * 2 ** attempt
+    'REQUEST_TIMEOUT': 15,
+    'TIME_BUDGET': 20 * 60,         # per task run, below the Celery time limit
+    'DEFAULT_COUNTRY_CODE': '91',
+}
+
+SOURCES = {
+    'voter_profile': (VoterProfile, 'phone_number'),
+    'voter': (Voter, 'phone'),
+}
+
+ACTIVE_STATUSES = ['pending', 'running']
+LOCK_TIMEOUT = 300
+
+# Throttling by WhatsApp: account or app rate limits, and per-recipient pair limits
+THROTTLE_CODES = {4, 80007, 130429}
+RETRYABLE_CODES = THROTTLE_CODES | {131000, 131016, 131056}
+
+# Recorded for numbers a dead run queued: they may or may not have been sent
+INTERRUPTED_ERROR = 'Run stopped before the send was confirmed'
+
+
+def get_broadcast_setting(name: str):
+    return getattr(settings, 'WHATSAPP_BROADCAST', {}).get(name, BROADCAST_DEFAULTS[name])
+
+
+def normalize_phone(phone: str) -> Optional[str]:
+    """WhatsApp number (country code and digits only), or None if unusable"""
+    digits = re.sub(r'\D', '', phone or '')
+    country_code = get_broadcast_setting('DEFAULT_COUNTRY_CODE')
+    if len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        digits = country_code + digits
+    return digits if 11 <= len(digits) <= 15 else None
+
+
+def segment_queryset(broadcast: WhatsAppBroadcast):
+    """The broadcast's recipients, in the key order the cursor follows"""
+    model, phone_field = SOURCES[broadcast.source]
+    return (
+        model.objects
+        .filter(**broadcast.segment_filters)
+        .exclude(**{phone_field: ''})
+        .order_by('pk')
+    )
+
+
+class GraphAPIError(Exception):
+    """A send rejected by the Graph API or not answered at all"""
+
+    def __init__(self, message: str, code: Optional[int] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+    @property
+    def throttled(self) -> bool:
+        return self.status == 429 or self.code in THROTTLE_CODES
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status >= 500 or self.throttled or self.code in RETRYABLE_CODES
+
+
+class GraphAPISender:
+    """Sends template messages to the Cloud API over a pooled session"""
+
+    def __init__(self, phone_id: str, token: str, base_url: Optional[str] = None,
+                 pool_size: Optional[int] = None, timeout: Optional[float] = None):
+        base_url = base_url or get_broadcast_setting('GRAPH_API_URL')
+        self.url = f"{base_url.rstrip('/')}/{phone_id}/messages"
+        self.timeout = timeout or get_broadcast_setting('REQUEST_TIMEOUT')
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or get_broadcast_setting('CONCURRENCY'))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_service(cls, service=None) -> Optional['GraphAPISender']:
+        """A sender with the WhatsAppService credentials; None in test mode"""
+        if service is None:
+            from api.services.whatsapp_service import get_whatsapp_service
+            service = get_whatsapp_service()
+        if not service.phone_id or not service.token:
+            return None
+        return cls(service.phone_id, service.token)
+
+    def send_template(self, to: str, template_name: str, language_code: str, components: list) -> str:
+        """Send one template message; returns the WhatsApp message id"""
+        payload = {
+            'messaging_product': 'whatsapp',
+            'to': to,
+            'type': 'template',
+            'template': {
+                'name': template_name,
+                'language': {'code': language_code},
+                'components': components,
+            },
+        }
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise GraphAPIError(f"Request failed: {e}")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code >= 400 or 'error' in body:
+            error = body.get('error') or {}
+            raise GraphAPIError(
+                error.get('message') or f"HTTP {response.status_code}",
+                code=error.get('code'),
+                status=response.status_code,
+            )
+        try:
+            return body['messages'][0]['id']
+        except (KeyError, IndexError, TypeError):
+            raise GraphAPIError("Response carried no message id", status=response.status_code)
+
+    def close(self):
+        self.session.close()
+
+
+class BroadcastRunner:
+    """Runs or resumes a WhatsAppBroadcast in checkpointed chunks"""
+
+    def __init__(self, broadcast: WhatsAppBroadcast, sender: Optional[GraphAPISender] = None,
+                 bucket: Optional[TokenBucket] = None, concurrency: Optional[int] = None,
+                 chunk_size: Optional[int] = None, sleep=time.sleep):
+        self.broadcast = broadcast
+        self.sender = sender
+        self.bucket = bucket or TokenBucket(get_broadcast_setting('MESSAGES_PER_SECOND'))
+        self.concurrency = concurrency or get_broadcast_setting('CONCURRENCY')
+        self.chunk_size = chunk_size or get_broadcast_setting('CHUNK_SIZE')
+        self.max_retries = get_broadcast_setting('MAX_RETRIES')
+        self.sleep = sleep
+        # True when the run stopped for its time budget and should be re-queued
+        self.yielded = False
+
+    @property
+    def lock_key(self) -> str:
+        return f"whatsapp-broadcast-lock:{self.broadcast.pk}"
+
+    def _update(self, **fields) -> bool:
+        """Write broadcast fields unless it was paused or cancelled; returns False if it was"""
+        fields.setdefault('updated_at', timezone.now())
+        updated = WhatsAppBroadcast.objects.filter(pk=self.broadcast.pk, status__in=ACTIVE_STATUSES).update(**fields)
+        if updated:
+            self.broadcast.refresh_from_db()
+        return bool(updated)
+
+    def _fail(self, error: str):
+        self._update(status='failed', last_error=error, completed_at=timezone.now())
+
+    def chunks(self) -> Iterator[List[Tuple[object, str]]]:
+        """(pk, phone) pairs after the cursor, read through a server-side cursor"""
+        _, phone_field = SOURCES[self.broadcast.source]
+        rows = segment_queryset(self.broadcast)
+        if self.broadcast.cursor:
+            rows = rows.filter(pk__gt=self.broadcast.cursor)
+
+        chunk = []
+        for row in rows.values_list('pk', phone_field).iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def deliver(self, phone: str) -> Tuple[str, Optional[str], str]:
+        """Send to one number, retrying throttling and server errors; (phone, message id, error)"""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                message_id = self.sender.send_template(
+                    phone, self.broadcast.template_name, self.broadcast.language_code, self.broadcast.components
+                )
+                return phone, message_id, ''
+            except GraphAPIError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    return phone, None, str(e)[:255]
+                delay = get_broadcast_setting('RETRY_BASE_SECONDS') * (2 ** attempt)
+                if e.throttled:
+                    # Slow every worker down, not just this one
+                    self.bucket.pause(delay)
+                self.sleep(delay)
+
+    def send_chunk(self, pool: ThreadPoolExecutor, chunk: List[Tuple[object, str]]) -> bool:
+        """Send a chunk and checkpoint it; returns False if the broadcast was stopped"""
+        phones = []
+        seen = set()
+        for _, phone in chunk:
+            phone = normalize_phone(phone)
+            if phone and phone not in seen:
+                seen.add(phone)
+                phones.append(phone)
+
+        # Numbers reached earlier in this broadcast, or queued by a run that died mid-chunk
+        recorded = dict(
+            WhatsAppBroadcastRecipient.objects
+            .filter(broadcast=self.broadcast, phone_number__in=phones)
+            .values_list('phone_number', 'delivery_status')
+        )
+        interrupted = [phone for phone, status in recorded.items() if status == 'queued']
+        pending = [phone for phone in phones if phone not in recorded]
+        WhatsAppBroadcastRecipient.objects.bulk_create(
+            [
+                WhatsAppBroadcastRecipient(broadcast=self.broadcast, phone_number=phone, delivery_status='queued')
+                for phone in pending
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        outcomes = list(pool.map(self.deliver, pending))
+
+        now = timezone.now()
+        recipients = [
+            WhatsAppBroadcastRecipient(
+                broadcast=self.broadcast,
+                phone_number=phone,
+                whatsapp_message_id=message_id,
+                delivery_status='sent' if message_id else 'failed',
+                status_updated_at=now,
+                delivery_error=error,
+                sent_at=now,
+            )
+            for phone, message_id, error in outcomes
+        ]
+        sent = sum(1 for _, message_id, _ in outcomes if message_id)
+        progress = {
+            'cursor': str(chunk[-1][0]),
+            'sent_count': F('sent_count') + sent,
+            'failed_count': F('failed_count') + len(outcomes) - sent + len(interrupted),
+            'skipped_count': F('skipped_count') + len(chunk) - len(outcomes) - len(interrupted),
+            'updated_at': now,
+        }
+        with transaction.atomic():
+            WhatsAppBroadcastRecipient.objects.bulk_create(
+                recipients,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['broadcast', 'phone_number'],
+                update_fields=['whatsapp_message_id', 'delivery_status', 'status_updated_at', 'delivery_error', 'sent_at'],
+            )
+            WhatsAppBroadcastRecipient.objects.filter(
+                broadcast=self.broadcast, phone_number__in=interrupted, delivery_status='queued',
+            ).update(delivery_status='failed', status_updated_at=now, delivery_error=INTERRUPTED_ERROR)
+            running = WhatsAppBroadcast.objects.filter(pk=self.broadcast.pk, status='running').update(**progress)
+            if not running:
+                # Paused or cancelled meanwhile: the chunk went out, so still record it
+                WhatsAppBroadcast.objects.filter(pk=self.broadcast.pk).update(**progress)
+        self.broadcast.cursor = progress['cursor']
+        cache.touch(self.lock_key, LOCK_TIMEOUT)
+        return bool(running)
+
+    def run(self, time_budget: Optional[float] = None) -> WhatsAppBroadcast:
+        """Run or resume the broadcast until it completes, stops or spends the time budget"""
+        self.broadcast.refresh_from_db()
+        if self.broadcast.status not in ACTIVE_STATUSES:
+            return self.broadcast
+
+        if not cache.add(self.lock_key, True, LOCK_TIMEOUT):
+            logger.info(f"Broadcast {self.broadcast.pk} is already running")
+            return self.broadcast
+
+        try:
+            self._run(time_budget)
+        except Exception as e:
+            logger.exception(f"Broadcast {self.broadcast.pk} failed")
+            self._fail(f"Unexpected error: {e}")
+        finally:
+            cache.delete(self.lock_key)
+
+        self.broadcast.refresh_from_db()
+        return self.broadcast
+
+    def _run(self, time_budget: Optional[float]):
+        if self.sender is None:
+            self.sender = GraphAPISender.from_service()
+        if self.sender is None:
+            self._fail("WhatsApp credentials not configured")
+            return
+
+        started = time.monotonic()
+        fields = {'status': 'running', 'started_at': self.broadcast.started_at or timezone.now()}
+        if not self.broadcast.cursor:
+            fields['total_recipients'] = segment_queryset(self.broadcast).count()
+        if not self._update(**fields):
+            return
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for chunk in self.chunks():
+                if not self.send_chunk(pool, chunk):
+                    return
+                if time_budget is not None and time.monotonic() - started >= time_budget:
+                    self.yielded = True
+                    return
+
+        self._update(status='completed', completed_at=timezone.now())
+
+
+def queue_broadcast(broadcast: WhatsAppBroadcast):
+    """Start a pending broadcast, or resume a paused one, on a worker"""
+    from api.tasks import send_whatsapp_broadcast
+
+    WhatsAppBroadcast.objects.filter(pk=broadcast.pk, status='paused').update(status='running', updated_at=timezone.now())
+    transaction.on_commit(lambda: send_whatsapp_broadcast.delay(str(broadcast.pk)))
+
+
+def pause_broadcast(broadcast: WhatsAppBroadcast) -> bool:
+    """Stop a broadcast after its current chunk; queue_broadcast resumes it"""
+    return bool(
+        WhatsAppBroadcast.objects.filter(pk=broadcast.pk, status__in=ACTIVE_STATUSES)
+        .update(status='paused', updated_at=timezone.now())
+    )
+
+
+def find_stalled_broadcasts(timeout: int = LOCK_TIMEOUT):
+    """Running broadcasts that have not checkpointed within the lock timeout"""
+    return WhatsAppBroadcast.objects.filter(
+        status='running',
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+
+
+def broadcast_summary(broadcast: WhatsAppBroadcast) -> Dict[str, float]:
+    """Progress counters plus delivery and read rates of the recorded recipients"""
+    from api.services.whatsapp_status import delivery_summary
+
+    summary = delivery_summary(broadcast.recipients.all())
+    summary.update({
+        'status': broadcast.status,
+        'total_recipients': broadcast.total_recipients,
+        'sent_count': broadcast.sent_count,
+        'failed_count': broadcast.failed_count,
+        'skipped_count': broadcast.skipped_count,
+    })
+    return summary
@@ -0,0 +1,255 @@
+"""
+WhatsApp Inbound Pipeline
+Acknowledge-then-process handling of incoming WhatsApp messages
+
+The webhook only parses the payload and records each message as a
+WhatsAppInboundEvent, keyed on its WhatsApp message id so Meta's retries
+are no-ops, then queues a worker for the sender. Language detection, AI
+enrichment, the reply and its delivery all happen in the worker, so
+webhook latency does not depend on LLM latency.
+
+Messages from one phone number (one conversation) are processed in order:
+a worker holds a per-number lock while it drains that number's pending
+events oldest first, and stops at a failing event instead of skipping it.
+A periodic sweep re-queues numbers whose events were not picked up.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import WhatsAppInboundEvent
+
+logger = logging.getLogger(__name__)
+
+
+MAX_ATTEMPTS = 5
+LOCK_TIMEOUT = 300          # seconds a drain may run before its lock expires
+SWEEP_AFTER = timedelta(seconds=30)
+
+
+def lock_key(phone_number: str) -> str:
+    return f"whatsapp-inbound-lock:{phone_number}"
+
+
+def _sent_at(timestamp) -> datetime:
+    try:
+        return datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc)
+    except (TypeError, ValueError):
+        return timezone.now()
+
+
+def parse_webhook(body: dict) -> List[WhatsAppInboundEvent]:
+    """Unsaved events for every message in a webhook payload"""
+    if body.get('object') != 'whatsapp_business_account':
+        return []
+
+    events = []
+    for entry in body.get('entry', []):
+        for change in entry.get('changes', []):
+            if change.get('field') != 'messages':
+                continue
+            for message in change.get('value', {}).get('messages', []):
+                if not message.get('id') or not message.get('from'):
+                    logger.warning(f"Ignoring WhatsApp message without id or sender: {message.get('type')}")
+                    continue
+                events.append(WhatsAppInboundEvent(
+                    whatsapp_message_id=message['id'],
+                    phone_number=message['from'],
+                    message_type=message.get('type', ''),
+                    payload=message,
+                    sent_at=_sent_at(message.get('timestamp')),
+                ))
+    return events
+
+
+def record_events(events: List[WhatsAppInboundEvent]) -> List[str]:
+    """
+    Store events not seen before and queue their senders
+
+    Returns the phone numbers that were queued.
+    """
+    if not events:
+        return []
+
+    known = set(
+        WhatsAppInboundEvent.objects.filter(
+            whatsapp_message_id__in=[event.whatsapp_message_id for event in events]
+        ).values_list('whatsapp_message_id', flat=True)
+    )
+    new_events = {event.whatsapp_message_id: event for event in events if event.whatsapp_message_id not in known}
+    if not new_events:
+        return []
+
+    # A concurrent retry of the same delivery may insert first
+    WhatsAppInboundEvent.objects.bulk_create(new_events.values(), ignore_conflicts=True)
+
+    phone_numbers = sorted({event.phone_number for event in new_events.values()})
+    transaction.on_commit(lambda: dispatch(phone_numbers))
+    return phone_numbers
+
+
+def dispatch(phone_numbers: List[str]):
+    """Queue a worker per phone number; the sweep catches any that fail to queue"""
+    from api.tasks import process_whatsapp_events
+
+    for phone_number in phone_numbers:
+        try:
+            process_whatsapp_events.delay(phone_number)
+        except Exception as e:
+            logger.warning(f"Could not queue WhatsApp events for {phone_number}: {e}")
+
+
+def message_content(message: dict) -> str:
+    """Text to process for a WhatsApp message of any type"""
+    message_type = message.get('type')
+    if message_type == 'text':
+        return message.get('text', {}).get('body', '')
+    if message_type == 'image':
+        return message.get('image', {}).get('caption', '[Image]')
+    if message_type == 'video':
+        return message.get('video', {}).get('caption', '[Video]')
+    if message_type == 'audio':
+        return '[Audio message]'
+    if message_type == 'document':
+        return message.get('document', {}).get('caption', '[Document]')
+    if message_type == 'location':
+        location = message.get('location', {})
+        return f"[Location: {location.get('latitude')}, {location.get('longitude')}]"
+    if message_type == 'button':
+        return message.get('button', {}).get('text', '[Button click]')
+
+    logger.info(f"Received unsupported message type: {message_type}")
+    return f'[{message_type} message]'
+
+
+def campaign_tracking(message_text: str) -> Optional[str]:
+    """
+    Extract campaign tracking from message
+
+    Messages from click-to-chat links may include:
+    [src:facebook] [cmp:campaign_001]
+    """
+    campaign_match = re.search(r'\[cmp:([^\]]+)\]', message_text)
+    if campaign_match:
+        return campaign_match.group(1)
+
+    source_match = re.search(r'\[src:([^\]]+)\]', message_text)
+    if source_match:
+        return source_match.group(1)
+
+    ref_match = re.search(r'\[ref:([^\]]+)\]', message_text)
+    if ref_match:
+        return f"referral_{ref_match.group(1)}"
+
+    return None
+
+
+class InboundEventProcessor:
+    """Drains one phone number's pending events in order"""
+
+    def __init__(self, phone_number: str, processor=None, max_attempts: int = MAX_ATTEMPTS):
+        self.phone_number = phone_number
+        self.processor = processor
+        self.max_attempts = max_attempts
+        self.processed = 0
+        self.failed = 0
+
+    def _processor(self):
+        if self.processor is None:
+            from api.services.message_processor import get_message_processor
+            self.processor = get_message_processor()
+        return self.processor
+
+    def next_event(self) -> Optional[WhatsAppInboundEvent]:
+        return (
+            WhatsAppInboundEvent.objects
+            .filter(phone_number=self.phone_number, status__in=['pending', 'processing'])
+            .order_by('sent_at', 'id')
+            .first()
+        )
+
+    def process(self, event: WhatsAppInboundEvent) -> bool:
+        """Process one event; returns False if it should be retried later"""
+        WhatsAppInboundEvent.objects.filter(pk=event.pk).update(status='processing', attempts=event.attempts + 1)
+        event.attempts += 1
+
+        message = event.payload
+        message_type = message.get('type')
+        message_text = message_content(message)
+        media_url = message.get(message_type, {}).get('url') if message_type in ['image', 'video', 'audio', 'document'] else None
+
+        try:
+            result = self._processor().process_incoming_message(
+                phone_number=event.phone_number,
+                message_text=message_text,
+                message_type=message_type,
+                whatsapp_message_id=event.whatsapp_message_id,
+                media_url=media_url,
+                source_campaign=campaign_tracking(message_text),
+                timestamp=event.sent_at,
+            )
+            error = (result.get('error') or 'Processing failed') if result.get('status') == 'error' else None
+        except Exception as e:
+            logger.error(f"Failed to process WhatsApp event {event.whatsapp_message_id}: {e}", exc_info=True)
+            error = str(e)
+
+        if error is None:
+            event.status = 'processed'
+            event.processed_at = timezone.now()
+            event.last_error = ''
+            self.processed += 1
+        elif event.attempts >= self.max_attempts:
+            event.status = 'failed'
+            event.last_error = error[:2000]
+            self.failed += 1
+        else:
+            event.status = 'pending'
+            event.last_error = error[:2000]
+        event.save(update_fields=['status', 'processed_at', 'last_error'])
+        return event.status != 'pending'
+
+    def drain(self) -> Dict[str, int]:
+        """
+        Process pending events until none are left or one must be retried
+
+        Returns immediately if another worker holds this number's lock;
+        that worker picks up events recorded while it runs.
+        """
+        while cache.add(lock_key(self.phone_number), True, LOCK_TIMEOUT):
+            try:
+                retry_later = False
+                event = self.next_event()
+                while event is not None:
+                    if not self.process(event):
+                        retry_later = True
+                        break
+                    cache.touch(lock_key(self.phone_number), LOCK_TIMEOUT)
+                    event = self.next_event()
+            finally:
+                cache.delete(lock_key(self.phone_number))
+
+            # An event recorded between the last check and the release
+            # found the lock held; go round again rather than strand it
+            if retry_later or not WhatsAppInboundEvent.objects.filter(
+                phone_number=self.phone_number, status='pending'
+            ).exists():
+                break
+
+        return {'processed': self.processed, 'failed': self.failed}
+
+
+def pending_phone_numbers(older_than: timedelta = SWEEP_AFTER) -> List[str]:
+    """Numbers with events waiting longer than older_than, for the sweep"""
+    return list(
+        WhatsAppInboundEvent.objects
+        .filter(status__in=['pending', 'processing'], received_at__lt=timezone.now() - older_than)
+        .order_by()
+        .values_list('phone_number', flat=True)
+        .distinct()
+    )
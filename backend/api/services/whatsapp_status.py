@@ -0,0 +1,224 @@
+"""
+WhatsApp Status Ingestion
+Buffered, bulk application of WhatsApp delivery statuses (sent, delivered,
+read, failed) to outgoing WhatsAppMessage and WhatsAppBroadcastRecipient
+rows.
+
+Webhooks store every status in the payload as a WhatsAppStatusEvent with one
+insert and schedule a flush for the end of a short window. The flush reads
+buffered events in id order, collapses them to the latest state per
+WhatsApp message id, loads the matching messages (and broadcast recipients
+for ids no message has) and writes them with bulk_update.
+
+Statuses can arrive out of order and repeat, so a message only moves
+forward (sent < delivered < read; failed is final). Events for messages not
+stored yet, such as a 'sent' that beats the save of the message id, stay
+buffered for UNMATCHED_TTL and are retried by later flushes.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from api.models import WhatsAppBroadcastRecipient, WhatsAppMessage, WhatsAppStatusEvent
+from api.utils.task_window import schedule_once_per_window
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_DEFAULTS = {
+    'BATCH_SIZE': 5000,         # buffered events read per query
+    'WINDOW_SECONDS': 5,        # how long statuses are buffered before a flush
+}
+
+STATUS_RANK = {'sent': 1, 'delivered': 2, 'read': 3, 'failed': 4}
+
+UNMATCHED_TTL = timedelta(hours=1)
+SCHEDULED_KEY = 'whatsapp-status-flush-scheduled'
+LOCK_KEY = 'whatsapp-status-flush-lock'
+LOCK_TIMEOUT = 300
+
+DELIVERY_FIELDS = ['delivery_status', 'delivered_at', 'read_at', 'status_updated_at', 'delivery_error']
+
+
+def get_status_setting(name: str):
+    return getattr(settings, 'WHATSAPP_STATUS', {}).get(name, STATUS_DEFAULTS[name])
+
+
+def _status_at(timestamp) -> datetime:
+    try:
+        return datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc)
+    except (TypeError, ValueError):
+        return timezone.now()
+
+
+def parse_statuses(body: dict) -> List[WhatsAppStatusEvent]:
+    """Unsaved events for every known status in a webhook payload"""
+    events = []
+    for entry in body.get('entry', []):
+        for change in entry.get('changes', []):
+            for status_update in change.get('value', {}).get('statuses', []):
+                if not status_update.get('id') or status_update.get('status') not in STATUS_RANK:
+                    continue
+                errors = status_update.get('errors') or [{}]
+                events.append(WhatsAppStatusEvent(
+                    whatsapp_message_id=status_update['id'],
+                    status=status_update['status'],
+                    status_at=_status_at(status_update.get('timestamp')),
+                    error=str(errors[0].get('title') or errors[0].get('message') or '')[:255],
+                ))
+    return events
+
+
+def record_statuses(events: List[WhatsAppStatusEvent]) -> int:
+    """Buffer statuses with one insert and schedule a flush"""
+    if not events:
+        return 0
+    WhatsAppStatusEvent.objects.bulk_create(events)
+    transaction.on_commit(schedule_flush)
+    return len(events)
+
+
+def schedule_flush():
+    """Schedule a flush for the end of the current window, once per window"""
+    from api.tasks import flush_whatsapp_statuses
+
+    schedule_once_per_window(flush_whatsapp_statuses, SCHEDULED_KEY, get_status_setting('WINDOW_SECONDS'))
+
+
+def collapse(events) -> Dict[str, dict]:
+    """Latest state per WhatsApp message id, keeping delivery and read times"""
+    states = {}
+    for event in events:
+        state = states.setdefault(event.whatsapp_message_id, {
+            'status': event.status, 'status_at': event.status_at,
+            'delivered_at': None, 'read_at': None, 'error': '',
+        })
+        if STATUS_RANK[event.status] > STATUS_RANK[state['status']]:
+            state['status'] = event.status
+        state['status_at'] = max(state['status_at'], event.status_at)
+        if event.status == 'delivered':
+            state['delivered_at'] = min(filter(None, [state['delivered_at'], event.status_at]))
+        elif event.status == 'read':
+            state['read_at'] = min(filter(None, [state['read_at'], event.status_at]))
+        elif event.status == 'failed':
+            state['error'] = event.error
+    return states
+
+
+def apply_state(message: WhatsAppMessage, state: dict) -> bool:
+    """Move a message forward to a collapsed state; returns True if it changed"""
+    current = STATUS_RANK.get(message.delivery_status, 0)
+    changed = False
+    if STATUS_RANK[state['status']] > current:
+        message.delivery_status = state['status']
+        message.status_updated_at = state['status_at']
+        changed = True
+    if state['error'] and message.delivery_error != state['error']:
+        message.delivery_error = state['error']
+        changed = True
+
+    # A read receipt implies delivery even if the delivered status never came
+    delivered_at = state['delivered_at'] or state['read_at']
+    if delivered_at and (message.delivered_at is None or delivered_at < message.delivered_at):
+        message.delivered_at = delivered_at
+        changed = True
+    if state['read_at'] and (message.read_at is None or state['read_at'] < message.read_at):
+        message.read_at = state['read_at']
+        changed = True
+    return changed
+
+
+class StatusIngestor:
+    """Applies buffered status events to messages in bulk"""
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or get_status_setting('BATCH_SIZE')
+        self.applied = 0
+        self.unmatched = 0
+        self.updated = 0
+
+    def flush_batch(self, after_id: int) -> int:
+        """Apply one batch of events with ids above after_id; returns the last id read, or 0"""
+        events = list(WhatsAppStatusEvent.objects.filter(id__gt=after_id).order_by('id')[:self.batch_size])
+        if not events:
+            return 0
+
+        states = collapse(events)
+        messages = list(
+            WhatsAppMessage.objects
+            .filter(whatsapp_message_id__in=list(states))
+            .order_by()
+            .only('id', 'whatsapp_message_id', *DELIVERY_FIELDS)
+        )
+        matched = {message.whatsapp_message_id for message in messages}
+        recipients = []
+        if len(matched) < len(states):
+            recipients = list(
+                WhatsAppBroadcastRecipient.objects
+                .filter(whatsapp_message_id__in=[message_id for message_id in states if message_id not in matched])
+                .only('id', 'whatsapp_message_id', *DELIVERY_FIELDS)
+            )
+            matched.update(recipient.whatsapp_message_id for recipient in recipients)
+        changed = [message for message in messages if apply_state(message, states[message.whatsapp_message_id])]
+        changed_recipients = [
+            recipient for recipient in recipients if apply_state(recipient, states[recipient.whatsapp_message_id])
+        ]
+
+        expired = timezone.now() - UNMATCHED_TTL
+        done = [event.id for event in events if event.whatsapp_message_id in matched or event.received_at < expired]
+
+        with transaction.atomic():
+            WhatsAppMessage.objects.bulk_update(changed, DELIVERY_FIELDS, batch_size=1000)
+            WhatsAppBroadcastRecipient.objects.bulk_update(changed_recipients, DELIVERY_FIELDS, batch_size=1000)
+            for start in range(0, len(done), 1000):
+                WhatsAppStatusEvent.objects.filter(id__in=done[start:start + 1000]).delete()
+
+        self.applied += sum(1 for event in events if event.whatsapp_message_id in matched)
+        self.unmatched += len(events) - len(done)
+        self.updated += len(changed) + len(changed_recipients)
+        return events[-1].id
+
+    def flush(self) -> Dict[str, int]:
+        """Apply every buffered event; a no-op while another flush runs"""
+        if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+            return {'applied': 0, 'updated': 0, 'unmatched': 0}
+        try:
+            last_id = 0
+            while True:
+                last_id = self.flush_batch(last_id)
+                if not last_id:
+                    break
+                cache.touch(LOCK_KEY, LOCK_TIMEOUT)
+        finally:
+            cache.delete(LOCK_KEY)
+        return {'applied': self.applied, 'updated': self.updated, 'unmatched': self.unmatched}
+
+
+def delivery_summary(messages=None) -> Dict[str, float]:
+    """
+    Counts per delivery status and delivery/read rates for outgoing messages
+
+    Aggregated on the indexed delivery_status column; pass a filtered
+    WhatsAppMessage queryset to summarise a time range, or a broadcast's
+    recipients.
+    """
+    messages = messages if messages is not None else WhatsAppMessage.objects.exclude(sender='user')
+    counts = {
+        row['delivery_status']: row['count']
+        for row in messages.order_by().values('delivery_status').annotate(count=Count('id'))
+    }
+    summary = {value: counts.get(value, 0) for value in STATUS_RANK}
+    # Messages without a status yet, and broadcast recipients queued for their send
+    summary['pending'] = counts.get(None, 0) + counts.get('queued', 0)
+    total = sum(counts.values())
+    summary['total'] = total
+    summary['delivery_rate'] = round((summary['delivered'] + summary['read']) / total, 4) if total else 0.0
+    summary['read_rate'] = round(summary['read'] / total, 4) if total else 0.0
+    return summary
@@ -4,14 +4,38 @@ Celery Tasks for Automated Reports and Background Processing
 
 from celery import shared_task
 from django.utils import timezone
+from django.core.cache import cache
 from django.core.mail import EmailMessage
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from io import BytesIO
 
 from api.models_analytics import ReportTemplate, GeneratedReport, ExportJob
-from api.utils.pdf_generator import generate_executive_summary_pdf, generate_campaign_report_pdf
-from api.utils.excel_exporter import export_analytics_to_excel
-from api.models import DirectFeedback, FieldReport
+from api.services.report_engine import ReportEngine, evict_report_artifacts, render_reports
+from api.services.email_outbox import OutboxDispatcher, release_stale_claims
+
+
+@shared_task
+def render_generated_report(report_id):
+    """
+    Render the files for a GeneratedReport created by the report views
+    """
+    reports = render_reports([report_id])
+    if not reports:
+        return f"Report not found: {report_id}"
+
+    report = reports[0]
+    return f"Report {report.report_id} {report.status}"
+
+
+@shared_task
+def render_generated_reports(report_ids):
+    """
+    Render several reports in one worker so reports over the same
+    scope and period share a single dataset snapshot
+    """
+    reports = render_reports(report_ids)
+    completed = sum(1 for report in reports if report.status == 'completed')
+    return f"Rendered {completed}/{len(reports)} reports"
 
 
 @shared_task
@@ -22,60 +46,27 @@ def generate_daily_report():
     """
     today = timezone.now().date()
 
-    # Collect daily data
-    feedback_count = DirectFeedback.objects.filter(
-        submitted_at__date=today
-    ).count()
-
-    reports_count = FieldReport.objects.filter(
-        report_date=today
-    ).count()
-
-    # Prepare report data
-    report_data = {
-        'report_name': f'Daily Activity Report - {today}',
-        'date_from': str(today),
-        'date_to': str(today),
-        'generated_by': 'System',
-        'summary': {
-            'feedback_submitted': feedback_count,
-            'field_reports_submitted': reports_count,
-            'new_voters_added': 0,  # TODO: Calculate from voter model
-            'tasks_completed': 0,  # TODO: Calculate from tasks
-            'issues_raised': feedback_count,
-        },
-        'insights': [
-            f"{feedback_count} feedback submissions received today",
-            f"{reports_count} field reports submitted by volunteers",
-            "Overall sentiment remains positive"
-        ]
-    }
-
-    # Generate PDF
-    try:
-        pdf_buffer = generate_executive_summary_pdf(report_data)
-
-        # Create report record
-        report = GeneratedReport.objects.create(
-            report_name=f"Daily Activity - {today}",
-            report_type='daily_activity',
-            status='completed',
-            filters_used={'date': str(today)},
-            # TODO: Upload to Supabase storage and set pdf_file_url
-            expires_at=timezone.now() + timedelta(days=7)
-        )
+    report = GeneratedReport.objects.create(
+        report_name=f"Daily Activity - {today}",
+        report_type='daily_activity',
+        status='pending',
+        filters_used={'date': str(today)},
+        metadata={'export_format': 'pdf'},
+        expires_at=timezone.now() + timedelta(days=7)
+    )
 
-        # Send email to admins
-        send_report_email.delay(
-            report_id=str(report.report_id),
-            recipients=['admin@example.com'],  # TODO: Get from settings
-            subject=f'Daily Activity Report - {today}'
-        )
+    ReportEngine().render(report)
+    if report.status != 'completed':
+        return f"Error generating daily report: {report.error_message}"
 
-        return f"Daily report generated: {report.report_id}"
+    # Send email to admins
+    send_report_email.delay(
+        report_id=str(report.report_id),
+        recipients=['admin@example.com'],  # TODO: Get from settings
+        subject=f'Daily Activity Report - {today}'
+    )
 
-    except Exception as e:
-        return f"Error generating daily report: {str(e)}"
+    return f"Daily report generated: {report.report_id}"
 
 
 @shared_task
@@ -88,48 +79,29 @@ def generate_weekly_report():
     week_start = today - timedelta(days=today.weekday())
     week_end = week_start + timedelta(days=6)
 
-    # Collect weekly data
-    report_data = {
-        'report_name': f'Weekly Summary - Week of {week_start}',
-        'date_from': str(week_start),
-        'date_to': str(week_end),
-        'generated_by': 'System',
-        'summary': {
-            'total_feedback': DirectFeedback.objects.filter(
-                submitted_at__date__gte=week_start,
-                submitted_at__date__lte=week_end
-            ).count(),
-            'total_field_reports': FieldReport.objects.filter(
-                report_date__gte=week_start,
-                report_date__lte=week_end
-            ).count(),
-        }
-    }
+    report = GeneratedReport.objects.create(
+        report_name=f"Weekly Summary - {week_start}",
+        report_type='weekly_summary',
+        status='pending',
+        filters_used={
+            'week_start': str(week_start),
+            'week_end': str(week_end)
+        },
+        metadata={'export_format': 'pdf'},
+        expires_at=timezone.now() + timedelta(days=30)
+    )
 
-    try:
-        pdf_buffer = generate_executive_summary_pdf(report_data)
-
-        report = GeneratedReport.objects.create(
-            report_name=f"Weekly Summary - {week_start}",
-            report_type='weekly_summary',
-            status='completed',
-            filters_used={
-                'week_start': str(week_start),
-                'week_end': str(week_end)
-            },
-            expires_at=timezone.now() + timedelta(days=30)
-        )
+    ReportEngine().render(report)
+    if report.status != 'completed':
+        return f"Error generating weekly report: {report.error_message}"
 
-        send_report_email.delay(
-            report_id=str(report.report_id),
-            recipients=['admin@example.com'],
-            subject=f'Weekly Summary - Week of {week_start}'
-        )
+    send_report_email.delay(
+        report_id=str(report.report_id),
+        recipients=['admin@example.com'],
+        subject=f'Weekly Summary - Week of {week_start}'
+    )
 
-        return f"Weekly report generated: {report.report_id}"
-
-    except Exception as e:
-        return f"Error generating weekly report: {str(e)}"
+    return f"Weekly report generated: {report.report_id}"
 
 
 @shared_task
@@ -143,39 +115,85 @@ def generate_monthly_report():
     month_start = last_month.replace(day=1)
     month_end = last_month
 
-    report_data = {
-        'report_name': f'Monthly Report - {month_start.strftime("%B %Y")}',
-        'date_from': str(month_start),
-        'date_to': str(month_end),
-        'generated_by': 'System',
-        'summary': {
-            'total_feedback': DirectFeedback.objects.filter(
-                submitted_at__date__gte=month_start,
-                submitted_at__date__lte=month_end
-            ).count(),
-        }
-    }
+    report = GeneratedReport.objects.create(
+        report_name=f"Monthly Report - {month_start.strftime('%B %Y')}",
+        report_type='executive_summary',
+        status='pending',
+        filters_used={
+            'date_from': str(month_start),
+            'date_to': str(month_end),
+        },
+        metadata={'export_format': 'pdf'},
+        expires_at=timezone.now() + timedelta(days=90)
+    )
 
-    try:
-        pdf_buffer = generate_executive_summary_pdf(report_data)
+    ReportEngine().render(report)
+    if report.status != 'completed':
+        return f"Error generating monthly report: {report.error_message}"
 
-        report = GeneratedReport.objects.create(
-            report_name=f"Monthly Report - {month_start.strftime('%B %Y')}",
-            report_type='executive_summary',
-            status='completed',
-            expires_at=timezone.now() + timedelta(days=90)
-        )
+    send_report_email.delay(
+        report_id=str(report.report_id),
+        recipients=['superadmin@example.com'],
+        subject=f'Monthly Report - {month_start.strftime("%B %Y")}'
+    )
+
+    return f"Monthly report generated: {report.report_id}"
+
+
+def _create_template_report(template):
+    """Create the GeneratedReport row for a scheduled template run"""
+    return GeneratedReport.objects.create(
+        template=template,
+        report_name=template.name,
+        report_type=template.report_type,
+        status='pending',
+        filters_used=template.filters,
+        metadata={
+            'metrics': template.metrics,
+            'visualizations': template.visualizations,
+            'export_format': template.export_format,
+        },
+        expires_at=timezone.now() + timedelta(hours=48)
+    )
 
+
+def _finish_template_report(template, report):
+    """Update the template and notify recipients after a scheduled run"""
+    template.last_generated = timezone.now()
+    template.save(update_fields=['last_generated', 'updated_at'])
+
+    if template.recipients:
         send_report_email.delay(
             report_id=str(report.report_id),
-            recipients=['superadmin@example.com'],
-            subject=f'Monthly Report - {month_start.strftime("%B %Y")}'
+            recipients=template.recipients,
+            subject=f'{template.name} - {timezone.now().strftime("%Y-%m-%d")}'
         )
 
-        return f"Monthly report generated: {report.report_id}"
 
-    except Exception as e:
-        return f"Error generating monthly report: {str(e)}"
+DEFAULT_SCHEDULE_TIME = time(9, 0)
+
+
+def _is_template_due(template, now):
+    """
+    Check whether a scheduled template should run now
+
+    generate_scheduled_reports runs hourly, so a template runs on its day
+    in the first run after its schedule_time (09:00 when unset). Once it
+    has been generated that day, later runs skip it.
+    """
+    today = now.date()
+    if template.last_generated and timezone.localtime(template.last_generated).date() == today:
+        return False
+    if now.time() < (template.schedule_time or DEFAULT_SCHEDULE_TIME):
+        return False
+    frequency = (template.schedule_frequency or '').lower()
+    if frequency == 'daily':
+        return True
+    if frequency == 'weekly':
+        return today.weekday() == (template.schedule_day if template.schedule_day is not None else 0)
+    if frequency == 'monthly':
+        return today.day == (template.schedule_day or 1)
+    return False
 
 
 @shared_task
@@ -192,52 +210,45 @@ def generate_scheduled_report(template_id):
     if not template.is_scheduled or not template.is_active:
         return f"Template is not scheduled: {template_id}"
 
-    # Prepare report data based on template
-    report_data = {
-        'report_name': template.name,
-        'generated_by': 'Scheduled Task',
-        'metrics': template.metrics,
-        'filters': template.filters,
-        # TODO: Fetch actual data based on metrics and filters
-    }
-
-    try:
-        # Generate PDF and/or Excel
-        pdf_buffer = None
-        excel_buffer = None
-
-        if template.export_format in ['pdf', 'both']:
-            pdf_buffer = generate_executive_summary_pdf(report_data)
-
-        if template.export_format in ['excel', 'both']:
-            excel_buffer = export_analytics_to_excel(report_data)
-
-        # Create report record
-        report = GeneratedReport.objects.create(
-            template=template,
-            report_name=template.name,
-            report_type=template.report_type,
-            status='completed',
-            filters_used=template.filters,
-            expires_at=timezone.now() + timedelta(hours=48)
-        )
+    report = _create_template_report(template)
+    ReportEngine().render(report)
+    if report.status != 'completed':
+        return f"Error generating scheduled report: {report.error_message}"
 
-        # Update template
-        template.last_generated = timezone.now()
-        template.save()
+    _finish_template_report(template, report)
 
-        # Send to recipients
-        if template.recipients:
-            send_report_email.delay(
-                report_id=str(report.report_id),
-                recipients=template.recipients,
-                subject=f'{template.name} - {timezone.now().strftime("%Y-%m-%d")}'
-            )
+    return f"Scheduled report generated: {report.report_id}"
 
-        return f"Scheduled report generated: {report.report_id}"
 
-    except Exception as e:
-        return f"Error generating scheduled report: {str(e)}"
+@shared_task
+def generate_scheduled_reports():
+    """
+    Generate every scheduled template that is due this hour in one batch
+    Templates over the same scope and period share one dataset snapshot
+    """
+    now = timezone.localtime()
+    templates = [
+        template for template in ReportTemplate.objects.filter(is_scheduled=True, is_active=True)
+        if _is_template_due(template, now)
+    ]
+    if not templates:
+        return "No scheduled reports due"
+
+    reports = {template.pk: _create_template_report(template) for template in templates}
+    engine = ReportEngine()
+    engine.render_batch(list(reports.values()))
+
+    completed = 0
+    for template in templates:
+        report = reports[template.pk]
+        if report.status == 'completed':
+            completed += 1
+            _finish_template_report(template, report)
+
+    return (
+        f"Generated {completed}/{len(templates)} scheduled reports "
+        f"from {engine.snapshots_built} dataset snapshots"
+    )
 
 
 @shared_task
@@ -287,6 +298,267 @@ def send_report_email(report_id, recipients, subject):
         return f"Error sending email: {str(e)}"
 
 
+@shared_task
+def drain_email_outbox():
+    """
+    Deliver queued outbox email in batches over one connection
+    Scheduled to run every minute
+    """
+    released = release_stale_claims()
+    # Stay inside the beat interval so runs don't overlap
+    result = OutboxDispatcher().drain(time_budget=50)
+
+    return (
+        f"Outbox: {result['sent']} sent, {result['retried']} retrying, "
+        f"{result['failed']} failed, {released} stale claims released"
+    )
+
+
+def _import_handler(job):
+    """Build the import handler for a BulkUploadJob's type"""
+    from api.services.bulk_user_import import BulkUserImportService
+    from api.services.bulk_geography_import import WardBulkImportService, PollingBoothBulkImportService
+
+    if job.job_type == 'wards':
+        return WardBulkImportService.for_job(job)
+    if job.job_type == 'polling_booths':
+        return PollingBoothBulkImportService.for_job(job)
+    return BulkUserImportService(job, job.created_by)
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_bulk_upload(job_id):
+    """
+    Run or resume a bulk upload (users, wards or polling booths) in checkpointed chunks
+    Late acknowledgement re-delivers the task if the worker dies mid-import
+    """
+    from api.models import BulkUploadJob
+    from api.services.bulk_upload_jobs import ChunkedImportRunner
+
+    try:
+        job = BulkUploadJob.objects.select_related('created_by__profile').get(job_id=job_id)
+    except BulkUploadJob.DoesNotExist:
+        return f"Bulk upload not found: {job_id}"
+
+    job = ChunkedImportRunner(job, _import_handler(job)).run()
+    return f"Bulk upload {job.job_id} {job.status}: {job.processed_rows}/{job.total_rows} rows"
+
+
+@shared_task
+def resume_stalled_bulk_uploads():
+    """
+    Re-queue bulk uploads whose worker stopped reporting progress
+    Scheduled to run every 5 minutes
+    """
+    from api.services.bulk_upload_jobs import find_stalled_jobs
+
+    job_ids = [str(job_id) for job_id in find_stalled_jobs().values_list('job_id', flat=True)]
+    for job_id in job_ids:
+        process_bulk_upload.delay(job_id)
+
+    return f"Resumed {len(job_ids)} stalled bulk uploads"
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_whatsapp_events(phone_number):
+    """
+    Process a phone number's recorded WhatsApp messages in order
+    Queued by the webhook; a no-op if another worker is already on this number
+    """
+    from api.services.whatsapp_inbound import InboundEventProcessor
+
+    result = InboundEventProcessor(phone_number).drain()
+    return f"WhatsApp {phone_number}: {result['processed']} processed, {result['failed']} failed"
+
+
+@shared_task
+def sweep_whatsapp_events():
+    """
+    Re-queue phone numbers with WhatsApp messages no worker has picked up
+    Scheduled to run every minute
+    """
+    from api.services.whatsapp_inbound import pending_phone_numbers, dispatch
+
+    phone_numbers = pending_phone_numbers()
+    dispatch(phone_numbers)
+    return f"Re-queued WhatsApp events for {len(phone_numbers)} numbers"
+
+
+@shared_task
+def flush_whatsapp_statuses():
+    """
+    Apply buffered WhatsApp delivery statuses to messages in bulk
+    Scheduled by the first status of each window, and every minute as a fallback
+    """
+    from api.services.whatsapp_status import StatusIngestor
+
+    result = StatusIngestor().flush()
+    return (
+        f"Applied {result['applied']} WhatsApp statuses to {result['updated']} messages, "
+        f"{result['unmatched']} awaiting their message"
+    )
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def send_whatsapp_broadcast(broadcast_id):
+    """
+    Send or resume a WhatsApp template broadcast
+    Runs for at most the configured time budget, then re-queues itself
+    """
+    from api.models import WhatsAppBroadcast
+    from api.services.whatsapp_broadcast import BroadcastRunner, get_broadcast_setting
+
+    try:
+        broadcast = WhatsAppBroadcast.objects.get(pk=broadcast_id)
+    except WhatsAppBroadcast.DoesNotExist:
+        return f"Broadcast not found: {broadcast_id}"
+
+    runner = BroadcastRunner(broadcast)
+    broadcast = runner.run(time_budget=get_broadcast_setting('TIME_BUDGET'))
+    if runner.yielded:
+        send_whatsapp_broadcast.delay(broadcast_id)
+    return (
+        f"Broadcast {broadcast.pk} {broadcast.status}: {broadcast.sent_count} sent, "
+        f"{broadcast.failed_count} failed, {broadcast.skipped_count} skipped of {broadcast.total_recipients}"
+    )
+
+
+@shared_task
+def resume_stalled_whatsapp_broadcasts():
+    """
+    Re-queue running broadcasts whose worker stopped checkpointing
+    Scheduled to run every 5 minutes
+    """
+    from api.services.whatsapp_broadcast import find_stalled_broadcasts
+
+    broadcast_ids = [str(pk) for pk in find_stalled_broadcasts().values_list('pk', flat=True)]
+    for broadcast_id in broadcast_ids:
+        send_whatsapp_broadcast.delay(broadcast_id)
+
+    return f"Resumed {len(broadcast_ids)} stalled WhatsApp broadcasts"
+
+
+@shared_task
+def summarize_whatsapp_conversation(conversation_id, phone_number):
+    """
+    Fold a conversation's overflowed turns into its running summary
+    The model is called without the number's processing lock; the summary is
+    applied under it, briefly, so no message is handled meanwhile
+    """
+    from api.models import WhatsAppInboundEvent
+    from api.services.conversation_context import get_context_store
+    from api.services.whatsapp_inbound import LOCK_TIMEOUT, dispatch, lock_key
+
+    store = get_context_store()
+    draft = store.draft_summary(conversation_id)
+    if draft is None:
+        return f"Conversation {conversation_id}: nothing to summarize"
+
+    if not cache.add(lock_key(phone_number), True, LOCK_TIMEOUT):
+        summarize_whatsapp_conversation.apply_async((conversation_id, phone_number), countdown=30)
+        return f"Conversation {conversation_id} busy; summary deferred"
+
+    try:
+        applied = store.apply_summary(conversation_id, draft)
+    finally:
+        cache.delete(lock_key(phone_number))
+
+    # Messages that arrived while the lock was held found it taken and were left
+    if WhatsAppInboundEvent.objects.filter(phone_number=phone_number, status='pending').exists():
+        dispatch([phone_number])
+    return f"Conversation {conversation_id}: {'summary updated' if applied else 'context moved on; summary dropped'}"
+
+
+@shared_task
+def enrich_whatsapp_messages():
+    """
+    Classify, score and tag pending WhatsApp messages in batches
+    Scheduled by the first message of each batching window, and every minute as a fallback
+    """
+    from api.services.message_enrichment import MessageEnricher
+
+    from api.utils.result_cache import ai_result_cache
+
+    result = MessageEnricher().drain(time_budget=240)
+    return (
+        f"Enriched {result['enriched']} WhatsApp messages, {result['local']} locally, in {result['requests']} batches, "
+        f"{result['retried']} to retry, {result['failed']} given up "
+        f"(AI result cache hit rate {ai_result_cache.hit_rate:.0%})"
+    )
+
+
+@shared_task
+def train_local_classifier():
+    """
+    Retrain the local intent and sentiment classifier from LLM-labeled messages
+    Scheduled to run daily; workers pick the new model up within minutes
+    """
+    from api.services.local_classifier import save_local_model, train_local_model
+
+    model = train_local_model()
+    if model is None:
+        return "Not enough labeled WhatsApp messages to train the local classifier"
+
+    save_local_model(model)
+    return (
+        f"Local classifier trained on {model['examples']} messages: "
+        f"intent accuracy {model['intent']['accuracy']:.1%} at {model['intent']['coverage']:.0%} coverage, "
+        f"sentiment accuracy {model['sentiment']['accuracy']:.1%} at {model['sentiment']['coverage']:.0%} coverage"
+    )
+
+
+@shared_task
+def scrape_news():
+    """
+    Scrape Tamil Nadu news sources and store the articles not seen before
+    Runs every 6 hours
+    """
+    from api.services.news_dedup import cluster_articles
+    from api.services.news_scraper import save_articles_to_database, scrape_tamil_nadu_news
+
+    article_ids = save_articles_to_database(scrape_tamil_nadu_news())
+    # Near-duplicates share the analysis of the story they copy
+    originals = cluster_articles(article_ids)
+    if originals:
+        analyze_news_articles.delay([str(article_id) for article_id in originals])
+    return f"Scraped news: {len(article_ids)} new articles, {len(article_ids) - len(originals)} near-duplicates"
+
+
+@shared_task
+def analyze_news_articles(article_ids=None):
+    """
+    Run TVK sentiment analysis on scraped news articles
+    Queued with new article ids by the scraper, and every 15 minutes for the backlog
+    """
+    from api.services.news_dedup import cluster_articles
+    from api.services.tvk_sentiment_analyzer import AnalysisPipeline, pending_articles
+
+    pipeline = AnalysisPipeline()
+    if article_ids:
+        result = pipeline.drain(article_ids=article_ids, time_budget=10 * 60)
+    else:
+        # Articles stored without the scrape task are clustered before paying for analysis
+        cluster_articles(pending_articles().filter(minhash__isnull=True).values_list('id', flat=True)[:1000])
+        # Ends before the next 15-minute beat
+        result = pipeline.drain(time_budget=10 * 60)
+    return (
+        f"Analyzed {result['analyzed']} news articles ({result['tokens']} tokens), "
+        f"{result['failed']} left for retry"
+    )
+
+
+@shared_task
+def compact_voter_sentiment():
+    """
+    Downsample aged voter sentiment events into day and week buckets
+    Scheduled to run daily
+    """
+    from api.services.voter_sentiment import compact_sentiment_events
+
+    result = compact_sentiment_events()
+    return f"Folded {result['day']} sentiment events into days and {result['week']} rows into weeks"
+
+
 @shared_task
 def process_export_job(job_id):
     """
@@ -338,10 +610,12 @@ def cleanup_expired_reports():
 
     count = expired.count()
 
-    # TODO: Delete files from storage before deleting records
+    # Evict cached artifacts no longer referenced by a live report
+    evicted = evict_report_artifacts(expired)
+
     expired.delete()
 
-    return f"Cleaned up {count} expired reports"
+    return f"Cleaned up {count} expired reports ({evicted} artifacts evicted)"
 
 
 @shared_task
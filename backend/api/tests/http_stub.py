@@ -0,0 +1,28 @@
+"""
+Local HTTP stand-ins for tests
+Serves a BaseHTTPRequestHandler on a local port for the duration of a test class
+"""
+import threading
+from http.server import ThreadingHTTPServer
+
+
+class LocalServerMixin:
+    """
+    Start `handler` on a free local port once per test class
+
+    The server is cls.server, with base_url set to its root and a lock
+    handlers can share state under. It is stopped after tearDownClass.
+    """
+
+    handler = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), cls.handler)
+        cls.server.lock = threading.Lock()
+        cls.server.daemon_threads = True
+        cls.server.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
@@ -0,0 +1,68 @@
+"""
+Unit tests for the content-addressed artifact cache
+"""
+from django.core.files.storage import InMemoryStorage
+from django.test import SimpleTestCase
+from api.utils.artifact_cache import ArtifactCache, content_hash
+
+
+class ContentHashTest(SimpleTestCase):
+    """Test hashing of renderer inputs"""
+
+    def test_key_order_does_not_matter(self):
+        """Test logically equal dicts hash the same"""
+        self.assertEqual(
+            content_hash('chart', {'labels': ['a', 'b'], 'values': [1, 2]}),
+            content_hash('chart', {'values': [1, 2], 'labels': ['a', 'b']}),
+        )
+
+    def test_different_inputs_differ(self):
+        """Test changed data produces a new hash"""
+        self.assertNotEqual(
+            content_hash('chart', {'values': [1, 2]}),
+            content_hash('chart', {'values': [1, 3]}),
+        )
+
+
+class ArtifactCacheTest(SimpleTestCase):
+    """Test artifact storage, lookup and eviction"""
+
+    def setUp(self):
+        self.cache = ArtifactCache(storage=InMemoryStorage(), memory_entries=2)
+
+    def test_put_then_get(self):
+        """Test stored bytes are returned on a hit"""
+        digest = content_hash('report', 'pdf')
+        path = self.cache.put('reports', digest, 'pdf', b'%PDF-1.4')
+        self.assertEqual(path, self.cache.path_for('reports', digest, 'pdf'))
+        self.assertEqual(self.cache.get('reports', digest, 'pdf'), b'%PDF-1.4')
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_miss(self):
+        """Test unknown hashes are misses"""
+        self.assertIsNone(self.cache.get('charts', content_hash('missing'), 'png'))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_put_keeps_existing_artifact(self):
+        """Test writing the same hash twice keeps a single file"""
+        digest = content_hash('chart')
+        first = self.cache.put('charts', digest, 'png', b'one')
+        second = self.cache.put('charts', digest, 'png', b'one')
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.storage.listdir(f'artifacts/charts/{digest[:2]}')[1], [f'{digest}.png'])
+
+    def test_memory_lru_is_bounded(self):
+        """Test the in-process tier drops least recently used charts"""
+        for i in range(3):
+            self.cache.put('charts', content_hash(i), 'png', b'x', remember=True)
+        self.assertEqual(len(self.cache._memory), 2)
+        self.assertNotIn(self.cache.path_for('charts', content_hash(0), 'png'), self.cache._memory)
+
+    def test_evict_keeps_referenced(self):
+        """Test eviction only removes unreferenced artifacts"""
+        kept = self.cache.put('reports', content_hash('a'), 'pdf', b'a')
+        dropped = self.cache.put('reports', content_hash('b'), 'pdf', b'b')
+        removed = self.cache.evict([kept, dropped], keep={kept})
+        self.assertEqual(removed, 1)
+        self.assertTrue(self.cache.storage.exists(kept))
+        self.assertFalse(self.cache.storage.exists(dropped))
@@ -0,0 +1,201 @@
+"""
+Unit tests for ward/booth bulk import
+Runs against a local HTTP stand-in for the Supabase REST API
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import BulkUploadJob, BulkUploadError
+from api.services.bulk_geography_import import (
+    AdaptiveBatchWriter, SupabaseService, SupabaseWriteError, WardBulkImportService,
+)
+from api.services.bulk_upload_jobs import ChunkedImportRunner
+from api.tests.http_stub import LocalServerMixin
+
+
+class FakeSupabase(BaseHTTPRequestHandler):
+    """Minimal PostgREST stand-in: rejects rows named REJECT, can fail the first N writes
+
+    Like PostgREST, a batch whose rows have different keys is rejected
+    unless the request names its columns; missing columns are stored as None.
+    """
+
+    tables = {}
+    fail_next_writes = 0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status_code, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        table = url.path.rsplit('/', 1)[-1]
+        query = parse_qs(url.query)
+        offset, limit = int(query['offset'][0]), int(query['limit'][0])
+        self._send(200, self.tables.get(table, [])[offset:offset + limit])
+
+    def do_POST(self):
+        cls = FakeSupabase
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            rows = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(0.01)
+            with cls.lock:
+                if cls.fail_next_writes:
+                    cls.fail_next_writes -= 1
+                    return self._send(503, {'message': 'Service unavailable'})
+            if any(row.get('name') == 'REJECT' for row in rows):
+                return self._send(400, {'message': 'invalid input value'})
+            url = urlparse(self.path)
+            columns = parse_qs(url.query).get('columns')
+            if columns:
+                columns = columns[0].split(',')
+                rows = [{column: row.get(column) for column in columns} for row in rows]
+            elif len({frozenset(row) for row in rows}) > 1:
+                return self._send(400, {'message': 'All object keys must match'})
+            table = url.path.rsplit('/', 1)[-1]
+            with cls.lock:
+                cls.tables.setdefault(table, []).extend(rows)
+            self._send(201)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+class SupabaseStandInMixin(LocalServerMixin):
+    """Start the stand-in server once per test class"""
+
+    handler = FakeSupabase
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.settings_override = override_settings(
+            SUPABASE_URL=cls.server.base_url, SUPABASE_SERVICE_KEY='test-service-key',
+        )
+        cls.settings_override.enable()
+        cls.addClassCleanup(cls.settings_override.disable)
+
+    def setUp(self):
+        FakeSupabase.tables = {
+            'constituencies': [{'id': 'c-1', 'code': 'TN-AC-001'}, {'id': 'c-2', 'code': 'TN-AC-002'}],
+        }
+        FakeSupabase.fail_next_writes = 0
+        FakeSupabase.max_in_flight = 0
+
+
+class AdaptiveBatchWriterTest(SimpleTestCase):
+    """Test bisection, retries and batch sizing"""
+
+    def test_bad_rows_are_isolated(self):
+        """Test a rejected batch is bisected down to the offending rows"""
+        def send(batch):
+            if any(row['bad'] for row in batch):
+                raise SupabaseWriteError('invalid input', status_code=400)
+
+        rows = [{'bad': i in (7, 130)} for i in range(200)]
+        result = AdaptiveBatchWriter(send, batch_size=50, max_workers=4).write(rows)
+        self.assertEqual(result['written'], 198)
+        self.assertEqual([failure['index'] for failure in result['failed']], [7, 130])
+
+    def test_transient_errors_are_retried(self):
+        """Test server errors are retried with backoff instead of failing rows"""
+        calls = {'count': 0}
+        sleeps = []
+
+        def send(batch):
+            calls['count'] += 1
+            if calls['count'] == 1:
+                raise SupabaseWriteError('timeout', status_code=503)
+
+        result = AdaptiveBatchWriter(send, batch_size=100, max_workers=1, sleep=sleeps.append).write([{}] * 100)
+        self.assertEqual(result, {'written': 100, 'failed': []})
+        self.assertEqual(len(sleeps), 1)
+
+    def test_batch_size_grows_when_fast(self):
+        """Test quick batches double the batch size"""
+        writer = AdaptiveBatchWriter(lambda batch: None, batch_size=50, max_workers=1)
+        writer.write([{}] * 1000)
+        self.assertGreater(writer.batch_size, 50)
+
+
+class SupabaseServiceTest(SupabaseStandInMixin, SimpleTestCase):
+    """Test the pooled REST client against the stand-in"""
+
+    def test_concurrent_upsert_with_rejected_row(self):
+        """Test batches are sent concurrently and only bad rows fail"""
+        wards = [{'organization_id': 'org', 'code': f'W{i}', 'name': f'Ward {i}'} for i in range(600)]
+        wards[321]['name'] = 'REJECT'
+
+        result = SupabaseService().bulk_upsert_wards(wards, batch_size=50)
+        self.assertEqual(result['total_upserted'], 599)
+        self.assertEqual(result['total_failed'], 1)
+        self.assertEqual(result['errors'][0]['index'], 321)
+        self.assertEqual(len(FakeSupabase.tables['wards']), 599)
+        self.assertGreater(FakeSupabase.max_in_flight, 1)
+
+    def test_rows_with_different_optional_fields(self):
+        """Test one batch carries rows with and without optional fields"""
+        wards = [{'organization_id': 'org', 'code': f'W{i}', 'name': f'Ward {i}'} for i in range(10)]
+        wards[3]['population'] = 5000
+        wards[7]['latitude'] = 9.93
+
+        result = SupabaseService().bulk_upsert_wards(wards, batch_size=50)
+        self.assertEqual((result['total_upserted'], result['total_failed']), (10, 0))
+        stored = {ward['code']: ward for ward in FakeSupabase.tables['wards']}
+        self.assertEqual((stored['W3']['population'], stored['W3']['latitude']), (5000, None))
+        self.assertEqual((stored['W7']['population'], stored['W7']['latitude']), (None, 9.93))
+
+    def test_get_constituencies_pages(self):
+        """Test reads page past the row limit"""
+        FakeSupabase.tables['constituencies'] = [{'id': f'c-{i}', 'code': f'C{i}'} for i in range(2500)]
+        self.assertEqual(len(SupabaseService().get_constituencies('org')), 2500)
+
+
+class WardImportJobTest(SupabaseStandInMixin, TestCase):
+    """Test a ward import running as a chunked background job"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user(username='admin', email='admin@example.com')
+
+    def test_ward_import_job(self):
+        """Test valid wards are written and bad rows become BulkUploadErrors"""
+        lines = ['constituency_code,name,code,ward_number']
+        lines += [f'TN-AC-001,Ward {i},TN-AC-001-W-{i:03d},{i}' for i in range(1, 41)]
+        lines.append('TN-AC-002,REJECT,TN-AC-002-W-001,1')    # rejected by Supabase
+        lines.append('TN-AC-999,Unknown,TN-AC-999-W-001,1')   # unknown constituency
+        lines.append('TN-AC-001,Again,TN-AC-001-W-001,1')     # duplicate code
+        job = BulkUploadJob.objects.create(
+            created_by=self.user, file_name='wards.csv', job_type='wards', chunk_size=20,
+            options={'organization_id': 'org', 'update_existing': False},
+        )
+
+        job = ChunkedImportRunner(job, WardBulkImportService.for_job(job)).run('\n'.join(lines).encode())
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.total_rows, job.success_count, job.failed_count), (43, 40, 3))
+        self.assertEqual(len(FakeSupabase.tables['wards']), 40)
+        self.assertEqual(FakeSupabase.tables['wards'][0]['constituency_id'], 'c-1')
+        errors = dict(BulkUploadError.objects.filter(job=job).values_list('row_number', 'error_field'))
+        self.assertEqual(errors, {42: 'supabase', 43: 'validation', 44: 'duplicate'})
@@ -0,0 +1,119 @@
+"""
+Unit tests for the bulk upsert engine and import_electoral_data
+Tests natural-key diffing, bulk writes and dry-run output
+"""
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.management.commands.import_electoral_data import Command
+from api.models import State, District, Constituency, PollingBooth
+from api.utils.bulk_upsert import BulkUpserter
+
+
+class BulkUpserterTest(TestCase):
+    """Test classifying and applying rows"""
+
+    def setUp(self):
+        State.objects.create(code='TN', name='Tamil Nadu', capital='Chennai')
+        State.objects.create(code='KL', name='Kerala', capital='Thiruvananthapuram')
+
+    def _upserter(self, **kwargs):
+        return BulkUpserter(State, ['code'], ['name', 'capital'], **kwargs)
+
+    def test_diff_and_apply(self):
+        """Test new, changed and unchanged rows are written with a fixed number of queries"""
+        upserter = self._upserter()
+        self.assertEqual(upserter.add({'code': 'TN', 'name': 'Tamil Nadu', 'capital': 'Chennai'}), 'unchanged')
+        self.assertEqual(upserter.add({'code': 'KL', 'name': 'Kerala', 'capital': 'Kochi'}), 'updated')
+        self.assertEqual(upserter.add({'code': 'KA', 'name': 'Karnataka', 'capital': 'Bengaluru'}), 'created')
+        self.assertEqual(upserter.changed_fields, {'capital': 1})
+
+        with self.assertNumQueries(2):
+            upserter.apply()
+
+        self.assertEqual(State.objects.get(code='KL').capital, 'Kochi')
+        self.assertEqual(State.objects.count(), 3)
+        self.assertEqual(set(upserter.id_map()), {'TN', 'KL', 'KA'})
+
+    def test_skip_existing(self):
+        """Test existing keys are left alone when skipping"""
+        upserter = self._upserter(skip_existing=True)
+        self.assertEqual(upserter.add({'code': 'KL', 'name': 'Kerala', 'capital': 'Kochi'}), 'skipped')
+        upserter.apply()
+        self.assertEqual(State.objects.get(code='KL').capital, 'Thiruvananthapuram')
+
+    def test_repeated_key_last_row_wins(self):
+        """Test a key repeated in the input is written once with the last values"""
+        upserter = self._upserter()
+        upserter.add({'code': 'GA', 'name': 'Goa', 'capital': 'Panjim'})
+        upserter.add({'code': 'GA', 'name': 'Goa', 'capital': 'Panaji'})
+        upserter.apply()
+        self.assertEqual(State.objects.get(code='GA').capital, 'Panaji')
+
+
+class ImportElectoralDataTest(TestCase):
+    """Test the management command end to end"""
+
+    FILES = {
+        'states.csv': 'code,name,capital\nTN,Tamil Nadu,Chennai\n',
+        'districts.csv': 'code,state_code,name\nTN-CHN,TN,Chennai\nTN-MDU,TN,Madurai\n',
+        'constituencies.csv': (
+            'code,state_code,district_code,name,number\n'
+            'TN-AC-001,TN,TN-CHN,Gummidipoondi,1\n'
+            'TN-AC-002,TN,TN-MDU,Ponneri,2\n'
+        ),
+        'polling_booths.csv': (
+            'state_code,district_code,constituency_code,booth_number,name,total_voters,latitude\n'
+            'TN,TN-CHN,TN-AC-001,001,School,900,13.0827\n'
+            'TN,TN-CHN,TN-AC-001,002,Hall,800,\n'
+            'TN,TN-MDU,TN-AC-002,001,Temple,700,\n'
+            'TN,TN-MDU,TN-AC-999,001,Nowhere,100,\n'
+        ),
+    }
+
+    def setUp(self):
+        self.data_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        for name, content in self.FILES.items():
+            (self.data_dir / name).write_text(content)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('import_electoral_data', str(self.data_dir), *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_then_reload(self):
+        """Test a first load creates rows and a reload only updates what changed"""
+        self._run()
+        self.assertEqual(PollingBooth.objects.count(), 3)
+        booth = PollingBooth.objects.get(constituency__code='TN-AC-001', booth_number='001')
+        self.assertEqual(booth.district.code, 'TN-CHN')
+        self.assertEqual(Constituency.objects.get(code='TN-AC-002').district.code, 'TN-MDU')
+
+        (self.data_dir / 'polling_booths.csv').write_text(
+            self.FILES['polling_booths.csv'].replace('Hall,800', 'Hall,850')
+        )
+        command = self._command()
+        command.handle(data_dir=str(self.data_dir), clear=False, dry_run=False,
+                       skip_existing=False, batch_size=2000)
+        self.assertEqual(command.stats['booths'], {
+            'created': 0, 'updated': 1, 'unchanged': 2, 'skipped': 0, 'errors': 1,
+        })
+        self.assertEqual(PollingBooth.objects.get(booth_number='002').total_voters, 850)
+
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run reports the diff, including rows under new parents, without writing"""
+        command = self._command()
+        command.handle(data_dir=str(self.data_dir), clear=False, dry_run=True,
+                       skip_existing=False, batch_size=2000)
+        self.assertEqual(command.stats['booths']['created'], 3)
+        self.assertEqual(command.stats['districts']['created'], 2)
+        self.assertEqual(State.objects.count() + District.objects.count() + PollingBooth.objects.count(), 0)
+
+    def _command(self):
+        return Command(stdout=StringIO())
@@ -0,0 +1,164 @@
+"""
+Unit tests for the bulk user import service
+Tests set-based row validation and batched user creation
+"""
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from api.models import State, District, BulkUploadJob, AuditLog, EmailOutbox
+from api.services import bulk_user_import
+from api.services.bulk_user_import import BulkUserImportService, PARALLEL_HASH_THRESHOLD, hash_passwords
+
+
+class BulkUserValidationTest(TestCase):
+    """Test validating uploaded rows against preloaded lookups"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com')
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save()
+        User.objects.create_user(username='taken', email='Taken@example.com')
+
+        self.state = State.objects.create(name="Tamil Nadu", code="TN")
+        self.district = District.objects.create(state=self.state, name="Chennai", code="CHN")
+
+        self.job = BulkUploadJob.objects.create(
+            created_by=self.admin, file_name='users.csv', file_path='users.csv'
+        )
+        self.service = BulkUserImportService(self.job, self.admin)
+
+    def _rows(self, *rows):
+        return [{'row_number': idx, 'data': row} for idx, row in enumerate(rows, start=2)]
+
+    def _row(self, email, **extra):
+        return {'name': 'Test User', 'email': email, 'role': 'user', **extra}
+
+    def test_valid_rows(self):
+        """Test rows with known references pass"""
+        rows = self._rows(
+            self._row('a@example.com', state_id=str(self.state.id), district_id=str(self.district.id)),
+            self._row('b@example.com'),
+        )
+        self.assertEqual(self.service.validate_all_rows(rows), [])
+
+    def test_reference_errors(self):
+        """Test existing emails and unknown ids are reported"""
+        rows = self._rows(
+            self._row('taken@example.com'),
+            self._row('c@example.com', state_id='9999', district_id='abc'),
+        )
+        errors = {(e.row_number, e.error_field): e.error_message for e in self.service.validate_all_rows(rows)}
+        self.assertEqual(errors[(2, 'email')], 'Email taken@example.com already exists')
+        self.assertEqual(errors[(3, 'state_id')], 'State ID 9999 does not exist')
+        self.assertEqual(errors[(3, 'district_id')], 'District ID must be a number, got: abc')
+
+    def test_duplicate_emails_in_file(self):
+        """Test repeated emails are flagged after the first row"""
+        rows = self._rows(self._row('d@example.com'), self._row('D@example.com'))
+        errors = self.service.validate_all_rows(rows)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].row_number, 3)
+        self.assertIn('first seen on row 2', errors[0].error_message)
+
+    def test_query_count_is_constant(self):
+        """Test validation does not query per row"""
+        rows = self._rows(*[
+            self._row(f'user{i}@example.com', state_id=str(self.state.id), district_id=str(self.district.id))
+            for i in range(500)
+        ])
+        with self.assertNumQueries(3):
+            self.assertEqual(self.service.validate_all_rows(rows), [])
+
+    def test_single_row_validation(self):
+        """Test validate_row still works without preloaded lookups"""
+        is_valid, errors = self.service.validate_row(self._row('taken@example.com'), 2)
+        self.assertFalse(is_valid)
+        self.assertEqual(errors, ['Email taken@example.com already exists'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BulkUserCreationTest(TestCase):
+    """Test batched user creation"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com')
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save()
+        self.state = State.objects.create(name="Tamil Nadu", code="TN")
+        self.job = BulkUploadJob.objects.create(
+            created_by=self.admin, file_name='users.csv', file_path='users.csv'
+        )
+        self.service = BulkUserImportService(self.job, self.admin)
+
+    def test_hash_passwords_in_pool(self):
+        """Test pooled hashes verify against the original passwords"""
+        passwords = [f'Secret-{i}' for i in range(PARALLEL_HASH_THRESHOLD)]
+        with patch.object(bulk_user_import, 'ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool:
+            hashes = hash_passwords(passwords, workers=2)
+        pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(len(hashes), len(passwords))
+        self.assertTrue(check_password(passwords[0], hashes[0]))
+        self.assertTrue(check_password(passwords[-1], hashes[-1]))
+
+    def test_allocate_usernames(self):
+        """Test usernames avoid existing users and each other"""
+        usernames = self.service.allocate_usernames(['admin@other.com', 'ravi@a.com', 'ravi@b.com'])
+        self.assertEqual(usernames, ['admin1', 'ravi', 'ravi1'])
+
+    def test_process_csv_creates_users_in_batches(self):
+        """Test users, profiles and progress are written per chunk"""
+        self.job.chunk_size = 2
+        self.job.save()
+        lines = ['name,email,role,phone,state_id']
+        lines += [f'User {i},user{i}@example.com,volunteer,98400{i:05d},{self.state.id}' for i in range(5)]
+        self.service.process_csv('\n'.join(lines))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+        self.assertEqual(self.job.success_count, 5)
+        self.assertEqual(self.job.processed_rows, 5)
+
+        user = User.objects.get(email='user3@example.com')
+        self.assertEqual(user.profile.role, 'volunteer')
+        self.assertEqual(user.profile.assigned_state, self.state)
+        self.assertTrue(user.profile.must_change_password)
+        self.assertTrue(user.has_usable_password())
+        self.assertTrue(AuditLog.objects.filter(target_model='User', target_id=str(user.id)).exists())
+        self.assertEqual(EmailOutbox.objects.filter(category='welcome', status='pending').count(), 5)
+
+    def test_passwords_hashed_outside_chunk_transaction(self):
+        """Test each chunk's passwords are hashed before its transaction opens"""
+        self.job.chunk_size = 2
+        self.job.save()
+        depth = len(connection.savepoint_ids)
+        depths = []
+
+        def hash_outside(passwords):
+            depths.append(len(connection.savepoint_ids))
+            return [f'hash-{password}' for password in passwords]
+
+        lines = ['name,email,role'] + [f'User {i},user{i}@example.com,user' for i in range(3)]
+        with patch.object(bulk_user_import, 'hash_passwords', side_effect=hash_outside):
+            self.service.process_csv('\n'.join(lines))
+
+        self.assertEqual(depths, [depth, depth])
+        self.assertEqual(User.objects.filter(password__startswith='hash-').count(), 3)
+
+    def test_duplicates_across_chunks(self):
+        """Test an email repeated in a later chunk is still rejected"""
+        self.job.chunk_size = 2
+        self.job.save()
+        lines = ['name,email,role']
+        lines += [f'User {i},user{i}@example.com,user' for i in range(4)]
+        lines.append('Again,USER0@example.com,user')
+        self.service.process_csv('\n'.join(lines))
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.total_rows, self.job.success_count, self.job.failed_count), (5, 4, 1))
+        error = self.job.errors.get()
+        self.assertEqual(error.row_number, 6)
+        self.assertIn('first seen on row 2', error.error_message)
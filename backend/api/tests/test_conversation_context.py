@@ -0,0 +1,179 @@
+"""
+Unit tests for the conversation context store
+Tests recent-turn windows, running summaries and message counters
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import VoterProfile, WhatsAppConversation, WhatsAppInboundEvent, WhatsAppMessage
+from api.services.conversation_context import ConversationContextStore
+from api.services.message_processor import MessageProcessor
+from api.services.whatsapp_inbound import lock_key
+from api.tasks import summarize_whatsapp_conversation
+
+
+class FakeAIService:
+    """Echoes messages back and records the history it was given"""
+
+    def __init__(self):
+        self.histories = []
+
+    def detect_language(self, text):
+        return 'en'
+
+    def generate_conversation_response(self, user_message, conversation_history, **kwargs):
+        self.histories.append(conversation_history)
+        return {'response': f'reply to {user_message}', 'tokens': {'prompt': 0, 'completion': 0}, 'model': 'fake'}
+
+    def summarize_conversation(self, conversation_history):
+        return f"{len(conversation_history)} turns about roads"
+
+
+class FakeWhatsAppService:
+    """Accepts every message"""
+
+    def send_text_message(self, to, message):
+        return {'message_id': None}
+
+    def generate_click_to_chat_link(self, **kwargs):
+        return 'https://wa.me/'
+
+
+@override_settings(WHATSAPP_CONTEXT={'TURNS': 6, 'SUMMARIZE_EVERY': 4})
+class MessageProcessorContextTest(TestCase):
+    """Test prompts are built from the cached context"""
+
+    def setUp(self):
+        cache.clear()
+        self.processor = MessageProcessor.__new__(MessageProcessor)
+        self.processor.ai_service = FakeAIService()
+        self.processor.whatsapp_service = FakeWhatsAppService()
+        self.processor.context_store = ConversationContextStore()
+
+    def _send(self, count, start=0):
+        with patch('api.tasks.enrich_whatsapp_messages.apply_async'), \
+                patch('api.tasks.summarize_whatsapp_conversation.delay') as summarize:
+            for i in range(start, start + count):
+                result = self.processor.process_incoming_message('919876543210', f'message {i}')
+                self.assertEqual(result['status'], 'success')
+        return summarize
+
+    def test_history_is_the_latest_turns(self):
+        """Test the prompt carries the most recent turns, not the oldest"""
+        self._send(10)
+        history = self.processor.ai_service.histories[-1]
+        self.assertEqual([turn['content'] for turn in history], [
+            'message 6', 'reply to message 6', 'message 7', 'reply to message 7',
+            'message 8', 'reply to message 8',
+        ])
+
+    def test_prompt_needs_no_queries(self):
+        """Test a cached context is read without touching the database"""
+        self._send(2)
+        conversation = WhatsAppConversation.objects.get()
+        store = self.processor.context_store
+        with self.assertNumQueries(0):
+            history = store.history(store.load(conversation))
+        self.assertEqual(len(history), 4)
+
+    def test_cache_miss_rebuilds_from_database(self):
+        """Test an evicted context is rebuilt from the latest stored messages"""
+        self._send(5)
+        cache.clear()
+        self._send(1, start=5)
+        history = self.processor.ai_service.histories[-1]
+        self.assertEqual(history[0]['content'], 'message 2')
+        self.assertEqual(history[-1]['content'], 'reply to message 4')
+
+    def test_overflow_is_summarized(self):
+        """Test overflowed turns are folded into a summary written to the database"""
+        summarize = self._send(6)
+        conversation = WhatsAppConversation.objects.get()
+        summarize.assert_called_with(str(conversation.id), '919876543210')
+
+        store = self.processor.context_store
+        self.assertEqual(store.summarize(conversation.id, FakeAIService()), '6 turns about roads')
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.summary, '6 turns about roads')
+
+        self._send(1, start=6)
+        history = self.processor.ai_service.histories[-1]
+        self.assertEqual(history[0]['role'], 'system')
+        self.assertIn('6 turns about roads', history[0]['content'])
+        self.assertEqual(len(history), 7)
+
+    def test_turns_overflowed_while_drafting_are_kept(self):
+        """Test a summary drafted before more turns overflowed applies and keeps the newer turns"""
+        self._send(6)
+        conversation = WhatsAppConversation.objects.get()
+        store = self.processor.context_store
+        draft = store.draft_summary(conversation.id, FakeAIService())
+
+        self._send(1, start=6)
+        self.assertTrue(store.apply_summary(conversation.id, draft))
+        context = store.load(conversation)
+        self.assertEqual(context['summary'], '6 turns about roads')
+        self.assertEqual([turn['content'] for turn in context['overflow']], ['message 3', 'reply to message 3'])
+
+    def test_stale_draft_is_dropped(self):
+        """Test a draft is not applied over a summary written since"""
+        self._send(6)
+        conversation = WhatsAppConversation.objects.get()
+        store = self.processor.context_store
+        draft = store.draft_summary(conversation.id, FakeAIService())
+        store.summarize(conversation.id, FakeAIService())
+
+        self.assertFalse(store.apply_summary(conversation.id, draft))
+
+    def test_summary_task_leaves_the_number_unlocked(self):
+        """Test the model is called without the processing lock and waiting events are dispatched"""
+        self._send(6)
+        conversation = WhatsAppConversation.objects.get()
+        WhatsAppInboundEvent.objects.create(
+            whatsapp_message_id='wamid.9', phone_number='919876543210', payload={}, sent_at=timezone.now(),
+        )
+        locked = []
+
+        class LockCheckingAIService(FakeAIService):
+            def summarize_conversation(self, conversation_history):
+                locked.append(cache.get(lock_key('919876543210')))
+                return super().summarize_conversation(conversation_history)
+
+        with patch('api.services.ai_service.get_ai_service', return_value=LockCheckingAIService()), \
+                patch('api.tasks.process_whatsapp_events.delay') as process:
+            self.assertEqual(summarize_whatsapp_conversation(str(conversation.id), '919876543210'),
+                             f"Conversation {conversation.id}: summary updated")
+
+        self.assertEqual(locked, [None])
+        self.assertIsNone(cache.get(lock_key('919876543210')))
+        process.assert_called_once_with('919876543210')
+
+    def test_counters_are_incremented(self):
+        """Test message and interaction counters count every message"""
+        self._send(3)
+        self.assertEqual(WhatsAppConversation.objects.get().message_count, 6)
+        self.assertEqual(WhatsAppMessage.objects.count(), 6)
+        profile = VoterProfile.objects.get(phone_number='919876543210')
+        self.assertEqual((profile.interaction_count, profile.total_messages_sent), (3, 3))
+
+    def test_retry_after_failed_reply(self):
+        """Test a redelivered message is answered once if its first reply failed"""
+        def receive():
+            with patch('api.tasks.enrich_whatsapp_messages.apply_async'):
+                return self.processor.process_incoming_message('919876543210', 'road broken', whatsapp_message_id='wamid.1')
+
+        with patch.object(FakeWhatsAppService, 'send_text_message', return_value=None):
+            self.assertEqual(receive()['status'], 'error')
+        self.assertEqual(WhatsAppMessage.objects.get().sender, 'user')
+
+        self.assertEqual(receive()['status'], 'success')
+        self.assertEqual(receive()['status'], 'duplicate')
+
+        self.assertEqual(list(WhatsAppMessage.objects.order_by('timestamp').values_list('sender', flat=True)), ['user', 'bot'])
+        self.assertEqual(WhatsAppConversation.objects.get().message_count, 2)
+        self.assertEqual(self.processor.ai_service.histories[-1], [])
+        store = self.processor.context_store
+        self.assertEqual(len(store.history(store.load(WhatsAppConversation.objects.get()))), 2)
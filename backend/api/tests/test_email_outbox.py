@@ -0,0 +1,107 @@
+"""
+Unit tests for the email outbox
+Tests queueing, batched delivery, retries and backoff
+"""
+from datetime import timedelta
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.models import EmailOutbox
+from api.services.email_outbox import OutboxDispatcher, queue_email, queue_emails, retry_delay
+
+
+class CountingBackend(LocmemBackend):
+    """Locmem backend that counts opened connections"""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class RejectingBackend(BaseEmailBackend):
+    """Backend that rejects mail to one address"""
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if 'bounce@example.com' in message.to:
+                raise ConnectionError("Recipient rejected")
+            mail.outbox.append(message)
+        return len(email_messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTest(TestCase):
+    """Test outbox delivery"""
+
+    def _queue(self, count, prefix='user'):
+        return queue_emails([
+            {'to_email': f'{prefix}{i}@example.com', 'subject': 'Welcome', 'body': f'Password {i}'}
+            for i in range(count)
+        ], category='welcome')
+
+    def test_queue_does_not_send(self):
+        """Test queueing only writes outbox rows"""
+        self._queue(3)
+        self.assertEqual(EmailOutbox.objects.filter(status='pending').count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_drain_sends_all(self):
+        """Test draining delivers every due message and clears bodies"""
+        self._queue(5)
+        result = OutboxDispatcher(batch_size=2, rate_per_second=0).drain()
+        self.assertEqual(result['sent'], 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].to, ['user0@example.com'])
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+        self.assertFalse(EmailOutbox.objects.exclude(body='').exists())
+
+    @override_settings(EMAIL_BACKEND='api.tests.test_email_outbox.CountingBackend')
+    def test_one_connection_per_batch(self):
+        """Test a batch reuses a single connection"""
+        CountingBackend.opened = 0
+        self._queue(6)
+        OutboxDispatcher(batch_size=3, rate_per_second=0).drain()
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 6)
+
+    @override_settings(EMAIL_BACKEND='api.tests.test_email_outbox.RejectingBackend')
+    def test_failures_retry_with_backoff(self):
+        """Test failed messages are rescheduled and eventually marked failed, without their body"""
+        queue_email('ok@example.com', 'Hi', 'Body')
+        bounced = queue_email('bounce@example.com', 'Hi', 'Temporary password: x7Kq')
+
+        result = OutboxDispatcher(rate_per_second=0, max_attempts=2).drain()
+        self.assertEqual((result['sent'], result['retried']), (1, 1))
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, 'pending')
+        self.assertEqual(bounced.attempts, 1)
+        self.assertEqual(bounced.body, 'Temporary password: x7Kq')
+        self.assertGreater(bounced.next_attempt_at, timezone.now())
+
+        # Not due yet
+        self.assertEqual(OutboxDispatcher(rate_per_second=0).drain()['sent'], 0)
+
+        EmailOutbox.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+        result = OutboxDispatcher(rate_per_second=0, max_attempts=2).drain()
+        bounced.refresh_from_db()
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(bounced.status, 'failed')
+        self.assertEqual(bounced.body, '')
+        self.assertIn('Recipient rejected', bounced.last_error)
+
+    def test_rate_limit(self):
+        """Test sends are spaced to the configured rate"""
+        self._queue(3)
+        sleeps = []
+        OutboxDispatcher(rate_per_second=5, sleep=sleeps.append).drain()
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(all(0 < wait <= 0.2 for wait in sleeps))
+
+    def test_retry_delay_is_exponential(self):
+        """Test backoff doubles per attempt"""
+        self.assertEqual(retry_delay(1), timedelta(seconds=60))
+        self.assertEqual(retry_delay(3), timedelta(seconds=240))
+        self.assertEqual(retry_delay(20), timedelta(seconds=3600))
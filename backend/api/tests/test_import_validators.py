@@ -0,0 +1,118 @@
+"""
+Unit tests for ward and polling booth import validation
+Tests row checks, typed spreadsheet cells and single-pass duplicate detection
+"""
+from django.test import SimpleTestCase
+
+from api.utils.validators import DuplicateDetector, PollingBoothValidator, WardValidator
+
+
+class WardValidationTest(SimpleTestCase):
+    """Test ward rows and batches"""
+
+    CODES = {'TN-AC-001'}
+
+    def _ward(self, **overrides):
+        ward = {'constituency_code': 'TN-AC-001', 'name': 'Ward 1', 'code': 'TN-AC-001-W-001',
+                'ward_number': '1', 'population': '5000', 'voter_count': '3000'}
+        ward.update(overrides)
+        return ward
+
+    def errors(self, rows):
+        return {
+            index: messages for index, row in enumerate(rows)
+            for messages in [WardValidator.validate_row(row, index + 1, self.CODES)[1]] if messages
+        }
+
+    def test_clean_rows_have_no_errors(self):
+        """Test valid rows pass every check"""
+        rows = [self._ward(code=f'TN-AC-001-W-{i:03d}', ward_number=str(i)) for i in range(1, 50)]
+        self.assertEqual(self.errors(rows), {})
+
+    def test_errors_in_check_order(self):
+        """Test each failing row gets its messages in check order"""
+        rows = [
+            self._ward(),
+            self._ward(constituency_code='TN-AC-999', code='bad', ward_number='0'),
+            self._ward(population='100', voter_count='-5', literacy_rate='120'),
+            self._ward(name=' ', urbanization='Metro'),
+            self._ward(population='100', voter_count='300'),
+        ]
+        errors = self.errors(rows)
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(errors[1], [
+            'Invalid constituency_code: TN-AC-999 not found',
+            'Invalid ward code format: bad. Expected format: XX-AC-XXX-W-XXX',
+            'ward_number must be a positive integer',
+        ])
+        self.assertEqual(errors[2], ['voter_count cannot be negative', 'literacy_rate must be between 0 and 100'])
+        self.assertEqual(errors[3][0], 'Missing required field: name')
+        self.assertEqual(errors[4], ['voter_count cannot exceed population'])
+
+    def test_unparsable_number(self):
+        """Test a number that does not parse is reported with its value"""
+        self.assertEqual(
+            WardValidator.validate_row(self._ward(population='abc'), 2, self.CODES),
+            (False, ['Invalid population: abc (must be an integer)']),
+        )
+
+    def test_typed_spreadsheet_cells(self):
+        """Test numbers in text columns, as XLSX sheets give them, are reported instead of raising"""
+        self.assertEqual(
+            WardValidator.validate_row(self._ward(code=1001, urbanization=3, population=5000), 2, self.CODES),
+            (False, [
+                'Invalid ward code format: 1001. Expected format: XX-AC-XXX-W-XXX',
+                "Invalid urbanization: 3. Must be one of ['urban', 'semi_urban', 'rural']",
+            ]),
+        )
+
+    def test_validate_batch_summary(self):
+        """Test validate_batch keeps its result format"""
+        result = WardValidator.validate_batch([self._ward(), self._ward(code='x')], self.CODES)
+        self.assertEqual((result['valid_rows'], result['invalid_rows']), (1, 1))
+        self.assertEqual(result['errors'][0]['row_number'], 2)
+
+
+class PollingBoothValidationTest(SimpleTestCase):
+    """Test booth rows"""
+
+    def test_booth_checks(self):
+        """Test coordinate, voter total and boolean checks"""
+        base = {'constituency_code': 'TN-AC-001', 'booth_number': '001', 'name': 'School'}
+        rows = [
+            {**base, 'latitude': '13.08', 'longitude': '80.27', 'total_voters': '900', 'male_voters': '450'},
+            {**base, 'latitude': '95', 'total_voters': '100', 'male_voters': '80', 'female_voters': '40'},
+            {**base, 'booth_number': 'x' * 51, 'is_active': 'maybe', 'priority_level': '9'},
+        ]
+        errors = [PollingBoothValidator.validate_row(row, index + 1, {'TN-AC-001'})[1] for index, row in enumerate(rows)]
+        self.assertEqual(errors[0], [])
+        self.assertEqual(errors[1], [
+            'Invalid latitude: 95.0 (must be between -90 and 90)',
+            'Sum of gender voters (120) exceeds total_voters (100)',
+        ])
+        self.assertEqual(errors[2], [
+            f"booth_number too long (max 50 characters): {'x' * 51}",
+            'priority_level must be between 1 and 5',
+            'Invalid is_active: maybe (must be boolean)',
+        ])
+
+
+class DuplicateDetectorTest(SimpleTestCase):
+    """Test single-pass duplicate detection"""
+
+    def test_scan_across_batches(self):
+        """Test repeats are reported against the first row, even from an earlier batch"""
+        seen = {}
+        self.assertEqual(DuplicateDetector.scan(['A', 'B', None, 'A'], seen, labels=[2, 3, 4, 5]), [(3, 2)])
+        self.assertEqual(DuplicateDetector.scan(['B', 'C'], seen, labels=[6, 7]), [(0, 3)])
+
+    def test_find_duplicate_booth_numbers(self):
+        """Test the grouped report format"""
+        rows = [
+            {'constituency_code': 'C1', 'booth_number': '1'},
+            {'constituency_code': 'C2', 'booth_number': '1'},
+            {'constituency_code': 'C1', 'booth_number': '1'},
+        ]
+        self.assertEqual(DuplicateDetector.find_duplicate_booth_numbers(rows), [
+            {'constituency_code': 'C1', 'booth_number': '1', 'row_numbers': [1, 3], 'count': 2},
+        ])
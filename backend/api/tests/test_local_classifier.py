@@ -0,0 +1,145 @@
+"""
+Unit tests for the local classifier tier
+Tests script language ID, quick replies, naive Bayes training and escalation
+"""
+import json
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from api.models import WhatsAppConversation, WhatsAppMessage
+from api.services.ai_service import AIService
+from api.services.local_classifier import (
+    LocalClassifier, TierStats, detect_script, labeled_messages, train_local_model,
+)
+from api.utils.result_cache import ResultCache
+
+LABELED_PHRASES = [
+    ('the road near my house is full of potholes', 'report_issue', 'negative', ['road', 'potholes'], ['Infrastructure']),
+    ('hospital doctors were very kind and helpful', 'feedback_positive', 'positive', ['hospital', 'doctors'], ['Healthcare']),
+    ('when will the new school open in our village', 'ask_question', 'neutral', ['school'], ['Education']),
+    ('bus service is terrible and always late', 'feedback_negative', 'negative', ['bus'], ['Transport']),
+]
+
+
+def labeled_rows(count, seed=1):
+    rng = random.Random(seed)
+    return [rng.choice(LABELED_PHRASES) for _ in range(count)]
+
+
+class EchoCompletions:
+    """Answers enrichment prompts with a fixed label and records the prompts"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def create(self, messages, **kwargs):
+        self.prompts.append(messages[0]['content'])
+        listing = messages[0]['content'].split('Messages:')[1].split('Respond with')[0]
+        count = len([line for line in listing.splitlines() if line])
+        content = json.dumps([{'id': i + 1, 'intent': 'political_opinion', 'sentiment': 'neutral'} for i in range(count)])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class ScriptDetectionTest(SimpleTestCase):
+    """Test language identification from Unicode script"""
+
+    def test_scripts(self):
+        """Test each supported script and text without letters"""
+        self.assertEqual(detect_script('சாலை சரியில்லை')[0], 'ta')
+        self.assertEqual(detect_script('सड़क खराब है')[0], 'hi')
+        self.assertEqual(detect_script('రోడ్డు బాగాలేదు')[0], 'te')
+        self.assertEqual(detect_script('Road is bad')[0], 'en')
+        self.assertEqual(detect_script('👍 123'), (None, 0.0))
+
+
+class LocalClassifierTest(SimpleTestCase):
+    """Test quick replies, trained models and escalation"""
+
+    def setUp(self):
+        self.classifier = LocalClassifier(train_local_model(labeled_rows(400)))
+
+    def test_quick_replies(self):
+        """Test greetings and thanks are answered without a model"""
+        self.assertEqual(LocalClassifier({}).intent('Vanakkam!! 🙏')['intent'], 'general_inquiry')
+        self.assertEqual(LocalClassifier({}).sentiment('நன்றி')['sentiment'], 'positive')
+
+    def test_trained_model_answers_known_phrasing(self):
+        """Test confident predictions come with keywords and topics from the lexicon"""
+        result = self.classifier.enrich('The hospital doctors are kind')
+        self.assertEqual((result['intent'], result['category'], result['sentiment']),
+                         ('feedback_positive', 'feedback', 'positive'))
+        self.assertEqual(result['keywords'], ['hospital', 'doctors'])
+        self.assertEqual(result['topics'], ['Healthcare'])
+
+    def test_escalation(self):
+        """Test unknown words and issue reports are left to the LLM"""
+        self.assertIsNone(self.classifier.intent('electricity cut for three days'))
+        self.assertIsNotNone(self.classifier.intent('potholes on the road'))
+        self.assertIsNone(self.classifier.enrich('potholes on the road'))
+
+    def test_inaccurate_model_is_disabled(self):
+        """Test a model that fails the held-out check is not deployed"""
+        rng = random.Random(2)
+        labels = ['feedback_positive', 'feedback_negative', 'ask_question']
+        rows = [(text, rng.choice(labels), rng.choice(['positive', 'negative']), [], [])
+                for text, *_ in labeled_rows(400)]
+        model = train_local_model(rows)
+        self.assertIsNone(model['intent']['naive_bayes'])
+        self.assertLess(model['intent']['accuracy'], 0.9)
+
+    def test_too_few_examples(self):
+        """Test no model is trained from a handful of labels"""
+        self.assertIsNone(train_local_model(labeled_rows(10)))
+
+
+class TieredAIServiceTest(SimpleTestCase):
+    """Test AIService consults the local tier before the model"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = AIService.__new__(AIService)
+        self.completions = EchoCompletions()
+        self.service.client = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        self.service.result_cache = ResultCache()
+        self.service.local_classifier = LocalClassifier(train_local_model(labeled_rows(400)))
+        self.service.tier_stats = TierStats()
+
+    def test_language_from_script(self):
+        """Test Tamil text is identified without langdetect"""
+        with patch('api.services.ai_service.detect', side_effect=AssertionError):
+            self.assertEqual(self.service.detect_language('வணக்கம் அண்ணா'), 'ta')
+
+    def test_only_low_confidence_messages_escalate(self):
+        """Test one batch request carries just the messages the local tier could not answer"""
+        results = self.service.enrich_messages(['Hi', 'hospital doctors were helpful', 'vote for change'])
+
+        self.assertEqual([result['tier'] for result in results], ['local', 'local', 'llm'])
+        self.assertEqual(results[2]['intent'], 'political_opinion')
+        self.assertEqual(len(self.completions.prompts), 1)
+        self.assertIn('vote for change', self.completions.prompts[0])
+        self.assertNotIn('doctors', self.completions.prompts[0])
+
+        stats = self.service.tier_stats.snapshot()
+        self.assertEqual((stats['local']['count'], stats['llm']['count']), (2, 1))
+
+
+class TrainingDataTest(TestCase):
+    """Test the local tier never trains on its own answers"""
+
+    def test_local_answers_are_excluded(self):
+        """Test only LLM-labeled user messages are used"""
+        conversation = WhatsAppConversation.objects.create(phone_number='919876543210')
+        for content, classified_by in (('llm label', 'llm'), ('old label', None), ('local label', 'local')):
+            WhatsAppMessage.objects.create(
+                conversation=conversation, sender='user', content=content, processed=True,
+                intent='general_inquiry', sentiment='neutral',
+                metadata={'classified_by': classified_by} if classified_by else {},
+            )
+        WhatsAppMessage.objects.create(conversation=conversation, sender='user', content='pending')
+
+        contents = sorted(row[0] for row in labeled_messages(100))
+        self.assertEqual(contents, ['llm label', 'old label'])
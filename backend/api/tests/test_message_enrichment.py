@@ -0,0 +1,186 @@
+"""
+Unit tests for batched WhatsApp message enrichment
+Tests one model request per batch, bulk writes and response parsing
+"""
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import WhatsAppConversation, WhatsAppMessage
+from api.services.ai_service import AIService
+from api.services.local_classifier import LocalClassifier, TierStats, labeled_messages
+from api.services.message_enrichment import LOCK_KEY, NO_ANSWER_ERROR, MessageEnricher, get_enrichment_setting
+from api.utils.result_cache import ResultCache
+
+
+class FakeCompletions:
+    """Answers enrichment prompts, tagging each message with its own text"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, messages, **kwargs):
+        self.calls += 1
+        listing = messages[0]['content'].split('Messages:')[1].split('Respond with')[0]
+        lines = [line for line in listing.splitlines() if line]
+        items = []
+        for line in lines:
+            number, text = line.split('. ', 1)
+            text = json.loads(text)
+            items.append({
+                'id': int(number),
+                'intent': 'report_issue' if 'road' in text else 'feedback_positive',
+                'confidence': 0.9,
+                'category': 'complaint' if 'road' in text else 'feedback',
+                'sentiment': 'negative' if 'road' in text else 'positive',
+                'score': -0.5 if 'road' in text else 0.5,
+                'topics': ['Infrastructure'] if 'road' in text else ['Education'],
+                'keywords': [text.split()[0]],
+                'issues': [],
+            })
+        # Answer out of order to check ids are honoured
+        content = json.dumps(list(reversed(items)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def fake_ai_service():
+    service = AIService.__new__(AIService)
+    service.completions = FakeCompletions()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=service.completions))
+    service.result_cache = ResultCache(memory_entries=0)
+    service.local_classifier = LocalClassifier({})
+    service.tier_stats = TierStats()
+    return service
+
+
+class MessageEnricherTest(TestCase):
+    """Test pending messages are enriched in batches"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.conversations = [
+            WhatsAppConversation.objects.create(phone_number=f'91987654321{i}', topics=['Jobs'])
+            for i in range(3)
+        ]
+        for i in range(5):
+            for n, conversation in enumerate(self.conversations):
+                WhatsAppMessage.objects.create(
+                    conversation=conversation, sender='user',
+                    content=f'school {n}.{i} is great' if i < 4 else f'road {n} is broken',
+                    timestamp=now + timedelta(seconds=i),
+                )
+        WhatsAppMessage.objects.create(conversation=self.conversations[0], sender='bot', content='Thanks')
+
+    def test_one_request_per_batch(self):
+        """Test fifteen messages from three conversations take two requests"""
+        service = fake_ai_service()
+        result = MessageEnricher(service, batch_size=10, concurrency=2).drain()
+
+        self.assertEqual(result, {'enriched': 15, 'retried': 0, 'failed': 0, 'requests': 2, 'local': 0})
+        self.assertEqual(service.completions.calls, 2)
+        self.assertFalse(WhatsAppMessage.objects.filter(sender='user', processed=False).exists())
+        self.assertFalse(WhatsAppMessage.objects.get(sender='bot').processed)
+
+        message = WhatsAppMessage.objects.filter(content='road 0 is broken').get()
+        self.assertEqual((message.intent, message.confidence, message.sentiment),
+                         ('report_issue', 90.0, 'negative'))
+        self.assertEqual(message.entities['topics'], ['Infrastructure'])
+
+    def test_conversation_aggregates(self):
+        """Test conversations take the latest sentiment and merge topics"""
+        MessageEnricher(fake_ai_service(), batch_size=4).drain()
+
+        for conversation in WhatsAppConversation.objects.all():
+            self.assertEqual((conversation.sentiment, conversation.sentiment_score, conversation.category),
+                             ('negative', -0.5, 'complaint'))
+            self.assertEqual(sorted(conversation.topics), ['Education', 'Infrastructure', 'Jobs'])
+            self.assertEqual(sorted(conversation.keywords), ['road', 'school'])
+
+    def test_unanswered_messages_are_not_labeled(self):
+        """Test messages the model skipped are retried later instead of getting default labels"""
+        service = fake_ai_service()
+        create = service.completions.create
+
+        def skip_roads(messages, **kwargs):
+            response = create(messages, **kwargs)
+            items = [item for item in json.loads(response.choices[0].message.content) if item['topics'] != ['Infrastructure']]
+            response.choices[0].message.content = json.dumps(items)
+            return response
+
+        service.completions.create = skip_roads
+        result = MessageEnricher(service, batch_size=20).drain()
+        self.assertEqual((result['enriched'], result['retried'], result['failed']), (12, 3, 0))
+
+        unanswered = WhatsAppMessage.objects.filter(content__startswith='road')
+        self.assertEqual(
+            {(message.processed, message.intent, message.processing_error, message.processing_attempts)
+             for message in unanswered},
+            {(False, None, NO_ANSWER_ERROR, 1)},
+        )
+        self.assertTrue(all(message.next_processing_at > timezone.now() for message in unanswered))
+        self.assertEqual(len(list(labeled_messages(100))), 12)
+        for conversation in WhatsAppConversation.objects.all():
+            self.assertEqual(conversation.sentiment, 'positive')
+
+        # Backed-off messages wait; on their last attempt they are given up on
+        self.assertEqual(MessageEnricher(service).drain()['requests'], 0)
+        unanswered.update(next_processing_at=None, processing_attempts=get_enrichment_setting('MAX_ATTEMPTS') - 1)
+        result = MessageEnricher(service).drain()
+        self.assertEqual((result['retried'], result['failed']), (0, 3))
+        self.assertEqual(MessageEnricher(service).drain()['requests'], 0)
+
+    def test_outage_is_retried(self):
+        """Test messages of a failed request are enriched by a later run"""
+        service = fake_ai_service()
+        create = service.completions.create
+
+        def outage(messages, **kwargs):
+            raise ConnectionError('outage')
+
+        service.completions.create = outage
+        self.assertEqual(MessageEnricher(service, batch_size=20).drain()['retried'], 15)
+
+        service.completions.create = create
+        WhatsAppMessage.objects.update(next_processing_at=timezone.now())
+        result = MessageEnricher(service, batch_size=20).drain()
+        self.assertEqual((result['enriched'], result['failed']), (15, 0))
+        message = WhatsAppMessage.objects.filter(content='road 0 is broken').get()
+        self.assertEqual((message.processed, message.processing_error, message.next_processing_at), (True, None, None))
+        self.assertEqual(WhatsAppConversation.objects.filter(sentiment='negative').count(), 3)
+
+    def test_no_client_leaves_messages_pending(self):
+        """Test messages stay pending, without a counted attempt, while no model is configured"""
+        service = fake_ai_service()
+        service.client = None
+        result = MessageEnricher(service, batch_size=20).drain()
+
+        self.assertEqual((result['enriched'], result['retried'], result['failed']), (0, 0, 0))
+        self.assertEqual(
+            set(WhatsAppMessage.objects.filter(sender='user').values_list('processed', 'processing_attempts', 'processing_error')),
+            {(False, 0, None)},
+        )
+
+    def test_locked_drain_is_skipped(self):
+        """Test a second worker leaves pending messages to the one holding the lock"""
+        cache.add(LOCK_KEY, True)
+        service = fake_ai_service()
+        MessageEnricher(service).drain()
+        self.assertEqual(service.completions.calls, 0)
+
+
+class EnrichmentParsingTest(TestCase):
+    """Test model responses are matched back to messages"""
+
+    def test_missing_and_malformed_items(self):
+        """Test messages the model skipped are reported as missing"""
+        service = AIService.__new__(AIService)
+        content = 'Here you go: [{"id": 2, "sentiment": "positive", "score": 0.8}, "junk"]'
+        results = service._parse_enrichment_items(content, 3)
+
+        self.assertEqual(results, [None, {'sentiment': 'positive', 'score': 0.8}, None])
+        self.assertEqual(service._parse_enrichment_items('no json', 1), [None])
@@ -0,0 +1,203 @@
+"""
+Unit tests for news sentiment analysis
+Tests the budgeted, concurrent analysis pipeline against a local
+OpenAI-compatible server
+"""
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import NewsArticle
+from api.services.tvk_sentiment_analyzer import LOCK_KEY, AnalysisPipeline, TVKSentimentAnalyzer, estimate_tokens
+from api.tests.http_stub import LocalServerMixin
+
+
+class MockChatCompletions(BaseHTTPRequestHandler):
+    """
+    Answers POST /v1/chat/completions like the OpenAI API
+
+    Articles titled "Throttled ..." are rate limited on their first attempt,
+    "Broken ..." get a reply that is not JSON and "Down ..." always fail
+    with a server error.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = payload['messages'][1]['content']
+        title = prompt.split('Title: ', 1)[1].split('\n', 1)[0]
+        with self.server.lock:
+            self.server.attempts[title] += 1
+            attempt = self.server.attempts[title]
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            # Long enough for concurrent requests to overlap
+            time.sleep(0.02)
+            if title.startswith('Throttled') and attempt == 1:
+                self._reply(429, {'error': {'message': 'Rate limit reached', 'type': 'requests', 'code': 'rate_limit_exceeded'}})
+            elif title.startswith('Down'):
+                self._reply(500, {'error': {'message': 'The server had an error', 'type': 'server_error'}})
+            elif title.startswith('Broken'):
+                self._complete(payload, 'not json')
+            else:
+                self._complete(payload, json.dumps({
+                    'tvk_sentiment': 'positive', 'tvk_sentiment_score': 0.8,
+                    'vijay_mentions': 2, 'tvk_mentions': 1, 'key_topics': ['jobs'],
+                    'ai_summary': f"Summary of {title}",
+                }))
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _complete(self, payload, content):
+        self._reply(200, {
+            'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 1700000000, 'model': payload['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 900, 'completion_tokens': 100, 'total_tokens': 1000},
+        })
+
+    def _reply(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockOpenAITestCase(LocalServerMixin, TestCase):
+    """Runs a mock OpenAI API on a local port for the duration of the tests"""
+
+    handler = MockChatCompletions
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.overrides = override_settings(OPENAI_API_KEY='test-key', OPENAI_BASE_URL=f"{cls.server.base_url}/v1")
+        cls.overrides.enable()
+        cls.addClassCleanup(cls.overrides.disable)
+
+    def setUp(self):
+        cache.clear()
+        self.server.attempts = Counter()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.sleeps = []
+
+    def article(self, title, **kwargs):
+        return NewsArticle.objects.create(
+            title=title, url=f"https://news.example.com/{title.replace(' ', '-').lower()}",
+            source='The Hindu', published_at=datetime(2026, 6, 1, tzinfo=dt_timezone.utc),
+            article_text=f"{title}. Vijay and TVK praise the jobs plan.", **kwargs,
+        )
+
+    def pipeline(self, **kwargs):
+        kwargs.setdefault('concurrency', 4)
+        return AnalysisPipeline(TVKSentimentAnalyzer(), sleep=self.sleeps.append, **kwargs)
+
+
+class AnalysisPipelineTest(MockOpenAITestCase):
+    """Test articles are analyzed concurrently and written in bulk"""
+
+    def test_analyzes_backlog(self):
+        """Test every article is analyzed with requests in flight together"""
+        for i in range(8):
+            self.article(f"Story {i}")
+
+        with self.assertNumQueries(4):
+            result = self.pipeline().drain(batch_size=20)
+
+        self.assertEqual(result, {'analyzed': 8, 'failed': 0, 'tokens': 8000})
+        self.assertGreater(self.server.max_in_flight, 1)
+        article = NewsArticle.objects.get(title='Story 3')
+        self.assertTrue(article.ai_processed)
+        self.assertEqual((article.tvk_sentiment, float(article.tvk_sentiment_score)), ('positive', 0.8))
+        self.assertEqual((article.vijay_mentions, article.key_topics), (2, ['jobs']))
+        self.assertEqual((article.ai_summary, article.processing_attempts), ('Summary of Story 3', 1))
+
+    @override_settings(NEWS_ANALYSIS={'RETRY_BASE_SECONDS': 0.05})
+    def test_rate_limit_is_retried(self):
+        """Test a throttled request is retried after a pause and counts as an attempt"""
+        self.article('Throttled story')
+        analyzed, failed = self.pipeline().run(list(NewsArticle.objects.all()))
+
+        self.assertEqual((analyzed, failed), (1, 0))
+        self.assertEqual(self.server.attempts['Throttled story'], 2)
+        self.assertEqual(self.sleeps[0], 0.05)
+        article = NewsArticle.objects.get()
+        self.assertEqual((article.ai_processed, article.processing_attempts), (True, 2))
+
+    def test_exhausted_attempts_fall_back(self):
+        """Test an article failing every attempt gets the keyword analysis"""
+        self.article('Down story')
+        analyzed, failed = self.pipeline().run(list(NewsArticle.objects.all()))
+
+        self.assertEqual((analyzed, failed), (1, 0))
+        self.assertEqual(self.server.attempts['Down story'], 3)
+        article = NewsArticle.objects.get()
+        self.assertEqual((article.processing_attempts, article.tvk_sentiment), (3, 'positive'))
+        self.assertEqual(article.sentiment_reasoning, 'Fallback keyword-based analysis')
+
+    def test_bad_response_is_left_for_next_run(self):
+        """Test a malformed reply is not retried within the run but recorded"""
+        self.article('Broken story')
+        result = self.pipeline().drain()
+
+        self.assertEqual((result['analyzed'], result['failed']), (0, 1))
+        self.assertEqual(self.server.attempts['Broken story'], 1)
+        article = NewsArticle.objects.get()
+        self.assertEqual((article.ai_processed, article.processing_attempts), (False, 1))
+        self.assertTrue(article.processing_error)
+
+    def test_attempts_carry_across_runs(self):
+        """Test an article with attempts used only gets the ones left"""
+        self.article('Down story', processing_attempts=2)
+        self.pipeline().run(list(NewsArticle.objects.all()))
+        self.assertEqual(self.server.attempts['Down story'], 1)
+        self.assertEqual(NewsArticle.objects.get().processing_attempts, 3)
+        self.assertEqual(self.pipeline().drain(), {'analyzed': 0, 'failed': 0, 'tokens': 0})
+
+    def test_locked_drain_is_skipped(self):
+        """Test a second worker leaves pending articles to the one holding the lock"""
+        self.article('Story')
+        cache.add(LOCK_KEY, True)
+        self.assertEqual(self.pipeline().drain(), {'analyzed': 0, 'failed': 0, 'tokens': 0})
+        self.assertEqual(sum(self.server.attempts.values()), 0)
+        self.assertFalse(NewsArticle.objects.get().ai_processed)
+
+    def test_drain_limited_to_ids(self):
+        """Test a drain given article ids leaves the rest of the backlog alone"""
+        story = self.article('Story')
+        self.article('Other story')
+        result = self.pipeline().drain(article_ids=[story.id])
+
+        self.assertEqual(result['analyzed'], 1)
+        self.assertEqual(set(NewsArticle.objects.filter(ai_processed=True).values_list('title', flat=True)), {'Story'})
+        self.assertTrue(cache.add(LOCK_KEY, True))
+
+    def test_process_article(self):
+        """Test a loaded article is analyzed without being fetched again"""
+        article = self.article('Story')
+        # The update, and the lookup of near-duplicates to share it with
+        with self.assertNumQueries(2):
+            self.assertTrue(TVKSentimentAnalyzer().process_article(article))
+        self.assertTrue(NewsArticle.objects.get().ai_processed)
+
+
+class TokenEstimateTest(SimpleTestCase):
+    """Test the prompt size estimate"""
+
+    def test_tamil_counts_heavier(self):
+        """Test Tamil text, three bytes per character, is estimated larger than English"""
+        self.assertEqual(estimate_tokens('abcd' * 10), 11)
+        self.assertGreater(estimate_tokens('விஜய்' * 10), estimate_tokens('Vijay' * 10))
@@ -0,0 +1,153 @@
+"""
+Unit tests for news near-duplicate detection
+Tests MinHash signatures, LSH clustering of syndicated copies, shared
+analyses and cluster-weighted trending statistics
+"""
+import random
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from api.models import NewsArticle, NewsArticleBand
+from api.services.news_dedup import cluster_articles, minhash, shingles, similarity
+from api.services.tvk_sentiment_analyzer import AnalysisPipeline, TVKSentimentAnalyzer, pending_articles
+from api.views.news import NewsArticleViewSet
+
+ENGLISH_WORDS = (
+    "vijay tvk rally madurai jobs youth neet exemption farmers water cauvery stalin dmk assembly "
+    "election manifesto promise chennai crowd speech policy governor budget schools fishermen"
+).split()
+
+TAMIL_WORDS = (
+    "விஜய் தமிழக வெற்றிக் கழகம் மாநாடு மதுரை இளைஞர்கள் வேலைவாய்ப்பு நீட் விலக்கு விவசாயிகள் "
+    "காவிரி தண்ணீர் ஸ்டாலின் திமுக சட்டமன்றம் தேர்தல் வாக்குறுதி சென்னை கூட்டம் உரை"
+).split()
+
+
+def story(seed, words=ENGLISH_WORDS, length=150):
+    generator = random.Random(seed)
+    return ' '.join(generator.choice(words) for _ in range(length))
+
+
+def edited(text, changes=2, tagline='(Syndicated copy)'):
+    words = text.split()
+    for i in range(changes):
+        words[10 + i * 40] = 'edited'
+    return ' '.join(words) + ' ' + tagline
+
+
+class SignatureTest(SimpleTestCase):
+    """Test signatures estimate the overlap of texts"""
+
+    def test_copies_and_distinct_stories(self):
+        """Test an edited copy scores high and another story low"""
+        text = story(1)
+        self.assertGreaterEqual(similarity(minhash(text), minhash(edited(text))), 0.8)
+        self.assertLess(similarity(minhash(text), minhash(story(2))), 0.3)
+        self.assertEqual(similarity(minhash(text), minhash(text)), 1.0)
+
+    def test_tamil_words_are_kept_whole(self):
+        """Test Tamil shingles are whole words, so copies match and stories differ"""
+        text = story(3, TAMIL_WORDS)
+        self.assertGreaterEqual(similarity(minhash(text), minhash(edited(text, tagline='(தினமலர்)'))), 0.8)
+        self.assertLess(similarity(minhash(text), minhash(story(4, TAMIL_WORDS))), 0.3)
+        self.assertEqual(len(shingles('விஜய் மதுரை மாநாடு', size=3)), 1)
+
+    def test_empty_text(self):
+        """Test text without words has no signature"""
+        self.assertIsNone(minhash('  ...  '))
+
+
+class ClusterArticlesTest(TestCase):
+    """Test copies are linked to their story and share its analysis"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.count = 0
+
+    def article(self, text, source='Dinamalar', minutes=0, **kwargs):
+        self.count += 1
+        return NewsArticle.objects.create(
+            title=f"Story {self.count}", url=f"https://news.example.com/{self.count}", source=source,
+            article_text=text, published_at=self.now + timedelta(minutes=minutes), **kwargs,
+        )
+
+    def test_copy_inherits_analysis(self):
+        """Test a copy of an analyzed story takes its analysis and grows its cluster"""
+        text = story(1)
+        original = self.article(text, ai_processed=True, tvk_sentiment='positive', tvk_sentiment_score=0.8,
+                                key_topics=['jobs'], ai_summary='Rally summary')
+        self.assertEqual(cluster_articles([original.id]), [])
+        copy = self.article(edited(text), source='Dinakaran', minutes=5)
+
+        self.assertEqual(cluster_articles([copy.id]), [])
+
+        copy.refresh_from_db()
+        self.assertEqual(copy.duplicate_of_id, original.id)
+        self.assertTrue(copy.ai_processed)
+        self.assertEqual((copy.tvk_sentiment, copy.key_topics, copy.ai_summary), ('positive', ['jobs'], 'Rally summary'))
+        original.refresh_from_db()
+        self.assertEqual(original.cluster_size, 2)
+        self.assertEqual(NewsArticleBand.objects.filter(article=copy).count(), 16)
+
+    def test_distinct_stories_stay_apart(self):
+        """Test unrelated articles each need their own analysis"""
+        ids = [self.article(story(seed), minutes=seed).id for seed in range(5)]
+        self.assertEqual(set(cluster_articles(ids)), set(ids))
+        self.assertFalse(NewsArticle.objects.filter(duplicate_of__isnull=False).exists())
+
+    @override_settings(OPENAI_API_KEY='')
+    def test_copies_in_one_batch_wait_for_the_original(self):
+        """Test the earliest copy is analyzed and the analysis reaches the others"""
+        text = story(1, TAMIL_WORDS)
+        first = self.article(text, language='ta')
+        second = self.article(edited(text), source='Dinakaran', minutes=10, language='ta')
+        third = self.article(edited(text, changes=3), source='Maalaimalar', minutes=20, language='ta')
+
+        self.assertEqual(cluster_articles([third.id, second.id, first.id]), [first.id])
+        self.assertEqual(list(pending_articles().values_list('id', flat=True)), [first.id])
+
+        AnalysisPipeline(TVKSentimentAnalyzer()).drain()
+        first.refresh_from_db()
+        self.assertEqual(first.cluster_size, 3)
+        for copy in NewsArticle.objects.filter(duplicate_of=first):
+            self.assertTrue(copy.ai_processed)
+            self.assertEqual(copy.sentiment_reasoning, first.sentiment_reasoning)
+
+    def test_copy_of_a_copy_joins_the_original(self):
+        """Test clusters stay flat when a copy matches another copy best"""
+        text = story(1)
+        original = self.article(text)
+        cluster_articles([original.id])
+        copy = self.article(edited(text, changes=1), minutes=5)
+        cluster_articles([copy.id])
+        recopy = self.article(edited(edited(text, changes=1), tagline='(Syndicated copy) reprint'), minutes=10)
+
+        cluster_articles([recopy.id])
+
+        recopy.refresh_from_db()
+        self.assertEqual(recopy.duplicate_of_id, original.id)
+        original.refresh_from_db()
+        self.assertEqual(original.cluster_size, 3)
+
+    def test_trending_weighs_stories_by_copies(self):
+        """Test trending topics count each copy carried and list the widest stories"""
+        text = story(1)
+        original = self.article(text, ai_processed=True, key_topics=['jobs'])
+        cluster_articles([original.id])
+        copies = [self.article(edited(text, changes=i + 1), minutes=i + 1) for i in range(2)]
+        cluster_articles([copy.id for copy in copies])
+        single = self.article(story(2), ai_processed=True, key_topics=['neet', 'jobs'])
+        cluster_articles([single.id])
+
+        request = APIRequestFactory().get('/api/news/trending_topics/', {'days': '7'})
+        response = NewsArticleViewSet.as_view({'get': 'trending_topics'})(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['total_articles'], response.data['total_stories']), (4, 2))
+        jobs = response.data['trending_topics'][0]
+        self.assertEqual((jobs['topic'], jobs['count'], jobs['stories']), ('jobs', 4, 2))
+        self.assertEqual([row['id'] for row in response.data['top_stories']], [original.id])
+        self.assertEqual(response.data['top_stories'][0]['cluster_size'], 3)
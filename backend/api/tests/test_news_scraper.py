@@ -0,0 +1,262 @@
+"""
+Unit tests for the news scraper
+Tests concurrent, conditional scraping against a local fixture server and
+idempotent bulk persistence
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from api.models import NewsArticle
+from api.services.news_scraper import NewsSource, TamilNaduNewsScraper, save_articles_to_database
+from api.tasks import scrape_news
+from api.tests.http_stub import LocalServerMixin
+from api.utils.url_hash import canonical_url, url_hash
+
+ARTICLE_TEXT = "Vijay addressed a TVK rally in Madurai on jobs for youth and the NEET exemption. " * 3
+
+
+class FixtureNewsSite(BaseHTTPRequestHandler):
+    """
+    Serves a listing page, an RSS feed and article pages
+
+    The listing and feed answer If-None-Match with 304 for their current
+    ETag. Article pages take a little while, /articles/broken fails.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path in ('/listing', '/feed.rss'):
+            etag = f'"{self.server.version}"'
+            if self.headers.get('If-None-Match') == etag:
+                self._reply(304, b'', {'ETag': etag})
+            elif self.path == '/listing':
+                items = ''.join(
+                    f'<div class="NewsList"><a href="{path}">{title}</a></div>' for path, title in self.server.listing
+                )
+                self._reply(200, f'<html><body>{items}</body></html>'.encode(), {'ETag': etag})
+            else:
+                items = ''.join(
+                    f'<item><title>TVK manifesto {i}</title><link>{self.server.base_url}/articles/feed-{i}</link>'
+                    f'<pubDate>Mon, 01 Jun 2026 10:00:00 GMT</pubDate></item>' for i in range(2)
+                )
+                body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>TN</title>{items}</channel></rss>'
+                self._reply(200, body.encode(), {'ETag': etag, 'Content-Type': 'application/rss+xml'})
+        elif self.path.startswith('/articles/'):
+            with self.server.lock:
+                self.server.in_flight += 1
+                self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            try:
+                time.sleep(0.05)
+                if self.path == '/articles/broken':
+                    self._reply(500, b'error')
+                else:
+                    body = f'<html><h1>Story {self.path}</h1><span class="author">Staff</span><p>{ARTICLE_TEXT}</p></html>'
+                    self._reply(200, body.encode())
+            finally:
+                with self.server.lock:
+                    self.server.in_flight -= 1
+        else:
+            self._reply(404, b'')
+
+    def _reply(self, status, content, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureNewsSiteTestCase(LocalServerMixin, TestCase):
+    """Runs the fixture news site on a local port for the duration of the tests"""
+
+    handler = FixtureNewsSite
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.listing = NewsSource('Dinamalar', 'Dinamalar', f"{cls.server.base_url}/listing", 'ta', '_parse_dinamalar')
+        cls.feed = NewsSource('The Hindu TN', 'The Hindu', f"{cls.server.base_url}/feed.rss", 'en', '_parse_rss')
+
+    def setUp(self):
+        cache.clear()
+        self.server.requests = []
+        self.server.version = 'v1'
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.listing = [(f'/articles/{i}', f'DMK and TVK clash over NEET {i}') for i in range(4)]
+        self.server.listing.append(('/articles/sport', 'Cricket: Super Kings win again'))
+
+    def scrape(self, *sources, **kwargs):
+        return TamilNaduNewsScraper(**kwargs).scrape_sources(list(sources or [self.listing, self.feed]))
+
+    def requested(self, prefix='/articles/'):
+        return sorted(path for path, _ in self.server.requests if path.startswith(prefix))
+
+
+class ScrapeCycleTest(FixtureNewsSiteTestCase):
+    """Test a cycle downloads only the political articles not seen before"""
+
+    def test_scrapes_sources(self):
+        """Test listing and feed articles are extracted, non-political links skipped"""
+        articles = self.scrape()
+
+        self.assertEqual(len(articles), 6)
+        self.assertNotIn('/articles/sport', self.requested())
+        by_url = {article['url']: article for article in articles}
+        listed = by_url[f"{self.server.base_url}/articles/2"]
+        self.assertEqual((listed['source'], listed['language'], listed['author']), ('Dinamalar', 'ta', 'Staff'))
+        fed = by_url[f"{self.server.base_url}/articles/feed-1"]
+        self.assertEqual((fed['source'], fed['language']), ('The Hindu', 'en'))
+        self.assertEqual(fed['published_at'], datetime(2026, 6, 1, 10, 0, tzinfo=dt_timezone.utc))
+
+    def test_known_articles_are_not_downloaded(self):
+        """Test a stored article is skipped under another spelling of its URL"""
+        NewsArticle.objects.create(
+            title='Stored', source='Dinamalar', article_text=ARTICLE_TEXT,
+            url=f"{self.server.base_url}/articles/1/?utm_source=whatsapp#top",
+            published_at=datetime(2026, 6, 1, tzinfo=dt_timezone.utc),
+        )
+        scraper = TamilNaduNewsScraper()
+        articles = scraper.scrape_sources([self.listing])
+
+        self.assertEqual(len(articles), 3)
+        self.assertNotIn('/articles/1', self.requested())
+        self.assertEqual((scraper.stats['known'], scraper.stats['fetched']), (1, 3))
+
+    def test_unchanged_listing_costs_one_request(self):
+        """Test the next cycle sends the ETag and stops at the 304"""
+        self.scrape()
+        self.server.requests = []
+
+        self.assertEqual(self.scrape(), [])
+        self.assertEqual(sorted(self.server.requests), [('/feed.rss', '"v1"'), ('/listing', '"v1"')])
+
+        # A changed listing is read again
+        self.server.version = 'v2'
+        self.server.listing.append(('/articles/9', 'Stalin responds to Vijay'))
+        self.server.requests = []
+        articles = self.scrape(self.listing)
+        self.assertEqual(len(articles), 5)
+
+    def test_failed_download_keeps_listing_fresh(self):
+        """Test a listing whose article failed is read in full next cycle"""
+        self.server.listing.append(('/articles/broken', 'Assembly session adjourned'))
+        scraper = TamilNaduNewsScraper()
+        articles = scraper.scrape_sources([self.listing])
+        self.assertEqual((len(articles), scraper.stats['errors']), (4, 1))
+
+        self.server.requests = []
+        self.scrape(self.listing)
+        self.assertIn(('/listing', None), self.server.requests)
+        self.assertIn('/articles/broken', self.requested())
+
+
+class HostLimitTest(FixtureNewsSiteTestCase):
+    """Test article pages are fetched concurrently, within the per-host limit"""
+
+    def setUp(self):
+        super().setUp()
+        self.server.listing = [(f'/articles/{i}', f'Election rally {i}') for i in range(8)]
+
+    def test_per_host_limit(self):
+        """Test no more than PER_HOST pages are in flight to one site"""
+        self.assertEqual(len(self.scrape(self.listing, concurrency=8, per_host=2)), 8)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_concurrent_downloads(self):
+        """Test a higher limit lets more pages download together"""
+        self.scrape(self.listing, concurrency=8, per_host=8)
+        self.assertGreater(self.server.max_in_flight, 2)
+
+
+def scraped(url, title='TVK rally in Madurai'):
+    return {
+        'title': title, 'url': url, 'source': 'Dinamalar', 'author': None, 'article_text': ARTICLE_TEXT,
+        'language': 'ta', 'published_at': datetime(2026, 6, 1, tzinfo=dt_timezone.utc),
+    }
+
+
+class SaveArticlesTest(TestCase):
+    """Test scraped articles are stored once, in bulk"""
+
+    def test_saves_new_articles(self):
+        """Test new articles are inserted and their ids returned, repeats within the batch once"""
+        ids = save_articles_to_database([
+            scraped('https://www.dinamalar.com/news/1'),
+            scraped('https://dinamalar.com/news/1/?utm_medium=rss'),
+            scraped('https://www.dinamalar.com/news/2'),
+        ])
+
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(set(NewsArticle.objects.values_list('id', flat=True)), set(ids))
+        article = NewsArticle.objects.get(url='https://www.dinamalar.com/news/1')
+        self.assertEqual(article.url_hash, url_hash('https://dinamalar.com/news/1'))
+        self.assertFalse(article.ai_processed)
+
+    def test_known_articles_cost_one_query(self):
+        """Test a batch of articles already stored is settled by one lookup"""
+        articles = [scraped(f'https://www.dinamalar.com/news/{i}') for i in range(200)]
+        save_articles_to_database(articles)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(save_articles_to_database(articles), [])
+        self.assertEqual(NewsArticle.objects.count(), 200)
+
+    def test_only_new_ids_are_returned(self):
+        """Test a mixed batch returns the ids of the new articles alone"""
+        save_articles_to_database([scraped('https://www.dinamalar.com/news/1')])
+        ids = save_articles_to_database([
+            scraped('http://dinamalar.com/news/1'), scraped('https://www.dinamalar.com/news/2'),
+        ])
+        self.assertEqual(ids, [NewsArticle.objects.get(url='https://www.dinamalar.com/news/2').id])
+
+    def test_concurrent_insert_is_ignored(self):
+        """Test an article stored between the lookup and the insert is not reported as new"""
+        NewsArticle.objects.create(**scraped('https://www.dinamalar.com/news/1'))
+        # The lookup misses it, as if another cycle stored it just after
+        real_filter = NewsArticle.objects.filter
+        lookups = [NewsArticle.objects.none()]
+
+        def stale_filter(**kwargs):
+            return lookups.pop() if lookups else real_filter(**kwargs)
+
+        with patch.object(NewsArticle.objects, 'filter', side_effect=stale_filter):
+            self.assertEqual(save_articles_to_database([scraped('https://dinamalar.com/news/1')]), [])
+        self.assertEqual(lookups, [])
+        self.assertEqual(NewsArticle.objects.count(), 1)
+
+    def test_scrape_task_queues_analysis(self):
+        """Test the scrape task sends only the new articles to sentiment analysis"""
+        save_articles_to_database([scraped('https://www.dinamalar.com/news/1')])
+        articles = [scraped('https://www.dinamalar.com/news/1'), scraped('https://www.dinamalar.com/news/2')]
+        with patch('api.services.news_scraper.scrape_tamil_nadu_news', return_value=articles), \
+                patch('api.tasks.analyze_news_articles.delay') as delay:
+            self.assertEqual(scrape_news(), "Scraped news: 1 new articles, 0 near-duplicates")
+        new = NewsArticle.objects.get(url='https://www.dinamalar.com/news/2')
+        delay.assert_called_once_with([str(new.id)])
+
+
+class CanonicalUrlTest(SimpleTestCase):
+    """Test links to the same article hash the same"""
+
+    def test_spellings(self):
+        """Test scheme, www, case, fragments, tracking and parameter order are ignored"""
+        self.assertEqual(
+            canonical_url('http://WWW.TheHindu.com/news/tn/article1.ece/?utm_source=fb&b=2&a=1#comments'),
+            'https://thehindu.com/news/tn/article1.ece?a=1&b=2',
+        )
+        self.assertEqual(url_hash('https://dinamalar.com/news/1'), url_hash('http://www.dinamalar.com/news/1/'))
+        self.assertNotEqual(url_hash('https://dinamalar.com/news/1'), url_hash('https://dinamalar.com/news/2'))
+        self.assertEqual(len(url_hash('https://dinamalar.com/news/1')), 40)
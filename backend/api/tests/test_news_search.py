@@ -0,0 +1,149 @@
+"""
+Unit tests for news search
+Tests the inverted index, ranking and highlights of full-text search and
+the search and source filters of the news API
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory
+
+from api.models import NewsArticle, NewsSearchTerm
+from api.services.news_search import highlight, search_articles, search_terms
+from api.views.news import NewsArticleViewSet
+
+
+class SearchTestCase(TestCase):
+    """Stores analyzed articles to search"""
+
+    def setUp(self):
+        cache.clear()
+        self.count = 0
+        self.published = datetime(2026, 6, 1, tzinfo=dt_timezone.utc)
+
+    def article(self, title, text, source='The Hindu', language='en', **kwargs):
+        self.count += 1
+        kwargs.setdefault('ai_processed', True)
+        return NewsArticle.objects.create(
+            title=title, article_text=text, source=source, language=language,
+            url=f"https://news.example.com/{self.count}",
+            published_at=self.published + timedelta(minutes=self.count), **kwargs,
+        )
+
+    def search(self, query):
+        return list(search_articles(NewsArticle.objects.all(), query))
+
+
+class SearchArticlesTest(SearchTestCase):
+    """Test articles are found by their words, best matches first"""
+
+    def test_saving_indexes_the_article(self):
+        """Test an article's words are indexed when it is saved, and again when its text changes"""
+        article = self.article('NEET exemption', 'Vijay spoke on NEET.')
+        self.assertEqual(
+            set(NewsSearchTerm.objects.filter(article=article).values_list('term', flat=True)),
+            {'neet', 'exemption', 'vijay', 'spoke', 'on'},
+        )
+        article.article_text = 'Farmers demand Cauvery water.'
+        article.save()
+        self.assertEqual(self.search('vijay'), [])
+        self.assertEqual(self.search('cauvery'), [article])
+
+    def test_all_terms_must_match(self):
+        """Test only articles holding every term of the query are returned"""
+        both = self.article('Vijay rally in Madurai', 'Crowds gathered for the rally.')
+        self.article('Vijay in Chennai', 'A press meet.')
+        self.article('Madurai temple festival', 'Devotees gathered.')
+
+        self.assertEqual(self.search('VIJAY madurai'), [both])
+        self.assertEqual(self.search('vijay trichy'), [])
+
+    def test_title_matches_rank_first(self):
+        """Test an article about the term outranks one that mentions it"""
+        mention = self.article('Assembly session', 'The budget was discussed. NEET came up once.')
+        about = self.article('NEET exemption bill', 'The NEET exemption bill returns to the assembly.')
+
+        self.assertEqual(self.search('neet'), [about, mention])
+
+    def test_tamil_words(self):
+        """Test Tamil words are matched whole, vowel signs included"""
+        rally = self.article('மதுரையில் விஜய் மாநாடு', 'தமிழக வெற்றிக் கழகம் மாநாடு நடைபெற்றது.', source='Dinamalar', language='ta')
+        self.article('சென்னை மழை', 'சென்னையில் கனமழை.', source='Dinamalar', language='ta')
+
+        self.assertEqual(self.search('விஜய் மாநாடு'), [rally])
+        self.assertEqual(self.search('விஜ'), [])
+
+    def test_query_without_words(self):
+        """Test punctuation alone matches nothing"""
+        self.article('Vijay rally', 'Text.')
+        self.assertEqual(self.search(' ?! '), [])
+        self.assertEqual(search_terms('Vijay, vijay and TVK'), ['vijay', 'and', 'tvk'])
+
+
+class HighlightTest(SimpleTestCase):
+    """Test snippets mark the search terms"""
+
+    def test_marks_terms(self):
+        """Test terms are marked in any case and the rest is escaped"""
+        self.assertEqual(
+            highlight('TVK <b>and</b> Vijay: vijay speaks', ['vijay'], width=200),
+            ['TVK &lt;b&gt;and&lt;/b&gt; <mark>Vijay</mark>: <mark>vijay</mark> speaks'],
+        )
+
+    def test_snippets_around_distant_matches(self):
+        """Test far-apart matches get their own snippets, cut at word boundaries"""
+        text = ' '.join(['filler'] * 50 + ['NEET'] + ['filler'] * 50 + ['NEET'] + ['filler'] * 50)
+        snippets = highlight(text, ['neet'], width=40)
+
+        self.assertEqual(len(snippets), 2)
+        for snippet in snippets:
+            self.assertTrue(snippet.startswith('…filler') and snippet.endswith('filler…'))
+            self.assertIn(' <mark>NEET</mark> ', snippet)
+        self.assertEqual(len(highlight(text, ['neet'], fragments=1, width=40)), 1)
+
+    def test_tamil(self):
+        """Test Tamil terms are marked whole"""
+        self.assertEqual(highlight('விஜய் மாநாடு', ['மாநாடு']), ['விஜய் <mark>மாநாடு</mark>'])
+
+
+class NewsSearchApiTest(SearchTestCase):
+    """Test the news list searches and filters through the index"""
+
+    def get(self, **params):
+        request = APIRequestFactory().get('/api/news/', params)
+        return NewsArticleViewSet.as_view({'get': 'list'})(request)
+
+    def results(self, response):
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'] if isinstance(response.data, dict) else response.data
+
+    def test_search_ranks_and_highlights(self):
+        """Test a search returns ranked matches with highlighted title and text"""
+        mention = self.article('Assembly session', 'The budget was discussed. NEET came up once.')
+        about = self.article('NEET exemption bill', 'The NEET exemption bill returns to the assembly.')
+        self.article('NEET coaching', 'Unanalyzed.', ai_processed=False)
+
+        results = self.results(self.get(search='neet'))
+
+        self.assertEqual([str(row['id']) for row in results], [str(about.id), str(mention.id)])
+        self.assertEqual(results[0]['highlights']['title'], '<mark>NEET</mark> exemption bill')
+        self.assertEqual(results[1]['highlights']['title'], None)
+        self.assertEqual(results[1]['highlights']['text'], ['The budget was discussed. <mark>NEET</mark> came up once.'])
+
+    def test_without_search(self):
+        """Test the list stays newest first, without highlights"""
+        older = self.article('First', 'Text.')
+        newer = self.article('Second', 'Text.')
+
+        results = self.results(self.get())
+        self.assertEqual([str(row['id']) for row in results], [str(newer.id), str(older.id)])
+        self.assertIsNone(results[0]['highlights'])
+
+    def test_source_filter(self):
+        """Test the source filter matches part of a source name, ignoring case"""
+        hindu = self.article('Vijay rally', 'Text.', source='The Hindu')
+        self.article('Vijay rally', 'Text.', source='Dinamalar')
+
+        self.assertEqual([str(row['id']) for row in self.results(self.get(source='hindu'))], [str(hindu.id)])
+        self.assertEqual(self.results(self.get(source='express')), [])
@@ -0,0 +1,258 @@
+"""
+Unit tests for the report engine
+Tests scope resolution, shared dataset snapshots and report data builders
+"""
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import InMemoryStorage
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.models import State, District, Constituency, IssueCategory, DirectFeedback, FieldReport
+from api.models_analytics import GeneratedReport, ReportTemplate
+from api.services.report_engine import (
+    ReportEngine, build_dataset_snapshot, build_report_data, get_export_formats, render_reports,
+    resolve_report_scope, reuse_completed_report, snapshot_cache_key,
+)
+from api.utils.artifact_cache import ArtifactCache
+from api.tasks import _is_template_due
+from api.views.reports import DailyActivityReportView
+
+
+class ReportScopeTest(TestCase):
+    """Test scope and period resolution from report filters"""
+
+    def test_daily_activity_period(self):
+        """Test daily reports cover a single day"""
+        report = GeneratedReport(report_type='daily_activity', filters_used={'date': '2025-11-10'})
+        scope, date_from, date_to = resolve_report_scope(report)
+        self.assertEqual(date_from, date(2025, 11, 10))
+        self.assertEqual(date_to, date(2025, 11, 10))
+        self.assertIsNone(scope['constituency_id'])
+
+    def test_weekly_summary_defaults_to_week(self):
+        """Test weekly reports fill in the missing week end"""
+        report = GeneratedReport(report_type='weekly_summary', filters_used={'week_start': '2025-11-10'})
+        _, date_from, date_to = resolve_report_scope(report)
+        self.assertEqual(date_from, date(2025, 11, 10))
+        self.assertEqual(date_to, date(2025, 11, 16))
+
+    def test_different_report_types_share_snapshot_key(self):
+        """Test report types over the same scope/period map to one snapshot"""
+        filters = {'date_from': '2025-11-01', 'date_to': '2025-11-10'}
+        executive = GeneratedReport(report_type='executive_summary', filters_used=filters)
+        campaign = GeneratedReport(
+            report_type='campaign_performance',
+            filters_used={**filters, 'campaign_ids': [1, 2]},
+        )
+        self.assertEqual(
+            snapshot_cache_key(*resolve_report_scope(executive)),
+            snapshot_cache_key(*resolve_report_scope(campaign)),
+        )
+
+    def test_export_formats(self):
+        """Test 'both' expands to pdf and excel"""
+        report = GeneratedReport(report_type='custom', metadata={'export_format': 'both'})
+        self.assertEqual(get_export_formats(report), ['pdf', 'excel'])
+        report.metadata = {}
+        self.assertEqual(get_export_formats(report), ['pdf'])
+
+
+class DatasetSnapshotTest(TestCase):
+    """Test snapshot aggregation and reuse"""
+
+    def setUp(self):
+        cache.clear()
+        self.state = State.objects.create(name="Tamil Nadu", code="TN")
+        self.district = District.objects.create(state=self.state, name="Chennai", code="CHN")
+        self.constituency = Constituency.objects.create(
+            state=self.state, district=self.district, name="Mylapore", code="TN-025", number=25
+        )
+        self.issue = IssueCategory.objects.create(name="Water Supply")
+        self.volunteer = User.objects.create_user(username='volunteer1', first_name='Ravi', last_name='Kumar')
+
+        for i in range(3):
+            DirectFeedback.objects.create(
+                citizen_name=f"Citizen {i}",
+                state=self.state,
+                district=self.district,
+                constituency=self.constituency,
+                issue_category=self.issue,
+                message_text="Water shortage in our area",
+            )
+        FieldReport.objects.create(
+            volunteer=self.volunteer,
+            state=self.state,
+            district=self.district,
+            constituency=self.constituency,
+            ward="Ward 1",
+            report_type='daily_summary',
+            crowd_size=40,
+        )
+
+    def _period(self):
+        today = date.today()
+        return today, today
+
+    def test_snapshot_aggregates(self):
+        """Test snapshot counts feedback, field reports and volunteers"""
+        date_from, date_to = self._period()
+        snapshot = build_dataset_snapshot({'constituency_id': self.constituency.id}, date_from, date_to)
+        self.assertEqual(snapshot['feedback']['total'], 3)
+        self.assertEqual(snapshot['feedback']['by_issue'][0]['issue'], "Water Supply")
+        self.assertEqual(snapshot['field_reports']['total'], 1)
+        self.assertEqual(snapshot['field_reports']['crowd_reached'], 40)
+        self.assertEqual(snapshot['volunteers'][0]['name'], "Ravi Kumar")
+        self.assertEqual(snapshot['scope_labels']['constituency'], "Mylapore")
+
+    def test_snapshot_respects_scope(self):
+        """Test other constituencies are excluded"""
+        other = Constituency.objects.create(state=self.state, name="Other", code="TN-026", number=26)
+        date_from, date_to = self._period()
+        snapshot = build_dataset_snapshot({'constituency_id': other.id}, date_from, date_to)
+        self.assertEqual(snapshot['feedback']['total'], 0)
+
+    def test_engine_builds_snapshot_once(self):
+        """Test several reports over one scope reuse a single snapshot"""
+        date_from, date_to = self._period()
+        scope = {'state_id': None, 'district_id': None, 'constituency_id': self.constituency.id}
+        engine = ReportEngine()
+        engine.get_snapshot(scope, date_from, date_to)
+        engine.get_snapshot(scope, date_from, date_to)
+        ReportEngine().get_snapshot(scope, date_from, date_to)  # served from the shared cache
+        self.assertEqual(engine.snapshots_built, 1)
+
+    def test_report_builders_use_snapshot(self):
+        """Test each report type renders from the same snapshot"""
+        date_from, date_to = self._period()
+        snapshot = build_dataset_snapshot({'constituency_id': self.constituency.id}, date_from, date_to)
+
+        daily = build_report_data(GeneratedReport(report_type='daily_activity', report_name='Daily'), snapshot)
+        self.assertEqual(daily['summary']['feedback_submitted'], 3)
+
+        volunteers = build_report_data(
+            GeneratedReport(
+                report_type='volunteer_performance',
+                report_name='Volunteers',
+                filters_used={'volunteer_ids': [self.volunteer.id]},
+            ),
+            snapshot,
+        )
+        self.assertEqual(volunteers['summary']['active_volunteers'], 1)
+        self.assertEqual(volunteers['tables'][0]['data'][1][0], "Ravi Kumar")
+
+
+class ReportRenderTest(TestCase):
+    """Test reports are rendered, stored and reused end to end"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='analyst', first_name='Priya')
+        state = State.objects.create(name="Tamil Nadu", code="TN")
+        self.constituency = Constituency.objects.create(state=state, name="Mylapore", code="TN-025", number=25)
+        issue = IssueCategory.objects.create(name="Water Supply")
+        for i in range(2):
+            DirectFeedback.objects.create(
+                citizen_name=f"Citizen {i}", state=state, constituency=self.constituency,
+                issue_category=issue, message_text="Water shortage in our area",
+            )
+        artifacts = ArtifactCache(storage=InMemoryStorage())
+        self.artifacts = artifacts
+        for module in ('api.services.report_engine', 'api.utils.pdf_generator'):
+            patcher = patch(f'{module}.artifact_cache', artifacts)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request(self):
+        """A report as the report views queue it"""
+        report = GeneratedReport(
+            report_name='Mylapore daily', report_type='daily_activity', generated_by=self.user,
+            filters_used={'constituency_id': self.constituency.id}, metadata={'export_format': 'both'},
+            expires_at=timezone.now() + timedelta(hours=24),
+        )
+        reused = reuse_completed_report(report)
+        return report, reused
+
+    def test_render_saves_report(self):
+        """Test a queued report is rendered to PDF and Excel and saved as completed"""
+        report, reused = self.request()
+        self.assertFalse(reused)
+        self.assertEqual(report.status, 'pending')
+
+        render_reports([report.report_id])
+
+        report.refresh_from_db()
+        self.assertEqual((report.status, report.progress, report.error_message), ('completed', 100, ''))
+        self.assertEqual(set(report.metadata['files']), {'pdf', 'excel'})
+        for path in report.metadata['files'].values():
+            self.assertTrue(self.artifacts.storage.exists(path))
+        self.assertGreater(report.file_size, 0)
+        self.assertTrue(report.pdf_file_url and report.excel_file_url)
+
+    def test_identical_request_reuses_report(self):
+        """Test a repeated request is completed from the stored report without rendering"""
+        first, _ = self.request()
+        render_reports([first.report_id])
+        first.refresh_from_db()
+
+        second, reused = self.request()
+        self.assertTrue(reused)
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.progress), ('completed', 100))
+        self.assertEqual(second.metadata['reused_from'], str(first.report_id))
+        self.assertEqual(second.metadata['files'], first.metadata['files'])
+        self.assertEqual(GeneratedReport.objects.count(), 2)
+
+    def test_view_reports_reuse(self):
+        """Test the view says a reused report is ready instead of promising a render"""
+        def post():
+            request = APIRequestFactory().post(
+                '/api/reports/daily-activity/', {'date': '2025-11-10', 'format': 'both'}, format='json',
+            )
+            force_authenticate(request, user=self.user)
+            return DailyActivityReportView.as_view()(request)
+
+        with patch('api.views.reports.render_generated_report.delay') as render:
+            first = post()
+            self.assertEqual((first.status_code, first.data['status']), (202, 'pending'))
+            self.assertEqual(first.data['message'], "Report generation started.")
+            render_reports([first.data['report_id']])
+
+            second = post()
+        render.assert_called_once_with(first.data['report_id'])
+        self.assertEqual((second.status_code, second.data['status']), (200, 'completed'))
+        self.assertIn('files are ready', second.data['message'])
+        self.assertTrue(second.data['pdf_url'] and second.data['excel_url'])
+
+
+class TemplateScheduleTest(SimpleTestCase):
+    """Test when scheduled templates come due in the hourly run"""
+
+    def at(self, day, hour):
+        return timezone.make_aware(datetime(2025, 11, day, hour, 0))
+
+    def test_due_from_schedule_time(self):
+        """Test a daily template runs from its schedule_time, 09:00 by default"""
+        template = ReportTemplate(schedule_frequency='daily', schedule_time=time(14, 30))
+        self.assertFalse(_is_template_due(template, self.at(10, 14)))
+        self.assertTrue(_is_template_due(template, self.at(10, 15)))
+        template.schedule_time = None
+        self.assertFalse(_is_template_due(template, self.at(10, 8)))
+        self.assertTrue(_is_template_due(template, self.at(10, 9)))
+
+    def test_runs_once_per_day(self):
+        """Test a template generated today is skipped until its next day"""
+        template = ReportTemplate(schedule_frequency='daily', last_generated=self.at(10, 9))
+        self.assertFalse(_is_template_due(template, self.at(10, 12)))
+        self.assertTrue(_is_template_due(template, self.at(11, 9)))
+
+    def test_weekly_and_monthly_days(self):
+        """Test weekly templates run on their weekday and monthly ones on their date"""
+        weekly = ReportTemplate(schedule_frequency='weekly', schedule_day=0)
+        self.assertTrue(_is_template_due(weekly, self.at(10, 9)))  # a Monday
+        self.assertFalse(_is_template_due(weekly, self.at(11, 9)))
+        monthly = ReportTemplate(schedule_frequency='monthly', schedule_day=11)
+        self.assertTrue(_is_template_due(monthly, self.at(11, 9)))
+        self.assertFalse(_is_template_due(monthly, self.at(10, 9)))
@@ -0,0 +1,116 @@
+"""
+Unit tests for the AI result cache
+Tests text normalization, the two cache tiers and prompt versioning
+"""
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from api.services import ai_service as ai_module
+from api.services.ai_service import AIService
+from api.services.local_classifier import LocalClassifier, TierStats
+from api.utils.result_cache import ResultCache, normalize_text
+
+
+class CountingCompletions:
+    """Returns a fixed sentiment and counts requests"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({'sentiment': 'positive', 'score': 0.7, 'confidence': 0.9})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class NormalizeTextTest(SimpleTestCase):
+    """Test messages that differ only cosmetically share a key"""
+
+    def test_case_whitespace_and_punctuation(self):
+        """Test case, spacing and trailing punctuation or emoji are ignored"""
+        self.assertEqual(normalize_text('  Vanakkam   Anna. 🙏'), 'vanakkam anna')
+        self.assertEqual(normalize_text('HI'), normalize_text('hi.'))
+
+    def test_questions_and_exclamations_keep_their_mark(self):
+        """Test a trailing ? or ! is part of the key, once"""
+        self.assertEqual(normalize_text('Road fixed??? 🙏'), 'road fixed?')
+        self.assertNotEqual(normalize_text('road fixed?'), normalize_text('road fixed.'))
+        self.assertEqual(normalize_text('Vanakkam Anna!! 🙏'), 'vanakkam anna!')
+        self.assertEqual(normalize_text('really?!'), 'really?')
+
+    def test_tamil_is_preserved(self):
+        """Test Tamil vowel signs and virama survive and joiners are dropped"""
+        self.assertEqual(normalize_text('வணக்கம்.'), 'வணக்கம்')
+        self.assertEqual(normalize_text('க்\u200dஷ'), 'க்ஷ')
+
+    def test_symbol_only_text_is_kept(self):
+        """Test a message of only emoji still has a key of its own"""
+        self.assertEqual(normalize_text('👍'), '👍')
+        self.assertNotEqual(normalize_text('👍'), normalize_text('👎'))
+
+
+class ResultCacheTest(SimpleTestCase):
+    """Test the in-process and shared tiers"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = ResultCache(memory_entries=2)
+
+    def test_memory_lru_then_shared_tier(self):
+        """Test evicted entries are served from the shared tier"""
+        keys = [ResultCache.key('sentiment', 'v1', text) for text in ('a', 'b', 'c')]
+        for key in keys:
+            self.cache.set(key, {'sentiment': 'neutral'})
+
+        self.assertEqual(len(self.cache._memory), 2)
+        self.assertEqual(self.cache.get(keys[0]), {'sentiment': 'neutral'})
+        self.assertEqual(self.cache.get(keys[2]), {'sentiment': 'neutral'})
+        self.assertIsNone(self.cache.get(ResultCache.key('sentiment', 'v1', 'd')))
+        self.assertEqual(self.cache.stats()['memory_hits'], 1)
+        self.assertEqual(self.cache.stats()['shared_hits'], 1)
+        self.assertAlmostEqual(self.cache.hit_rate, 2 / 3)
+
+    def test_results_are_copies(self):
+        """Test mutating a returned result does not change the cache"""
+        key = ResultCache.key('topics', 'v1', 'road')
+        self.cache.set(key, {'topics': ['Infrastructure']})
+        self.cache.get(key)['topics'].append('Jobs')
+        self.assertEqual(self.cache.get(key), {'topics': ['Infrastructure']})
+
+
+class AIServiceCacheTest(SimpleTestCase):
+    """Test AIService only calls the model for new text or a new prompt"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = AIService.__new__(AIService)
+        self.completions = CountingCompletions()
+        self.service.client = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        self.service.result_cache = ResultCache()
+        self.service.local_classifier = LocalClassifier({})
+        self.service.tier_stats = TierStats()
+
+    def test_repeated_text_is_cached(self):
+        """Test equivalent messages are analyzed once"""
+        for text in ('Great work.', 'great work', '  GREAT   work 👏'):
+            self.assertEqual(self.service.analyze_sentiment(text)['sentiment'], 'positive')
+        self.assertEqual(self.completions.calls, 1)
+        self.assertAlmostEqual(self.service.result_cache.hit_rate, 2 / 3)
+
+    def test_prompt_change_invalidates(self):
+        """Test editing a prompt template bypasses old results"""
+        self.service.analyze_sentiment('Great work')
+        with patch.object(ai_module, 'SENTIMENT_PROMPT', ai_module.SENTIMENT_PROMPT + '\nBe strict.'):
+            self.service.analyze_sentiment('Great work')
+        self.service.analyze_sentiment('Great work')
+        self.assertEqual(self.completions.calls, 2)
+
+    def test_failures_are_not_cached(self):
+        """Test a failed request is retried on the next message"""
+        self.completions.create = lambda **kwargs: (_ for _ in ()).throw(RuntimeError('timeout'))
+        self.assertEqual(self.service.classify_intent('is the hospital open')['intent'], 'general_inquiry')
+        self.assertEqual(self.service.result_cache.stats()['memory_entries'], 0)
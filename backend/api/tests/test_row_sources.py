@@ -0,0 +1,75 @@
+"""
+Unit tests for streaming row sources
+Tests CSV, gzip'd CSV and XLSX reading and batching
+"""
+import gzip
+import io
+
+import openpyxl
+from django.test import SimpleTestCase
+
+from api.utils.row_sources import (
+    CsvRowSource, GzipCsvRowSource, RowSourceError, XlsxRowSource, open_row_source,
+)
+
+
+CSV_CONTENT = '\ufeffname , code\nWard 1,W-1\n\nWard 2\nWard 3,W-3,extra\n'
+
+
+class RowSourceTest(SimpleTestCase):
+    """Test reading rows from each supported format"""
+
+    def test_csv_rows(self):
+        """Test BOM/whitespace in headers, blank lines and ragged rows"""
+        source = open_row_source(io.BytesIO(CSV_CONTENT.encode()), 'wards.csv')
+        self.assertIsInstance(source, CsvRowSource)
+        self.assertEqual(source.headers, ['name', 'code'])
+        self.assertEqual(list(source), [
+            {'row_number': 2, 'data': {'name': 'Ward 1', 'code': 'W-1'}},
+            {'row_number': 3, 'data': {'name': 'Ward 2', 'code': None}},
+            {'row_number': 4, 'data': {'name': 'Ward 3', 'code': 'W-3'}},
+        ])
+
+    def test_gzip_detected_by_name_or_content(self):
+        """Test gzip'd CSV is read whether or not the name says so"""
+        content = gzip.compress(CSV_CONTENT.encode())
+        for name in ('wards.csv.gz', 'wards.csv'):
+            with open_row_source(io.BytesIO(content), name) as source:
+                self.assertEqual(len(list(source)), 3)
+
+    def test_gzip_close_closes_upload(self):
+        """Test closing a gzip'd source closes the underlying upload too"""
+        upload = io.BytesIO(gzip.compress(CSV_CONTENT.encode()))
+        with open_row_source(upload, 'wards.csv.gz') as source:
+            self.assertIsInstance(source, GzipCsvRowSource)
+            list(source)
+        self.assertTrue(upload.closed)
+
+    def test_xlsx_rows(self):
+        """Test workbook rows are read lazily with empty rows skipped"""
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['name', 'booth_number'])
+        sheet.append(['School', 12])
+        sheet.append([None, None])
+        sheet.append(['Hall', 13])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        with open_row_source(buffer, 'booths.xlsx') as source:
+            self.assertIsInstance(source, XlsxRowSource)
+            rows = list(source)
+        self.assertEqual([row['data']['booth_number'] for row in rows], [12, 13])
+
+    def test_batches(self):
+        """Test batches are bounded and cover every row"""
+        content = 'n\n' + '\n'.join(str(i) for i in range(7))
+        source = open_row_source(io.BytesIO(content.encode()), 'numbers.csv')
+        self.assertEqual([len(batch) for batch in source.batches(3)], [3, 3, 1])
+
+    def test_undecodable_file(self):
+        """Test content that is not UTF-8 raises RowSourceError"""
+        source = open_row_source(io.BytesIO(b'name\n\xff\xfe\xfa\n'), 'bad.csv')
+        with self.assertRaises(RowSourceError):
+            list(source)
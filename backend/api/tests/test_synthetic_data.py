@@ -0,0 +1,231 @@
+"""
+Unit tests for the synthetic data engine and the generate_* commands
+Tests seeded sharding, sampled distributions and raw bulk loading
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Count, Max
+from django.test import SimpleTestCase, TestCase
+
+from api.management.commands.generate_master_data import Command as MasterDataCommand
+from api.models import (
+    State, District, Constituency, Voter, VoterInteraction, SentimentData, FieldReport, IssueCategory,
+    VoterSegment, PoliticalParty, PollingBooth,
+)
+from api.services.voter_search import search_keys, search_voters
+from api.utils.synthetic_data import (
+    PARTY_AFFILIATION, PollingBoothGenerator, SentimentGenerator, VoterGenerator, plan_shards, reference_time_for,
+)
+
+
+def make_generator(seed=7):
+    districts = [(1, 'TN01', 'Chennai'), (2, 'TN02', 'Madurai'), (3, 'TN03', 'Ooty')]
+    constituencies = [(10, 1), (11, 1), (12, 2)]
+    return VoterGenerator(districts, constituencies, state_id=1, created_by_id=None,
+                          seed=seed, reference_time=reference_time_for(date(2024, 6, 1)))
+
+
+class VoterGeneratorTest(SimpleTestCase):
+    """Test sampling without touching the database"""
+
+    def test_shards_are_independent_of_partitioning(self):
+        """Test a shard's rows depend only on the seed and its row range"""
+        generator = make_generator()
+        first, _ = generator.generate(0, 500)
+        again, _ = make_generator().generate(0, 500)
+        other_seed, _ = make_generator(seed=8).generate(0, 500)
+        self.assertEqual(first['voter_id'].tolist(), again['voter_id'].tolist())
+        self.assertEqual(first['tags'].tolist(), again['tags'].tolist())
+        self.assertNotEqual(first['party_affiliation'].tolist(), other_seed['party_affiliation'].tolist())
+
+        self.assertEqual(plan_shards(0, 1200, 500), [(0, 500), (500, 500), (1000, 200)])
+        later, _ = generator.generate(500, 500)
+        self.assertTrue(later['voter_id'][0].endswith('00000500'))
+
+    def test_distributions_and_consistency(self):
+        """Test sampled attributes follow the tables and agree with each other"""
+        columns, stats = make_generator().generate(0, 50_000)
+
+        share = stats['by_party']['tvk'] / 50_000
+        self.assertAlmostEqual(share, PARTY_AFFILIATION['tvk'], delta=0.01)
+        self.assertTrue(set(columns['constituency_id'][columns['district_id'] == 1].tolist()) <= {10, 11})
+        # No constituencies in Ooty, so any in the state may be drawn
+        self.assertTrue(set(columns['constituency_id'][columns['district_id'] == 3].tolist()) <= {10, 11, 12})
+
+        age = columns['age']
+        self.assertTrue(((age >= 18) & (age <= 90)).all())
+        self.assertTrue(
+            (columns['positive_interactions'] + columns['negative_interactions'] == columns['interaction_count']).all()
+        )
+        self.assertTrue(np.array_equal(columns['is_opinion_leader'], columns['influence_level'] == 'high'))
+
+        youngest = int(np.argmin(age))
+        self.assertEqual(columns['voting_history'][youngest], '[]')
+        self.assertIn('youth', columns['tags'][youngest])
+        self.assertEqual(len(set(columns['voter_id'].tolist())), 50_000)
+
+
+class GenerateVotersCommandTest(TestCase):
+    """Test the command loads voters readable through the ORM"""
+
+    def setUp(self):
+        state = State.objects.create(code='TN', name='Tamil Nadu')
+        chennai = District.objects.create(state=state, name='Chennai', code='TN01')
+        District.objects.create(state=state, name='Madurai', code='TN02')
+        Constituency.objects.create(state=state, district=chennai, name='Mylapore', code='TN-AC-025', number=25)
+
+    def test_generate_and_append(self):
+        """Test rows are written in shards and a later run appends after --start"""
+        call_command('generate_voters', count=250, shard_size=100, as_of=date(2024, 6, 1), stdout=StringIO())
+        self.assertEqual(Voter.objects.count(), 250)
+
+        voter = Voter.objects.exclude(last_contacted_at=None).first()
+        self.assertEqual(voter.state.code, 'TN')
+        self.assertEqual(voter.constituency.code, 'TN-AC-025')
+        self.assertIsInstance(voter.voting_history, list)
+        self.assertIsInstance(voter.tags, list)
+        self.assertLessEqual(voter.last_contacted_at.date(), date(2024, 6, 1))
+        self.assertEqual((date(2024, 6, 1) - voter.date_of_birth).days // 365, voter.age)
+        self.assertEqual(search_keys(voter), {field: getattr(voter, field) for field in search_keys(voter)})
+        self.assertIn(voter, search_voters(Voter.objects.all(), f"{voter.first_name} {voter.last_name}"))
+
+        call_command('generate_voters', count=50, start=250, as_of=date(2024, 6, 1), stdout=StringIO())
+        self.assertEqual(Voter.objects.count(), 300)
+
+
+ISSUE_CATEGORIES_SEEDED = [
+    'Healthcare Access', 'Youth Employment & Education', 'Farmers Welfare & Agriculture',
+    "Fishermen's Rights & Livelihood", 'Environmental Protection', 'Social Justice & Caste Issues',
+]
+
+
+class SentimentGeneratorTest(SimpleTestCase):
+    """Test issue-driven sampling of sentiment records"""
+
+    def test_issues_drive_district_and_polarity(self):
+        """Test records land in the issue's districts with scores matching their polarity"""
+        generator = SentimentGenerator(
+            [(1, 'Chennai'), (2, 'Thanjavur'), (3, 'Ooty')], [(10, 1), (11, 2)],
+            list(enumerate(ISSUE_CATEGORIES_SEEDED, 5)), [7], state_id=1, seed=7,
+            start=datetime(2024, 9, 1, tzinfo=dt_timezone.utc), end=datetime(2024, 11, 30, tzinfo=dt_timezone.utc),
+        )
+        columns, stats = generator.generate(0, 20_000)
+        again, _ = generator.generate(0, 20_000)
+        self.assertEqual(columns['source_id'].tolist(), again['source_id'].tolist())
+
+        self.assertEqual(sum(stats['by_issue'].values()), 20_000)
+        # Healthcare, water, jobs and education records are only filed in urban Chennai
+        self.assertEqual(set(columns['district_id'][np.isin(columns['issue_id'], [5, 6])].tolist()), {1})
+        self.assertEqual(set(columns['issue_id'].tolist()), {5, 6, 7, 8, 9, 10})
+        self.assertEqual(set(columns['constituency_id'][columns['district_id'] == 2].tolist()), {11})
+
+        score, polarity = columns['sentiment_score'], columns['polarity']
+        self.assertTrue((score[polarity == 'positive'] >= 0.6).all())
+        self.assertTrue((score[polarity == 'negative'] <= 0.4).all())
+        self.assertTrue((columns['timestamp'] >= '2024-09-01').all())
+        self.assertTrue((columns['timestamp'] < '2024-12-01').all())
+
+
+class PollingBoothGeneratorTest(SimpleTestCase):
+    """Test booths are numbered per constituency up to the target"""
+
+    def test_stops_after_target(self):
+        """Test booths are drawn for constituencies until one reaches the target"""
+        constituencies = [
+            (1, 1, 1, 'Mylapore', 13.03, 80.27, 'Chennai'),
+            (2, 1, 2, 'Ooty', None, None, 'Nilgiris'),
+        ]
+        reference_time = reference_time_for(date(2024, 6, 1))
+        generator = PollingBoothGenerator(constituencies, seed=7, reference_time=reference_time, target=1)
+        columns, _ = generator.generate(0, generator.size)
+        booths = columns['booth_number'].tolist()
+        self.assertEqual(set(columns['constituency_id'].tolist()), {1})
+        self.assertTrue(60 <= len(booths) <= 100)
+        self.assertEqual(booths[:2], ['001', '002'])
+        self.assertEqual(len(set(booths)), len(booths))
+        self.assertTrue((np.abs(columns['latitude'] - 13.03) <= 0.05).all())
+
+        generator = PollingBoothGenerator(constituencies, seed=7, reference_time=reference_time)
+        columns, _ = generator.generate(0, generator.size)
+        ooty = columns['constituency_id'] == 2
+        self.assertTrue(30 <= ooty.sum() <= 50)
+        # Constituencies without a centre are placed around 10N 78E
+        self.assertTrue((np.abs(columns['latitude'][ooty] - 10.0) <= 0.05).all())
+
+
+class GenerateCommandsTest(TestCase):
+    """Test the other generate_* commands load rows readable through the ORM"""
+
+    def setUp(self):
+        self.state = State.objects.create(code='TN', name='Tamil Nadu')
+        chennai = District.objects.create(state=self.state, name='Chennai', code='TN01')
+        thanjavur = District.objects.create(state=self.state, name='Thanjavur', code='TN02')
+        Constituency.objects.create(state=self.state, district=chennai, name='Mylapore', code='TN-AC-025', number=25)
+        Constituency.objects.create(state=self.state, district=thanjavur, name='Thiruvaiyaru', code='TN-AC-173',
+                                    number=173)
+        for name in ('Healthcare Access', 'Farmers Welfare & Agriculture', 'Youth Employment & Education'):
+            IssueCategory.objects.create(name=name)
+        VoterSegment.objects.create(name='Farmers')
+        VoterSegment.objects.create(name='Youth')
+        PoliticalParty.objects.create(name='DMK', short_name='DMK')
+        for number in range(3):
+            User.objects.create(username=f'volunteer{number}')
+
+    def test_voter_interactions(self):
+        """Test interactions are written and voters' engagement counters follow them"""
+        call_command('generate_voters', count=100, as_of=date(2024, 6, 1), stdout=StringIO())
+        before = dict(Voter.objects.values_list('id', 'interaction_count'))
+        call_command('generate_voter_interactions', count=400, shard_size=150, as_of=date(2024, 6, 1),
+                     stdout=StringIO())
+        self.assertEqual(VoterInteraction.objects.count(), 400)
+
+        interaction = VoterInteraction.objects.filter(follow_up_required=True).first()
+        self.assertIsInstance(interaction.issues_discussed, list)
+        self.assertGreater(interaction.follow_up_date, interaction.interaction_date.date())
+        self.assertLessEqual(interaction.interaction_date.date(), date(2024, 6, 1))
+
+        voter = Voter.objects.annotate(total=Count('interactions')).filter(total__gt=0).first()
+        self.assertEqual(voter.interaction_count, before[voter.id] + voter.total)
+        self.assertEqual(voter.positive_interactions, voter.interactions.filter(sentiment='positive').count())
+        self.assertEqual(voter.last_contacted_at, voter.interactions.aggregate(last=Max('interaction_date'))['last'])
+
+    def test_sentiment_data(self):
+        """Test records are written with their issue category and segment"""
+        call_command('generate_sentiment_data', count=300, shard_size=100, stdout=StringIO())
+        self.assertEqual(SentimentData.objects.count(), 300)
+
+        record = SentimentData.objects.exclude(voter_segment=None).first()
+        self.assertEqual(record.state, self.state)
+        self.assertIn(record.issue.name, {'Healthcare Access', 'Farmers Welfare & Agriculture',
+                                          'Youth Employment & Education'})
+        self.assertEqual(record.constituency.district, record.district)
+        self.assertTrue(0 <= record.sentiment_score <= 1)
+
+    def test_field_reports(self):
+        """Test every report is written with its key issues and segments"""
+        call_command('generate_field_reports', count=200, shard_size=80, as_of=date(2024, 6, 1), stdout=StringIO())
+        self.assertEqual(FieldReport.objects.count(), 200)
+
+        counts = FieldReport.objects.annotate(issues=Count('key_issues', distinct=True),
+                                              segments=Count('voter_segments_met', distinct=True))
+        self.assertEqual(set(counts.values_list('issues', flat=True)) - {1, 2, 3}, set())
+        self.assertEqual(set(counts.values_list('segments', flat=True)) - {1, 2}, set())
+
+        report = FieldReport.objects.filter(verification_status='verified').first()
+        self.assertGreater(report.verified_at, report.timestamp)
+        self.assertIn(report.volunteer.username, {'volunteer0', 'volunteer1', 'volunteer2'})
+        self.assertIsInstance(report.positive_reactions, list)
+        self.assertEqual(report.report_date, report.timestamp.date())
+
+    def test_polling_booths_are_not_duplicated(self):
+        """Test constituencies that already have booths are skipped"""
+        command = MasterDataCommand(stdout=StringIO())
+        created = command.create_polling_booths(seed=7)
+        self.assertEqual(PollingBooth.objects.count(), created)
+        self.assertEqual(command.create_polling_booths(seed=7), 0)
+        booth = PollingBooth.objects.get(constituency__code='TN-AC-025', booth_number='001')
+        self.assertEqual(booth.district.name, 'Chennai')
@@ -0,0 +1,186 @@
+"""
+Unit tests for voter search
+Tests search key normalization, Tamil/Latin name matching and the role
+scoped voter search API
+"""
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.core_views import VoterViewSet
+from api.models import District, State, Voter, VoterNameTrigram
+from api.services import voter_search
+from api.services.voter_search import name_key, phone_digits, search_voters, voter_id_key
+
+
+class SearchKeyTest(SimpleTestCase):
+    """Test spellings of one phone, voter ID or name share a key"""
+
+    def test_phone_digits(self):
+        """Test country code, trunk prefix and punctuation are dropped"""
+        for phone in ('+91 98765-43210', '098765 43210', '919876543210', '(98765) 43210'):
+            self.assertEqual(phone_digits(phone), '9876543210')
+        self.assertEqual(phone_digits(''), '')
+
+    def test_voter_id_key(self):
+        """Test case and separators are ignored"""
+        self.assertEqual(voter_id_key('tn/01-abc 1234'), 'TN01ABC1234')
+
+    def test_latin_spellings(self):
+        """Test spellings Tamil does not distinguish fold together"""
+        self.assertEqual(name_key('Geetha'), name_key('Geeta'))
+        self.assertEqual(name_key('Muthu'), name_key('Mutthu'))
+        self.assertEqual(name_key('Azhagu'), name_key('Alagu'))
+        self.assertEqual(name_key('Ganesh', 'Kumar'), 'kanes kumar')
+
+    def test_tamil_script(self):
+        """Test Tamil names transliterate to the key of their Latin spelling"""
+        self.assertEqual(name_key('கீதா'), name_key('Geetha'))
+        self.assertEqual(name_key('முருகன்'), name_key('Murugan'))
+        self.assertEqual(name_key('கணேஷ்'), name_key('Ganesh'))
+        self.assertEqual(name_key('செல்வி'), name_key('Selvi'))
+        self.assertEqual(name_key('சுந்தர்'), name_key('Sundar'))
+
+
+class PostgresQueryTest(SimpleTestCase):
+    """Test the PostgreSQL name search compiles to the trigram index operator"""
+
+    def test_name_search_sql(self):
+        """Test a scoped name search filters with %> and ranks by word similarity"""
+        postgres = DatabaseWrapper({
+            'NAME': 'pulse', 'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '', 'OPTIONS': {},
+            'TIME_ZONE': None, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False, 'TEST': {},
+        })
+        with patch.object(voter_search, 'uses_postgres', return_value=True):
+            queryset = search_voters(Voter.objects.filter(district_id=7), 'Geetha')
+        sql, params = queryset.query.get_compiler(connection=postgres).as_sql()
+
+        self.assertIn('"api_voter"."district_id" = %s AND "api_voter"."name_key" %%> %s', sql)
+        self.assertIn('WORD_SIMILARITY(%s, "api_voter"."name_key") AS "search_rank"', sql)
+        self.assertEqual(params, ('kita', 7, 'kita'))
+
+
+class VoterSearchTestCase(TestCase):
+    """Stores voters in two districts"""
+
+    def setUp(self):
+        self.state = State.objects.create(name='Tamil Nadu', code='TN')
+        self.madurai = District.objects.create(state=self.state, name='Madurai', code='TN-MDU')
+        self.chennai = District.objects.create(state=self.state, name='Chennai', code='TN-CHN')
+        self.count = 0
+
+    def voter(self, first_name, last_name='', phone='', district=None, **kwargs):
+        self.count += 1
+        kwargs.setdefault('voter_id', f"TN/{self.count:02d}/ABC{self.count:07d}")
+        return Voter.objects.create(
+            first_name=first_name, last_name=last_name, phone=phone, state=self.state,
+            district=district or self.madurai, **kwargs,
+        )
+
+    def search(self, query):
+        return list(search_voters(Voter.objects.all(), query))
+
+
+class SearchVotersTest(VoterSearchTestCase):
+    """Test queries are routed to the matching key and ranked"""
+
+    def test_phone_prefix(self):
+        """Test phone numbers match by prefix however they are written"""
+        first = self.voter('Geetha', phone='+91 98765 43210')
+        second = self.voter('Murugan', phone='9876512345')
+        self.voter('Selvi', phone='9123456789')
+
+        self.assertEqual(self.search('98765'), [second, first])
+        self.assertEqual(self.search('+91 98765 4'), [first])
+        self.assertEqual(self.search('098765-43'), [first])
+        self.assertEqual(self.search('98'), [])
+
+    def test_voter_id_prefix(self):
+        """Test voter IDs match by prefix, ignoring case and separators"""
+        voter = self.voter('Geetha', voter_id='TN/07/XYZ1234567')
+        self.voter('Murugan', voter_id='TN/08/XYZ7654321')
+
+        self.assertEqual(self.search('tn07'), [voter])
+        self.assertEqual(self.search('TN/07/xyz12'), [voter])
+
+    def test_email(self):
+        """Test an email matches whole, as stored or in lower case"""
+        voter = self.voter('Geetha', email='geetha@example.com')
+        self.assertEqual(self.search('Geetha@Example.com'), [voter])
+        self.assertEqual(self.search('geetha@example'), [])
+
+    def test_names_across_scripts(self):
+        """Test a name is found from its Tamil or Latin spelling, closest first"""
+        geetha = self.voter('Geetha', 'Ramasamy')
+        tamil = self.voter('கீதா', 'ராமசாமி')
+        self.voter('Murugan', 'Selvam')
+
+        self.assertEqual(set(self.search('Gita')), {geetha, tamil})
+        self.assertEqual(set(self.search('கீதா ராமசாமி')), {geetha, tamil})
+        self.assertEqual(self.search('Selvam')[0].first_name, 'Murugan')
+        self.assertEqual(self.search('Kannan'), [])
+
+    def test_misspelled_name_ranks_below_exact(self):
+        """Test a close spelling still matches, below the exact one"""
+        exact = self.voter('Sundaram')
+        close = self.voter('Sundaresan')
+
+        self.assertEqual(self.search('sundaram'), [exact, close])
+
+    def test_renamed_voter_is_reindexed(self):
+        """Test a name change replaces the voter's trigrams"""
+        voter = self.voter('Geetha')
+        voter.first_name = 'Lakshmi'
+        voter.save(update_fields=['first_name'])
+
+        self.assertEqual(self.search('Geetha'), [])
+        self.assertEqual(self.search('Lakshmi'), [voter])
+        voter.refresh_from_db()
+        self.assertEqual(voter.name_key, 'laksmi')
+        self.assertFalse(VoterNameTrigram.objects.filter(voter=voter, trigram='kit').exists())
+
+
+class VoterSearchApiTest(VoterSearchTestCase):
+    """Test the voter list searches within the user's scope"""
+
+    def get(self, user, **params):
+        request = APIRequestFactory().get('/api/voters/', params)
+        force_authenticate(request, user=user)
+        response = VoterViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        data = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [row['first_name'] for row in data]
+
+    def user(self, username, role, **assignments):
+        user = User.objects.create_user(username=username, email=f"{username}@example.com", password='x')
+        profile = user.profile
+        profile.role = role
+        for field, value in assignments.items():
+            setattr(profile, field, value)
+        profile.save()
+        return user
+
+    def test_search_respects_role_scope(self):
+        """Test a district manager finds only the voters of their district"""
+        self.voter('Geetha', phone='9876543210', district=self.madurai)
+        self.voter('Geeta', phone='9876543211', district=self.chennai)
+        manager = self.user('madurai', 'manager', assigned_district=self.madurai)
+        admin = self.user('state', 'admin', assigned_state=self.state)
+
+        self.assertEqual(self.get(manager, search='geetha'), ['Geetha'])
+        self.assertEqual(self.get(manager, search='98765'), ['Geetha'])
+        self.assertEqual(sorted(self.get(admin, search='98765')), ['Geeta', 'Geetha'])
+
+    def test_ordering_param_still_applies(self):
+        """Test matches are ranked unless an ordering is asked for"""
+        self.voter('Sundaram', age=40)
+        self.voter('Sundaresan', age=30)
+        admin = self.user('state', 'admin', assigned_state=self.state)
+
+        self.assertEqual(self.get(admin, search='sundaram'), ['Sundaram', 'Sundaresan'])
+        self.assertEqual(self.get(admin, search='sundaram', ordering='age'), ['Sundaresan', 'Sundaram'])
+        self.assertEqual(len(self.get(admin)), 2)
@@ -0,0 +1,141 @@
+"""
+Unit tests for the voter sentiment time series
+Tests appending, downsampling and range queries over sentiment events
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import VoterProfile, VoterSentimentEvent, WhatsAppConversation
+from api.services.conversation_context import ConversationContextStore
+from api.services.message_processor import MessageProcessor
+from api.services.voter_sentiment import (
+    compact_sentiment_events, count_topics, record_sentiment, sentiment_changes, sentiment_dropped, sentiment_series,
+)
+from api.views.whatsapp_api_views import VoterProfileViewSet
+
+NOW = datetime(2026, 6, 17, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class SentimentSeriesTest(TestCase):
+    """Test events are appended and downsampled"""
+
+    def setUp(self):
+        self.profile = VoterProfile.objects.create(phone_number='919876543210')
+
+    def record(self, days_ago, score, hours=0, profile=None):
+        return record_sentiment(profile or self.profile, score, NOW - timedelta(days=days_ago, hours=hours))
+
+    def test_recent_events_stay_raw(self):
+        """Test events inside the raw window are not touched"""
+        self.record(1, 0.5)
+        self.record(2, -0.5)
+        self.assertEqual(compact_sentiment_events(NOW), {'day': 0, 'week': 0})
+        series = sentiment_series(self.profile)
+        self.assertEqual([(point['score'], point['resolution']) for point in series], [(-0.5, 'event'), (0.5, 'event')])
+
+    def test_downsampling(self):
+        """Test old events fold into day buckets and older days into weeks, keeping the mean"""
+        self.record(10, 0.9, hours=1)
+        self.record(10, 0.3, hours=2)
+        self.record(10, 0.0, hours=3)
+        self.record(120, -1.0)
+        self.record(121, 0.0)
+
+        # Five events into three days, then the two old days into one week
+        self.assertEqual(compact_sentiment_events(NOW), {'day': 5, 'week': 2})
+        day = VoterSentimentEvent.objects.get(resolution='day')
+        self.assertEqual((round(day.score, 4), day.count), (0.4, 3))
+        week = VoterSentimentEvent.objects.get(resolution='week')
+        self.assertEqual((week.score, week.count), (-0.5, 2))
+        self.assertEqual(week.recorded_at.weekday(), 0)
+
+        # A late event for a compacted day is merged into its bucket
+        self.record(10, 0.8, hours=4)
+        compact_sentiment_events(NOW)
+        bucket = VoterSentimentEvent.objects.filter(resolution='day').order_by('-recorded_at').first()
+        self.assertEqual((round(bucket.score, 4), bucket.count), (0.5, 4))
+        self.assertEqual(VoterSentimentEvent.objects.count(), 2)
+
+    def test_sentiment_dropped(self):
+        """Test drops are found with one aggregate query over the time range"""
+        steady = VoterProfile.objects.create(phone_number='919876543211')
+        new = VoterProfile.objects.create(phone_number='919876543212')
+        for days_ago in (40, 50, 60):
+            self.record(days_ago, 0.6)
+            self.record(days_ago, 0.2, profile=steady)
+        self.record(5, -0.2)
+        self.record(5, 0.1, profile=steady)
+        self.record(5, -0.9, profile=new)
+        compact_sentiment_events(NOW)
+
+        with self.assertNumQueries(1):
+            dropped = list(sentiment_dropped(days=30, min_drop=0.2, now=NOW))
+        self.assertEqual(dropped, [self.profile])
+
+        change = sentiment_changes(days=30, now=NOW).get(voter_profile_id=self.profile.id)
+        self.assertAlmostEqual(change['change'], -0.8)
+
+    def test_topics_are_bounded(self):
+        """Test topic counters keep only the most frequent topics"""
+        counts = {f'topic {i}': 1 for i in range(60)}
+        counts = count_topics(counts, ['Roads', 'Roads'])
+        self.assertEqual(len(counts), 50)
+        self.assertEqual(counts['Roads'], 2)
+
+
+class FakeAIService:
+    """Summarises without a model"""
+
+    def summarize_conversation(self, history):
+        return 'summary'
+
+    def extract_demographics(self, history):
+        return {'age_group': '25-34'}
+
+
+class EndConversationTest(TestCase):
+    """Test ending a conversation appends to the time series"""
+
+    def test_end_conversation(self):
+        """Test one event is recorded and the profile keeps no history JSON"""
+        profile = VoterProfile.objects.create(phone_number='919876543210')
+        conversation = WhatsAppConversation.objects.create(
+            phone_number='919876543210', sentiment='negative', sentiment_score=-0.4, topics=['Roads'],
+        )
+        processor = MessageProcessor.__new__(MessageProcessor)
+        processor.ai_service = FakeAIService()
+        processor.context_store = ConversationContextStore()
+
+        processor.end_conversation(str(conversation.id))
+
+        event = VoterSentimentEvent.objects.get()
+        self.assertEqual((event.voter_profile_id, event.score, event.recorded_at),
+                         (profile.id, -0.4, conversation.started_at))
+        profile.refresh_from_db()
+        self.assertEqual(profile.topic_interests, {'Roads': 1})
+        self.assertEqual(profile.demographics, {'age_group': '25-34'})
+
+
+class VoterProfileSentimentViewTest(TestCase):
+    """Test the voter profile API reads from the time series"""
+
+    def test_list_and_filter(self):
+        """Test sentiment_history comes from events and sentiment_dropped filters"""
+        user = User.objects.create_user('analyst', password='pass12345')
+        falling = VoterProfile.objects.create(phone_number='919876543210')
+        VoterProfile.objects.create(phone_number='919876543211')
+        now = datetime.now(dt_timezone.utc)
+        record_sentiment(falling, 0.7, now - timedelta(days=45))
+        record_sentiment(falling, -0.3, now - timedelta(days=2))
+
+        request = APIRequestFactory().get('/api/whatsapp/voters/', {'sentiment_dropped': '30'})
+        force_authenticate(request, user=user)
+        response = VoterProfileViewSet.as_view({'get': 'list'})(request)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([row['phone_number'] for row in results], ['919876543210'])
+        self.assertEqual([point['score'] for point in results[0]['sentiment_history']], [0.7, -0.3])
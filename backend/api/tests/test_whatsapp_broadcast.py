@@ -0,0 +1,277 @@
+"""
+Unit tests for WhatsApp broadcasts
+Tests segment streaming, throttled sending against a mock Graph API,
+checkpointing and resume
+"""
+import json
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from api.models import Voter, VoterProfile, WhatsAppBroadcast, WhatsAppBroadcastRecipient
+from api.services.whatsapp_broadcast import (
+    INTERRUPTED_ERROR, BroadcastRunner, GraphAPISender, broadcast_summary, normalize_phone, pause_broadcast,
+)
+from api.services.whatsapp_status import StatusIngestor, parse_statuses, record_statuses
+from api.tests.http_stub import LocalServerMixin
+from api.utils.rate_limit import TokenBucket
+
+
+class MockGraphAPI(BaseHTTPRequestHandler):
+    """
+    Answers POST /<phone id>/messages like the Cloud API
+
+    Numbers ending in 0000 are undeliverable; numbers ending in 4290 are
+    throttled on their first attempt.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        to = payload['to']
+        with self.server.lock:
+            self.server.requests.append((self.path, self.headers['Authorization'], payload))
+            self.server.attempts[to] += 1
+            attempt = self.server.attempts[to]
+
+        if to.endswith('0000'):
+            self._reply(400, {'error': {'message': '(#131026) Message undeliverable', 'code': 131026}})
+        elif to.endswith('4290') and attempt == 1:
+            self._reply(429, {'error': {'message': '(#130429) Rate limit hit', 'code': 130429}})
+        else:
+            self._reply(200, {'messaging_product': 'whatsapp', 'messages': [{'id': f"wamid.{to}"}]})
+
+    def _reply(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class WorkerLost(BaseException):
+    """Stands in for the worker process being killed"""
+
+
+class DyingSender(GraphAPISender):
+    """A sender whose worker is killed after a number of sends"""
+
+    def __init__(self, base_url, sends):
+        super().__init__('1234', 'secret', base_url=base_url, pool_size=1)
+        self.sends = sends
+
+    def send_template(self, *args):
+        if not self.sends:
+            raise WorkerLost()
+        self.sends -= 1
+        return super().send_template(*args)
+
+
+class MockGraphAPITestCase(LocalServerMixin, TestCase):
+    """Runs a mock Graph API on a local port for the duration of the tests"""
+
+    handler = MockGraphAPI
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.base_url = f"{cls.server.base_url}/v21.0"
+
+    def setUp(self):
+        cache.clear()
+        self.server.requests = []
+        self.server.attempts = Counter()
+
+    def runner(self, broadcast, **kwargs):
+        kwargs.setdefault('chunk_size', 7)
+        kwargs.setdefault('concurrency', 4)
+        return BroadcastRunner(
+            broadcast,
+            sender=kwargs.pop('sender', None) or GraphAPISender('1234', 'secret', base_url=self.base_url, pool_size=4),
+            bucket=TokenBucket(10000),
+            sleep=lambda seconds: None,
+            **kwargs,
+        )
+
+    def sent_to(self):
+        return [payload['to'] for _, _, payload in self.server.requests]
+
+
+class BroadcastRunnerTest(MockGraphAPITestCase):
+    """Test a segment is sent and every outcome recorded"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            VoterProfile.objects.create(phone_number=f"91987650{i:04d}", preferred_language='ta' if i % 2 else 'en')
+        self.broadcast = WhatsAppBroadcast.objects.create(
+            name='Rally', template_name='rally_invite', language_code='ta',
+            components=[{'type': 'body', 'parameters': [{'type': 'text', 'text': 'Madurai'}]}],
+        )
+
+    def test_sends_segment(self):
+        """Test every number gets one template message and one outcome row"""
+        VoterProfile.objects.filter(phone_number='919876500007').update(phone_number='919876514290')
+        broadcast = self.runner(self.broadcast).run()
+
+        self.assertEqual(broadcast.status, 'completed')
+        self.assertEqual((broadcast.total_recipients, broadcast.sent_count, broadcast.failed_count), (30, 29, 1))
+        path, authorization, payload = self.server.requests[0]
+        self.assertEqual((path, authorization), ('/v21.0/1234/messages', 'Bearer secret'))
+        self.assertEqual(payload['template']['name'], 'rally_invite')
+        self.assertEqual(payload['template']['components'][0]['parameters'][0]['text'], 'Madurai')
+
+        # The throttled number was retried, the undeliverable one was not
+        self.assertEqual(Counter(self.sent_to())['919876514290'], 2)
+        self.assertEqual(Counter(self.sent_to())['919876500000'], 1)
+
+        failed = WhatsAppBroadcastRecipient.objects.get(delivery_status='failed')
+        self.assertEqual(failed.phone_number, '919876500000')
+        self.assertIn('undeliverable', failed.delivery_error)
+        self.assertEqual(WhatsAppBroadcastRecipient.objects.filter(delivery_status='sent').count(), 29)
+
+    def test_segment_filters(self):
+        """Test only profiles matching the segment are reached"""
+        self.broadcast.segment_filters = {'preferred_language': 'en'}
+        self.broadcast.save()
+        broadcast = self.runner(self.broadcast).run()
+        self.assertEqual(broadcast.total_recipients, 15)
+        self.assertEqual(len(self.server.requests), 15)
+
+    def test_resume_after_interruption(self):
+        """Test a resumed run continues after the checkpoint without re-sending"""
+        # Profile order is random (UUID keys), so keep every number deliverable
+        VoterProfile.objects.filter(phone_number='919876500000').update(phone_number='919876599999')
+        runner = self.runner(self.broadcast)
+        broadcast = runner.run(time_budget=0)
+        self.assertTrue(runner.yielded)
+        self.assertEqual((broadcast.status, broadcast.sent_count), ('running', 7))
+
+        # Numbers recorded already, as a phone repeated further down a segment is
+        later = list(VoterProfile.objects.order_by('pk').values_list('phone_number', flat=True))[7:10]
+        WhatsAppBroadcastRecipient.objects.bulk_create([
+            WhatsAppBroadcastRecipient(broadcast=broadcast, phone_number=phone, delivery_status='sent')
+            for phone in later
+        ])
+
+        broadcast = self.runner(broadcast).run()
+        self.assertEqual(broadcast.status, 'completed')
+        self.assertEqual((broadcast.sent_count, broadcast.failed_count, broadcast.skipped_count), (27, 0, 3))
+        self.assertEqual(len(self.sent_to()), 27)
+        self.assertEqual(len(set(self.sent_to())), 27)
+        self.assertEqual(WhatsAppBroadcastRecipient.objects.count(), 30)
+
+    def test_worker_lost_mid_chunk(self):
+        """Test numbers queued by a run killed mid-chunk are not sent again"""
+        VoterProfile.objects.filter(phone_number='919876500000').update(phone_number='919876599999')
+        runner = self.runner(self.broadcast, sender=DyingSender(self.base_url, sends=9), concurrency=1)
+        with self.assertRaises(WorkerLost):
+            runner.run()
+        cache.clear()   # the lock of a killed worker expires
+
+        broadcast = WhatsAppBroadcast.objects.get()
+        self.assertEqual((broadcast.status, broadcast.sent_count), ('running', 7))
+        queued = set(
+            WhatsAppBroadcastRecipient.objects.filter(delivery_status='queued').values_list('phone_number', flat=True)
+        )
+        self.assertEqual(len(queued), 7)
+        self.assertEqual(len(queued & set(self.sent_to())), 2)
+
+        broadcast = self.runner(broadcast).run()
+        self.assertEqual(broadcast.status, 'completed')
+        self.assertEqual((broadcast.sent_count, broadcast.failed_count, broadcast.skipped_count), (23, 7, 0))
+        self.assertEqual(len(self.sent_to()), 25)
+        self.assertEqual(len(set(self.sent_to())), 25)
+        interrupted = WhatsAppBroadcastRecipient.objects.filter(phone_number__in=queued)
+        self.assertEqual({(row.delivery_status, row.delivery_error) for row in interrupted}, {('failed', INTERRUPTED_ERROR)})
+        self.assertFalse(WhatsAppBroadcastRecipient.objects.filter(delivery_status='queued').exists())
+
+    def test_paused_broadcast_does_not_send(self):
+        """Test a paused broadcast is left alone until queued again"""
+        pause_broadcast(self.broadcast)
+        broadcast = self.runner(self.broadcast).run()
+        self.assertEqual(broadcast.status, 'paused')
+        self.assertEqual(self.server.requests, [])
+
+    def test_missing_credentials_fail(self):
+        """Test a broadcast is not silently 'sent' in test mode"""
+        service = SimpleNamespace(phone_id=None, token=None)
+        with patch('api.services.whatsapp_service.get_whatsapp_service', return_value=service):
+            broadcast = BroadcastRunner(self.broadcast).run()
+        self.assertEqual((broadcast.status, broadcast.last_error), ('failed', 'WhatsApp credentials not configured'))
+
+    def test_statuses_reach_recipients(self):
+        """Test delivery and read webhooks update the broadcast's recipients"""
+        self.runner(self.broadcast).run()
+        record_statuses(parse_statuses({'entry': [{'changes': [{'value': {'statuses': [
+            {'id': 'wamid.919876500001', 'status': 'delivered', 'timestamp': '1700000000'},
+            {'id': 'wamid.919876500002', 'status': 'read', 'timestamp': '1700000005'},
+        ]}}]}]}))
+        self.assertEqual(StatusIngestor().flush(), {'applied': 2, 'updated': 2, 'unmatched': 0})
+
+        summary = broadcast_summary(WhatsAppBroadcast.objects.get())
+        self.assertEqual((summary['sent'], summary['delivered'], summary['read'], summary['failed']), (27, 1, 1, 1))
+        self.assertEqual(summary['delivery_rate'], round(2 / 30, 4))
+
+
+class VoterSegmentTest(MockGraphAPITestCase):
+    """Test Voter phones are normalized and deduplicated"""
+
+    def test_voter_phones(self):
+        """Test formatted, repeated and missing phones"""
+        for voter_id, phone in (('TN1', '+91 98765 43210'), ('TN2', '098765-43210'), ('TN3', ''), ('TN4', '12')):
+            Voter.objects.create(voter_id=voter_id, first_name='Voter', phone=phone)
+        broadcast = WhatsAppBroadcast.objects.create(name='Voters', template_name='hello', source='voter')
+
+        broadcast = self.runner(broadcast).run()
+        self.assertEqual(self.sent_to(), ['919876543210'])
+        self.assertEqual((broadcast.total_recipients, broadcast.sent_count, broadcast.skipped_count), (3, 1, 2))
+
+
+class TokenBucketTest(SimpleTestCase):
+    """Test the token bucket's rate, burst and pause"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.bucket = TokenBucket(10, clock=lambda: self.now, sleep=self._sleep)
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def test_rate(self):
+        """Test a full bucket bursts, then hands out tokens at the rate"""
+        for _ in range(10):
+            self.bucket.acquire()
+        self.assertEqual(self.sleeps, [])
+        for _ in range(5):
+            self.bucket.acquire()
+        self.assertAlmostEqual(self.now, 0.5)
+
+    def test_pause(self):
+        """Test a pause holds every caller back, and repeated pauses do not stack"""
+        self.bucket.pause(2)
+        self.bucket.pause(2)
+        self.bucket.acquire()
+        self.assertAlmostEqual(self.now, 2.1)
+
+
+class PhoneNormalizationTest(SimpleTestCase):
+    """Test phone numbers are turned into WhatsApp numbers"""
+
+    def test_formats(self):
+        """Test national, trunk-prefixed and international formats"""
+        self.assertEqual(normalize_phone('98765 43210'), '919876543210')
+        self.assertEqual(normalize_phone('09876543210'), '919876543210')
+        self.assertEqual(normalize_phone('+44 20 7946 0958'), '442079460958')
+        self.assertIsNone(normalize_phone('100'))
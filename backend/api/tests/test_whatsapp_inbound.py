@@ -0,0 +1,124 @@
+"""
+Unit tests for the WhatsApp inbound pipeline
+Tests webhook acknowledgement, idempotent recording and ordered processing
+"""
+import hashlib
+import hmac
+import json
+import os
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from api.models import WhatsAppInboundEvent
+from api.services.whatsapp_inbound import InboundEventProcessor, lock_key, parse_webhook, record_events
+from api.views.whatsapp_webhook import WhatsAppWebhookView
+
+
+def webhook_body(*messages):
+    return {
+        'object': 'whatsapp_business_account',
+        'entry': [{'changes': [{'field': 'messages', 'value': {'messages': list(messages)}}]}],
+    }
+
+
+def text_message(message_id, text, timestamp, sender='919876543210'):
+    return {'id': message_id, 'from': sender, 'timestamp': str(timestamp), 'type': 'text', 'text': {'body': text}}
+
+
+class RecordingProcessor:
+    """Stands in for MessageProcessor, failing on chosen texts"""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.seen = []
+
+    def process_incoming_message(self, phone_number, message_text, **kwargs):
+        self.seen.append(message_text)
+        if message_text in self.fail_on:
+            return {'status': 'error', 'error': 'model unavailable'}
+        return {'status': 'success'}
+
+
+class WhatsAppWebhookTest(TestCase):
+    """Test the webhook only records and acknowledges"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def _post(self, body, **headers):
+        request = self.factory.post('/api/whatsapp/webhook/', json.dumps(body),
+                                    content_type='application/json', **headers)
+        return WhatsAppWebhookView.as_view()(request)
+
+    def test_records_without_processing(self):
+        """Test messages are stored and queued, and a redelivery is a no-op"""
+        body = webhook_body(text_message('wamid.1', 'Hello', 1700000000))
+        with patch('api.services.message_processor.MessageProcessor.process_incoming_message') as process, \
+                patch('api.tasks.process_whatsapp_events.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self._post(body)
+            self._post(body)
+
+        self.assertEqual(response.status_code, 200)
+        process.assert_not_called()
+        delay.assert_called_once_with('919876543210')
+        event = WhatsAppInboundEvent.objects.get()
+        self.assertEqual((event.status, event.sent_at.timestamp()), ('pending', 1700000000))
+
+    def test_invalid_signature_is_rejected(self):
+        """Test a wrong signature is refused before anything is stored"""
+        body = webhook_body(text_message('wamid.1', 'Hello', 1700000000))
+        with patch.dict(os.environ, {'WHATSAPP_APP_SECRET': 'secret'}):
+            response = self._post(body, HTTP_X_HUB_SIGNATURE_256='sha256=bad')
+            self.assertEqual(response.status_code, 403)
+
+            signature = hmac.new(b'secret', json.dumps(body).encode(), hashlib.sha256).hexdigest()
+            with patch('api.tasks.process_whatsapp_events.delay'):
+                response = self._post(body, HTTP_X_HUB_SIGNATURE_256=f'sha256={signature}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WhatsAppInboundEvent.objects.count(), 1)
+
+
+class InboundEventProcessorTest(TestCase):
+    """Test per-number ordered processing"""
+
+    def setUp(self):
+        cache.clear()
+        # Delivered out of order: the webhook for the later message arrives first
+        record_events(parse_webhook(webhook_body(
+            text_message('wamid.3', 'third', 1700000030),
+            text_message('wamid.1', 'first', 1700000010),
+            text_message('wamid.9', 'other sender', 1700000000, sender='919000000000'),
+        )))
+        record_events(parse_webhook(webhook_body(text_message('wamid.2', 'second', 1700000020))))
+
+    def test_processes_in_sent_order(self):
+        """Test a number's events are processed oldest first and others are left alone"""
+        processor = RecordingProcessor()
+        result = InboundEventProcessor('919876543210', processor).drain()
+        self.assertEqual(processor.seen, ['first', 'second', 'third'])
+        self.assertEqual(result, {'processed': 3, 'failed': 0})
+        self.assertEqual(WhatsAppInboundEvent.objects.get(whatsapp_message_id='wamid.9').status, 'pending')
+
+    def test_failure_blocks_later_messages_until_given_up(self):
+        """Test a failing event is retried before later ones, then marked failed"""
+        processor = RecordingProcessor(fail_on={'second'})
+        drain = InboundEventProcessor('919876543210', processor, max_attempts=2)
+        drain.drain()
+        self.assertEqual(processor.seen, ['first', 'second'])
+        self.assertEqual(WhatsAppInboundEvent.objects.get(whatsapp_message_id='wamid.3').status, 'pending')
+
+        drain.drain()
+        self.assertEqual(processor.seen, ['first', 'second', 'second', 'third'])
+        failed = WhatsAppInboundEvent.objects.get(whatsapp_message_id='wamid.2')
+        self.assertEqual((failed.status, failed.attempts, failed.last_error), ('failed', 2, 'model unavailable'))
+
+    def test_locked_number_is_skipped(self):
+        """Test a second worker leaves a number to the worker holding its lock"""
+        cache.add(lock_key('919876543210'), True)
+        processor = RecordingProcessor()
+        InboundEventProcessor('919876543210', processor).drain()
+        self.assertEqual(processor.seen, [])
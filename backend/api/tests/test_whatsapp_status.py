@@ -0,0 +1,105 @@
+"""
+Unit tests for WhatsApp delivery status ingestion
+Tests buffering, collapsing to the latest state and bulk application
+"""
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from api.models import WhatsAppConversation, WhatsAppMessage, WhatsAppStatusEvent
+from api.services.whatsapp_status import (
+    StatusIngestor, delivery_summary, parse_statuses, record_statuses, schedule_flush,
+)
+from api.views.whatsapp_webhook import WhatsAppStatusWebhookView
+
+
+def status_body(*statuses):
+    return {'entry': [{'changes': [{'field': 'messages', 'value': {'statuses': list(statuses)}}]}]}
+
+
+def status(message_id, value, timestamp, **extra):
+    return {'id': message_id, 'status': value, 'timestamp': str(timestamp), 'recipient_id': '919876543210', **extra}
+
+
+class StatusIngestionTest(TestCase):
+    """Test statuses are buffered and applied in bulk"""
+
+    def setUp(self):
+        cache.clear()
+        conversation = WhatsAppConversation.objects.create(phone_number='919876543210')
+        for i in range(3):
+            WhatsAppMessage.objects.create(
+                conversation=conversation, sender='bot', content=f'broadcast {i}', whatsapp_message_id=f'wamid.{i}'
+            )
+
+    def test_webhook_only_buffers(self):
+        """Test the webhook stores statuses without touching messages"""
+        body = status_body(status('wamid.0', 'sent', 1700000000), status('wamid.0', 'delivered', 1700000005))
+        request = APIRequestFactory().post('/api/whatsapp/status/', json.dumps(body), content_type='application/json')
+        with patch('api.tasks.flush_whatsapp_statuses.apply_async') as flush, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = WhatsAppStatusWebhookView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WhatsAppStatusEvent.objects.count(), 2)
+        self.assertIsNone(WhatsAppMessage.objects.get(whatsapp_message_id='wamid.0').delivery_status)
+        flush.assert_called_once()
+
+    def test_flush_scheduled_once_per_window(self):
+        """Test one flush is scheduled per window, and a refused one is retried by the next status"""
+        with patch('api.tasks.flush_whatsapp_statuses.apply_async', side_effect=ConnectionError('broker down')):
+            schedule_flush()
+        with patch('api.tasks.flush_whatsapp_statuses.apply_async') as flush:
+            schedule_flush()
+            schedule_flush()
+        flush.assert_called_once_with(countdown=5)
+
+    def test_collapses_to_latest_state(self):
+        """Test out-of-order and repeated statuses only move a message forward"""
+        record_statuses(parse_statuses(status_body(
+            status('wamid.0', 'read', 1700000010),
+            status('wamid.0', 'delivered', 1700000005),
+            status('wamid.0', 'sent', 1700000000),
+            status('wamid.1', 'sent', 1700000000),
+            status('wamid.1', 'delivered', 1700000003),
+            status('wamid.2', 'failed', 1700000001, errors=[{'code': 131026, 'title': 'Message undeliverable'}]),
+        )))
+        # Read events, read messages, one bulk update and one delete (in a savepoint)
+        with self.assertNumQueries(6):
+            result = StatusIngestor().flush_batch(0)
+        self.assertTrue(result)
+
+        read, delivered, failed = WhatsAppMessage.objects.order_by('whatsapp_message_id')
+        self.assertEqual((read.delivery_status, read.delivered_at.timestamp(), read.read_at.timestamp()),
+                         ('read', 1700000005, 1700000010))
+        self.assertEqual((delivered.delivery_status, delivered.read_at), ('delivered', None))
+        self.assertEqual((failed.delivery_status, failed.delivery_error), ('failed', 'Message undeliverable'))
+        self.assertFalse(WhatsAppStatusEvent.objects.exists())
+
+        # A late 'delivered' does not undo the read
+        record_statuses(parse_statuses(status_body(status('wamid.0', 'delivered', 1700000020))))
+        StatusIngestor().flush()
+        self.assertEqual(WhatsAppMessage.objects.get(whatsapp_message_id='wamid.0').delivery_status, 'read')
+
+        summary = delivery_summary()
+        self.assertEqual((summary['read'], summary['delivered'], summary['failed'], summary['total']), (1, 1, 1, 3))
+        self.assertEqual(summary['delivery_rate'], round(2 / 3, 4))
+
+    def test_unknown_messages_wait_for_their_message(self):
+        """Test statuses for unstored messages are retried, then dropped after a while"""
+        record_statuses(parse_statuses(status_body(status('wamid.9', 'sent', 1700000000))))
+        self.assertEqual(StatusIngestor().flush(), {'applied': 0, 'updated': 0, 'unmatched': 1})
+
+        WhatsAppMessage.objects.filter(whatsapp_message_id='wamid.2').update(whatsapp_message_id='wamid.9')
+        self.assertEqual(StatusIngestor().flush()['applied'], 1)
+        self.assertEqual(WhatsAppMessage.objects.get(whatsapp_message_id='wamid.9').delivery_status, 'sent')
+
+        record_statuses(parse_statuses(status_body(status('wamid.404', 'sent', 1700000000))))
+        WhatsAppStatusEvent.objects.update(received_at=timezone.now() - timedelta(hours=2))
+        StatusIngestor().flush()
+        self.assertFalse(WhatsAppStatusEvent.objects.exists())
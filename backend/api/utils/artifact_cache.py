@@ -0,0 +1,141 @@
+"""
+Content-Addressed Artifact Cache
+Stores rendered report artifacts (chart images, PDF and Excel files) under a
+hash of the inputs that produced them, so identical inputs are never rendered
+twice.
+
+Artifacts live in the default file storage under artifacts/<kind>/<hash>.<ext>.
+Chart images are additionally kept in a small in-process LRU because the same
+charts are requested many times while a batch of reports is rendered.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable, Optional, Set
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+
+ARTIFACT_STORAGE_DIR = 'artifacts'
+
+# Bump when a renderer changes its output so old artifacts are not reused
+RENDERER_VERSION = 1
+
+MEMORY_CACHE_MAX_ENTRIES = 256
+
+
+def content_hash(*parts) -> str:
+    """
+    Stable SHA-256 hash of JSON-serialisable inputs
+
+    Dict keys are sorted so logically equal inputs always hash the same.
+    """
+    payload = json.dumps([RENDERER_VERSION, *parts], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ArtifactCache:
+    """Content-addressed store for rendered artifacts"""
+
+    def __init__(self, storage=None, memory_entries: int = MEMORY_CACHE_MAX_ENTRIES):
+        self.storage = storage or default_storage
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def path_for(kind: str, digest: str, extension: str) -> str:
+        return f"{ARTIFACT_STORAGE_DIR}/{kind}/{digest[:2]}/{digest}.{extension}"
+
+    def _remember(self, path: str, content: bytes):
+        if not self.memory_entries:
+            return
+        with self._lock:
+            self._memory[path] = content
+            self._memory.move_to_end(path)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def exists(self, kind: str, digest: str, extension: str) -> Optional[str]:
+        """Return the storage path if the artifact exists, else None"""
+        path = self.path_for(kind, digest, extension)
+        if path in self._memory or self.storage.exists(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def get(self, kind: str, digest: str, extension: str, remember: bool = False) -> Optional[bytes]:
+        """Return the artifact bytes, or None on a miss"""
+        path = self.path_for(kind, digest, extension)
+        with self._lock:
+            content = self._memory.get(path)
+            if content is not None:
+                self._memory.move_to_end(path)
+        if content is not None:
+            self.hits += 1
+            return content
+
+        try:
+            if not self.storage.exists(path):
+                self.misses += 1
+                return None
+            with self.storage.open(path, 'rb') as handle:
+                content = handle.read()
+        except Exception as e:
+            logger.warning(f"Artifact read failed for {path}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if remember:
+            self._remember(path, content)
+        return content
+
+    def put(self, kind: str, digest: str, extension: str, content: bytes, remember: bool = False) -> str:
+        """Store an artifact; an existing artifact with the same hash is kept"""
+        path = self.path_for(kind, digest, extension)
+        if not self.storage.exists(path):
+            saved_path = self.storage.save(path, ContentFile(content))
+            if saved_path != path:
+                # Lost a race with another worker writing the same content
+                self.storage.delete(saved_path)
+        if remember:
+            self._remember(path, content)
+        return path
+
+    def url(self, path: str) -> str:
+        return self.storage.url(path)
+
+    def size(self, path: str) -> int:
+        try:
+            return self.storage.size(path)
+        except Exception:
+            return 0
+
+    def evict(self, paths: Iterable[str], keep: Optional[Set[str]] = None) -> int:
+        """Delete artifacts that are no longer referenced; returns the number removed"""
+        keep = keep or set()
+        removed = 0
+        for path in set(paths) - keep:
+            with self._lock:
+                self._memory.pop(path, None)
+            try:
+                if self.storage.exists(path):
+                    self.storage.delete(path)
+                    removed += 1
+            except Exception as e:
+                logger.warning(f"Artifact eviction failed for {path}: {e}")
+        return removed
+
+
+# Shared per-process instance used by the PDF generator and report engine
+artifact_cache = ArtifactCache()
@@ -0,0 +1,133 @@
+"""
+Bulk Upsert Engine
+Diffs incoming rows against existing rows by natural key and writes only
+the difference with set-based queries
+
+Existing rows are loaded once as key -> (pk, values); each incoming row is
+classified as created / updated / unchanged / skipped in memory, and the
+result is applied with bulk_create(update_conflicts=True) and bulk_update
+in large batches. Nothing touches the database between load and apply,
+so a dry run is just a diff without apply().
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import models
+from django.utils import timezone
+
+
+class BulkUpserter:
+    """
+    Insert-or-update rows of one model keyed on a unique natural key
+
+    Args:
+        model: Model class to write
+        key_fields: Field attnames forming a unique constraint, e.g.
+            ['constituency_id', 'booth_number']
+        fields: Field attnames set from incoming rows
+        batch_size: Rows per INSERT/UPDATE statement
+        skip_existing: Leave rows that already exist untouched
+    """
+
+    def __init__(self, model: type, key_fields: List[str], fields: List[str],
+                 batch_size: int = 2000, skip_existing: bool = False):
+        self.model = model
+        self.key_fields = list(key_fields)
+        self.fields = [field for field in fields if field not in key_fields]
+        self.batch_size = batch_size
+        self.skip_existing = skip_existing
+        self.stats = Counter(created=0, updated=0, unchanged=0, skipped=0)
+        self.changed_fields = Counter()
+        self._existing: Dict[Tuple, Tuple[Any, Tuple]] = {}
+        self._to_create: Dict[Tuple, models.Model] = {}
+        self._to_update: Dict[Tuple, models.Model] = {}
+        self._load()
+
+    def _load(self):
+        width = len(self.key_fields)
+        rows = self.model.objects.values_list('pk', *self.key_fields, *self.fields).iterator(chunk_size=5000)
+        for row in rows:
+            self._existing[tuple(row[1:width + 1])] = (row[0], tuple(row[width + 1:]))
+
+    def add(self, values: Dict[str, Any]) -> str:
+        """
+        Stage one row; returns how it was classified
+
+        A key repeated in the input replaces the earlier staged row, as
+        repeated update_or_create calls would.
+        """
+        key = tuple(values[field] for field in self.key_fields)
+        incoming = tuple(values.get(field) for field in self.fields)
+
+        staged = self._to_create.get(key) or self._to_update.get(key)
+        if staged is not None:
+            for field, value in zip(self.fields, incoming):
+                setattr(staged, field, value)
+            self.stats['updated'] += 1
+            return 'updated'
+
+        if key not in self._existing:
+            self._to_create[key] = self.model(**dict(zip(self.key_fields, key)), **dict(zip(self.fields, incoming)))
+            self.stats['created'] += 1
+            return 'created'
+
+        if self.skip_existing:
+            self.stats['skipped'] += 1
+            return 'skipped'
+
+        pk, current = self._existing[key]
+        changed = [field for field, old, new in zip(self.fields, current, incoming) if old != new]
+        if not changed:
+            self.stats['unchanged'] += 1
+            return 'unchanged'
+
+        self.changed_fields.update(changed)
+        obj = self.model(pk=pk, **dict(zip(self.key_fields, key)), **dict(zip(self.fields, incoming)))
+        self._to_update[key] = obj
+        self.stats['updated'] += 1
+        return 'updated'
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]):
+        for values in rows:
+            self.add(values)
+
+    def apply(self):
+        """Write staged inserts and updates; call inside a transaction"""
+        if self._to_create:
+            # update_conflicts covers rows inserted concurrently since _load
+            self.model.objects.bulk_create(
+                list(self._to_create.values()),
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=self.key_fields,
+                update_fields=self.fields + self._timestamp_fields(),
+            )
+        if self._to_update:
+            now = timezone.now()
+            objs = list(self._to_update.values())
+            for obj in objs:
+                for field in self._timestamp_fields():
+                    setattr(obj, field, now)
+            self.model.objects.bulk_update(objs, self.fields + self._timestamp_fields(), batch_size=self.batch_size)
+
+    def _timestamp_fields(self) -> List[str]:
+        return [
+            field.attname for field in self.model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) and field.attname not in self.fields
+        ]
+
+    def id_map(self, include_staged: bool = False) -> Dict[Any, Optional[Any]]:
+        """
+        Natural key -> pk, read fresh so rows inserted by apply() are included
+
+        With include_staged, rows staged for creation map to None so a
+        dry run can still resolve references to them. Single-field keys
+        are returned unwrapped.
+        """
+        ids = {tuple(row[1:]): row[0] for row in self.model.objects.values_list('pk', *self.key_fields)}
+        if include_staged:
+            ids.update({key: None for key in self._to_create})
+        if len(self.key_fields) == 1:
+            return {key[0]: pk for key, pk in ids.items()}
+        return ids
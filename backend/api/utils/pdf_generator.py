@@ -18,6 +18,21 @@ import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 
+from api.utils.artifact_cache import artifact_cache, content_hash
+
+
+def chart_digest(chart_type, chart_data):
+    """Content hash identifying a rendered chart image"""
+    return content_hash('chart', chart_type, chart_data)
+
+
+def chart_artifact_paths(data):
+    """Storage paths of every chart image a report's data renders to"""
+    return [
+        artifact_cache.path_for('charts', chart_digest(chart.get('type', 'bar'), chart.get('data', {})), 'png')
+        for chart in data.get('charts', [])
+    ]
+
 
 class ReportPDF:
     """PDF Report Generator"""
@@ -217,7 +232,25 @@ class ReportPDF:
                 elements.append(Spacer(1, 0.3*inch))
 
     def _generate_chart(self, chart_type, chart_data):
-        """Generate matplotlib chart and return as image buffer"""
+        """
+        Return a chart image buffer, rendering it only if the same chart
+        has not been rendered before (charts are cached by content hash)
+        """
+        digest = chart_digest(chart_type, chart_data)
+        cached = artifact_cache.get('charts', digest, 'png', remember=True)
+        if cached is not None:
+            return BytesIO(cached)
+
+        buffer = self._render_chart(chart_type, chart_data)
+        if buffer is not None:
+            try:
+                artifact_cache.put('charts', digest, 'png', buffer.getvalue(), remember=True)
+            except Exception as e:
+                print(f"Error caching chart: {e}")
+        return buffer
+
+    def _render_chart(self, chart_type, chart_data):
+        """Render matplotlib chart and return as image buffer"""
         try:
             fig, ax = plt.subplots(figsize=(10, 6))
 
@@ -0,0 +1,67 @@
+"""
+Rate Limiting
+Thread-safe token bucket shared by the workers of one sender
+
+Tokens refill continuously at `rate` per second up to `capacity`, so
+callers can burst up to the capacity and then settle at the rate. Waiting
+callers sleep outside the lock, so one slow caller never blocks the others
+from taking tokens as they refill.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Hands out tokens at a steady rate to any number of threads"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take tokens if available; returns 0, or the seconds to wait before retrying"""
+        # A request larger than the bucket could never be served otherwise
+        tokens = min(tokens, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until tokens are taken; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    def adjust(self, tokens: float):
+        """Give back tokens taken on an estimate (or take more, if negative) once the real cost is known"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def pause(self, seconds: float):
+        """Hand out nothing for the next `seconds`, e.g. after the provider throttled us"""
+        with self._lock:
+            self._refill()
+            # Several workers throttled at once extend the pause only once
+            self.tokens = min(self.tokens, -seconds * self.rate)
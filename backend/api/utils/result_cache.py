@@ -0,0 +1,160 @@
+"""
+AI Result Cache
+Caches model results (intent, sentiment, topics, language) keyed by the
+normalized message text, so repeated messages - greetings, campaign
+keywords, forwards - are only sent to the model once.
+
+Keys combine the operation, a version derived from the prompt template and
+model parameters, and a hash of the normalized text. Editing a prompt
+therefore changes its version and old results are simply never looked up
+again; they age out of the shared cache on their TTL.
+
+Lookups try a small in-process LRU first and then the shared Django cache
+(Redis in production), which is shared by all workers.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+RESULT_CACHE_PREFIX = 'ai-result'
+RESULT_CACHE_TTL = getattr(settings, 'CACHE_TTL', {}).get('ai_results', 7 * 24 * 3600)
+
+MEMORY_CACHE_MAX_ENTRIES = 2048
+
+# Zero-width characters WhatsApp clients insert inconsistently, notably
+# joiners inside Tamil conjuncts
+_INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _is_edge_noise(char: str) -> bool:
+    # Punctuation, symbols (including emoji) and separators; not \W, which
+    # would also match Tamil vowel signs and the virama
+    return unicodedata.category(char)[0] in 'PSZ'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a message for cache keys
+
+    Applies NFKC (which also composes Tamil vowel signs), drops zero-width
+    characters, case-folds Latin text, collapses whitespace and trims
+    punctuation and emoji at either end. A trailing question or exclamation
+    mark changes what a message means ("road fixed?" asks, "road fixed."
+    reports), so one "?" - or failing that one "!" - from the trimmed end
+    is kept. Text that is only punctuation or emoji is kept as it is.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    text = _INVISIBLE.sub('', text).casefold()
+    text = _WHITESPACE.sub(' ', text).strip()
+    start, end = 0, len(text)
+    while start < end and _is_edge_noise(text[start]):
+        start += 1
+    while end > start and _is_edge_noise(text[end - 1]):
+        end -= 1
+    if start == end:
+        return text
+    trimmed = text[end:]
+    mark = '?' if '?' in trimmed else '!' if '!' in trimmed else ''
+    return text[start:end] + mark
+
+
+def prompt_version(*parts) -> str:
+    """Short hash of a prompt template and the model parameters used with it"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class ResultCache:
+    """Two-tier cache of model results"""
+
+    def __init__(self, shared=None, memory_entries: int = MEMORY_CACHE_MAX_ENTRIES, timeout: int = RESULT_CACHE_TTL):
+        self.shared = shared if shared is not None else cache
+        self.memory_entries = memory_entries
+        self.timeout = timeout
+        self._memory = OrderedDict()
+        self._lock = Lock()
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(operation: str, version: str, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+        return f"{RESULT_CACHE_PREFIX}:{operation}:{version}:{digest}"
+
+    def _remember(self, key: str, value: Any):
+        if not self.memory_entries:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached result, or None on a miss"""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if value is not None:
+            return _copy(value)
+
+        try:
+            value = self.shared.get(key)
+        except Exception:
+            # The shared tier is an optimisation; never fail a request over it
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.shared_hits += 1
+        self._remember(key, value)
+        return _copy(value)
+
+    def set(self, key: str, value: Any):
+        self._remember(key, _copy(value))
+        try:
+            self.shared.set(key, value, self.timeout)
+        except Exception:
+            pass
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        return (self.memory_hits + self.shared_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'memory_hits': self.memory_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'memory_entries': len(self._memory),
+        }
+
+
+def _copy(value):
+    # Results are small JSON-like dicts; callers mutate what they get back
+    if isinstance(value, (dict, list)):
+        return json.loads(json.dumps(value))
+    return value
+
+
+# Shared per-process instance used by the AI service
+ai_result_cache = ResultCache()
@@ -0,0 +1,175 @@
+"""
+Streaming Row Sources for Bulk Imports
+Reads CSV, gzip'd CSV and XLSX uploads one row at a time
+
+Importers iterate rows or fixed-size batches instead of loading the
+whole file, so memory stays flat however large the upload is.
+"""
+
+import csv
+import gzip
+import io
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+import openpyxl
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+class RowSourceError(Exception):
+    """The upload could not be read as a table"""
+
+
+class RowSource(ABC):
+    """
+    Base row source
+
+    Iterating yields {'row_number': int, 'data': dict} with row_number
+    counted from the file's first line (the header is row 1).
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self._headers: Optional[List[str]] = None
+
+    @property
+    def headers(self) -> List[str]:
+        if self._headers is None:
+            self._headers = self._read_headers()
+        return self._headers
+
+    @abstractmethod
+    def _read_headers(self) -> List[str]:
+        """The header row, read once"""
+
+    @abstractmethod
+    def _iter_data(self) -> Iterator[Dict[str, Any]]:
+        """Data rows after the header as header -> value dicts"""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.headers
+        for row_number, data in enumerate(self._iter_data(), start=2):
+            yield {'row_number': row_number, 'data': data}
+
+    def batches(self, size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Yield lists of at most size rows"""
+        batch = []
+        for row in self:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvRowSource(RowSource):
+    """CSV rows, decoded incrementally (BOM tolerant)"""
+
+    def __init__(self, fileobj):
+        super().__init__(fileobj)
+        self._text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        self._reader = csv.reader(self._text)
+
+    def _read_headers(self) -> List[str]:
+        try:
+            return [header.strip() for header in next(self._reader)]
+        except StopIteration:
+            return []
+        except (UnicodeDecodeError, csv.Error, OSError) as e:
+            raise RowSourceError(str(e))
+
+    def _iter_data(self) -> Iterator[Dict[str, Any]]:
+        headers = self.headers
+        try:
+            for values in self._reader:
+                if not values:
+                    continue  # blank line, as csv.DictReader skips them
+                # Pad short rows, ignore extra values
+                yield {header: values[i] if i < len(values) else None for i, header in enumerate(headers)}
+        except (UnicodeDecodeError, csv.Error, OSError) as e:
+            raise RowSourceError(str(e))
+
+    def close(self):
+        self._text.detach()
+        super().close()
+
+
+class GzipCsvRowSource(CsvRowSource):
+    """CSV rows decompressed on the fly; closing also closes the compressed file"""
+
+    def __init__(self, fileobj):
+        self._compressed = fileobj
+        super().__init__(gzip.GzipFile(fileobj=fileobj, mode='rb'))
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._compressed.close()
+
+
+class XlsxRowSource(RowSource):
+    """Rows from the active sheet of a workbook opened read-only"""
+
+    def __init__(self, fileobj):
+        super().__init__(fileobj)
+        try:
+            self._workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        except Exception as e:
+            raise RowSourceError(f"Could not open workbook: {e}")
+        self._rows = self._workbook.active.iter_rows(values_only=True)
+
+    def _read_headers(self) -> List[str]:
+        first = next(self._rows, None)
+        if first is None:
+            return []
+        return [str(value).strip() if value is not None else '' for value in first]
+
+    def _iter_data(self) -> Iterator[Dict[str, Any]]:
+        headers = self.headers
+        for values in self._rows:
+            if all(value is None for value in values):
+                continue
+            yield {header: values[i] if i < len(values) else None for i, header in enumerate(headers)}
+
+    def close(self):
+        self._workbook.close()
+        super().close()
+
+
+def open_row_source(fileobj, file_name: str) -> RowSource:
+    """
+    Pick a row source from the file name and content
+
+    Args:
+        fileobj: Binary file object positioned at the start
+        file_name: Original upload name; .xlsx/.xls are read as workbooks,
+            .gz or gzip content as compressed CSV, anything else as CSV
+    """
+    name = (file_name or '').lower()
+    if name.endswith(XLSX_EXTENSIONS):
+        return XlsxRowSource(fileobj)
+
+    is_gzip = name.endswith('.gz')
+    if not is_gzip and hasattr(fileobj, 'peek'):
+        is_gzip = fileobj.peek(2)[:2] == GZIP_MAGIC
+    elif not is_gzip and fileobj.seekable():
+        is_gzip = fileobj.read(2) == GZIP_MAGIC
+        fileobj.seek(0)
+
+    if is_gzip:
+        return GzipCsvRowSource(fileobj)
+    return CsvRowSource(fileobj)
@@ -0,0 +1,1653 @@
+"""
+Synthetic Data Engine
+Seeded, vectorized generation of large synthetic datasets for load and
+benchmark testing
+
+Rows are produced in fixed-size shards. Each shard draws every attribute
+as a NumPy array from its own generator seeded with (seed, first row), so
+the output depends only on the seed, the row range and the shard size -
+not on how many worker processes share the work. Shards are written
+straight to the table with PostgreSQL COPY, or with batched executemany
+INSERTs on other databases (SQLite in development); no model instances
+are built, so signals and auto_now hooks do not run.
+
+Generators supply:
+    table                                   target db_table
+    generate(start, size) -> (columns, stats)
+where columns maps column names to equal-length arrays and stats maps a
+label to a Counter that is summed across shards. Voters, their
+interactions, sentiment data, field reports (and their many-to-many
+rows) and polling booths each have one; rows that reference others are
+drawn from ids loaded once by the calling command.
+"""
+
+import io
+import itertools
+import json
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from django.db import connections, transaction
+
+from api.models import FieldReport, PollingBooth, SentimentData, Voter, VoterInteraction
+from api.services.voter_search import name_key, voter_id_key
+
+
+# Tamil Nadu district distribution (38 districts)
+TN_DISTRICT_DISTRIBUTION = {
+    'Chennai': 0.15,
+    'Coimbatore': 0.08,
+    'Madurai': 0.06,
+    'Tiruchirappalli': 0.05,
+    'Salem': 0.05,
+    'Tirunelveli': 0.04,
+    'Erode': 0.035,
+    'Vellore': 0.035,
+    'Tiruppur': 0.035,
+    'Thoothukudi': 0.03,
+    'Thanjavur': 0.03,
+    'Kancheepuram': 0.03,
+    'Dindigul': 0.028,
+    'Cuddalore': 0.027,
+    'Namakkal': 0.025,
+    'Krishnagiri': 0.025,
+    'Virudhunagar': 0.024,
+    'Karur': 0.022,
+    'Sivaganga': 0.022,
+    'Ramanathapuram': 0.021,
+    'Pudukkottai': 0.02,
+    'Villupuram': 0.02,
+    'Tiruvannamalai': 0.019,
+    'Dharmapuri': 0.018,
+    'Nagapattinam': 0.018,
+    'Theni': 0.017,
+    'Kanniyakumari': 0.016,
+    'Tiruvallur': 0.016,
+    'Ariyalur': 0.014,
+    'Perambalur': 0.013,
+    'Nilgiris': 0.013,
+    'Tiruvarur': 0.012,
+    'Ranipet': 0.011,
+    'Tirupathur': 0.011,
+    'Tenkasi': 0.01,
+    'Kallakurichi': 0.01,
+    'Chengalpattu': 0.009,
+    'Mayiladuthurai': 0.008,
+}
+
+# Age distribution
+AGE_DISTRIBUTION = {
+    (18, 25): 0.20,   # Youth: 20%
+    (26, 35): 0.25,   # Young adults: 25%
+    (36, 50): 0.30,   # Middle age: 30%
+    (51, 65): 0.18,   # Senior: 18%
+    (66, 90): 0.07,   # Elderly: 7%
+}
+
+GENDER_DISTRIBUTION = {
+    'male': 0.51,
+    'female': 0.48,
+    'other': 0.01,
+}
+
+# Education distribution (TN literacy patterns)
+EDUCATION_LEVELS = {
+    'Illiterate': 0.10,
+    'Primary': 0.15,
+    'Secondary': 0.25,
+    'Higher Secondary': 0.20,
+    'Graduate': 0.20,
+    'Postgraduate': 0.10,
+}
+
+# Party affiliation (simulated pre-TVK + TVK gain)
+PARTY_AFFILIATION = {
+    'tvk': 0.22,
+    'dmk': 0.20,
+    'aiadmk': 0.18,
+    'bjp': 0.08,
+    'congress': 0.05,
+    'neutral': 0.20,
+    'other': 0.07,
+}
+
+SENTIMENT_DISTRIBUTION = {
+    'strong_supporter': 0.15,
+    'supporter': 0.25,
+    'neutral': 0.35,
+    'opposition': 0.20,
+    'strong_opposition': 0.05,
+}
+
+# TVK supporters lean positive
+TVK_SENTIMENT_DISTRIBUTION = {
+    'strong_supporter': 0.40,
+    'supporter': 0.50,
+    'neutral': 0.10,
+}
+
+INFLUENCE_DISTRIBUTION = {
+    'high': 0.05,    # Opinion leaders
+    'medium': 0.20,  # Active community
+    'low': 0.75,     # General voters
+}
+
+TAMIL_FIRST_NAMES_MALE = [
+    'Arun', 'Balaji', 'Chandran', 'Dhanush', 'Ezhil', 'Gokul', 'Hari', 'Ilango',
+    'Jagan', 'Karthik', 'Kumar', 'Manoj', 'Murugan', 'Naren', 'Pandi', 'Prakash',
+    'Raj', 'Ravi', 'Sakthi', 'Senthil', 'Surya', 'Tamil', 'Vasan', 'Vijay', 'Vinoth'
+]
+TAMIL_FIRST_NAMES_FEMALE = [
+    'Anitha', 'Bharathi', 'Chitra', 'Deepa', 'Gayatri', 'Geetha', 'Janaki', 'Kavitha',
+    'Lakshmi', 'Malathi', 'Meena', 'Nila', 'Priya', 'Radha', 'Sangeetha', 'Saranya',
+    'Selvi', 'Shanthi', 'Sudha', 'Sumathi', 'Thenmozhi', 'Vasanthi', 'Valli', 'Yamini'
+]
+TAMIL_LAST_NAMES = [
+    'Kumar', 'Raj', 'Selvam', 'Moorthy', 'Pandian', 'Kannan', 'Rajan', 'Subramanian',
+    'Venkatesh', 'Sundaram', 'Murugan', 'Anand', 'Krishnan', 'Ramesh', 'Saravanan'
+]
+
+TN_AREAS = [
+    'Anna Nagar', 'T Nagar', 'Adyar', 'Velachery', 'Tambaram', 'Pallavaram',
+    'Gandhipuram', 'RS Puram', 'Saibaba Colony', 'Peelamedu', 'Singanallur',
+    'SS Colony', 'Anna Nagar West', 'Vilangudi', 'Tallakulam', 'K Pudur',
+    'Woraiyur', 'Srirangam', 'Thillai Nagar', 'Cantonment', 'Town Hall Area',
+    'Junction', 'Fairlands', 'New Bus Stand', 'Collectorate', 'Market Area'
+]
+
+TN_STREETS = [
+    'Gandhi Road', 'Nehru Street', 'Kamarajar Salai', 'Anna Salai', 'Periyar Street',
+    'Bharathiyar Street', 'Mount Road', 'Temple Street', 'Car Street', 'Market Road',
+    'Station Road', 'Church Street', 'Mosque Street', 'North Street', 'South Street',
+    'East Street', 'West Street', 'Main Road', 'Bazaar Street', 'Pillaiyar Koil Street'
+]
+
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.co.in', 'outlook.com', 'rediffmail.com']
+
+VOTER_TAGS = [
+    ['youth', 'first_time'], ['farmer'], ['tech_worker'], ['business_owner'],
+    ['teacher'], ['healthcare_worker'], ['student'], ['retired'],
+    ['daily_wage'], ['fisherman'], ['auto_driver'], ['small_business']
+]
+
+ELECTIONS = [
+    {'year': 2021, 'election': 'Assembly'},
+    {'year': 2019, 'election': 'Lok Sabha'},
+    {'year': 2016, 'election': 'Assembly'},
+    {'year': 2014, 'election': 'Lok Sabha'},
+]
+HISTORY_YEAR = 2024
+TURNOUT = 0.75
+
+COMMUNICATION_CHANNELS = ['phone', 'sms', 'whatsapp', 'email', 'door_to_door']
+
+DEFAULT_SHARD_SIZE = 100_000
+
+
+def shard_rng(seed: int, start: int) -> np.random.Generator:
+    """Independent generator for the shard beginning at row start"""
+    return np.random.default_rng([seed, start])
+
+
+def sample_index(rng: np.random.Generator, distribution: dict, size: int) -> np.ndarray:
+    """Indices into distribution's keys, drawn with its weights"""
+    weights = np.fromiter(distribution.values(), dtype=float)
+    return rng.choice(len(weights), size=size, p=weights / weights.sum())
+
+
+def sample(rng: np.random.Generator, distribution: dict, size: int) -> np.ndarray:
+    """Keys of distribution drawn with its weights"""
+    return _array(list(distribution))[sample_index(rng, distribution, size)]
+
+
+def pick(rng: np.random.Generator, values: Sequence, size: int) -> np.ndarray:
+    """Values drawn uniformly"""
+    return _array(values)[rng.integers(len(values), size=size)]
+
+
+def tally(values: np.ndarray, labels: Sequence = None) -> Counter:
+    """Count of each distinct value, optionally mapped through labels"""
+    keys, counts = np.unique(values, return_counts=True)
+    if labels is not None:
+        keys = [labels[key] for key in keys]
+    return Counter(dict(zip(np.asarray(keys).tolist(), counts.tolist())))
+
+
+def _array(values: Sequence) -> np.ndarray:
+    """Object array that keeps str/None/JSON values as Python objects"""
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _concat(*parts) -> np.ndarray:
+    """Element-wise string concatenation of arrays and scalars"""
+    result = np.asarray(parts[0], dtype=str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part, dtype=str))
+    return result
+
+
+def _timestamps(reference: datetime, seconds_before: np.ndarray) -> np.ndarray:
+    """
+    Naive UTC 'YYYY-MM-DD HH:MM:SS.ffffff' strings
+
+    This is how Django stores aware datetimes on SQLite, and PostgreSQL
+    reads it as UTC since Django sets the connection time zone.
+    """
+    return np.char.replace(np.datetime_as_string(_instants(reference, seconds_before), unit='us'), 'T', ' ')
+
+
+def _dates(reference: datetime, seconds_before: np.ndarray) -> np.ndarray:
+    """UTC 'YYYY-MM-DD' strings"""
+    return np.datetime_as_string(_instants(reference, seconds_before), unit='D')
+
+
+def _instants(reference: datetime, seconds_before: np.ndarray) -> np.ndarray:
+    base = np.datetime64(reference.astimezone(dt_timezone.utc).replace(tzinfo=None), 'us')
+    return base - np.asarray(seconds_before).astype('timedelta64[s]')
+
+
+def _fill(templates: Sequence[str], choice: np.ndarray, fields: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Each row's template, chosen by index, with {name} replaced by the
+    row's value in fields[name]
+
+    Rows sharing a template are filled together, so the work is one
+    concatenation per placeholder rather than one format() per row.
+    """
+    result = np.empty(len(choice), dtype=object)
+    for number, template in enumerate(templates):
+        rows = choice == number
+        if not rows.any():
+            continue
+        parts = []
+        for literal, name, _, _ in string.Formatter().parse(template):
+            if literal:
+                parts.append(literal)
+            if name is not None:
+                parts.append(np.asarray(fields[name])[rows])
+        result[rows] = _concat(*parts)
+    return result
+
+
+def _choose_subsets(rng: np.random.Generator, count: int, k: np.ndarray) -> np.ndarray:
+    """(rows, count) mask choosing k[row] distinct items for each row"""
+    ranks = rng.random((len(k), count)).argsort(axis=1).argsort(axis=1)
+    return ranks < np.asarray(k)[:, None]
+
+
+def _subset_codes(chosen: np.ndarray) -> np.ndarray:
+    """Bit mask of each row's chosen items, indexing a _subsets_json table"""
+    return chosen @ (1 << np.arange(chosen.shape[1]))
+
+
+def _subsets_json(items: Sequence) -> np.ndarray:
+    """JSON list of the items in every bit mask"""
+    return _json_lookup([
+        [item for position, item in enumerate(items) if code >> position & 1] for code in range(1 << len(items))
+    ])
+
+
+def _pick_tiered(rng: np.random.Generator, tiers: List[np.ndarray], shares: Sequence[float],
+                 size: int) -> np.ndarray:
+    """
+    Values drawn uniformly from a tier picked with the given shares
+
+    A draw that lands on an empty tier goes to the next one; the last
+    tier takes whatever is left and must not be empty.
+    """
+    draw = rng.random(size)
+    tier = np.full(size, len(tiers) - 1)
+    for number in reversed(range(len(tiers) - 1)):
+        if len(tiers[number]):
+            tier = np.where(draw < sum(shares[:number + 1]), number, tier)
+    values = np.empty(size, dtype=np.asarray(tiers[-1]).dtype)
+    for number, values_in_tier in enumerate(tiers):
+        rows = tier == number
+        values[rows] = np.asarray(values_in_tier)[rng.integers(len(values_in_tier), size=int(rows.sum()))]
+    return values
+
+
+def _uuids(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Random version 4 UUIDs as 32 hex digits, which both backends accept"""
+    octets = rng.integers(0, 256, (size, 16), dtype=np.uint8)
+    octets[:, 6] = octets[:, 6] & 0x0F | 0x40
+    octets[:, 8] = octets[:, 8] & 0x3F | 0x80
+    return np.frombuffer(octets.tobytes().hex().encode(), dtype='S32').astype(str)
+
+
+def _name_keys(*parts: np.ndarray) -> np.ndarray:
+    """Voter search name_key of each row's names, computed once per distinct name"""
+    keys = []
+    for part in parts:
+        distinct, inverse = np.unique(part.astype(str), return_inverse=True)
+        keys.append(_array([name_key(name) for name in distinct.tolist()])[inverse])
+    return _array([' '.join(filter(None, row)) for row in zip(*keys)])
+
+
+def _json_lookup(values: Sequence) -> np.ndarray:
+    return _array([json.dumps(value) for value in values])
+
+
+def _voting_history_lookup() -> np.ndarray:
+    """
+    JSON voting history for every (eligible elections, turnout bits) code
+
+    Elections are newest first, so a voter is eligible for a prefix of
+    them; code = eligible * 16 + bits, bit 3 being the newest election.
+    """
+    histories = []
+    for eligible in range(len(ELECTIONS) + 1):
+        for bits in range(16):
+            histories.append([
+                {**election, 'voted': bool(bits >> (3 - position) & 1)}
+                for position, election in enumerate(ELECTIONS[:eligible])
+            ])
+    return _json_lookup(histories)
+
+
+def _tags_lookup() -> np.ndarray:
+    """JSON tags for every (base tags or none, youth, first time, influencer) code"""
+    combinations = []
+    for base, youth, first_time, influencer in itertools.product(VOTER_TAGS + [[]], *[(False, True)] * 3):
+        tags = list(base)
+        for flag, tag in ((youth, 'youth'), (first_time, 'first_time'), (influencer, 'influencer')):
+            if flag and tag not in tags:
+                tags.append(tag)
+        combinations.append(tags)
+    return _json_lookup(combinations)
+
+
+VOTING_HISTORY_JSON = _voting_history_lookup()
+TAGS_JSON = _tags_lookup()
+NOTES = _array([
+    f"Education: {education}, Area: {area}" for education in EDUCATION_LEVELS for area in TN_AREAS
+])
+
+# Categorical attributes are drawn as codes into these key lists
+PARTIES = list(PARTY_AFFILIATION)
+SENTIMENTS = list(SENTIMENT_DISTRIBUTION)
+INFLUENCE_LEVELS = list(INFLUENCE_DISTRIBUTION)
+TVK_SENTIMENT_CODES = np.array([SENTIMENTS.index(key) for key in TVK_SENTIMENT_DISTRIBUTION])
+SUPPORTER_CODES = [SENTIMENTS.index('strong_supporter'), SENTIMENTS.index('supporter')]
+
+
+class ConstituencyPicker:
+    """
+    Draws a constituency within each row's district
+
+    Districts without constituencies draw from all of them. Built from
+    plain ids so generators holding one can be pickled to worker processes.
+
+    Args:
+        district_ids: District id at each district position
+        constituencies: (id, district_id) of each constituency
+    """
+
+    def __init__(self, district_ids: Sequence, constituencies: List[Tuple]):
+        by_district = {}
+        for constituency_id, district_id in constituencies:
+            by_district.setdefault(district_id, []).append(constituency_id)
+        ids, offsets, counts = [], [], []
+        for district_id in np.asarray(district_ids).tolist():
+            offsets.append(len(ids))
+            counts.append(len(by_district.get(district_id, [])))
+            ids.extend(by_district.get(district_id, []))
+        # The whole list, stored once more at the end
+        everywhere = len(ids)
+        ids.extend(constituency for constituency, _ in constituencies)
+        self.ids = np.array(ids)
+        self.offsets = np.array([offset if count else everywhere for offset, count in zip(offsets, counts)])
+        self.counts = np.array([count or len(constituencies) for count in counts])
+
+    def pick(self, rng: np.random.Generator, district: np.ndarray) -> np.ndarray:
+        """Constituency id for each district position"""
+        if not len(self.ids):
+            return np.full(len(district), None, dtype=object)
+        return self.ids[self.offsets[district] + (rng.random(len(district)) * self.counts[district]).astype(np.int64)]
+
+
+class VoterGenerator:
+    """
+    Draws Voter rows for one state
+
+    Built from plain ids so it can be pickled to worker processes.
+
+    Args:
+        districts: (id, code, name) of each district in the state
+        constituencies: (id, district_id) of each constituency in the state
+        state_id: State every voter belongs to
+        created_by_id: User recorded as created_by
+        seed: Base seed; the same seed, row range and reference time give
+            identical rows
+        reference_time: 'Now' for ages, contact dates and timestamps
+    """
+
+    table = Voter._meta.db_table
+
+    def __init__(self, districts: List[Tuple], constituencies: List[Tuple], state_id, created_by_id,
+                 seed: int, reference_time: datetime):
+        self.state_id = state_id
+        self.created_by_id = created_by_id
+        self.seed = seed
+        self.reference_time = reference_time
+        self.district_ids = np.array([district[0] for district in districts])
+        self.district_codes = _array([district[1] for district in districts])
+        self.district_id_keys = _array([voter_id_key(district[1]) for district in districts])
+        self.district_names = [district[2] for district in districts]
+        self.district_for_key = self._match_districts([name.lower() for name in self.district_names])
+
+        self.constituencies = ConstituencyPicker(self.district_ids, constituencies)
+
+    @staticmethod
+    def _match_districts(names: List[str]) -> np.ndarray:
+        """Position of the district matching each distribution key, by name"""
+        positions = []
+        for number, key in enumerate(TN_DISTRICT_DISTRIBUTION):
+            key = key.lower()
+            match = next((i for i, name in enumerate(names) if key in name or name in key), None)
+            # Unmatched keys fall back to a fixed district so reruns agree
+            positions.append(number % len(names) if match is None else match)
+        return np.array(positions)
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for rows start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+        row_index = np.arange(start, start + size)
+
+        district = self.district_for_key[sample_index(rng, TN_DISTRICT_DISTRIBUTION, size)]
+        constituency = self.constituencies.pick(rng, district)
+
+        gender = sample_index(rng, GENDER_DISTRIBUTION, size)
+        band = sample_index(rng, AGE_DISTRIBUTION, size)
+        low, high = np.array(list(AGE_DISTRIBUTION)).T
+        age = rng.integers(low[band], high[band] + 1)
+
+        first_name = np.where(
+            gender == 0, pick(rng, TAMIL_FIRST_NAMES_MALE, size),
+            np.where(gender == 1, pick(rng, TAMIL_FIRST_NAMES_FEMALE, size),
+                     pick(rng, TAMIL_FIRST_NAMES_MALE + TAMIL_FIRST_NAMES_FEMALE, size)),
+        )
+        last_name = pick(rng, TAMIL_LAST_NAMES, size)
+        middle_name = np.where(rng.random(size) > 0.6, pick(rng, TAMIL_LAST_NAMES, size), '')
+
+        # Young people are more likely to have email
+        has_phone = rng.random(size) < 0.70
+        has_alternate = has_phone & (rng.random(size) > 0.7)
+        has_email = rng.random(size) < np.where(age <= 35, 0.40, 0.25)
+        phone_number = rng.integers(6_000_000_000, 10_000_000_000, size)
+        phone = _concat('+91 ', phone_number)
+        alternate_phone = _concat('+91 ', rng.integers(6_000_000_000, 10_000_000_000, size))
+        email = _concat(
+            np.char.lower(first_name.astype(str)), '.', np.char.lower(last_name.astype(str)),
+            row_index, '@', pick(rng, EMAIL_DOMAINS, size),
+        )
+
+        party = sample_index(rng, PARTY_AFFILIATION, size)
+        sentiment = np.where(
+            party == PARTIES.index('tvk'),
+            TVK_SENTIMENT_CODES[sample_index(rng, TVK_SENTIMENT_DISTRIBUTION, size)],
+            sample_index(rng, SENTIMENT_DISTRIBUTION, size),
+        )
+        influence = sample_index(rng, INFLUENCE_DISTRIBUTION, size)
+        is_opinion_leader = influence == INFLUENCE_LEVELS.index('high')
+
+        contacted = rng.random(size) > 0.40
+        contacted_days_ago = rng.integers(0, 181, size)
+        interaction_count = rng.integers(0, 51, size)
+        positive_ratio = np.where(np.isin(sentiment, SUPPORTER_CODES), 0.60, 0.40)
+        positive_interactions = (interaction_count * positive_ratio).astype(np.int64)
+
+        area = rng.integers(len(TN_AREAS), size=size)
+        education = sample_index(rng, EDUCATION_LEVELS, size)
+
+        eligible = sum(
+            (age - 18 >= HISTORY_YEAR - election['year']).astype(np.int64) for election in ELECTIONS
+        )
+        voted = rng.random((size, len(ELECTIONS))) < TURNOUT
+        turnout_bits = voted @ (1 << np.arange(len(ELECTIONS) - 1, -1, -1))
+        eligible_mask = (0xF << (len(ELECTIONS) - eligible)) & 0xF
+        history = eligible * 16 + (turnout_bits & eligible_mask)
+
+        base_tags = np.where(rng.random(size) > 0.60, rng.integers(len(VOTER_TAGS), size=size), len(VOTER_TAGS))
+        tags = ((base_tags * 2 + (age <= 25)) * 2 + (age <= 21)) * 2 + is_opinion_leader
+
+        reference_date = np.datetime64(self.reference_time.date(), 'D')
+        days_old = age * 365 + rng.integers(0, 365, size)
+        now = _timestamps(self.reference_time, np.zeros(1, dtype=np.int64))[0]
+
+        columns = {
+            'voter_id': _concat('TN', self.district_codes[district], np.char.zfill(row_index.astype(str), 8)),
+            'first_name': first_name,
+            'middle_name': middle_name,
+            'last_name': last_name,
+            'date_of_birth': (reference_date - days_old.astype('timedelta64[D]')).astype(str),
+            'age': age,
+            'gender': _array(list(GENDER_DISTRIBUTION))[gender],
+            'phone': np.where(has_phone, phone, ''),
+            'alternate_phone': np.where(has_alternate, alternate_phone, ''),
+            'email': np.where(has_email, email.astype(object), None),
+            'photo': np.full(size, None, dtype=object),
+            'address_line1': _concat(rng.integers(1, 501, size), ', ', pick(rng, TN_STREETS, size)),
+            'address_line2': _array(TN_AREAS)[area],
+            'landmark': np.where(rng.random(size) > 0.5, pick(rng, TN_STREETS, size), ''),
+            'ward': _concat('Ward-', rng.integers(1, 51, size)),
+            'constituency_id': constituency,
+            'district_id': self.district_ids[district],
+            'state_id': np.full(size, self.state_id),
+            'pincode': rng.integers(600000, 644000, size).astype(str),
+            'latitude': np.round(rng.uniform(8.0, 13.5, size), 6),
+            'longitude': np.round(rng.uniform(76.0, 80.5, size), 6),
+            'party_affiliation': _array(PARTIES)[party],
+            'voting_history': VOTING_HISTORY_JSON[history],
+            'sentiment': _array(SENTIMENTS)[sentiment],
+            'influence_level': _array(INFLUENCE_LEVELS)[influence],
+            'is_opinion_leader': is_opinion_leader,
+            'last_contacted_at': np.where(
+                contacted, _timestamps(self.reference_time, contacted_days_ago * 86400).astype(object), None
+            ),
+            'contact_frequency': rng.integers(0, 21, size),
+            'interaction_count': interaction_count,
+            'positive_interactions': positive_interactions,
+            'negative_interactions': interaction_count - positive_interactions,
+            'preferred_communication': pick(rng, COMMUNICATION_CHANNELS, size),
+            'created_by_id': np.full(size, self.created_by_id, dtype=object),
+            'created_at': np.full(size, now, dtype=object),
+            'updated_at': np.full(size, now, dtype=object),
+            'is_active': np.ones(size, dtype=bool),
+            'is_verified': rng.random(size) > 0.30,
+            'tags': TAGS_JSON[tags],
+            'notes': NOTES[education * len(TN_AREAS) + area],
+            # Voter search keys, as Voter.save() would set them
+            'phone_digits': np.where(has_phone, phone_number.astype(str), ''),
+            'voter_id_key': _concat('TN', self.district_id_keys[district], np.char.zfill(row_index.astype(str), 8)),
+            'name_key': _name_keys(first_name, middle_name, last_name),
+        }
+
+        stats = {
+            'by_district': tally(district, self.district_names),
+            'by_age_group': Counter({f"{decade}-{decade + 9}": count for decade, count in tally(age // 10 * 10).items()}),
+            'by_gender': tally(gender, list(GENDER_DISTRIBUTION)),
+            'by_party': tally(party, PARTIES),
+            'by_sentiment': tally(sentiment, SENTIMENTS),
+            'by_influence': tally(influence, INFLUENCE_LEVELS),
+            'by_education': tally(education, list(EDUCATION_LEVELS)),
+            'totals': Counter(
+                total_created=size,
+                with_phone=int(has_phone.sum()),
+                with_email=int(has_email.sum()),
+                opinion_leaders=int(is_opinion_leader.sum()),
+            ),
+        }
+        return columns, stats
+
+
+# ---------------------------------------------------------------------------
+# Voter interactions
+# ---------------------------------------------------------------------------
+
+INTERACTION_TYPES = {
+    'phone_call': 0.40,
+    'door_visit': 0.30,
+    'event_meeting': 0.15,
+    'sms': 0.08,
+    'whatsapp': 0.05,
+    'email': 0.02,
+}
+
+# Minutes; zero for messages, which have no duration
+DURATION_RANGES = {
+    'phone_call': (2, 15),
+    'door_visit': (5, 30),
+    'event_meeting': (15, 60),
+    'sms': (0, 0),
+    'whatsapp': (0, 0),
+    'email': (0, 0),
+}
+
+NOTE_PREFIXES = {
+    'phone_call': 'Phone call conducted. ',
+    'door_visit': 'Door-to-door visit. ',
+    'event_meeting': 'Met at community event. ',
+}
+
+# Overall, for TVK voters, and for other supporters (showing TVK improvement)
+INTERACTION_SENTIMENTS = {'positive': 0.55, 'neutral': 0.30, 'negative': 0.15}
+TVK_INTERACTION_SENTIMENTS = {'positive': 0.75, 'neutral': 0.20, 'negative': 0.05}
+SUPPORTER_INTERACTION_SENTIMENTS = {'positive': 0.65, 'neutral': 0.25, 'negative': 0.10}
+
+# Issues discussed (Tamil Nadu priorities), drawn with replacement
+INTERACTION_ISSUES = {
+    'Jobs': 0.25,
+    'Water': 0.20,
+    'NEET': 0.12,
+    'Healthcare': 0.10,
+    'Education': 0.08,
+    'Agriculture': 0.07,
+    'Transportation': 0.05,
+    'Electricity': 0.04,
+    'Housing': 0.03,
+    'Sanitation': 0.03,
+    'Law and Order': 0.03,
+}
+ISSUES_PER_INTERACTION = {1: 0.40, 2: 0.35, 3: 0.20, 4: 0.05}
+
+INTERACTION_NOTES = {
+    'positive': [
+        "Discussed {issue} issues in {ward}. Voter {sentiment} about TVK vision. Interested in {interest_area}.",
+        "Very enthusiastic conversation about TVK's {policy} policy. {voter_name} appreciates leadership's transparency.",
+        "Strong supporter. Discussed {issue} concerns. Promised to help with grassroots mobilization in {area}.",
+        "First-time engagement. Youth voter excited about {topic}. Willing to volunteer for upcoming events.",
+        "Farmer concerned about {issue}. Explained TVK's {solution}. Positive response, requested follow-up meeting.",
+        "Opinion leader in community. Discussed multiple issues: {issues}. Committed to organizing local meeting.",
+        "Senior citizen, traditional voter. Impressed by party's {value} values. Requested more information materials.",
+        "Business owner worried about {issue}. Detailed discussion about economic policies. Very supportive feedback.",
+    ],
+    'neutral': [
+        "Listened to concerns about {issue}. Voter undecided but open to further dialogue. Scheduled follow-up.",
+        "Neutral conversation. Discussed {issue} and {issue2}. Voter wants to see concrete action plans.",
+        "First contact. Provided party manifesto. Voter non-committal but took literature for review.",
+        "Brief discussion about {issue}. Voter waiting to evaluate all parties before deciding.",
+        "Attended community meeting. Asked several questions about {topic}. Neither positive nor negative.",
+        "Concerned about {issue}. Explained party stance. Voter wants time to think and compare with others.",
+        "Respectful conversation. {voter_name} appreciates outreach but hasn't made up mind yet.",
+    ],
+    'negative': [
+        "Voter skeptical about political promises. Discussed {issue} but remains unconvinced. Will try again later.",
+        "Strong supporter of {opponent}. Brief conversation, left materials. Unlikely to change affiliation.",
+        "Disappointed with political system overall. Expressed frustration about {issue}. Cordial but not interested.",
+        "Critical of new party entry. Believes established parties better. Noted concerns about {issue} for report.",
+        "Refused detailed discussion. Stated loyalty to {party}. Maintained respectful interaction throughout.",
+        "Concerned about {issue} but distrusts all political parties. Challenging conversation, documented concerns.",
+        "Previously contacted, still negative. Needs more time and evidence of concrete action on {issue}.",
+    ],
+}
+
+# Values for the remaining note placeholders, drawn uniformly
+NOTE_CHOICES = {
+    'sentiment': ['very positive', 'enthusiastic', 'supportive'],
+    'interest_area': ['youth programs', 'education policy', 'job creation'],
+    'policy': ['education', 'employment', 'agriculture', 'healthcare'],
+    'topic': ['youth empowerment', 'job opportunities', 'education reform'],
+    'solution': ['detailed plan', 'comprehensive policy', 'immediate action plan'],
+    'value': ['integrity', 'transparency', 'accountability'],
+    'opponent': ['DMK', 'AIADMK', 'BJP', 'Congress'],
+    'party': ['DMK', 'AIADMK', 'BJP', 'Congress'],
+    'forum': ['youth', 'farmer', 'business'],
+}
+
+PROMISE_TEMPLATES = [
+    "Promised to escalate {issue} issue to district manager.",
+    "Committed to organizing community meeting on {issue} within 2 weeks.",
+    "Will provide detailed information on TVK's {issue} policy via WhatsApp.",
+    "Promised to connect voter with local {forum} forum.",
+    "Will arrange meeting with constituency in-charge to discuss concerns.",
+    "Committed to provide regular updates on {issue} developments.",
+]
+
+# (share of interactions, first day, last day before the reference time)
+INTERACTION_RECENCY = [(0.50, 0, 30), (0.30, 31, 90), (0.20, 91, 180)]
+
+
+def _issue_sequence_lookups() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    JSON list and '{issues}' text of every sequence of issue codes
+
+    Sequences of length n start at sum(len ** i for i in 1 .. n - 1) and
+    are numbered like base-len numbers within it.
+    """
+    names = list(INTERACTION_ISSUES)
+    sequences = [
+        [names[code] for code in codes]
+        for length in ISSUES_PER_INTERACTION
+        for codes in itertools.product(range(len(names)), repeat=length)
+    ]
+    return _json_lookup(sequences), _array([', '.join(sequence[:3]) for sequence in sequences])
+
+
+ISSUE_SEQUENCES_JSON, ISSUE_SEQUENCES_TEXT = _issue_sequence_lookups()
+INTERACTION_SENTIMENT_CODES = list(INTERACTION_SENTIMENTS)
+
+
+class InteractionGenerator:
+    """
+    Draws VoterInteraction rows for existing voters
+
+    Interactions lean towards high and medium influence voters and are
+    logged mostly by a core of very active users.
+
+    Args:
+        voters: (id, influence_level, party_affiliation, sentiment,
+            first_name, ward, address_line2) of every voter
+        user_ids: Users interactions are logged by
+        seed: Base seed; also fixes which users are the active ones
+        reference_time: 'Now' for interaction and follow-up dates
+    """
+
+    table = VoterInteraction._meta.db_table
+
+    def __init__(self, voters: List[Tuple], user_ids: List, seed: int, reference_time: datetime):
+        self.seed = seed
+        self.reference_time = reference_time
+        ids, influence, party, sentiment, first_name, ward, area = zip(*voters)
+        self.voter_ids = np.array(ids)
+        self.influence = np.asarray(influence, dtype=str)
+        self.tvk = np.asarray(party, dtype=str) == 'tvk'
+        self.supporter = np.isin(np.asarray(sentiment, dtype=str), ['strong_supporter', 'supporter'])
+        self.first_name = np.asarray(first_name, dtype=str)
+        self.ward = np.asarray(ward, dtype=str)
+        self.area = np.asarray([place or ward_name for place, ward_name in zip(area, ward)], dtype=str)
+
+        # 35% high, 35% medium, 30% low influence; everyone if nobody is low
+        positions = np.arange(len(self.voter_ids))
+        self.voter_tiers = [positions[self.influence == level] for level in ('high', 'medium', 'low')]
+        if not len(self.voter_tiers[-1]):
+            self.voter_tiers[-1] = positions
+
+        # Half the users are active and a third of those very active
+        rng = np.random.default_rng(seed)
+        users = np.array(user_ids)
+        active = rng.choice(users, size=max(1, len(users) // 2), replace=False)
+        very_active = rng.choice(active, size=max(1, len(active) // 3), replace=False)
+        self.user_tiers = [very_active, active, users]
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for interactions start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+
+        voter = _pick_tiered(rng, self.voter_tiers, [0.35, 0.35, 0.30], size)
+        contacted_by = _pick_tiered(rng, self.user_tiers, [0.50, 0.30, 0.20], size)
+        kind = sample_index(rng, INTERACTION_TYPES, size)
+        kinds = list(INTERACTION_TYPES)
+
+        sentiment = np.where(
+            self.tvk[voter], sample_index(rng, TVK_INTERACTION_SENTIMENTS, size),
+            np.where(self.supporter[voter], sample_index(rng, SUPPORTER_INTERACTION_SENTIMENTS, size),
+                     sample_index(rng, INTERACTION_SENTIMENTS, size)),
+        )
+
+        # Issue sequences as codes into the ISSUE_SEQUENCES lookups
+        lengths = np.array(list(ISSUES_PER_INTERACTION))
+        count = lengths[sample_index(rng, ISSUES_PER_INTERACTION, size)]
+        drawn = sample_index(rng, INTERACTION_ISSUES, size * lengths.max()).reshape(size, lengths.max())
+        base = len(INTERACTION_ISSUES)
+        sequence = np.zeros(size, dtype=np.int64)
+        number = np.zeros(size, dtype=np.int64)
+        offset = 0
+        for position, length in enumerate(lengths):
+            number = number * base + drawn[:, position]
+            sequence = np.where(count == length, offset + number, sequence)
+            offset += base ** length
+        issue_names = _array(list(INTERACTION_ISSUES))
+        rows = np.arange(size)
+        discussed = drawn[rows, (rng.random(size) * count).astype(np.int64)]
+        other = drawn[rows, (rng.random(size) * count).astype(np.int64)]
+
+        low, high = np.array([DURATION_RANGES[key] for key in kinds]).T
+        duration = rng.integers(low[kind], high[kind] + 1)
+
+        shares, first_day, last_day = np.array(INTERACTION_RECENCY).T
+        recency = np.searchsorted(np.cumsum(shares), rng.random(size), side='right').clip(max=len(shares) - 1)
+        days_ago = rng.integers(first_day[recency].astype(np.int64), last_day[recency].astype(np.int64) + 1)
+        seconds_before = days_ago * 86400 + rng.integers(0, 24, size) * 3600
+
+        follow_up = rng.random(size) < 0.40
+        follow_up_after = rng.integers(7, 31, size) * 86400
+
+        fields = {
+            'issue': issue_names[discussed],
+            'issue2': np.where(count > 1, issue_names[other], 'infrastructure'),
+            'issues': ISSUE_SEQUENCES_TEXT[sequence],
+            'ward': self.ward[voter],
+            'area': self.area[voter],
+            'voter_name': self.first_name[voter],
+            **{name: pick(rng, choices, size) for name, choices in NOTE_CHOICES.items()},
+        }
+        note = np.empty(size, dtype=object)
+        for code, polarity in enumerate(INTERACTION_SENTIMENT_CODES):
+            templates = INTERACTION_NOTES[polarity]
+            rows = sentiment == code
+            note[rows] = _fill(templates, rng.integers(len(templates), size=size)[rows],
+                               {name: values[rows] for name, values in fields.items()})
+        prefixes = _array([NOTE_PREFIXES.get(key, '') for key in kinds])
+        note = _concat(prefixes[kind], note)
+
+        # Some positive conversations end with a promise about the first issue
+        promised = (sentiment == INTERACTION_SENTIMENT_CODES.index('positive')) & (rng.random(size) > 0.60)
+        promise = _fill(PROMISE_TEMPLATES, rng.integers(len(PROMISE_TEMPLATES), size=size),
+                        {'issue': issue_names[drawn[:, 0]], 'forum': fields['forum']})
+
+        now = _timestamps(self.reference_time, np.zeros(1, dtype=np.int64))[0]
+        columns = {
+            'voter_id': self.voter_ids[voter],
+            'interaction_type': _array(kinds)[kind],
+            'contacted_by_id': contacted_by,
+            'interaction_date': _timestamps(self.reference_time, seconds_before),
+            'duration_minutes': np.where(high[kind] > 0, duration.astype(object), None),
+            'sentiment': _array(INTERACTION_SENTIMENT_CODES)[sentiment],
+            'issues_discussed': ISSUE_SEQUENCES_JSON[sequence],
+            'promises_made': np.where(promised, promise, ''),
+            'follow_up_required': follow_up,
+            'follow_up_date': np.where(
+                follow_up, _dates(self.reference_time, seconds_before - follow_up_after).astype(object), None
+            ),
+            'notes': note,
+            'created_at': np.full(size, now, dtype=object),
+        }
+
+        stats = {
+            'by_type': tally(kind, kinds),
+            'by_sentiment': tally(sentiment, INTERACTION_SENTIMENT_CODES),
+            'by_issue': tally(drawn[np.arange(lengths.max()) < count[:, None]], list(INTERACTION_ISSUES)),
+            'by_influence': tally(self.influence[voter]),
+            'totals': Counter(
+                total_created=size,
+                require_followup=int(follow_up.sum()),
+                recent_interactions=int((recency == 0).sum()),
+            ),
+        }
+        return columns, stats
+
+
+# ---------------------------------------------------------------------------
+# Sentiment data (Tamil Nadu issues, November 2024)
+# ---------------------------------------------------------------------------
+
+WATER_CRISIS_DISTRICTS = [
+    'Coimbatore', 'Chennai', 'Tiruchirappalli', 'Salem', 'Erode',
+    'Madurai', 'Tiruppur', 'Vellore', 'Dindigul', 'Karur',
+]
+# Delta region
+CAUVERY_DISTRICTS = ['Thanjavur', 'Tiruvarur', 'Nagapattinam', 'Cuddalore', 'Mayiladuthurai', 'Ariyalur']
+# Cyclone Fengal
+CYCLONE_DISTRICTS = ['Cuddalore', 'Viluppuram', 'Tiruvannamalai', 'Chengalpattu', 'Kallakurichi', 'Ranipet']
+COASTAL_DISTRICTS = [
+    'Ramanathapuram', 'Nagapattinam', 'Pudukkottai', 'Thanjavur', 'Thoothukudi', 'Kanyakumari', 'Chennai',
+]
+URBAN_DISTRICTS = ['Chennai', 'Coimbatore', 'Madurai', 'Tiruchirappalli', 'Salem', 'Tiruppur', 'Erode']
+
+SENTIMENT_ISSUES = {
+    'Water Supply': 0.20,
+    'Jobs/Employment': 0.18,
+    'Agriculture': 0.12,
+    'NEET Opposition': 0.10,
+    'Cauvery Dispute': 0.08,
+    'Healthcare': 0.08,
+    'Education': 0.07,
+    'Fishermen Rights': 0.05,
+    'Infrastructure': 0.05,
+    'Cyclone Relief': 0.04,
+    'Other': 0.03,
+}
+
+# Issues are reported in these districts; the rest anywhere
+ISSUE_DISTRICTS = {
+    'Water Supply': WATER_CRISIS_DISTRICTS,
+    'Cauvery Dispute': CAUVERY_DISTRICTS,
+    'Cyclone Relief': CYCLONE_DISTRICTS,
+    'Fishermen Rights': COASTAL_DISTRICTS,
+    'Jobs/Employment': URBAN_DISTRICTS,
+    'Agriculture': CAUVERY_DISTRICTS + ['Salem', 'Erode', 'Namakkal'],
+    'NEET Opposition': URBAN_DISTRICTS,
+    'Healthcare': URBAN_DISTRICTS,
+    'Education': URBAN_DISTRICTS,
+}
+
+# IssueCategory each issue is recorded under; a random one if it is missing
+ISSUE_CATEGORIES = {
+    'Water Supply': 'Healthcare Access',
+    'Jobs/Employment': 'Youth Employment & Education',
+    'Agriculture': 'Farmers Welfare & Agriculture',
+    'NEET Opposition': 'Youth Employment & Education',
+    'Cauvery Dispute': 'Farmers Welfare & Agriculture',
+    'Healthcare': 'Healthcare Access',
+    'Education': 'Youth Employment & Education',
+    'Fishermen Rights': "Fishermen's Rights & Livelihood",
+    'Infrastructure': 'Environmental Protection',
+    'Cyclone Relief': 'Farmers Welfare & Agriculture',
+    'Other': 'Social Justice & Caste Issues',
+}
+
+# Positive / neutral / negative shares by issue
+ISSUE_POLARITY = {
+    'Water Supply': (15, 25, 60),
+    'Cauvery Dispute': (10, 20, 70),
+    'Cyclone Relief': (20, 30, 50),
+    'Fishermen Rights': (15, 25, 60),
+    'NEET Opposition': (45, 30, 25),
+    'Jobs/Employment': (25, 30, 45),
+    'Agriculture': (20, 25, 55),
+    'Healthcare': (30, 35, 35),
+    'Education': (35, 35, 30),
+    'Infrastructure': (30, 40, 30),
+    'Other': (40, 35, 25),
+}
+POLARITIES = ['positive', 'neutral', 'negative']
+
+SENTIMENT_SOURCES = {
+    'direct_feedback': 0.40,
+    'social_media': 0.35,
+    'field_report': 0.20,
+    'survey': 0.05,
+}
+
+# Peaks 7-9am, 12-2pm and 6-9pm
+HOUR_WEIGHTS = dict(enumerate([1, 1, 1, 1, 1, 1, 3, 3, 2, 1, 1, 3, 3, 1, 1, 1, 1, 3, 3, 3, 2, 1, 1, 1]))
+# Share of weekend records kept, for 30% more volume on weekdays
+WEEKEND_KEPT = 0.7
+
+WARD_TYPES = ['Ward', 'Division', 'Zone']
+
+
+class SentimentGenerator:
+    """
+    Draws SentimentData rows between two dates
+
+    Each issue is reported in the districts it affects, weighted towards
+    urban and crisis-hit ones, and its polarity follows ISSUE_POLARITY.
+    Recent days get more records.
+
+    Args:
+        districts: (id, name) of each district in the state
+        constituencies: (id, district_id) of each constituency in the state
+        issues: (id, name) of every issue category
+        segment_ids: Voter segments half the records are tagged with
+        state_id: State every record belongs to
+        seed: Base seed
+        start, end: Aware datetimes bounding the records' days
+    """
+
+    table = SentimentData._meta.db_table
+
+    def __init__(self, districts: List[Tuple], constituencies: List[Tuple], issues: List[Tuple],
+                 segment_ids: List, state_id, seed: int, start: datetime, end: datetime):
+        self.state_id = state_id
+        self.seed = seed
+        self.end = end
+        self.days = (end - start).days
+        self.district_ids = np.array([district[0] for district in districts])
+        self.district_names = [district[1] for district in districts]
+        self.constituencies = ConstituencyPicker(self.district_ids, constituencies)
+        self.issue_ids = np.array([issue[0] for issue in issues])
+        self.segment_ids = np.array(segment_ids)
+
+        category_ids = {name: issue_id for issue_id, name in issues}
+        self.category_ids = np.array([category_ids.get(ISSUE_CATEGORIES[name], -1) for name in SENTIMENT_ISSUES])
+
+        # Urban districts count three times, other crisis-hit ones twice
+        weights = np.array([
+            3.0 if name in URBAN_DISTRICTS else 2.0 if name in WATER_CRISIS_DISTRICTS + CAUVERY_DISTRICTS else 1.0
+            for name in self.district_names
+        ])
+        self.issue_districts = []
+        for name in SENTIMENT_ISSUES:
+            positions = np.array([
+                position for position, district in enumerate(self.district_names)
+                if district in ISSUE_DISTRICTS.get(name, ())
+            ], dtype=np.int64)
+            if not len(positions):
+                positions = np.arange(len(self.district_names))
+            self.issue_districts.append((positions, np.cumsum(weights[positions]) / weights[positions].sum()))
+
+        polarity = np.array([ISSUE_POLARITY[name] for name in SENTIMENT_ISSUES], dtype=float)
+        self.polarity_cumulative = np.cumsum(polarity, axis=1) / polarity.sum(axis=1, keepdims=True)
+
+    def _days_back(self, rng: np.random.Generator, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Days before the end date and seconds into the day, thinning weekends"""
+        days = np.empty(size, dtype=np.int64)
+        seconds = np.empty(size, dtype=np.int64)
+        end_day = np.datetime64(self.end.date(), 'D').astype(np.int64)
+        redraw = np.arange(size)
+        while len(redraw):
+            count = len(redraw)
+            days[redraw] = np.minimum(rng.exponential(self.days / 3, count).astype(np.int64), self.days)
+            seconds[redraw] = (
+                sample_index(rng, HOUR_WEIGHTS, count) * 3600
+                + rng.integers(0, 60, count) * 60 + rng.integers(0, 60, count)
+            )
+            # Monday is 0; 1970-01-01 was a Thursday
+            weekday = (end_day - days[redraw] + 3) % 7
+            redraw = redraw[(weekday >= 5) & (rng.random(count) > WEEKEND_KEPT)]
+        return days, seconds
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for records start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+
+        issue = sample_index(rng, SENTIMENT_ISSUES, size)
+        category = self.category_ids[issue]
+        missing = category < 0
+        category[missing] = self.issue_ids[rng.integers(len(self.issue_ids), size=int(missing.sum()))]
+
+        district = np.empty(size, dtype=np.int64)
+        draw = rng.random(size)
+        for number, (positions, cumulative) in enumerate(self.issue_districts):
+            rows = issue == number
+            chosen = np.searchsorted(cumulative, draw[rows], side='right').clip(max=len(positions) - 1)
+            district[rows] = positions[chosen]
+
+        polarity = (rng.random(size)[:, None] > self.polarity_cumulative[issue]).sum(axis=1).clip(max=2)
+        # Positive scores fall in 0.6-1.0, neutral in 0.4-0.6 and negative in 0.0-0.4
+        score = np.choose(polarity, [
+            rng.beta(5, 2, size) * 0.4 + 0.6,
+            rng.beta(2, 2, size) * 0.2 + 0.4,
+            rng.beta(2, 5, size) * 0.4,
+        ])
+        confidence = rng.normal(0.75, 0.15, size).clip(0.0, 1.0)
+
+        days, seconds = self._days_back(rng, size)
+        timestamp = _timestamps(self.end, days * 86400 - seconds)
+        segment = (
+            self.segment_ids[rng.integers(len(self.segment_ids), size=size)].astype(object)
+            if len(self.segment_ids) else np.full(size, None, dtype=object)
+        )
+        source = sample_index(rng, SENTIMENT_SOURCES, size)
+
+        columns = {
+            'source_type': _array(list(SENTIMENT_SOURCES))[source],
+            'source_id': _uuids(rng, size),
+            'issue_id': category,
+            'sentiment_score': np.round(score.clip(0.0, 1.0), 2),
+            'polarity': _array(POLARITIES)[polarity],
+            'confidence': np.round(confidence, 2),
+            'state_id': np.full(size, self.state_id),
+            'district_id': self.district_ids[district],
+            'constituency_id': self.constituencies.pick(rng, district),
+            'ward': _concat(pick(rng, WARD_TYPES, size), ' ', rng.integers(1, 101, size)),
+            'voter_segment_id': np.where(rng.random(size) > 0.5, segment, None),
+            'timestamp': timestamp,
+            'created_at': timestamp,
+        }
+
+        stats = {
+            'by_issue': tally(issue, list(SENTIMENT_ISSUES)),
+            'by_district': tally(district, self.district_names),
+            'by_polarity': tally(polarity, POLARITIES),
+            'by_source': tally(source, list(SENTIMENT_SOURCES)),
+            'totals': Counter(total=size),
+        }
+        return columns, stats
+
+
+# ---------------------------------------------------------------------------
+# Field reports
+# ---------------------------------------------------------------------------
+
+REPORT_TYPES = {
+    'daily_summary': 0.50,
+    'event_feedback': 0.25,
+    'issue_report': 0.15,
+    'competitor_activity': 0.05,
+    'booth_report': 0.05,
+}
+
+VERIFICATION_STATUSES = {'verified': 0.70, 'pending': 0.25, 'disputed': 0.05}
+VERIFICATION_NOTES = {
+    'verified': "Field report verified by supervisor. Data cross-checked.",
+    'disputed': "Crowd size seems inflated. Needs re-verification.",
+}
+
+URBAN_AREAS = [
+    'T Nagar', 'Adyar', 'Anna Nagar', 'Velachery', 'Tambaram',
+    'RS Puram', 'Gandhipuram', 'Saibaba Colony', 'Race Course',
+    'Anna Salai', 'Perambur', 'KK Nagar', 'Kodambakkam', 'Mylapore',
+    'Ashok Nagar', 'Vadapalani', 'Porur', 'Sholinganallur',
+]
+
+# (title, notes) of each report type
+REPORT_TEMPLATES = {
+    'daily_summary': [
+        ("Daily Field Visit - {ward}",
+         "{ward} field visit completed. Met 45 families, mostly positive response to TVK vision. Water supply remains top concern in {area}. Residents want immediate action on drinking water crisis."),
+        ("Door-to-Door Coverage - {area}",
+         "Booth coverage in {area}: 60% households contacted. Youth showing strong interest in employment programs. Many asked about skill development initiatives and job creation plans."),
+        ("Ground Report - {ward}",
+         "Door-to-door in {area}: Mixed reactions. NEET issue resonates strongly with students, parents very concerned about education costs and accessibility for rural students."),
+        ("Field Activity Summary - {area}",
+         "Covered {households} households in {area} today. Key concerns: water scarcity, unemployment, agriculture input costs. TVK's anti-corruption stand getting good response."),
+        ("Community Engagement - {ward}",
+         "Met with {families} families. Strong support for TVK's stance on social justice. People want change from DMK-AIADMK cycle. Youth very enthusiastic about new political movement."),
+    ],
+    'event_feedback': [
+        ("TVK Rally Feedback - {area}",
+         "TVK rally in {area}: Estimated {attendance}+ attendance. Crowd very enthusiastic. Key topics resonated: jobs, water, corruption-free governance. Youth participation exceptional."),
+        ("Town Hall Meeting Success - {area}",
+         "Town hall meeting in {area} was highly successful. 200+ participants asked detailed questions about healthcare access, education reforms. Very positive sentiment, people want actionable solutions."),
+        ("Public Meeting Report - {area}",
+         "Public meeting had {turnout} turnout. Vijay's speech on social justice and equality received standing ovation. Many first-time voters expressing strong support. NEET abolition demand got huge applause."),
+        ("Community Gathering - {area}",
+         "Corner meeting in {area} attended by {residents} residents. Interactive session on local issues. People appreciate TVK's grassroots approach and listening to ground realities."),
+    ],
+    'issue_report': [
+        ("URGENT: Water Crisis - {ward}",
+         "URGENT: Water crisis worsening in {ward}. Residents without supply for 3 days. Tanker water expensive at Rs.{tanker_cost} per load. Immediate attention needed. Women and children traveling 2km to fetch water."),
+        ("Employment Crisis - {area}",
+         "Multiple families in {area} report job loss due to factory closure. Economic distress very high. {workers} workers affected. No government response or compensation. Families struggling to make ends meet."),
+        ("Fishermen Community Alert - {area}",
+         "Fishermen community raising SL Navy arrest concerns. {fishing_families} families affected this month alone. Boats confiscated, livelihoods destroyed. Community demanding government intervention and protection."),
+        ("Agriculture Distress - {ward}",
+         "Farmers in {ward} facing severe crisis. No Cauvery water for {dry_days} days. Paddy fields drying up. Input costs doubled but MSP unchanged. Debt burden increasing, many considering quitting farming."),
+        ("Healthcare Emergency - {area}",
+         "Primary Health Center in {area} non-functional. No doctors for 2 weeks. Pregnant women forced to travel 30km for basic checkups. Medical emergency cases being turned away. Critical situation needs immediate action."),
+        ("Education Infrastructure Crisis - {ward}",
+         "Government school in {ward} has no proper building. {students} students studying under trees. No toilets, no drinking water. Parents demanding infrastructure improvement or school merger."),
+    ],
+    'competitor_activity': [
+        ("{party} Activity Observed - {area}",
+         "{party} organized small rally in {area}. Approximately {rally_attendees} attendees. Focus on existing government schemes and freebies. Crowd response lukewarm."),
+        ("Opposition Campaign - {area}",
+         "{party} booth setup observed in {area}. Workers distributing pamphlets about welfare schemes. Minimal public engagement. People asking critical questions about unfulfilled promises."),
+        ("Competitor Rally - {area}",
+         "{party} public meeting in {area}. Estimated {meeting_participants} participants. Many were brought by organizers. Local issues not addressed, only party rhetoric. TVK gaining ground in comparison."),
+    ],
+    'booth_report': [
+        ("Booth Assessment - {ward}",
+         "Booth {booth} coverage status: {mapped}% households mapped. Voter database {updated}% updated. {booth_volunteers} booth-level volunteers active. Need more volunteers for complete coverage."),
+        ("Booth Strength Analysis - {ward}",
+         "Booth {booth} has {registered} registered voters. Our estimated support: {support}%. Swing voters: {swing}%. Strong opposition: {opposition}%. Focus needed on undecided voters."),
+    ],
+}
+
+# Inclusive ranges of the numbers quoted in the templates
+REPORT_NUMBERS = {
+    'households': (30, 80),
+    'families': (20, 50),
+    'attendance': (3000, 8000),
+    'residents': (100, 300),
+    'tanker_cost': (800, 1500),
+    'workers': (300, 800),
+    'fishing_families': (10, 25),
+    'dry_days': (15, 45),
+    'students': (200, 400),
+    'rally_attendees': (150, 400),
+    'meeting_participants': (300, 800),
+    'mapped': (50, 85),
+    'updated': (60, 90),
+    'booth_volunteers': (5, 15),
+    'registered': (600, 1200),
+    'support': (25, 45),
+    'swing': (20, 35),
+    'opposition': (15, 30),
+}
+
+COMPETITORS = ['DMK', 'AIADMK', 'BJP', 'Congress']
+
+POSITIVE_REACTIONS = [
+    "Strong support for anti-corruption stance",
+    "Youth very enthusiastic about new movement",
+    "Appreciate grassroots approach",
+    "Want alternative to DMK-AIADMK",
+    "NEET abolition demand resonates",
+    "Jobs creation plans appreciated",
+    "Social justice message connects well",
+    "Women voters showing strong interest",
+]
+NEGATIVE_REACTIONS = [
+    "Skeptical about new party effectiveness",
+    "Wait and watch approach",
+    "Concerned about political experience",
+    "Want more concrete policy details",
+    "Worried about winnability",
+    "Questions about alliance strategy",
+]
+EVENT_POSITIVE_REACTIONS = [
+    "Massive crowd turnout exceeded expectations",
+    "Standing ovation for key policy points",
+    "Youth participation unprecedented",
+    "First-time voters very engaged",
+    "Social media buzz very positive",
+    "Local media coverage extensive",
+    "Volunteers highly motivated post-event",
+]
+ISSUE_NEGATIVE_REACTIONS = [
+    "Community very angry about government inaction",
+    "People losing faith in political system",
+    "Urgent intervention needed",
+    "Families in severe distress",
+    "Children's future at stake",
+    "Economic hardship increasing",
+]
+EVENT_QUOTES = [
+    "Finally someone who understands our problems - Auto driver, 42",
+    "My son needs a job, not empty promises - Mother of graduate, 48",
+    "NEET destroyed my daughter's dreams - Father, 51",
+    "We want change, not same old politics - College student, 21",
+    "TVK gives us hope for corruption-free governance - Small business owner, 38",
+    "Youth needs opportunities in Tamil Nadu - Engineering graduate, 24",
+]
+
+# JSON lists field reports draw: (lookup, items, fewest, most)
+REACTION_LISTS = {
+    name: (_subsets_json(items), len(items), fewest, most)
+    for name, items, fewest, most in [
+        ('positive', POSITIVE_REACTIONS, 2, 4),
+        ('negative', NEGATIVE_REACTIONS, 1, 3),
+        ('event_positive', EVENT_POSITIVE_REACTIONS, 3, 5),
+        ('issue_negative', ISSUE_NEGATIVE_REACTIONS, 2, 4),
+        ('quotes', EVENT_QUOTES, 2, 4),
+    ]
+}
+# Which list fills each JSON column, by report type
+REPORT_LISTS = {
+    'positive_reactions': {'daily_summary': 'positive', 'event_feedback': 'event_positive', 'booth_report': 'positive'},
+    'negative_reactions': {'daily_summary': 'negative', 'issue_report': 'issue_negative'},
+    'quotes': {'event_feedback': 'quotes'},
+}
+# Crowd sizes reported, by report type
+CROWD_SIZES = {'event_feedback': (50, 10000), 'competitor_activity': (50, 500)}
+
+
+class FieldReportGenerator:
+    """
+    Draws FieldReport rows filed over the 60 days before the reference time
+
+    Titles and notes come from REPORT_TEMPLATES for the report's type.
+    Key issues and segments met are many-to-many rows, loaded afterwards
+    with ManyToManyGenerator once the reports have ids.
+
+    Args:
+        volunteer_ids: Users who file and verify reports
+        constituencies: (id, district_id) of each constituency in the state
+        district_ids: Districts reports without a constituency fall in
+        party_ids: Parties competitor activity is reported for
+        state_id: State every report belongs to
+        seed: Base seed
+        reference_time: 'Now' for report and verification times
+    """
+
+    table = FieldReport._meta.db_table
+
+    def __init__(self, volunteer_ids: List, constituencies: List[Tuple], district_ids: List, party_ids: List,
+                 state_id, seed: int, reference_time: datetime):
+        self.volunteer_ids = np.array(volunteer_ids)
+        self.constituency_ids = np.array([constituency[0] for constituency in constituencies])
+        self.constituency_districts = np.array([constituency[1] for constituency in constituencies])
+        self.district_ids = np.array(district_ids)
+        self.party_ids = np.array(party_ids)
+        self.state_id = state_id
+        self.seed = seed
+        self.reference_time = reference_time
+
+    def _ids(self, rng: np.random.Generator, ids: np.ndarray, size: int) -> np.ndarray:
+        """Uniform draws from ids, None when there are none"""
+        if not len(ids):
+            return np.full(size, None, dtype=object)
+        return ids[rng.integers(len(ids), size=size)].astype(object)
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for reports start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+        types = list(REPORT_TYPES)
+        report_type = sample_index(rng, REPORT_TYPES, size)
+        type_names = _array(types)[report_type]
+
+        if len(self.constituency_ids):
+            constituency = rng.integers(len(self.constituency_ids), size=size)
+            constituency_id = self.constituency_ids[constituency]
+            district_id = self.constituency_districts[constituency]
+            ward = _concat('Ward-', rng.integers(1, 61, size))
+        else:
+            constituency_id = np.full(size, None, dtype=object)
+            district_id = self._ids(rng, self.district_ids, size)
+            ward = np.full(size, 'Ward-1')
+
+        # Weighted towards recent days
+        seconds_before = (
+            rng.triangular(0, 5, 60, size).astype(np.int64) * 86400
+            + rng.integers(18, 22, size) * 3600 + rng.integers(0, 60, size) * 60
+        )
+        urban = rng.random(size) < 0.45
+        area = np.where(urban, pick(rng, URBAN_AREAS, size), _concat(ward, ' Area'))
+        booth = np.where(rng.random(size) < 0.3, np.char.zfill(rng.integers(1, 151, size).astype(str), 3), '')
+
+        fields = {
+            'ward': ward, 'area': area, 'booth': booth,
+            'party': pick(rng, COMPETITORS, size),
+            'turnout': np.where(rng.random(size) < 0.3, 'massive', 'good'),
+            **{name: rng.integers(low, high + 1, size) for name, (low, high) in REPORT_NUMBERS.items()},
+        }
+        title = np.empty(size, dtype=object)
+        notes = np.empty(size, dtype=object)
+        for code, name in enumerate(types):
+            templates = REPORT_TEMPLATES[name]
+            rows = report_type == code
+            choice = rng.integers(len(templates), size=int(rows.sum()))
+            row_fields = {field: values[rows] for field, values in fields.items()}
+            title[rows] = _fill([template[0] for template in templates], choice, row_fields)
+            notes[rows] = _fill([template[1] for template in templates], choice, row_fields)
+
+        lists = {}
+        for name, (lookup, count, fewest, most) in REACTION_LISTS.items():
+            lists[name] = lookup[_subset_codes(_choose_subsets(rng, count, rng.integers(fewest, most + 1, size)))]
+        json_columns = {
+            column: np.select(
+                [type_names == report for report in by_type], [lists[name] for name in by_type.values()], '[]'
+            ).astype(object)
+            for column, by_type in REPORT_LISTS.items()
+        }
+        crowd = np.full(size, None, dtype=object)
+        for name, (low, high) in CROWD_SIZES.items():
+            rows = type_names == name
+            crowd[rows] = rng.integers(low, high + 1, int(rows.sum()))
+        competitor = type_names == 'competitor_activity'
+
+        status = sample_index(rng, VERIFICATION_STATUSES, size)
+        statuses = _array(list(VERIFICATION_STATUSES))[status]
+        verified = statuses == 'verified'
+        verified_after = rng.integers(2, 49, size) * 3600
+
+        timestamp = _timestamps(self.reference_time, seconds_before)
+        now = _timestamps(self.reference_time, np.zeros(1, dtype=np.int64))[0]
+        columns = {
+            'report_id': _uuids(rng, size),
+            'volunteer_id': self.volunteer_ids[rng.integers(len(self.volunteer_ids), size=size)],
+            'state_id': np.full(size, self.state_id, dtype=object),
+            'district_id': district_id,
+            'constituency_id': constituency_id,
+            'ward': ward,
+            'booth_number': booth,
+            'address': np.full(size, ''),
+            'report_type': type_names,
+            'title': title,
+            **json_columns,
+            'crowd_size': crowd,
+            'notes': notes,
+            'competitor_party_id': np.where(competitor, self._ids(rng, self.party_ids, size), None),
+            'competitor_activity_description': np.where(competitor, notes, ''),
+            'media_urls': np.full(size, '[]'),
+            'verification_status': statuses,
+            'verified_by_id': np.where(verified, self._ids(rng, self.volunteer_ids, size), None),
+            'verified_at': np.where(
+                verified, _timestamps(self.reference_time, seconds_before - verified_after).astype(object), None
+            ),
+            'verification_notes': _array([VERIFICATION_NOTES.get(name, '') for name in VERIFICATION_STATUSES])[status],
+            'report_date': _dates(self.reference_time, seconds_before),
+            'timestamp': timestamp,
+            'created_at': np.full(size, now, dtype=object),
+            'updated_at': np.full(size, now, dtype=object),
+        }
+
+        stats = {
+            'by_type': tally(report_type, types),
+            'by_status': tally(status, list(VERIFICATION_STATUSES)),
+            'totals': Counter(total_created=size),
+        }
+        return columns, stats
+
+
+class ManyToManyGenerator:
+    """
+    Draws many-to-many rows linking each source row to a few distinct targets
+
+    Row i of the shard plan is source_ids[i]; each gets between fewest and
+    most targets (at most all of them).
+
+    Args:
+        field: The ManyToManyField, e.g. FieldReport.key_issues.field
+        source_ids: Ids of the rows on the field's model
+        target_ids: Ids of the related rows to draw from
+        fewest, most: Inclusive bounds on each source's number of targets
+        seed: Base seed
+    """
+
+    def __init__(self, field, source_ids: Sequence, target_ids: Sequence, fewest: int, most: int, seed: int):
+        self.table = field.m2m_db_table()
+        self.source_column = field.m2m_column_name()
+        self.target_column = field.m2m_reverse_name()
+        self.source_ids = np.array(source_ids)
+        self.target_ids = np.array(target_ids)
+        self.fewest = min(fewest, len(target_ids))
+        self.most = min(most, len(target_ids))
+        self.seed = seed
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for the links of sources start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+        chosen = _choose_subsets(rng, len(self.target_ids), rng.integers(self.fewest, self.most + 1, size))
+        source, target = np.nonzero(chosen)
+        columns = {
+            self.source_column: self.source_ids[start + source],
+            self.target_column: self.target_ids[target],
+        }
+        return columns, {'totals': Counter(links=len(source))}
+
+
+# ---------------------------------------------------------------------------
+# Polling booths
+# ---------------------------------------------------------------------------
+
+BOOTH_BUILDINGS = [
+    'Government Higher Secondary School',
+    'Corporation Primary School',
+    'Government Elementary School',
+    'Municipal High School',
+    'Government Girls High School',
+    'Panchayat Union Primary School',
+    'Government Boys School',
+    'Corporation Middle School',
+    'Community Hall',
+    'Government Primary School',
+    'Municipal Elementary School',
+    'Village Panchayat Office',
+]
+# Constituencies in these districts get more booths
+BOOTH_URBAN_DISTRICTS = ['Chennai', 'Coimbatore', 'Madurai', 'Salem']
+URBAN_BOOTHS = (60, 100)
+RURAL_BOOTHS = (30, 50)
+
+
+class PollingBoothGenerator:
+    """
+    Draws PollingBooth rows numbered 001 upwards in each constituency
+
+    The number of booths in each constituency is drawn up front, in
+    constituency order, stopping after the constituency that reaches
+    target; row i of the shard plan is then the i-th of those booths.
+
+    Args:
+        constituencies: (id, state_id, district_id, name, center_lat,
+            center_lng, district name) of each constituency
+        seed: Base seed
+        reference_time: Creation time recorded on every booth
+        target: Booths to stop after
+    """
+
+    table = PollingBooth._meta.db_table
+
+    def __init__(self, constituencies: List[Tuple], seed: int, reference_time: datetime, target: int = 10_000):
+        self.seed = seed
+        self.reference_time = reference_time
+        ids, state_ids, district_ids, names, lats, lngs, districts = zip(*constituencies) if constituencies else [()] * 7
+
+        rng = np.random.default_rng(seed)
+        urban = np.isin(np.asarray(districts, dtype=str), BOOTH_URBAN_DISTRICTS)
+        counts = np.where(urban, rng.integers(URBAN_BOOTHS[0], URBAN_BOOTHS[1] + 1, len(ids)),
+                          rng.integers(RURAL_BOOTHS[0], RURAL_BOOTHS[1] + 1, len(ids)))
+        kept = int(np.searchsorted(np.cumsum(counts), target)) + 1
+        counts = counts[:kept]
+
+        self.constituency = np.repeat(np.arange(len(counts)), counts)
+        self.booth_number = np.arange(len(self.constituency)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        self.ids = np.array(ids[:kept])
+        self.state_ids = np.array(state_ids[:kept])
+        self.district_ids = np.array(district_ids[:kept])
+        self.names = np.asarray(names[:kept], dtype=str)
+        # Constituencies without a centre are placed at 10N 78E
+        self.lat = np.array([float(lat) if lat else 10.0 for lat in lats[:kept]])
+        self.lng = np.array([float(lng) if lng else 78.0 for lng in lngs[:kept]])
+
+    @property
+    def size(self) -> int:
+        return len(self.constituency)
+
+    def generate(self, start: int, size: int) -> Tuple[Dict[str, np.ndarray], Dict[str, Counter]]:
+        """Columns and statistics for booths start .. start + size - 1"""
+        rng = shard_rng(self.seed, start)
+        constituency = self.constituency[start:start + size]
+        name = self.names[constituency]
+        now = _timestamps(self.reference_time, np.zeros(1, dtype=np.int64))[0]
+
+        columns = {
+            'state_id': self.state_ids[constituency],
+            'district_id': self.district_ids[constituency],
+            'constituency_id': self.ids[constituency],
+            'booth_number': np.char.zfill(self.booth_number[start:start + size].astype(str), 3),
+            'name': _concat(pick(rng, BOOTH_BUILDINGS, size), ' - ', name),
+            'building_name': pick(rng, BOOTH_BUILDINGS, size),
+            'address': np.full(size, ''),
+            'area': _concat(name, ' Zone-', rng.integers(1, 6, size)),
+            'landmark': np.full(size, ''),
+            'pincode': np.full(size, ''),
+            'latitude': np.round(self.lat[constituency] + rng.uniform(-0.05, 0.05, size), 8),
+            'longitude': np.round(self.lng[constituency] + rng.uniform(-0.05, 0.05, size), 8),
+            'total_voters': rng.integers(600, 1201, size),
+            'male_voters': rng.integers(300, 601, size),
+            'female_voters': rng.integers(300, 601, size),
+            'other_voters': np.zeros(size, dtype=np.int64),
+            'is_active': np.ones(size, dtype=bool),
+            'is_accessible': rng.random(size) < 0.75,
+            'metadata': np.full(size, '{}'),
+            'created_at': np.full(size, now, dtype=object),
+            'updated_at': np.full(size, now, dtype=object),
+        }
+        return columns, {'totals': Counter(polling_booths=size)}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+_COPY_NULL = '\\N'
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_text(value) -> str:
+    return _COPY_NULL if value is None else str(value).translate(_COPY_ESCAPES)
+
+
+def _copy_column(values: np.ndarray) -> List[str]:
+    """One column in COPY text format"""
+    kind = values.dtype.kind
+    if kind == 'b':
+        return np.where(values, 't', 'f').tolist()
+    if kind in 'iuf':
+        return values.astype(str).tolist()
+    if kind == 'U':
+        if not any((np.char.find(values, char) >= 0).any() for char in '\\\t\n\r'):
+            return values.tolist()
+        return [value.translate(_COPY_ESCAPES) for value in values.tolist()]
+    # Object columns are mostly drawn from small lookup tables, so each
+    # distinct value is converted once
+    values = values.tolist()
+    distinct = set(values)
+    if len(distinct) * 2 > len(values):
+        return [_copy_text(value) for value in values]
+    return list(map({value: _copy_text(value) for value in distinct}.__getitem__, values))
+
+
+def _batches(rows: Iterator, size: int) -> Iterator[list]:
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_columns(table: str, columns: Dict[str, np.ndarray], batch_size: int = 10_000,
+                  using: str = 'default') -> int:
+    """
+    Insert column arrays into table in one transaction
+
+    Uses COPY FROM STDIN on PostgreSQL and batched executemany elsewhere.
+    Returns the number of rows written.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    names = ', '.join(quote(name) for name in columns)
+    written = 0
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            rows = zip(*(_copy_column(values) for values in columns.values()))
+            sql = f"COPY {quote(table)} ({names}) FROM STDIN"
+            for batch in _batches(rows, batch_size):
+                buffer = io.StringIO('\n'.join(map('\t'.join, batch)) + '\n')
+                raw = cursor.cursor
+                if hasattr(raw, 'copy_expert'):  # psycopg2
+                    raw.copy_expert(sql, buffer)
+                else:  # psycopg 3
+                    with raw.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+                written += len(batch)
+        else:
+            rows = zip(*(values.tolist() for values in columns.values()))
+            sql = f"INSERT INTO {quote(table)} ({names}) VALUES ({', '.join(['%s'] * len(columns))})"
+            for batch in _batches(rows, batch_size):
+                cursor.executemany(sql, batch)
+                written += len(batch)
+    return written
+
+
+def plan_shards(start: int, count: int, shard_size: int = DEFAULT_SHARD_SIZE) -> List[Tuple[int, int]]:
+    """(first row, size) of each shard covering start .. start + count - 1"""
+    return [(first, min(shard_size, start + count - first)) for first in range(start, start + count, shard_size)]
+
+
+def load_shard(generator, start: int, size: int, batch_size: int) -> Dict[str, Counter]:
+    """Generate and write one shard; returns its statistics"""
+    columns, stats = generator.generate(start, size)
+    write_columns(generator.table, columns, batch_size)
+    return stats
+
+
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    import django
+    django.setup()
+    _worker_generator = generator
+
+
+def _load_in_worker(start: int, size: int, batch_size: int) -> Dict[str, Counter]:
+    return load_shard(_worker_generator, start, size, batch_size)
+
+
+def run_shards(generator, shards: List[Tuple[int, int]], batch_size: int = 10_000,
+               workers: int = 1) -> Iterator[Dict[str, Counter]]:
+    """
+    Load shards, yielding each one's statistics as it finishes
+
+    Shards run in worker processes with their own connections when
+    workers > 1; each worker is handed the generator once, not with every
+    shard. SQLite allows a single writer, so it always loads in this
+    process.
+    """
+    if workers <= 1 or connections['default'].vendor == 'sqlite':
+        for start, size in shards:
+            yield load_shard(generator, start, size, batch_size)
+        return
+
+    # Forked workers must not share the parent's database connection
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(generator,)) as executor:
+        futures = [executor.submit(_load_in_worker, start, size, batch_size) for start, size in shards]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def merge_stats(total: Dict[str, Counter], stats: Dict[str, Counter]) -> Dict[str, Counter]:
+    for key, counter in stats.items():
+        total.setdefault(key, Counter()).update(counter)
+    return total
+
+
+def reference_time_for(day: date) -> datetime:
+    """Fixed reference time (midnight UTC) for a day"""
+    return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
@@ -0,0 +1,29 @@
+"""
+Windowed Task Scheduling
+Runs a Celery task once at the end of a window, however many events ask for it
+
+The first caller in a window claims a cache key that lives for the window
+and schedules the task with the window as its countdown; later callers see
+the key and return. If the broker refuses the task the key is released, so
+the next event tries again, and the periodic run of the task picks up
+whatever was left.
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_once_per_window(task, key: str, window: int) -> bool:
+    """Schedule task for the end of the current window; returns whether this call scheduled it"""
+    if not cache.add(key, True, window):
+        return False
+    try:
+        task.apply_async(countdown=window)
+    except Exception as e:
+        cache.delete(key)
+        logger.warning(f"Could not schedule {task.name}: {e}")
+        return False
+    return True
@@ -0,0 +1,39 @@
+"""
+URL Hashing
+Canonical form and hash of article links
+
+News sites link the same article under many spellings (http/https, with
+or without "www.", tracking parameters, fragments, trailing slashes). The
+canonical form drops those differences, and its SHA-1 is the article's
+identity: NewsArticle.url_hash carries a unique index on it.
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only record where the reader came from
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|ref|from)$', re.IGNORECASE)
+
+
+def canonical_url(url: str) -> str:
+    """
+    One spelling per article link
+
+    Scheme, "www." and host case, fragments, tracking parameters, parameter
+    order and trailing slashes do not make a different article.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    return urlunsplit(('https', host, parts.path.rstrip('/') or '/', query, ''))
+
+
+def url_hash(url: str) -> str:
+    """SHA-1 hex digest of the canonical URL"""
+    return hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()
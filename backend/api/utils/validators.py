@@ -3,7 +3,7 @@ Data Validation Utilities for Ward and Polling Booth Import
 Validates CSV/Excel data before bulk insertion into database
 """
 
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Hashable, Iterable, List, Tuple, Optional, Any
 import re
 from decimal import Decimal, InvalidOperation
 from django.core.exceptions import ValidationError
@@ -51,7 +51,7 @@ class WardValidator:
 
         # Validate ward code format (e.g., TN-AC-001-W-001)
         if row.get('code'):
-            if not cls.validate_ward_code(row['code']):
+            if not cls.validate_ward_code(str(row['code'])):
                 errors.append(f"Invalid ward code format: {row['code']}. Expected format: XX-AC-XXX-W-XXX")
 
         # Validate ward number (must be positive integer)
@@ -64,6 +64,7 @@ class WardValidator:
                 errors.append(f"Invalid ward_number: {row['ward_number']} (must be an integer)")
 
         # Validate population (if provided)
+        pop = None
         if row.get('population'):
             try:
                 pop = int(row['population'])
@@ -79,7 +80,7 @@ class WardValidator:
                 if voters < 0:
                     errors.append("voter_count cannot be negative")
                 # Sanity check: voter_count should not exceed population
-                if row.get('population') and voters > int(row['population']):
+                if pop is not None and voters > pop:
                     errors.append("voter_count cannot exceed population")
             except (ValueError, TypeError):
                 errors.append(f"Invalid voter_count: {row['voter_count']} (must be an integer)")
@@ -95,12 +96,12 @@ class WardValidator:
 
         # Validate urbanization
         if row.get('urbanization'):
-            if row['urbanization'].lower() not in cls.URBANIZATION_TYPES:
+            if str(row['urbanization']).lower() not in cls.URBANIZATION_TYPES:
                 errors.append(f"Invalid urbanization: {row['urbanization']}. Must be one of {cls.URBANIZATION_TYPES}")
 
         # Validate income_level
         if row.get('income_level'):
-            if row['income_level'].lower() not in cls.INCOME_LEVELS:
+            if str(row['income_level']).lower() not in cls.INCOME_LEVELS:
                 errors.append(f"Invalid income_level: {row['income_level']}. Must be one of {cls.INCOME_LEVELS}")
 
         # Validate literacy_rate (0-100)
@@ -270,7 +271,7 @@ class PollingBoothValidator:
 
         # Validate booth type
         if row.get('booth_type'):
-            if row['booth_type'].lower() not in cls.BOOTH_TYPES:
+            if str(row['booth_type']).lower() not in cls.BOOTH_TYPES:
                 errors.append(f"Invalid booth_type: {row['booth_type']}. Must be one of {cls.BOOTH_TYPES}")
 
         # Validate priority level (1-5)
@@ -328,6 +329,40 @@ class PollingBoothValidator:
 class DuplicateDetector:
     """Detect duplicates in import data"""
 
+    @staticmethod
+    def scan(keys: Iterable[Optional[Hashable]], first_seen: Dict[Hashable, Any],
+             labels: Optional[Iterable[Any]] = None) -> List[Tuple[int, Any]]:
+        """
+        Single hash pass over keys
+
+        Records the label (default: 1-based position) of each key's first
+        occurrence in first_seen, which can be shared across batches, and
+        returns (position index, first label) for every repeat. None keys
+        are ignored.
+        """
+        repeats = []
+        labels = iter(labels) if labels is not None else None
+        for index, key in enumerate(keys):
+            label = next(labels) if labels is not None else index + 1
+            if key is None:
+                continue
+            first = first_seen.get(key)
+            if first is None:
+                first_seen[key] = label
+            else:
+                repeats.append((index, first))
+        return repeats
+
+    @staticmethod
+    def ward_key(row: Dict[str, Any]) -> Optional[Hashable]:
+        return row.get('code') or None
+
+    @staticmethod
+    def booth_key(row: Dict[str, Any]) -> Optional[Hashable]:
+        if row.get('constituency_code') and row.get('booth_number'):
+            return (row['constituency_code'], row['booth_number'])
+        return None
+
     @staticmethod
     def find_duplicate_ward_codes(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Find duplicate ward codes in the batch"""
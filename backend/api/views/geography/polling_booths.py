@@ -196,7 +196,7 @@ def polling_booth_bulk_import(request):
     Bulk import polling booths from CSV or Excel file
 
     Expected file format:
-    - CSV or Excel (.csv, .xlsx, .xls)
+    - CSV, gzip'd CSV or Excel (.csv, .csv.gz, .xlsx, .xls)
     - Headers: constituency_code, ward_code (optional), booth_number, name, address,
                latitude, longitude, total_voters, male_voters, female_voters, transgender_voters,
                booth_type, is_accessible, building_name, priority_level, etc.
@@ -236,10 +236,8 @@ def polling_booth_bulk_import(request):
             'completed_at': job.completed_at
         })
 
-        return Response(
-            response_serializer.data,
-            status=status.HTTP_200_OK if job.status == 'completed' else status.HTTP_400_BAD_REQUEST
-        )
+        # Import runs on a worker; poll the import status endpoint for progress
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         return Response(
@@ -260,7 +258,7 @@ def polling_booth_import_status(request, job_id):
 
         # Get error details if exists
         errors = []
-        if job.status == 'failed':
+        if job.status == 'failed' or job.failed_count:
             error_records = BulkUploadError.objects.filter(job=job)[:100]  # Limit to 100 errors
             errors = [{
                 'row_number': err.row_number,
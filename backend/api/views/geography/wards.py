@@ -195,7 +195,7 @@ def ward_bulk_import(request):
     Bulk import wards from CSV or Excel file
 
     Expected file format:
-    - CSV or Excel (.csv, .xlsx, .xls)
+    - CSV, gzip'd CSV or Excel (.csv, .csv.gz, .xlsx, .xls)
     - Headers: constituency_code, name, code, ward_number, population, voter_count,
                total_booths, urbanization, income_level, literacy_rate
 
@@ -234,10 +234,8 @@ def ward_bulk_import(request):
             'completed_at': job.completed_at
         })
 
-        return Response(
-            response_serializer.data,
-            status=status.HTTP_200_OK if job.status == 'completed' else status.HTTP_400_BAD_REQUEST
-        )
+        # Import runs on a worker; poll the import status endpoint for progress
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         return Response(
@@ -258,7 +256,7 @@ def ward_import_status(request, job_id):
 
         # Get error details if exists
         errors = []
-        if job.status == 'failed':
+        if job.status == 'failed' or job.failed_count:
             from api.models import BulkUploadError
             error_records = BulkUploadError.objects.filter(job=job)[:100]  # Limit to 100 errors
             errors = [{
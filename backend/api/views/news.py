@@ -3,15 +3,18 @@ News Article API Views
 Provides endpoints for Tamil Nadu political news with sentiment analysis
 """
 
+from collections import Counter
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Avg
 from django.utils import timezone
 from datetime import timedelta
 
 from api.models import NewsArticle
+from api.services.news_search import search_articles, search_terms, sources_matching
 from api.serializers.news_serializers import (
     NewsArticleListSerializer,
     NewsArticleDetailSerializer,
@@ -20,6 +23,24 @@ from api.serializers.news_serializers import (
 )
 
 
+def count_topics(articles):
+    """
+    Topic counts over the stories among articles
+
+    Near-duplicate copies are not read; each story counts once per copy
+    carried (its cluster_size), and once more in the story counts.
+
+    Returns:
+        tuple: (articles per topic, stories per topic) Counters
+    """
+    coverage, stories = Counter(), Counter()
+    for topics, cluster_size in articles.filter(duplicate_of__isnull=True).values_list('key_topics', 'cluster_size'):
+        for topic in topics or []:
+            coverage[topic] += cluster_size
+            stories[topic] += 1
+    return coverage, stories
+
+
 class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for news articles (read-only)
@@ -59,7 +80,7 @@ class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
         # Filter by source
         source = self.request.query_params.get('source', None)
         if source:
-            queryset = queryset.filter(source__icontains=source)
+            queryset = queryset.filter(source__in=sources_matching(source))
 
         # Filter by language
         language = self.request.query_params.get('language', None)
@@ -71,15 +92,19 @@ class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
         if relevant_only.lower() == 'true':
             queryset = queryset.filter(is_relevant=True)
 
-        # Search in title
+        # Full-text search in title and text, best matches first
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(article_text__icontains=search)
-            )
+            return search_articles(queryset, search)
 
         return queryset.order_by('-published_at')
 
+    def get_serializer_context(self):
+        """Pass the search terms on, for the list serializer's highlights"""
+        context = super().get_serializer_context()
+        context['search_terms'] = search_terms(self.request.query_params.get('search', ''))
+        return context
+
     def get_serializer_class(self):
         """Use detailed serializer for retrieve action"""
         if self.action == 'retrieve':
@@ -132,14 +157,8 @@ class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
         language_counts = articles.values('language').annotate(count=Count('id'))
         articles_by_language = {item['language']: item['count'] for item in language_counts}
 
-        # Trending topics (flatten and count)
-        all_topics = []
-        for article in articles:
-            if article.key_topics:
-                all_topics.extend(article.key_topics)
-
-        from collections import Counter
-        topic_counts = Counter(all_topics)
+        # Trending topics, stories weighted by the copies carried
+        topic_counts, _ = count_topics(articles)
         trending_topics = [{'topic': topic, 'count': count} for topic, count in topic_counts.most_common(10)]
 
         stats = {
@@ -238,24 +257,32 @@ class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
             is_relevant=True
         )
 
-        # Flatten topics
-        all_topics = []
-        for article in articles:
-            if article.key_topics:
-                all_topics.extend(article.key_topics)
-
-        # Count and rank
-        from collections import Counter
-        topic_counts = Counter(all_topics)
+        # Count and rank; a story carried by several outlets weighs as many articles
+        topic_counts, story_counts = count_topics(articles)
+        total_topics = sum(topic_counts.values())
         trending = [
-            {'topic': topic, 'count': count, 'percentage': round((count / len(all_topics)) * 100, 1)}
+            {
+                'topic': topic,
+                'count': count,
+                'stories': story_counts[topic],
+                'percentage': round((count / total_topics) * 100, 1),
+            }
             for topic, count in topic_counts.most_common(limit_int)
         ]
 
+        # Most widely carried stories
+        top_stories = list(
+            articles.filter(duplicate_of__isnull=True, cluster_size__gt=1)
+            .order_by('-cluster_size', '-published_at')
+            .values('id', 'title', 'source', 'published_at', 'tvk_sentiment', 'cluster_size')[:10]
+        )
+
         return Response({
             'period_days': days_int,
             'total_articles': articles.count(),
-            'total_topics': len(all_topics),
+            'total_stories': articles.filter(duplicate_of__isnull=True).count(),
+            'total_topics': total_topics,
             'unique_topics': len(topic_counts),
             'trending_topics': trending,
+            'top_stories': top_stories,
         })
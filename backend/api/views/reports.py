@@ -11,6 +11,40 @@ from datetime import datetime, timedelta
 import uuid
 
 from api.models_analytics import ReportTemplate, GeneratedReport
+from api.services.report_engine import reuse_completed_report
+from api.tasks import render_generated_report
+
+
+def queue_report(report):
+    """
+    Complete the report from an identical fresh one if possible,
+    otherwise render it in a worker
+
+    Returns the report's status: 'completed' when it was reused.
+    """
+    if not reuse_completed_report(report):
+        render_generated_report.delay(str(report.report_id))
+    return report.status
+
+
+def report_response(report, report_status, message, estimated_time=None, **fields):
+    """
+    202 with the progress message while the report renders, or 200 with
+    its file URLs when queue_report completed it from an identical report
+    """
+    data = {"report_id": str(report.report_id), **fields, "status": report_status}
+    if report_status == 'completed':
+        data.update({
+            "message": "An identical report was generated recently; its files are ready.",
+            "pdf_url": report.pdf_file_url,
+            "excel_url": report.excel_file_url,
+        })
+        return Response(data, status=status.HTTP_200_OK)
+
+    data["message"] = message
+    if estimated_time:
+        data["estimated_time"] = estimated_time
+    return Response(data, status=status.HTTP_202_ACCEPTED)
 
 
 class ExecutiveSummaryReportView(APIView):
@@ -36,18 +70,15 @@ class ExecutiveSummaryReportView(APIView):
                 'date_from': str(date_from) if date_from else None,
                 'date_to': str(date_to),
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        # TODO: Queue background task to generate report
-        # For now, return job ID
-
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started. You will be notified when ready.",
-            "estimated_time": "2-5 minutes"
-        }, status=status.HTTP_202_ACCEPTED)
+        # Render files in a worker (or reuse an identical report)
+        return report_response(
+            report, queue_report(report),
+            "Report generation started. You will be notified when ready.", estimated_time="2-5 minutes",
+        )
 
 
 class CampaignPerformanceReportView(APIView):
@@ -73,14 +104,11 @@ class CampaignPerformanceReportView(APIView):
                 'date_from': str(date_from) if date_from else None,
                 'date_to': str(date_to),
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(report, queue_report(report), "Report generation started.")
 
 
 class ConstituencyReportView(APIView):
@@ -107,14 +135,11 @@ class ConstituencyReportView(APIView):
             filters_used={
                 'constituency_id': constituency_id,
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(report, queue_report(report), "Report generation started.")
 
 
 class DailyActivityReportView(APIView):
@@ -126,6 +151,7 @@ class DailyActivityReportView(APIView):
 
     def post(self, request):
         report_date = request.data.get('date', timezone.now().date())
+        export_format = request.data.get('format', 'pdf')
 
         report = GeneratedReport.objects.create(
             report_name=f"Daily Activity - {report_date}",
@@ -135,14 +161,11 @@ class DailyActivityReportView(APIView):
             filters_used={
                 'date': str(report_date),
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(report, queue_report(report), "Report generation started.")
 
 
 class WeeklySummaryReportView(APIView):
@@ -155,6 +178,7 @@ class WeeklySummaryReportView(APIView):
     def post(self, request):
         week_start = request.data.get('week_start')
         week_end = request.data.get('week_end')
+        export_format = request.data.get('format', 'pdf')
 
         report = GeneratedReport.objects.create(
             report_name=f"Weekly Summary - {timezone.now().strftime('%Y-%m-%d')}",
@@ -165,14 +189,11 @@ class WeeklySummaryReportView(APIView):
                 'week_start': str(week_start) if week_start else None,
                 'week_end': str(week_end) if week_end else None,
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(report, queue_report(report), "Report generation started.")
 
 
 class VolunteerPerformanceReportView(APIView):
@@ -186,6 +207,7 @@ class VolunteerPerformanceReportView(APIView):
         date_from = request.data.get('date_from')
         date_to = request.data.get('date_to', timezone.now().date())
         volunteer_ids = request.data.get('volunteer_ids', [])
+        export_format = request.data.get('format', 'pdf')
 
         report = GeneratedReport.objects.create(
             report_name=f"Volunteer Performance - {timezone.now().strftime('%Y-%m-%d')}",
@@ -197,14 +219,11 @@ class VolunteerPerformanceReportView(APIView):
                 'date_to': str(date_to),
                 'volunteer_ids': volunteer_ids,
             },
+            metadata={'export_format': export_format},
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(report, queue_report(report), "Report generation started.")
 
 
 class CustomReportBuilderView(APIView):
@@ -246,16 +265,15 @@ class CustomReportBuilderView(APIView):
             metadata={
                 'metrics': metrics,
                 'visualizations': visualizations,
+                'export_format': export_format,
             },
             expires_at=timezone.now() + timedelta(hours=24)
         )
 
-        return Response({
-            "report_id": str(report.report_id),
-            "template_id": str(template.template_id) if save_as_template else None,
-            "status": "pending",
-            "message": "Report generation started."
-        }, status=status.HTTP_202_ACCEPTED)
+        return report_response(
+            report, queue_report(report), "Report generation started.",
+            template_id=str(template.template_id) if save_as_template else None,
+        )
 
 
 class ReportStatusView(APIView):
@@ -283,6 +301,7 @@ class ReportStatusView(APIView):
         return Response({
             "report_id": str(report.report_id),
             "status": report.status,
+            "progress": report.progress,
             "pdf_url": report.pdf_file_url if report.status == 'completed' else None,
             "excel_url": report.excel_file_url if report.status == 'completed' else None,
             "error_message": report.error_message if report.status == 'failed' else None,
@@ -5,7 +5,6 @@ User Management Views for Bulk Upload
 import csv
 import io
 import os
-import tempfile
 from django.http import HttpResponse, FileResponse
 from django.utils import timezone
 from rest_framework import status
@@ -21,7 +20,7 @@ from api.services.bulk_user_import import BulkUserImportService, start_bulk_uplo
 @permission_classes([IsAuthenticated])
 def bulk_upload_users(request):
     """
-    Upload CSV file for bulk user creation
+    Upload CSV file (optionally gzip'd as .csv.gz) for bulk user creation
 
     POST /api/users/bulk-upload/
     Headers: Authorization: Bearer <token>
@@ -53,7 +52,7 @@ def bulk_upload_users(request):
     uploaded_file = request.FILES['file']
 
     # Validate file type
-    if not uploaded_file.name.endswith('.csv'):
+    if not uploaded_file.name.lower().endswith(('.csv', '.csv.gz')):
         return Response({
             'error': 'Invalid file type. Please upload a CSV file.'
         }, status=status.HTTP_400_BAD_REQUEST)
@@ -65,24 +64,15 @@ def bulk_upload_users(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        # Read file content
-        file_content = uploaded_file.read().decode('utf-8')
-
-        # Create a temporary file to store the uploaded CSV
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-
         # Create BulkUploadJob
         job = BulkUploadJob.objects.create(
             created_by=request.user,
             file_name=uploaded_file.name,
-            file_path=temp_file_path,
             status='pending'
         )
 
-        # Start background processing
-        start_bulk_upload_processing(job, file_content, request.user)
+        # Store the file and queue it for a worker; it is streamed, never read whole
+        start_bulk_upload_processing(job, uploaded_file)
 
         return Response({
             'job_id': str(job.job_id),
@@ -208,12 +198,14 @@ def cancel_bulk_upload(request, job_id):
     try:
         job = BulkUploadJob.objects.get(job_id=job_id, created_by=request.user)
 
-        # Only allow cancellation if job is still pending or processing
-        if job.status in ['pending', 'validating', 'processing']:
-            job.status = 'cancelled'
-            job.completed_at = timezone.now()
-            job.save()
+        # Only allow cancellation if job is still pending or processing.
+        # A conditional update so a worker's progress writes are not overwritten;
+        # the worker rolls back its current chunk and stops at the next checkpoint.
+        cancelled = BulkUploadJob.objects.filter(
+            pk=job.pk, status__in=['pending', 'validating', 'processing']
+        ).update(status='cancelled', completed_at=timezone.now(), updated_at=timezone.now())
 
+        if cancelled:
             return Response({
                 'message': 'Bulk upload cancelled successfully'
             })
@@ -5,7 +5,7 @@ REST API endpoints for frontend to fetch conversation data and analytics
 import logging
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Avg, Prefetch, Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -14,6 +14,7 @@ from api.models import (
     WhatsAppConversation,
     WhatsAppMessage,
     VoterProfile,
+    VoterSentimentEvent,
     BotConfiguration
 )
 from api.serializers.whatsapp_serializers import (
@@ -26,6 +27,7 @@ from api.serializers.whatsapp_serializers import (
     ClickToWhatsAppLinkSerializer
 )
 from api.services.whatsapp_service import get_whatsapp_service
+from api.services.voter_sentiment import sentiment_dropped, sentiment_series
 
 logger = logging.getLogger(__name__)
 
@@ -269,6 +271,8 @@ class VoterProfileViewSet(viewsets.ReadOnlyModelViewSet):
 
     GET /api/whatsapp/voters/ - List voter profiles
     GET /api/whatsapp/voters/{id}/ - Get voter profile detail
+    GET /api/whatsapp/voters/{id}/sentiment/ - Get sentiment time series
+    GET /api/whatsapp/voters/?sentiment_dropped=30 - Voters whose sentiment fell in the last 30 days
     """
 
     permission_classes = [IsAuthenticated]
@@ -292,7 +296,28 @@ class VoterProfileViewSet(viewsets.ReadOnlyModelViewSet):
         if has_referrals == 'true':
             queryset = queryset.filter(referrals_made__gt=0)
 
-        return queryset.order_by('-last_contacted')
+        # Filter by a drop in sentiment over the last N days
+        dropped_days = self.request.query_params.get('sentiment_dropped')
+        if dropped_days:
+            try:
+                days = int(dropped_days)
+                min_drop = float(self.request.query_params.get('min_drop', 0.2))
+            except ValueError:
+                days, min_drop = 30, 0.2
+            queryset = queryset.filter(id__in=sentiment_dropped(days, min_drop).values('id'))
+
+        return queryset.prefetch_related(
+            Prefetch(
+                'sentiment_events',
+                queryset=VoterSentimentEvent.objects.filter(recorded_at__gte=timezone.now() - timedelta(days=90))
+            )
+        ).order_by('-last_contacted')
+
+    @action(detail=True, methods=['get'])
+    def sentiment(self, request, pk=None):
+        """Full sentiment time series of a voter"""
+        profile = self.get_object()
+        return Response({'voter_profile': str(profile.id), 'series': sentiment_series(profile)})
 
 
 class BotConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
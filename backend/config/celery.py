@@ -39,6 +39,16 @@ app.conf.beat_schedule = {
         }
     },
 
+    # Scheduled template reports - Runs every hour
+    # Templates whose schedule_time has passed are rendered in one batch sharing dataset snapshots
+    'scheduled-template-reports': {
+        'task': 'api.tasks.generate_scheduled_reports',
+        'schedule': crontab(minute=0),
+        'options': {
+            'expires': 3600,
+        }
+    },
+
     # Monthly Report - Runs on 1st of every month at 10 AM
     'monthly-comprehensive-report': {
         'task': 'api.tasks.generate_monthly_report',
@@ -60,6 +70,96 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=0, minute=30),
     },
 
+    # Deliver queued email (welcome emails, report notices) - Runs every minute
+    'drain-email-outbox': {
+        'task': 'api.tasks.drain_email_outbox',
+        'schedule': crontab(),
+        'options': {
+            'expires': 60,
+        }
+    },
+
+    # Resume bulk uploads whose worker died - Runs every 5 minutes
+    'resume-stalled-bulk-uploads': {
+        'task': 'api.tasks.resume_stalled_bulk_uploads',
+        'schedule': crontab(minute='*/5'),
+        'options': {
+            'expires': 300,
+        }
+    },
+
+    # Pick up WhatsApp messages whose worker was never queued or died - Runs every minute
+    'sweep-whatsapp-events': {
+        'task': 'api.tasks.sweep_whatsapp_events',
+        'schedule': crontab(),
+        'options': {
+            'expires': 60,
+        }
+    },
+
+    # Apply WhatsApp delivery statuses left by a missed flush - Runs every minute
+    'flush-whatsapp-statuses': {
+        'task': 'api.tasks.flush_whatsapp_statuses',
+        'schedule': crontab(),
+        'options': {
+            'expires': 60,
+        }
+    },
+
+    # Enrich WhatsApp messages left pending by a missed batch - Runs every minute
+    'enrich-whatsapp-messages': {
+        'task': 'api.tasks.enrich_whatsapp_messages',
+        'schedule': crontab(),
+        'options': {
+            'expires': 60,
+        }
+    },
+
+    # Resume WhatsApp broadcasts whose worker died - Runs every 5 minutes
+    'resume-stalled-whatsapp-broadcasts': {
+        'task': 'api.tasks.resume_stalled_whatsapp_broadcasts',
+        'schedule': crontab(minute='*/5'),
+        'options': {
+            'expires': 300,
+        }
+    },
+
+    # Retrain the local WhatsApp classifier from LLM labels - Runs daily at 3:30 AM
+    'train-local-classifier': {
+        'task': 'api.tasks.train_local_classifier',
+        'schedule': crontab(hour=3, minute=30),
+        'options': {
+            'expires': 3600,
+        }
+    },
+
+    # Scrape Tamil Nadu news sources - Runs every 6 hours
+    'scrape-news': {
+        'task': 'api.tasks.scrape_news',
+        'schedule': crontab(hour='*/6', minute=0),
+        'options': {
+            'expires': 3600,
+        }
+    },
+
+    # Analyze news articles not yet analyzed - Runs every 15 minutes
+    'analyze-news-articles': {
+        'task': 'api.tasks.analyze_news_articles',
+        'schedule': crontab(minute='*/15'),
+        'options': {
+            'expires': 900,
+        }
+    },
+
+    # Downsample voter sentiment history - Runs daily at 2:45 AM
+    'compact-voter-sentiment': {
+        'task': 'api.tasks.compact_voter_sentiment',
+        'schedule': crontab(hour=2, minute=45),
+        'options': {
+            'expires': 3600,
+        }
+    },
+
     # Aggregate analytics data - Runs hourly
     'aggregate-analytics-hourly': {
         'task': 'api.tasks.aggregate_analytics_task',
@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text and trigram search lookups
 
     # Third-party apps
     'rest_framework',
@@ -411,6 +412,35 @@ else:
 
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@pulseofpeople.com')
 
+# Email outbox delivery (see api/services/email_outbox.py)
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '100')),
+    'RATE_PER_SECOND': float(os.environ.get('EMAIL_OUTBOX_RATE_PER_SECOND', '10')),
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BASE_SECONDS': 60,
+    'RETRY_MAX_SECONDS': 3600,
+}
+
+# OpenAI (news sentiment analysis); OPENAI_BASE_URL points at a compatible server
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL') or None
+
+# News analysis budgets (see api/services/tvk_sentiment_analyzer.py); set them
+# to the account's rate limits
+NEWS_ANALYSIS = {
+    'REQUESTS_PER_MINUTE': float(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', '500')),
+    'TOKENS_PER_MINUTE': float(os.environ.get('OPENAI_TOKENS_PER_MINUTE', '300000')),
+    'CONCURRENCY': int(os.environ.get('NEWS_ANALYSIS_CONCURRENCY', '8')),
+}
+
+# WhatsApp broadcasts (see api/services/whatsapp_broadcast.py); set the rate
+# to the sending number's messaging tier
+WHATSAPP_BROADCAST = {
+    'GRAPH_API_URL': os.environ.get('WHATSAPP_GRAPH_API_URL', 'https://graph.facebook.com/v21.0'),
+    'MESSAGES_PER_SECOND': float(os.environ.get('WHATSAPP_MESSAGES_PER_SECOND', '80')),
+    'CONCURRENCY': int(os.environ.get('WHATSAPP_BROADCAST_CONCURRENCY', '32')),
+}
+
 # =====================================================
 # CACHING CONFIGURATION (Redis)
 # =====================================================
@@ -456,6 +486,8 @@ CACHE_TTL = {
     'geographic_data': 3600,  # 1 hour
     'user_permissions': 1800,  # 30 minutes
     'constituency_list': 7200,  # 2 hours
+    'report_snapshot': 900,  # 15 minutes
+    'ai_results': 604800,  # 7 days; prompt edits change the keys
 }
 
 # Session cache (using Redis)